@@ -0,0 +1,218 @@
+# Web sunucusu olmadan toplu tarama: python -m backend
+# Abonelikler süreç içinde, paralel taranır; sonuçlar her abonelik bittikçe NDJSON/CSV/Parquet çıktısına
+# yazılır ve (varsayılan olarak) dashboard'un okuduğu depolara kaydedilir.
+#
+# Kullanım (proje kök dizininden):
+#     python -m backend --subscription <id> --subscription <id2> -o bulgular.ndjson   # AZURE_* ortam değişkenleri
+#     python -m backend --config data/schedules.json --workers 8 -o bulgular.parquet
+#     python -m backend --fake --fake-public-ips 5000 --profile -o /dev/null
+import argparse
+import json
+import logging
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import ExitStack
+from typing import Any, Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+from . import telemetry
+from .export import (
+    EXPORT_FORMATS,
+    ExportUnavailable,
+    check_format,
+    export_to_file,
+    format_for_path,
+    records_dataset
+)
+from .logging_config import configure_logging, shutdown_logging
+from .recommendations import Recommendation
+from .scan import ScanIncomplete, scan_subscription
+from .scheduler import load_schedule_config
+
+logger = logging.getLogger("backend.cli")
+
+DEFAULT_CLI_WORKERS = 4
+
+
+class Target(NamedTuple):
+    subscription_id: str
+    tenant_id: str
+    client_id: str
+    client_secret: str
+
+
+class ScanResult(NamedTuple):
+    subscription_id: str
+    scanned_at: float
+    duration: float
+    records: List[Recommendation]
+    trace: Optional[telemetry.Trace]
+    error: Optional[str]
+
+
+def _targets(args, parser: argparse.ArgumentParser) -> List[Target]:
+    if args.fake:
+        from .fake_azure import FAKE_SUBSCRIPTION_ID
+        return [Target(subscription_id, "fake-tenant", "fake-client", "fake-secret")
+                for subscription_id in args.subscription or [FAKE_SUBSCRIPTION_ID]]
+    if args.config:
+        targets = []
+        for config in load_schedule_config(args.config):
+            if not config.enabled:
+                continue
+            secret = os.getenv(config.client_secret_env)
+            if not secret:
+                parser.error(f"{config.subscription_id}: {config.client_secret_env} ortam değişkeni tanımlı değil")
+            targets.append(Target(config.subscription_id, config.tenant_id, config.client_id, secret))
+        return targets
+    credentials = (os.getenv("AZURE_TENANT_ID"), os.getenv("AZURE_CLIENT_ID"), os.getenv("AZURE_CLIENT_SECRET"))
+    if not args.subscription or not all(credentials):
+        parser.error("--subscription (ya da --config) ve AZURE_TENANT_ID, AZURE_CLIENT_ID, AZURE_CLIENT_SECRET gerekli")
+    return [Target(subscription_id, *credentials) for subscription_id in args.subscription]
+
+
+def _scan(target: Target, persist: bool, profile: bool) -> ScanResult:
+    start = time.perf_counter()
+    trace = None
+    with ExitStack() as stack:
+        if profile:
+            trace = stack.enter_context(telemetry.start_trace(f"scan {target.subscription_id}"))
+        try:
+            records = scan_subscription(*target, source="cli", persist=persist)
+            error = None
+        except ScanIncomplete as e:
+            records, error = e.records, str(e)
+        except Exception as e:
+            logger.error("Abonelik taranamadı: %s", e, extra={"subscription_id": target.subscription_id},
+                         exc_info=logger.isEnabledFor(logging.DEBUG))
+            records, error = [], str(e)
+    return ScanResult(target.subscription_id, time.time(), time.perf_counter() - start, records, trace, error)
+
+
+def run_scans(targets: List[Target], workers: int, persist: bool, profile: bool) -> Iterator[ScanResult]:
+    """Abonelikleri en fazla `workers` paralellikle tarar; sonuçları bitiş sırasıyla üretir."""
+    with ThreadPoolExecutor(max_workers=max(1, min(workers, len(targets))), thread_name_prefix="cli-scan") as pool:
+        futures = [pool.submit(_scan, target, persist, profile) for target in targets]
+        for future in as_completed(futures):
+            yield future.result()
+
+
+def profile_report(results: List[ScanResult], wall_seconds: float,
+                   fake_calls: Optional[Dict[str, int]] = None) -> Dict[str, Any]:
+    """Abonelik başına süre ve operasyon dökümü ile süreç geneli operasyon sayıları/süreleri."""
+    report: Dict[str, Any] = {
+        "wall_seconds": round(wall_seconds, 3),
+        "subscriptions": [
+            {
+                "subscription_id": result.subscription_id,
+                "duration_seconds": round(result.duration, 3),
+                "findings": len(result.records),
+                "error": result.error,
+                "operations": result.trace.summary() if result.trace else {},
+            }
+            for result in sorted(results, key=lambda r: r.subscription_id)
+        ],
+        "operations": telemetry.registry.operation_snapshot(),
+    }
+    if fake_calls is not None:
+        report["fake_azure_calls"] = dict(sorted(fake_calls.items()))
+    return report
+
+
+def _print_profile(report: Dict[str, Any]) -> None:
+    out = sys.stderr
+    print(f"\nToplam süre: {report['wall_seconds']:.2f} s", file=out)
+    print(f"{'Abonelik':<40} {'Süre (s)':>9} {'Bulgu':>7}", file=out)
+    for sub in report["subscriptions"]:
+        print(f"{sub['subscription_id']:<40} {sub['duration_seconds']:>9.2f} {sub['findings']:>7}"
+              + (f"  HATA: {sub['error']}" if sub["error"] else ""), file=out)
+    print(f"\n{'Operasyon':<50} {'Çağrı':>7} {'Toplam ms':>11} {'Ort. ms':>9} {'Hata':>5}", file=out)
+    operations = sorted(report["operations"].items(), key=lambda item: -item[1]["total_ms"])
+    for operation, stats in operations:
+        print(f"{operation:<50} {stats['count']:>7} {stats['total_ms']:>11.1f} {stats['avg_ms']:>9.2f} "
+              f"{stats['errors']:>5}", file=out)
+    if "fake_azure_calls" in report:
+        print(f"\n{'Sahte Azure çağrısı':<50} {'Sayı':>7}", file=out)
+        for call, count in report["fake_azure_calls"].items():
+            print(f"{call:<50} {count:>7}", file=out)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m backend", description="Abonelikleri web sunucusu olmadan tarar")
+    parser.add_argument("--subscription", action="append", help="Taranacak abonelik (birden fazla verilebilir)")
+    parser.add_argument("--config", help="Abonelik listesi (zamanlayıcıyla aynı JSON biçimi)")
+    parser.add_argument("--workers", type=int, default=int(os.getenv("CLI_WORKERS", DEFAULT_CLI_WORKERS)),
+                        help="Aynı anda taranacak abonelik sayısı")
+    parser.add_argument("--output", "-o", default="-", help="Çıktı dosyası ('-' = stdout)")
+    parser.add_argument("--format", choices=sorted(EXPORT_FORMATS), default=None,
+                        help="Verilmezse dosya uzantısından belirlenir (varsayılan ndjson)")
+    parser.add_argument("--no-store", action="store_true",
+                        help="Sonuçları geçmiş ve son sonuç depolarına yazma (--fake ile her zaman)")
+    parser.add_argument("--profile", action="store_true", help="Süre ve çağrı sayısı raporunu stderr'e yaz")
+    parser.add_argument("--profile-output", help="Profil raporunu JSON olarak bu dosyaya da yaz")
+    fake = parser.add_argument_group("sahte Azure (çevrimdışı çalıştırma)")
+    fake.add_argument("--fake", action="store_true", help="Azure yerine backend/fake_azure.py kullan")
+    fake.add_argument("--fake-public-ips", type=int, default=50)
+    fake.add_argument("--fake-plans", type=int, default=20)
+    fake.add_argument("--fake-disks", type=int, default=50)
+    fake.add_argument("--fake-snapshots", type=int, default=20)
+    fake.add_argument("--fake-latency-ms", type=float, default=0.0)
+    fake.add_argument("--fake-error-rate", type=float, default=0.0)
+    args = parser.parse_args(argv)
+
+    # stdout çıktıya ayrılmıştır; loglar stderr'e yazılır
+    configure_logging(stream=sys.stderr)
+    fmt = format_for_path(args.output, args.format, default="ndjson")
+    try:
+        check_format(fmt)
+    except (ValueError, ExportUnavailable) as e:
+        parser.error(str(e))
+    targets = _targets(args, parser)
+    if not targets:
+        parser.error("Taranacak abonelik yok")
+    profile = args.profile or bool(args.profile_output)
+    persist = not (args.no_store or args.fake)
+
+    with ExitStack() as stack:
+        azure = None
+        if args.fake:
+            from .fake_azure import FakeAzure
+            azure = stack.enter_context(FakeAzure(
+                public_ips=args.fake_public_ips, app_service_plans=args.fake_plans, disks=args.fake_disks,
+                snapshots=args.fake_snapshots, latency_ms=args.fake_latency_ms, error_rate=args.fake_error_rate
+            ).install())
+        if profile:
+            telemetry.registry.reset()
+        output = sys.stdout.buffer if args.output == "-" else stack.enter_context(open(args.output, "wb"))
+
+        results: List[ScanResult] = []
+        start = time.perf_counter()
+
+        def completed() -> Iterator[Tuple[str, float, List[Recommendation]]]:
+            for result in run_scans(targets, args.workers, persist, profile):
+                results.append(result)
+                yield result.subscription_id, result.scanned_at, result.records
+
+        export_to_file(records_dataset(completed()), fmt, output)
+        wall = time.perf_counter() - start
+        fake_calls = dict(azure.calls) if azure is not None else None
+
+    shutdown_logging()
+    failed = [result for result in results if result.error]
+    findings = sum(len(result.records) for result in results)
+    savings = sum(record.monthly_savings for result in results for record in result.records)
+    print(f"{len(results)} abonelik, {findings:,} bulgu, aylık ~${savings:,.2f} tasarruf, {wall:.2f} s"
+          + (f", {len(failed)} hata" if failed else ""), file=sys.stderr)
+
+    if profile:
+        report = profile_report(results, wall, fake_calls)
+        _print_profile(report)
+        if args.profile_output:
+            with open(args.profile_output, "w", encoding="utf-8") as f:
+                json.dump(report, f, ensure_ascii=False, indent=2)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,194 @@
+# CPU yoğun analiz adımları (yüzdelik metrikler, tasarruf toplamları) için süreç havuzu.
+# Girdi ve çıktı dizileri paylaşılan bellekte (multiprocessing.shared_memory) numpy tamponu olarak tutulur;
+# worker'lara yalnızca tampon adı, şekil ve satır aralığı gönderilir, veri pickle edilmez. Her worker kendi satır
+# aralığını hesaplayıp sonucu doğrudan çıktı tamponuna yazar. I/O adımları (Azure, Retail Prices) asyncio ve
+# thread havuzlarında kalır; bu modül yalnızca numpy çekirdeklerini GIL dışına taşır.
+#
+# ANALYSIS_WORKERS=0 (varsayılan) iken havuz kullanılmaz ve çekirdekler aynı süreçte çalışır.
+import logging
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing import shared_memory
+from typing import Any, Callable, List, NamedTuple, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .telemetry import span
+
+logger = logging.getLogger(__name__)
+
+# Analiz süreç sayısı; 0 ise çekirdekler istek thread'inde çalışır. Her uvicorn worker kendi havuzunu açar.
+ANALYSIS_WORKERS = int(os.getenv("ANALYSIS_WORKERS", 0))
+
+# Çekirdek imzası: kernel(rows, chunk_index, inputs, outputs, *args). `rows` girdilerin işlenecek satır aralığıdır;
+# eşleme çekirdekleri outputs[k][rows], indirgeme çekirdekleri outputs[k][chunk_index] satırına yazar. Boyutu
+# önceden bilinmeyen küçük sonuçlar (örn. parçadaki benzersiz etiketler) dönüş değeriyle alınır.
+Kernel = Callable[..., None]
+
+
+class SharedArray(NamedTuple):
+    """Worker'a gönderilen paylaşılan bellek tamponu tanımı."""
+    name: str
+    shape: Tuple[int, ...]
+    dtype: str
+
+
+def _start_method() -> str:
+    # fork, thread'leri (fiyat loop'u, log kuyruğu) kilit tutarken kopyalayabilir
+    return "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+
+def _executor() -> Optional[ProcessPoolExecutor]:
+    global _pool
+    if ANALYSIS_WORKERS <= 0:
+        return None
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ProcessPoolExecutor(max_workers=ANALYSIS_WORKERS,
+                                            mp_context=multiprocessing.get_context(_start_method()))
+    return _pool
+
+
+def start_analysis_pool() -> None:
+    """Havuzu açar ve worker'ları başlatır; ilk analiz isteği süreç başlatma süresini ödemez."""
+    pool = _executor()
+    if pool is not None:
+        list(pool.map(_noop, range(ANALYSIS_WORKERS)))
+
+
+def shutdown_analysis_pool() -> None:
+    global _pool
+    with _pool_lock:
+        pool, _pool = _pool, None
+    if pool is not None:
+        pool.shutdown(wait=True, cancel_futures=True)
+
+
+def _noop(_: int) -> None:
+    return None
+
+
+def row_chunks(n_rows: int, min_rows: int) -> List[slice]:
+    """
+    Satırları worker sayısı kadar (her biri en az `min_rows` satır) eşit parçaya böler. Havuz kapalıysa ya da
+    veri küçükse tek parça döner ve hesap aynı süreçte yapılır.
+    """
+    parts = max(1, min(ANALYSIS_WORKERS, n_rows // max(min_rows, 1)))
+    bounds = np.linspace(0, n_rows, parts + 1).astype(int)
+    return [slice(int(start), int(stop)) for start, stop in zip(bounds[:-1], bounds[1:])]
+
+
+def _share(segments: List[shared_memory.SharedMemory], array: np.ndarray) -> SharedArray:
+    """Diziyi yeni bir paylaşılan bellek tamponuna kopyalar; tampon `segments` listesine eklenir."""
+    shm = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+    segments.append(shm)
+    np.ndarray(array.shape, dtype=array.dtype, buffer=shm.buf)[...] = array
+    return SharedArray(shm.name, array.shape, array.dtype.str)
+
+
+def _view(ref: SharedArray, shm: shared_memory.SharedMemory) -> np.ndarray:
+    return np.ndarray(ref.shape, dtype=np.dtype(ref.dtype), buffer=shm.buf)
+
+
+def _run_chunk(kernel: Kernel, rows: slice, chunk_index: int, inputs: Sequence[SharedArray],
+               outputs: Sequence[SharedArray], args: Tuple[Any, ...]) -> Any:
+    """Worker tarafı: tamponlara bağlanır, çekirdeği kendi satır aralığında çalıştırır."""
+    handles = [shared_memory.SharedMemory(name=ref.name) for ref in (*inputs, *outputs)]
+    try:
+        arrays = [_view(ref, handle) for ref, handle in zip((*inputs, *outputs), handles)]
+        result = kernel(rows, chunk_index, arrays[:len(inputs)], arrays[len(inputs):], *args)
+        del arrays
+        return result
+    finally:
+        for handle in handles:
+            handle.close()
+
+
+def run_chunks(kernel: Kernel, chunks: Sequence[slice], inputs: Sequence[np.ndarray],
+               outputs: Sequence[np.ndarray], *args: Any) -> List[Any]:
+    """
+    Çekirdeği her satır parçası için çalıştırır, sonuçları `outputs` dizilerine yazar ve parça başına dönüş
+    değerlerini döndürür. Birden fazla parça varsa girdiler paylaşılan belleğe bir kez kopyalanır ve parçalar
+    süreç havuzunda paralel hesaplanır. Havuz kullanılamazsa (worker çöktü vb.) hesap aynı süreçte tekrarlanır.
+    Girdiler sayısal ya da sabit genişlikli metin (numpy "U") dizileri olmalıdır.
+    """
+    pool = _executor() if len(chunks) > 1 else None
+    if pool is None:
+        return [kernel(rows, index, inputs, outputs, *args) for index, rows in enumerate(chunks)]
+
+    with span("analysis.parallel", kernel=kernel.__name__, chunks=len(chunks)):
+        segments: List[shared_memory.SharedMemory] = []
+        try:
+            input_refs = [_share(segments, np.ascontiguousarray(array)) for array in inputs]
+            output_refs = [_share(segments, array) for array in outputs]
+            futures = [pool.submit(_run_chunk, kernel, rows, index, input_refs, output_refs, args)
+                       for index, rows in enumerate(chunks)]
+            results = [future.result() for future in futures]
+            for array, ref, shm in zip(outputs, output_refs, segments[len(inputs):]):
+                array[...] = _view(ref, shm)
+            return results
+        except BrokenProcessPool as e:
+            logger.warning("Analiz süreç havuzu kullanılamıyor, hesap aynı süreçte yapılacak: %s", e,
+                           exc_info=logger.isEnabledFor(logging.DEBUG))
+            shutdown_analysis_pool()
+        finally:
+            for shm in segments:
+                shm.close()
+                shm.unlink()
+    return [kernel(rows, index, inputs, outputs, *args) for index, rows in enumerate(chunks)]
+
+
+# --- Ortak gruplama çekirdekleri -------------------------------------------
+
+
+def _factorize_kernel(rows: slice, chunk_index: int, inputs: List[np.ndarray],
+                      outputs: List[np.ndarray]) -> np.ndarray:
+    names, codes = np.unique(inputs[0][rows], return_inverse=True)
+    outputs[0][rows] = codes
+    return names
+
+
+def factorize(labels: np.ndarray, min_rows: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    `np.unique(labels, return_inverse=True)` eşdeğeri: sıralı benzersiz etiketler ve satır başına kodları.
+    Büyük dizilerde her parça kendi etiketlerini paralel sıralar; parçaların benzersiz etiketleri birleştirilip
+    yerel kodlar genel kodlara çevrilir.
+    """
+    labels = np.asarray(labels)
+    chunks = row_chunks(len(labels), min_rows)
+    if len(chunks) == 1:
+        names, codes = np.unique(labels, return_inverse=True)
+        return names, codes.reshape(-1)
+    codes = np.empty(len(labels), dtype=np.int64)
+    chunk_names = run_chunks(_factorize_kernel, chunks, [labels], [codes])
+    names = np.unique(np.concatenate(chunk_names))
+    for rows, local_names in zip(chunks, chunk_names):
+        codes[rows] = np.searchsorted(names, local_names)[codes[rows]]
+    return names, codes
+
+
+def _grouped_sums_kernel(rows: slice, chunk_index: int, inputs: List[np.ndarray], outputs: List[np.ndarray],
+                         n_groups: int) -> None:
+    codes, weights = inputs[0][rows], inputs[1][rows]
+    outputs[0][chunk_index] = np.bincount(codes, weights=weights, minlength=n_groups)
+    outputs[1][chunk_index] = np.bincount(codes, minlength=n_groups)
+
+
+def grouped_sums(codes: np.ndarray, weights: np.ndarray, n_groups: int,
+                 min_rows: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Grup kodu başına ağırlık toplamı ve satır sayısı (np.bincount); büyük dizilerde parçalar paralel toplanır."""
+    codes = np.asarray(codes, dtype=np.int64)
+    weights = np.asarray(weights, dtype=np.float64)
+    chunks = row_chunks(len(codes), min_rows)
+    totals = np.zeros((len(chunks), n_groups), dtype=np.float64)
+    counts = np.zeros((len(chunks), n_groups), dtype=np.int64)
+    run_chunks(_grouped_sums_kernel, chunks, [codes, weights], [totals, counts], n_groups)
+    return totals.sum(axis=0), counts.sum(axis=0)
@@ -0,0 +1,180 @@
+# App Service planları için kullanım istatistikleri ve SKU/instance sayısı boyutlandırması.
+# Tüm planların metrik serileri tek bir (plan x zaman) matrisinde toplanır; yüzdelikler ve
+# aday SKU'lar üzerindeki uygunluk/maliyet hesabı vektörel olarak yapılır. Büyük filolarda yüzdelikler
+# satır parçaları halinde analiz süreç havuzunda hesaplanır (bkz. analysis_pool).
+import warnings
+from typing import Dict, List, NamedTuple, Optional, Sequence
+
+import numpy as np
+
+from .analysis_pool import row_chunks, run_chunks
+
+DEFAULT_PEAK_PERCENTILE = 95.0
+# Hedef SKU'da gözlenen tepe yükün bu oranı aşmaması istenir (%25 pay)
+DEFAULT_TARGET_UTILIZATION = 0.75
+# Süreç havuzuna gönderilecek parça başına en az plan sayısı; daha küçük filolarda kopyalama maliyeti baskındır
+PARALLEL_MIN_PLANS = 512
+
+
+class SkuSpec(NamedTuple):
+    """Bir App Service SKU'sunun instance başına kapasitesi."""
+    tier: str
+    vcpu: float
+    memory_gb: float
+    max_instances: int
+    # Özellik seviyesi: hedef SKU, mevcut planın özelliklerini (slot, autoscale vb.) kaybettirmemeli
+    feature_level: int
+
+
+APP_SERVICE_SKU_SPECS: Dict[str, SkuSpec] = {
+    "B1": SkuSpec("Basic", 1, 1.75, 3, 1),
+    "B2": SkuSpec("Basic", 2, 3.5, 3, 1),
+    "B3": SkuSpec("Basic", 4, 7, 3, 1),
+    "S1": SkuSpec("Standard", 1, 1.75, 10, 2),
+    "S2": SkuSpec("Standard", 2, 3.5, 10, 2),
+    "S3": SkuSpec("Standard", 4, 7, 10, 2),
+    "P1V2": SkuSpec("PremiumV2", 1, 3.5, 30, 3),
+    "P2V2": SkuSpec("PremiumV2", 2, 7, 30, 3),
+    "P3V2": SkuSpec("PremiumV2", 4, 14, 30, 3),
+    "P1V3": SkuSpec("PremiumV3", 2, 8, 30, 3),
+    "P2V3": SkuSpec("PremiumV3", 4, 16, 30, 3),
+    "P3V3": SkuSpec("PremiumV3", 8, 32, 30, 3),
+    "P1mv3": SkuSpec("PremiumMV3", 2, 16, 30, 3),
+    "P2mv3": SkuSpec("PremiumMV3", 4, 32, 30, 3),
+    "P3mv3": SkuSpec("PremiumMV3", 8, 64, 30, 3),
+    "P4mv3": SkuSpec("PremiumMV3", 16, 128, 30, 3),
+}
+
+
+def normalize_sku_name(sku_name: Optional[str]) -> Optional[str]:
+    """Azure SKU adını fiyat tablosundaki biçime çevirir (örn: "P1v3" -> "P1V3", "p1mv3" -> "P1mv3")."""
+    if not sku_name:
+        return sku_name
+    upper = sku_name.upper()
+    if upper.endswith("MV3"):
+        return upper[:-3] + "mv3"
+    return upper
+
+
+class UtilizationStats(NamedTuple):
+    """Plan başına kullanım istatistikleri (yüzde); veri yoksa NaN. `samples` CPU ve bellek örnek sayılarının küçüğüdür."""
+    cpu_avg: np.ndarray
+    cpu_peak: np.ndarray
+    cpu_max: np.ndarray
+    memory_avg: np.ndarray
+    memory_peak: np.ndarray
+    memory_max: np.ndarray
+    samples: np.ndarray
+
+
+def _to_matrix(series: Sequence[Sequence[float]]) -> np.ndarray:
+    """Farklı uzunluktaki serileri NaN ile doldurulmuş (plan x zaman) matrise çevirir."""
+    width = max((len(values) for values in series), default=0)
+    matrix = np.full((len(series), max(width, 1)), np.nan, dtype=np.float64)
+    for row, values in enumerate(series):
+        if values:
+            matrix[row, :len(values)] = values
+    return matrix
+
+
+def utilization_stats(cpu_average: Sequence[Sequence[float]], cpu_maximum: Sequence[Sequence[float]],
+                      memory_average: Sequence[Sequence[float]], memory_maximum: Sequence[Sequence[float]],
+                      peak_percentile: float = DEFAULT_PEAK_PERCENTILE) -> UtilizationStats:
+    """
+    Saatlik ortalama/maksimum serilerinden plan başına ortalama, yüzdelik tepe ve mutlak maksimum hesaplar.
+    Tepe değer, saatlik maksimumların `peak_percentile` yüzdeliğidir; tek seferlik sıçramalar boyutlandırmayı bozmaz.
+    """
+    inputs = [_to_matrix(cpu_average), _to_matrix(cpu_maximum), _to_matrix(memory_average),
+              _to_matrix(memory_maximum)]
+    n_plans = len(cpu_maximum)
+    outputs = [np.empty(n_plans, dtype=np.float64) for _ in range(6)] + [np.empty(n_plans, dtype=np.int64)]
+    run_chunks(_utilization_kernel, row_chunks(n_plans, PARALLEL_MIN_PLANS), inputs, outputs, peak_percentile)
+    return UtilizationStats(*outputs)
+
+
+def _utilization_kernel(rows: slice, chunk_index: int, inputs: List[np.ndarray], outputs: List[np.ndarray],
+                        peak_percentile: float) -> None:
+    cpu_avg_m, cpu_max_m, mem_avg_m, mem_max_m = (matrix[rows] for matrix in inputs)
+    with warnings.catch_warnings():
+        # Verisi olmayan planların satırları tamamen NaN'dır; sonuç NaN kalır
+        warnings.simplefilter("ignore", category=RuntimeWarning)
+        outputs[0][rows] = np.nanmean(cpu_avg_m, axis=1)
+        outputs[1][rows] = np.nanpercentile(cpu_max_m, peak_percentile, axis=1)
+        outputs[2][rows] = np.nanmax(cpu_max_m, axis=1)
+        outputs[3][rows] = np.nanmean(mem_avg_m, axis=1)
+        outputs[4][rows] = np.nanpercentile(mem_max_m, peak_percentile, axis=1)
+        outputs[5][rows] = np.nanmax(mem_max_m, axis=1)
+    # Boyutlandırma için iki metriğin de verisi olmalı; biri eksik planlarda 0 olur
+    outputs[6][rows] = np.minimum(np.count_nonzero(~np.isnan(cpu_max_m), axis=1),
+                                  np.count_nonzero(~np.isnan(mem_max_m), axis=1))
+
+
+class SizingResult(NamedTuple):
+    """Plan başına önerilen SKU ve instance sayısı; uygun aday yoksa sku None."""
+    sku: Optional[str]
+    instances: int
+    current_monthly_cost: float
+    target_monthly_cost: float
+
+
+def cheapest_fitting_skus(current_skus: Sequence[str], current_instances: Sequence[int],
+                          cpu_peak_pct: np.ndarray, memory_peak_pct: np.ndarray,
+                          monthly_prices: Dict[str, float],
+                          target_utilization: float = DEFAULT_TARGET_UTILIZATION) -> List[SizingResult]:
+    """
+    Her plan için gözlenen tepe yükü `target_utilization` altında taşıyan en ucuz (SKU, instance sayısı)
+    çiftini seçer. Yük, yüzde x instance kapasitesi x instance sayısı olarak vCPU ve GB cinsinden hesaplanır.
+
+    Adaylar fiyatı bilinen ve özellik seviyesi mevcut SKU'dan düşük olmayan SKU'lardır. Birden fazla
+    instance ile çalışan planlar erişilebilirlik için en az iki instance'ta tutulur. CPU ya da bellek tepesi
+    NaN olan planlar için öneri üretilmez (sku None).
+    """
+    candidates = [sku for sku in APP_SERVICE_SKU_SPECS if sku in monthly_prices]
+    n_plans = len(current_skus)
+    if not candidates or n_plans == 0:
+        return [SizingResult(None, int(n), 0.0, 0.0) for n in current_instances]
+
+    cand_vcpu = np.array([APP_SERVICE_SKU_SPECS[s].vcpu for s in candidates])
+    cand_mem = np.array([APP_SERVICE_SKU_SPECS[s].memory_gb for s in candidates])
+    cand_max = np.array([APP_SERVICE_SKU_SPECS[s].max_instances for s in candidates])
+    cand_level = np.array([APP_SERVICE_SKU_SPECS[s].feature_level for s in candidates])
+    cand_price = np.array([monthly_prices[s] for s in candidates])
+
+    specs = [APP_SERVICE_SKU_SPECS.get(sku) for sku in current_skus]
+    known = np.array([spec is not None for spec in specs])
+    cur_vcpu = np.array([spec.vcpu if spec else np.nan for spec in specs])
+    cur_mem = np.array([spec.memory_gb if spec else np.nan for spec in specs])
+    cur_level = np.array([spec.feature_level if spec else 0 for spec in specs])
+    cur_price = np.array([monthly_prices.get(sku, np.nan) for sku in current_skus])
+    instances = np.maximum(np.asarray(current_instances, dtype=np.float64), 1.0)
+
+    # Gözlenen tepe yük (vCPU ve GB); (plan, 1) şeklinde. Metriği olmayan plan boyutlandırılmaz: eksik
+    # bellek serisi sıfır yük sayılırsa plan belleği yetmeyen bir SKU'ya küçültülebilir
+    cpu_peak_pct = np.asarray(cpu_peak_pct, dtype=np.float64)
+    memory_peak_pct = np.asarray(memory_peak_pct, dtype=np.float64)
+    measured = ~(np.isnan(cpu_peak_pct) | np.isnan(memory_peak_pct))
+    cpu_load = (np.where(measured, cpu_peak_pct, 0.0) / 100.0 * cur_vcpu * instances)[:, None]
+    mem_load = (np.where(measured, memory_peak_pct, 0.0) / 100.0 * cur_mem * instances)[:, None]
+    min_instances = np.minimum(instances, 2.0)[:, None]
+
+    # (plan, aday) matrisleri
+    needed = np.maximum.reduce([
+        np.ceil(cpu_load / (cand_vcpu[None, :] * target_utilization)),
+        np.ceil(mem_load / (cand_mem[None, :] * target_utilization)),
+        np.broadcast_to(min_instances, (n_plans, len(candidates))),
+    ])
+    feasible = (needed <= cand_max[None, :]) & (cand_level[None, :] >= cur_level[:, None]) & (known & measured)[:, None]
+    cost = np.where(feasible, needed * cand_price[None, :], np.inf)
+
+    best = np.argmin(cost, axis=1)
+    best_cost = cost[np.arange(n_plans), best]
+    current_cost = cur_price * instances
+
+    results: List[SizingResult] = []
+    for i in range(n_plans):
+        if not np.isfinite(best_cost[i]) or np.isnan(current_cost[i]):
+            results.append(SizingResult(None, int(instances[i]), 0.0, 0.0))
+            continue
+        results.append(SizingResult(candidates[best[i]], int(needed[i, best[i]]),
+                                    round(float(current_cost[i]), 2), round(float(best_cost[i]), 2)))
+    return results
@@ -1,17 +1,164 @@
-# Azure SDK kullanarak Azure ile etkileşim kuracak fonksiyonlar
-from azure.identity import ClientSecretCredential
-from azure.core.exceptions import HttpResponseError
-from azure.mgmt.compute import ComputeManagementClient
-from azure.mgmt.network import NetworkManagementClient
-from azure.mgmt.costmanagement import CostManagementClient
-from azure.mgmt.web import WebSiteManagementClient
-from azure.mgmt.monitor import MonitorManagementClient
+# Azure SDK kullanarak Azure ile etkileşim kuracak fonksiyonlar.
+# azure.mgmt.* paketleri çok büyüktür; modül import edilirken yüklenmez, her servis ilk kullanıldığında
+# yüklenir. Böylece yalnızca fiyat endpoint'lerine istek alan bir worker SDK import süresini hiç ödemez.
+import contextvars
 import datetime
-import traceback
-from typing import Optional, List, Dict, Any, Tuple
+import importlib
+import itertools
+import logging
+import threading
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, List, Dict, Any, Iterable, Iterator, Tuple
+from urllib.parse import parse_qs, urlparse
+
+import numpy as np
+
+from .logging_config import RATE_LIMITED
+from .azure_pricing import (
+    FALLBACK_PER_GB_MONTHLY_USD,
+    FALLBACK_SNAPSHOT_PER_GB_MONTHLY_USD,
+    AzureRetailPrices,
+    _fallback_disk_price,
+    managed_disk_price_key
+)
+from .savings import (
+    app_service_price_book,
+    apply_savings,
+    load_app_service_prices,
+    load_public_ip_prices,
+    public_ip_price_book
+)
+from .app_service_sizing import (
+    APP_SERVICE_SKU_SPECS,
+    DEFAULT_PEAK_PERCENTILE,
+    cheapest_fitting_skus,
+    normalize_sku_name,
+    utilization_stats
+)
+from .commitments import (
+    COMMITMENT_OPTIONS,
+    analyze_commitments,
+    commitment_recommendations,
+    fleet_savings_plan,
+    get_commitment_prices
+)
+from .fx_rates import exchange_rates
+from .network_orphans import build_reference_index, find_orphan_ips
+from .telemetry import InstrumentedCredential, span, traced_iter
+from .recommendations import (
+    AppServicePlanRecommendation,
+    AppServicePlanRightsizeRecommendation,
+    DiskRecommendation,
+    PublicIpRecommendation,
+    Recommendation,
+    SnapshotRecommendation,
+    intern_str,
+    region_key
+)
+
+logger = logging.getLogger(__name__)
 
 DEFAULT_CPU_THRESHOLD = 5.0
 DEFAULT_DAYS_AGO = 7
+DEFAULT_SNAPSHOT_AGE_DAYS = 90
+DEFAULT_PLAN_METRICS_DAYS = 14
+METRICS_FETCH_WORKERS = 16
+# VM analizinde birlikte işlenen VM sayısı; bellek ve eşzamanlı çağrı sayısı bununla sınırlıdır
+VM_SCAN_BATCH_SIZE = 100
+PLAN_METRIC_NAMES = ("CpuPercentage", "MemoryPercentage")
+DEFAULT_COMMITMENT_DAYS = 30
+# Azure Monitor saatlik metrikleri en fazla 93 gün saklar
+MAX_COMMITMENT_DAYS = 93
+# Cost Management sorgu sonucunda maliyet sütununun olası adları (sorgu tipine göre değişir)
+_COST_COLUMNS = ("Cost", "PreTaxCost", "CostUSD", "totalCost")
+
+# Servis adı -> (modül, istemci sınıfı); modül ilk kullanımda import edilir
+_SDK_CLIENTS = {
+    "compute": ("azure.mgmt.compute", "ComputeManagementClient"),
+    "network": ("azure.mgmt.network", "NetworkManagementClient"),
+    "costmanagement": ("azure.mgmt.costmanagement", "CostManagementClient"),
+    "web": ("azure.mgmt.web", "WebSiteManagementClient"),
+    "monitor": ("azure.mgmt.monitor", "MonitorManagementClient"),
+    "resource": ("azure.mgmt.resource.resources", "ResourceManagementClient")
+}
+# Abonelik kimliği almayan istemciler; kapsam her istekte verilir
+_SCOPED_CLIENTS = {"costmanagement"}
+_sdk_classes: Dict[str, Any] = {}
+_sdk_import_lock = threading.Lock()
+
+class PartialAnalysis(RuntimeError):
+    """
+    Analiz tamamlandı ama bazı kaynaklar değerlendirilemedi (örn: metrikleri alınamadı). `records` üretilen
+    bulgulardır; `resource_ids` değerlendirilemeyen kaynaklardır ve önceki bulguları korunmalıdır.
+    """
+
+    def __init__(self, records: List[Recommendation], resource_ids: List[str]):
+        super().__init__(f"{len(resource_ids)} kaynak değerlendirilemedi")
+        self.records = records
+        self.resource_ids = resource_ids
+
+# Gerçek SDK yerine istemci üreten fabrika (örn: backend/fake_azure.py). None ise Azure SDK kullanılır.
+_client_factory = None
+
+def set_client_factory(factory) -> None:
+    """
+    SDK istemcilerini üretecek fabrikayı ayarlar. Fabrika `credential(tenant_id, client_id, client_secret)`
+    ve `client(service, credential, subscription_id)` metodlarını sağlamalıdır. None verilirse gerçek SDK'ya dönülür.
+    """
+    global _client_factory
+    _client_factory = factory
+
+def _sdk_class(service: str):
+    """Servisin SDK istemci sınıfını döndürür; modülü ilk çağrıda import eder."""
+    cls = _sdk_classes.get(service)
+    if cls is not None:
+        return cls
+    module_name, class_name = _SDK_CLIENTS[service]
+    with _sdk_import_lock:
+        cls = _sdk_classes.get(service)
+        if cls is None:
+            with span("sdk.import", service=service):
+                cls = getattr(importlib.import_module(module_name), class_name)
+            _sdk_classes[service] = cls
+    return cls
+
+def _create_credential(tenant_id: str, client_id: str, client_secret: str):
+    if _client_factory is not None:
+        return InstrumentedCredential(_client_factory.credential(tenant_id, client_id, client_secret))
+    from azure.identity import ClientSecretCredential
+    return InstrumentedCredential(ClientSecretCredential(
+        tenant_id=tenant_id,
+        client_id=client_id,
+        client_secret=client_secret
+    ))
+
+def _create_client(service: str, credential, subscription_id: str):
+    if _client_factory is not None:
+        return _client_factory.client(service, credential, subscription_id)
+    if service in _SCOPED_CLIENTS:
+        return _sdk_class(service)(credential)
+    return _sdk_class(service)(credential, subscription_id)
+
+def create_clients(subscription_id: str, tenant_id: str, client_id: str, client_secret: str,
+                   services: List[str]) -> Dict[str, Any]:
+    """
+    Tek bir kimlik bilgisiyle istenen servislerin SDK istemcilerini oluşturur (örn: ["compute", "web"]).
+    Toplu işlemlerde istemciler tüm öğeler arasında paylaşılır.
+    """
+    credential = _create_credential(tenant_id, client_id, client_secret)
+    return {service: _create_client(service, credential, subscription_id) for service in services}
+
+def parse_vm_id(vm_id: str) -> Tuple[str, str]:
+    """VM resource ID'sinden (resource group, VM adı) döndürür."""
+    vm_parts = vm_id.split('/')
+    return vm_parts[4], vm_parts[8]
+
+def begin_deallocate_vm(compute_client, vm_id: str):
+    """Deallocate uzun süreli işlemini başlatır ve beklemeden poller'ı döndürür."""
+    resource_group_name, vm_name = parse_vm_id(vm_id)
+    with span("compute.virtual_machines.begin_deallocate"):
+        return compute_client.virtual_machines.begin_deallocate(resource_group_name, vm_name)
 
 def get_vm_cpu_utilization(monitor_client, resource_id: str, days_ago: int = DEFAULT_DAYS_AGO) -> float:
     """
@@ -21,13 +168,14 @@ def get_vm_cpu_utilization(monitor_client, resource_id: str, days_ago: int = DEF
         end_time = datetime.datetime.utcnow()
         start_time = end_time - datetime.timedelta(days=days_ago)
         
-        metrics_data = monitor_client.metrics.list(
-            resource_uri=resource_id,
-            timespan=f"{start_time.isoformat()}/{end_time.isoformat()}",
-            interval='P1D',
-            metricnames='Percentage CPU',
-            aggregation='Average'
-        )
+        with span("monitor.metrics.list"):
+            metrics_data = monitor_client.metrics.list(
+                resource_uri=resource_id,
+                timespan=f"{start_time.isoformat()}/{end_time.isoformat()}",
+                interval='P1D',
+                metricnames='Percentage CPU',
+                aggregation='Average'
+            )
         
         total_cpu = 0
         data_points = 0
@@ -44,165 +192,273 @@ def get_vm_cpu_utilization(monitor_client, resource_id: str, days_ago: int = DEF
         return 0.0
         
     except Exception as e:
-        print(f"VM CPU metriği alınırken hata: {str(e)}")
+        logger.warning("VM CPU metriği alınırken hata: %s", e, extra={"resource_id": resource_id, **RATE_LIMITED})
         return 0.0
 
-def get_azure_vms_with_cpu(subscription_id: str, tenant_id: str, client_id: str, client_secret: str, 
-                          cpu_threshold: float = DEFAULT_CPU_THRESHOLD, days_ago_for_metrics: int = DEFAULT_DAYS_AGO):
+def _batches(items: Iterable[Any], size: int) -> Iterator[List[Any]]:
+    iterator = iter(items)
+    while True:
+        batch = list(itertools.islice(iterator, size))
+        if not batch:
+            return
+        yield batch
+
+def _is_vm_running(compute_client, vm) -> bool:
+    """VM'in güç durumu; instance view alınamazsa VM atlanır."""
+    try:
+        with span("compute.virtual_machines.instance_view"):
+            instance_view = compute_client.virtual_machines.instance_view(
+                vm.id.split('/')[4],  # resource group name
+                vm.name
+            )
+    except Exception as e:
+        logger.warning("VM %s analiz edilirken hata: %s", vm.name, e, extra={"resource_id": vm.id, **RATE_LIMITED})
+        return False
+    return any(status.code == 'PowerState/running' for status in instance_view.statuses)
+
+def _vm_cpu_info(vm, cpu_avg: float, cpu_threshold: float, days_ago_for_metrics: int) -> Dict[str, Any]:
+    if cpu_avg < cpu_threshold:
+        recommendation = "Düşük CPU kullanımı tespit edildi. Kapatma önerilir."
+    else:
+        recommendation = "VM etkin kullanımda."
+    return {
+        "vm_id": vm.id,
+        "vm_name": vm.name,
+        "vm_size": vm.hardware_profile.vm_size if vm.hardware_profile else "Unknown",
+        "location": vm.location,
+        "resource_group": vm.id.split('/')[4],
+        "cpu_average": cpu_avg,
+        "recommendation": recommendation,
+        "days_analyzed": days_ago_for_metrics,
+        "cpu_threshold": cpu_threshold
+    }
+
+def iter_azure_vms_with_cpu(subscription_id: str, tenant_id: str, client_id: str, client_secret: str,
+                            cpu_threshold: float = DEFAULT_CPU_THRESHOLD,
+                            days_ago_for_metrics: int = DEFAULT_DAYS_AGO,
+                            batch_size: int = VM_SCAN_BATCH_SIZE) -> Iterator[Dict[str, Any]]:
     """
-    Azure aboneliğindeki tüm Sanal Makineleri listeler ve CPU kullanımlarını analiz eder.
+    Çalışan VM'leri CPU kullanım analiziyle birlikte üretir. Akış listele -> çalışanları süz -> metrik -> sınıflandır
+    şeklindedir ve `batch_size` VM'lik partilerle ilerler; parti içindeki çağrılar eşzamanlıdır. Tüketici bir
+    partinin sonuçlarını almadan sonraki parti listelenmez, bellekte filo büyüklüğünden bağımsız olarak en fazla
+    bir parti tutulur. Listeleme ya da bir parti başarısız olursa hata loglanıp tüketiciye fırlatılır; eksik
+    liste tam liste gibi görünmemelidir.
     """
     try:
-        credential = ClientSecretCredential(
-            tenant_id=tenant_id,
-            client_id=client_id,
-            client_secret=client_secret
-        )
-        
-        compute_client = ComputeManagementClient(credential, subscription_id)
-        monitor_client = MonitorManagementClient(credential, subscription_id)
-        
-        vms = []
-        vm_list = compute_client.virtual_machines.list_all()
-        
-        for vm in vm_list:
-            try:
-                instance_view = compute_client.virtual_machines.instance_view(
-                    vm.id.split('/')[4],  # resource group name
-                    vm.name
-                )
-                
-                is_running = False
-                for status in instance_view.statuses:
-                    if status.code == 'PowerState/running':
-                        is_running = True
-                        break
-                
-                if not is_running:
-                    continue
-                
-                cpu_avg = get_vm_cpu_utilization(monitor_client, vm.id, days_ago_for_metrics)
-                
-                recommendation = ""
-                if cpu_avg < cpu_threshold:
-                    recommendation = "Düşük CPU kullanımı tespit edildi. Kapatma önerilir."
-                else:
-                    recommendation = "VM etkin kullanımda."
-                
-                vm_info = {
-                    "vm_id": vm.id,
-                    "vm_name": vm.name,
-                    "vm_size": vm.hardware_profile.vm_size if vm.hardware_profile else "Unknown",
-                    "location": vm.location,
-                    "resource_group": vm.id.split('/')[4],
-                    "cpu_average": cpu_avg,
-                    "recommendation": recommendation,
-                    "days_analyzed": days_ago_for_metrics,
-                    "cpu_threshold": cpu_threshold
-                }
-                
-                vms.append(vm_info)
-                
-            except Exception as e:
-                print(f"VM {vm.name} analiz edilirken hata: {str(e)}")
-                continue
-        
-        return vms
+        credential = _create_credential(tenant_id, client_id, client_secret)
+        
+        compute_client = _create_client("compute", credential, subscription_id)
+        monitor_client = _create_client("monitor", credential, subscription_id)
+        
+        vm_list = traced_iter(compute_client.virtual_machines.list_all(), "compute.virtual_machines.list_all")
+        
+        with ThreadPoolExecutor(max_workers=max(1, min(METRICS_FETCH_WORKERS, batch_size)),
+                                thread_name_prefix="vm-scan") as pool:
+            def run_batch(fn, items: List[Any]) -> List[Any]:
+                # Her görev tüketicinin izine (trace) span yazabilsin diye bağlam kopyalanır
+                futures = [pool.submit(contextvars.copy_context().run, fn, item) for item in items]
+                return [future.result() for future in futures]
+            
+            for batch in _batches(vm_list, batch_size):
+                running = [vm for vm, is_running in zip(batch, run_batch(
+                    lambda vm: _is_vm_running(compute_client, vm), batch)) if is_running]
+                cpu_averages = run_batch(
+                    lambda vm: get_vm_cpu_utilization(monitor_client, vm.id, days_ago_for_metrics), running)
+                for vm, cpu_avg in zip(running, cpu_averages):
+                    yield _vm_cpu_info(vm, cpu_avg, cpu_threshold, days_ago_for_metrics)
         
     except Exception as e:
-        print(f"VM'ler listelenirken hata: {str(e)}")
-        return []
+        logger.error("VM'ler listelenirken hata: %s", e, exc_info=logger.isEnabledFor(logging.DEBUG))
+        raise
+
+def get_azure_vms_with_cpu(subscription_id: str, tenant_id: str, client_id: str, client_secret: str, 
+                          cpu_threshold: float = DEFAULT_CPU_THRESHOLD, days_ago_for_metrics: int = DEFAULT_DAYS_AGO):
+    """
+    Azure aboneliğindeki tüm Sanal Makineleri listeler ve CPU kullanımlarını analiz eder.
+    """
+    return list(iter_azure_vms_with_cpu(subscription_id, tenant_id, client_id, client_secret,
+                                        cpu_threshold, days_ago_for_metrics))
 
 def stop_and_deallocate_vm(subscription_id: str, tenant_id: str, client_id: str, client_secret: str, vm_id: str):
     """
     Belirtilen Sanal Makineyi durdurur ve kaynak ayırmasını kaldırır (deallocate).
     """
     try:
-        credential = ClientSecretCredential(
-            tenant_id=tenant_id,
-            client_id=client_id,
-            client_secret=client_secret
-        )
+        credential = _create_credential(tenant_id, client_id, client_secret)
         
-        compute_client = ComputeManagementClient(credential, subscription_id)
+        compute_client = _create_client("compute", credential, subscription_id)
         
-        vm_parts = vm_id.split('/')
-        resource_group_name = vm_parts[4]
-        vm_name = vm_parts[8]
-        
-        async_vm_stop = compute_client.virtual_machines.begin_deallocate(
-            resource_group_name, vm_name
-        )
+        _, vm_name = parse_vm_id(vm_id)
+        async_vm_stop = begin_deallocate_vm(compute_client, vm_id)
         
-        async_vm_stop.result()
+        with span("compute.virtual_machines.deallocate_wait"):
+            async_vm_stop.result()
         
         return True, f"VM {vm_name} başarıyla durduruldu ve deallocate edildi."
         
     except Exception as e:
         error_msg = f"VM durdurulamadı: {str(e)}"
-        print(error_msg)
+        logger.error("VM durdurulamadı: %s", e, extra={"resource_id": vm_id})
         return False, error_msg
 
-def get_unattached_public_ips(subscription_id: str, tenant_id: str, client_id: str, client_secret: str):
+def _enum_value(value) -> Optional[str]:
+    return getattr(value, "value", value)
+
+# Sahipsiz IP analizinde birlikte listelenen ağ kaynakları: özellik adı -> span adı
+_NETWORK_LISTINGS = (
+    ("public_ip_addresses", "network.public_ip_addresses.list_all"),
+    ("nat_gateways", "network.nat_gateways.list_all"),
+    ("load_balancers", "network.load_balancers.list_all"),
+    ("network_interfaces", "network.network_interfaces.list_all"),
+)
+
+def _list_network_resources(network_client) -> Dict[str, List[Any]]:
+    """Genel IP, NAT gateway, load balancer ve NIC listelerini eşzamanlı, her biri bir kez alır."""
+    def fetch(attribute: str, operation: str) -> List[Any]:
+        return list(traced_iter(getattr(network_client, attribute).list_all(), operation))
+    
+    with ThreadPoolExecutor(max_workers=len(_NETWORK_LISTINGS), thread_name_prefix="network-list") as pool:
+        futures = {attribute: pool.submit(contextvars.copy_context().run, fetch, attribute, operation)
+                   for attribute, operation in _NETWORK_LISTINGS}
+        return {attribute: future.result() for attribute, future in futures.items()}
+
+def get_unattached_public_ips(subscription_id: str, tenant_id: str, client_id: str, client_secret: str) -> List[Recommendation]:
     """
-    Azure aboneliğindeki sahipsiz (herhangi bir ağ arayüzüne bağlı olmayan) Genel IP adreslerini bulur.
+    Azure aboneliğindeki sahipsiz Genel IP adreslerini bulur: hiçbir kaynağa bağlı olmayanlar ile boştaki bir
+    NAT gateway'e, kural kullanmayan bir load balancer frontend'ine ya da VM'siz bir NIC'e bağlı olanlar.
+    Ağ kaynakları birer kez listelenir; maliyet bölge ve SKU fiyatından toplu hesaplanır.
+    Sonuçlar kompakt öneri kayıtlarıdır; JSON'a çevirmek için to_dict() kullanılır. Listeleme başarısız olursa
+    hata fırlatılır (boş liste, taramada sahipsiz IP kalmadığı anlamına gelir).
     """
     try:
-        credential = ClientSecretCredential(
-            tenant_id=tenant_id,
-            client_id=client_id,
-            client_secret=client_secret
-        )
+        credential = _create_credential(tenant_id, client_id, client_secret)
         
-        network_client = NetworkManagementClient(credential, subscription_id)
+        network_client = _create_client("network", credential, subscription_id)
         
-        public_ips = network_client.public_ip_addresses.list_all()
+        resources = _list_network_resources(network_client)
+        index = build_reference_index(resources["nat_gateways"], resources["load_balancers"],
+                                      resources["network_interfaces"])
         unattached_ips = []
         
-        for public_ip in public_ips:
-            if public_ip.ip_configuration is None:
-                # Sahipsiz IP bulundu
-                estimated_monthly_cost = 2.50  # USD/ay tahmin (Basic IP)
-                
-                recommendation = {
-                    "id": f"public_ip_{public_ip.name}",
-                    "name": public_ip.name,
-                    "category": "Cost_Custom_PublicIP",
-                    "impact": "Medium",
-                    "impacted_field": "Microsoft.Network/publicIPAddresses",
-                    "impacted_value": public_ip.name,
-                    "short_description_problem": f"Genel IP adresi '{public_ip.name}' herhangi bir kaynağa bağlı değil",
-                    "short_description_solution": "Kullanılmayan genel IP adresini silin veya bir kaynağa atayın",
-                    "potential_benefits": f"Aylık ~${estimated_monthly_cost:.2f} tasarruf",
-                    "extended_properties": {
-                        "resource_id": public_ip.id,
-                        "location": public_ip.location,
-                        "estimated_monthly_cost_usd": estimated_monthly_cost,
-                        "ip_address": public_ip.ip_address,
-                        "allocation_method": public_ip.public_ip_allocation_method.value if public_ip.public_ip_allocation_method else "Unknown"
-                    },
-                    "resource_metadata": {
-                        "resource_id": public_ip.id,
-                        "source": "Azure SDK",
-                        "location": public_ip.location,
-                        "resource_group": public_ip.id.split('/')[4] if public_ip.id else ""
-                    },
-                    "action_details": {
-                        "action": "delete",
-                        "resource_type": "public_ip",
-                        "estimated_time_minutes": 2,
-                        "risk_level": "Low"
-                    }
-                }
-                
-                unattached_ips.append(recommendation)
-        
+        for orphan in find_orphan_ips(resources["public_ip_addresses"], index):
+            public_ip = orphan.public_ip
+            # Maliyet SKU, atama yöntemi ve bölgeye göre toplu hesaplanır
+            unattached_ips.append(PublicIpRecommendation(
+                name=public_ip.name,
+                resource_id=public_ip.id,
+                location=intern_str(public_ip.location),
+                resource_group=intern_str(public_ip.id.split('/')[4]) if public_ip.id else "",
+                estimated_monthly_cost=0.0,
+                ip_address=public_ip.ip_address,
+                allocation_method=intern_str(_enum_value(public_ip.public_ip_allocation_method) or "Unknown"),
+                sku=intern_str(_enum_value(public_ip.sku.name) if public_ip.sku else "Basic"),
+                reason=intern_str(orphan.reason),
+                attached_to=orphan.attached_to
+            ))
+        
+        prices = load_public_ip_prices(ip.location for ip in unattached_ips)
+        apply_savings(unattached_ips, public_ip_price_book(prices))
+        logger.info("%d sahipsiz/boşta genel IP bulundu", len(unattached_ips),
+                    extra={"public_ips": len(resources["public_ip_addresses"]), "references": len(index)})
         return unattached_ips
         
     except Exception as e:
-        print(f"Sahipsiz genel IP'ler alınırken hata: {str(e)}")
-        traceback.print_exc()
-        return []
+        logger.error("Sahipsiz genel IP'ler alınırken hata: %s", e, exc_info=logger.isEnabledFor(logging.DEBUG))
+        raise
+
+def _disk_monthly_cost(prices: Dict[str, float], sku_name: Optional[str], size_gb: Optional[int]) -> Tuple[Optional[str], float]:
+    """Disk için (fiyat anahtarı, aylık USD maliyet). API fiyatı yoksa tahmini tablo kullanılır."""
+    price_key = managed_disk_price_key(sku_name, size_gb)
+    if price_key is not None:
+        price = prices.get(price_key)
+        if price is None:
+            price = _fallback_disk_price(price_key)
+        if price is not None:
+            return price_key, round(price, 2)
+    per_gb = FALLBACK_PER_GB_MONTHLY_USD.get(sku_name or "", FALLBACK_SNAPSHOT_PER_GB_MONTHLY_USD["LRS"])
+    return price_key, round(per_gb * (size_gb or 0), 2)
+
+def _snapshot_monthly_cost(prices: Dict[str, float], sku_name: Optional[str], size_gb: Optional[int]) -> float:
+    """Snapshot için aylık USD maliyet (GB başına fiyat x disk boyutu; artımlı snapshot'larda üst sınırdır)."""
+    redundancy = "ZRS" if sku_name and sku_name.endswith("ZRS") else "LRS"
+    per_gb = prices.get(f"snapshot {redundancy}", FALLBACK_SNAPSHOT_PER_GB_MONTHLY_USD[redundancy])
+    return round(per_gb * (size_gb or 0), 2)
+
+def get_unattached_disks_recommendations(subscription_id: str, tenant_id: str, client_id: str, client_secret: str,
+                                         snapshot_age_days: int = DEFAULT_SNAPSHOT_AGE_DAYS) -> List[Recommendation]:
+    """
+    Hiçbir VM'e bağlı olmayan yönetilen diskleri ve `snapshot_age_days` günden eski snapshot'ları bulur.
+    Diskler ve snapshot'lar abonelik genelinde birer kez listelenir; fiyatlar bölge başına bir kez çekilir.
+    Listeleme başarısız olursa hata fırlatılır.
+    """
+    try:
+        credential = _create_credential(tenant_id, client_id, client_secret)
+        compute_client = _create_client("compute", credential, subscription_id)
+        
+        # Önce adaylar toplanır; fiyatlar yalnızca bulgu olan bölgeler için, tek seferde eşzamanlı çekilir
+        disks = []
+        for disk in traced_iter(compute_client.disks.list(), "compute.disks.list"):
+            disk_state = _enum_value(disk.disk_state)
+            if disk_state != "Unattached" and (disk_state is not None or disk.managed_by is not None):
+                continue
+            disks.append(disk)
+        
+        now = datetime.datetime.now(datetime.timezone.utc)
+        snapshots = []
+        for snapshot in traced_iter(compute_client.snapshots.list(), "compute.snapshots.list"):
+            if snapshot.time_created is None:
+                continue
+            time_created = snapshot.time_created
+            if time_created.tzinfo is None:
+                time_created = time_created.replace(tzinfo=datetime.timezone.utc)
+            age_days = (now - time_created).days
+            if age_days >= snapshot_age_days:
+                snapshots.append((snapshot, age_days))
+        
+        regions = {disk.location for disk in disks} | {snapshot.location for snapshot, _ in snapshots}
+        region_prices = AzureRetailPrices.get_managed_disk_prices_many("USD", sorted(r for r in regions if r))
+        
+        def prices_for(region: Optional[str]) -> Dict[str, float]:
+            return region_prices.get(region, {}) if region else {}
+        
+        recommendations: List[Recommendation] = []
+        
+        for disk in disks:
+            sku_name = disk.sku.name if disk.sku else None
+            sku_name = _enum_value(sku_name)
+            price_key, monthly_cost = _disk_monthly_cost(prices_for(disk.location), sku_name, disk.disk_size_gb)
+            recommendations.append(DiskRecommendation(
+                name=disk.name,
+                resource_id=disk.id,
+                location=intern_str(disk.location),
+                resource_group=intern_str(disk.id.split('/')[4]) if disk.id else "",
+                estimated_monthly_cost=monthly_cost,
+                sku=intern_str(sku_name),
+                size_gb=disk.disk_size_gb,
+                price_key=intern_str(price_key),
+                time_created=disk.time_created.isoformat() if disk.time_created else None
+            ))
+        
+        for snapshot, age_days in snapshots:
+            sku_name = _enum_value(snapshot.sku.name) if snapshot.sku else None
+            recommendations.append(SnapshotRecommendation(
+                name=snapshot.name,
+                resource_id=snapshot.id,
+                location=intern_str(snapshot.location),
+                resource_group=intern_str(snapshot.id.split('/')[4]) if snapshot.id else "",
+                estimated_monthly_cost=_snapshot_monthly_cost(prices_for(snapshot.location), sku_name, snapshot.disk_size_gb),
+                size_gb=snapshot.disk_size_gb,
+                age_days=age_days,
+                source_resource_id=snapshot.creation_data.source_resource_id if snapshot.creation_data else None
+            ))
+        
+        logger.info("%d sahipsiz disk/eski snapshot önerisi bulundu", len(recommendations),
+                    extra={"regions": len(region_prices)})
+        return recommendations
+        
+    except Exception as e:
+        logger.error("Sahipsiz diskler alınırken hata: %s", e, exc_info=logger.isEnabledFor(logging.DEBUG))
+        raise
 
 def get_cost_details(subscription_id: str, tenant_id: str, client_id: str, client_secret: str, 
                     scope: str, time_period_days: int = 30):
@@ -228,97 +484,410 @@ def get_cost_details(subscription_id: str, tenant_id: str, client_id: str, clien
         }
         
     except Exception as e:
-        print(f"Maliyet detayları alınırken hata: {str(e)}")
+        logger.error("Maliyet detayları alınırken hata: %s", e)
         return None
 
-def get_app_service_plan_recommendations(subscription_id: str, tenant_id: str, client_id: str, client_secret: str):
+def get_resource_tags(subscription_id: str, tenant_id: str, client_id: str,
+                      client_secret: str) -> List[Tuple[str, Dict[str, str]]]:
+    """Abonelikteki tüm kaynakların (kimlik, tag'ler) listesi; tek bir sayfalı ARM listesiyle."""
+    credential = _create_credential(tenant_id, client_id, client_secret)
+    resource_client = _create_client("resource", credential, subscription_id)
+    return [(resource.id, resource.tags or {})
+            for resource in traced_iter(resource_client.resources.list(), "resource.resources.list")]
+
+
+def _usage_day(value) -> str:
+    """UsageDate (20240115 tamsayısı ya da ISO metni) -> "2024-01-15"."""
+    text = str(value)
+    return f"{text[:4]}-{text[4:6]}-{text[6:8]}" if text.isdigit() else text[:10]
+
+
+def _query_page(result) -> Tuple[List[str], List[List[Any]], Optional[str]]:
+    """Sorgu sonucundan (sütun adları, satırlar, sonraki sayfa); SDK modeli ya da ham JSON."""
+    if isinstance(result, dict):
+        properties = result.get("properties", result)
+        return ([column["name"] for column in properties.get("columns") or []], properties.get("rows") or [],
+                properties.get("nextLink"))
+    properties = getattr(result, "properties", None) or result
+    return ([column.name for column in properties.columns or []], properties.rows or [],
+            getattr(properties, "next_link", None))
+
+
+def iter_daily_costs(subscription_id: str, tenant_id: str, client_id: str, client_secret: str,
+                     start: datetime.date, end: datetime.date) -> Iterator[Tuple[str, str, str, float, str]]:
+    """
+    Cost Management'tan gün, kaynak ve servis kırılımında gerçekleşen maliyet satırları:
+    (gün, kaynak kimliği, servis, maliyet, para birimi). Sorgu gövdesi ham JSON'dur (SDK model sınıfları
+    gerekmez); sonraki sayfalar `next_link`'teki $skiptoken ile aynı sorgu yeniden gönderilerek alınır.
+    """
+    credential = _create_credential(tenant_id, client_id, client_secret)
+    cost_client = _create_client("costmanagement", credential, subscription_id)
+    scope = f"/subscriptions/{subscription_id}"
+    definition = {
+        "type": "ActualCost",
+        "timeframe": "Custom",
+        "timePeriod": {
+            "from": datetime.datetime.combine(start, datetime.time.min, tzinfo=datetime.timezone.utc).isoformat(),
+            "to": datetime.datetime.combine(end, datetime.time(23, 59, 59), tzinfo=datetime.timezone.utc).isoformat()
+        },
+        "dataset": {
+            "granularity": "Daily",
+            "aggregation": {"totalCost": {"name": "Cost", "function": "Sum"}},
+            "grouping": [{"type": "Dimension", "name": "ResourceId"},
+                         {"type": "Dimension", "name": "ServiceName"}]
+        }
+    }
+    params: Dict[str, str] = {}
+    while True:
+        with span("costmanagement.query.usage"):
+            columns, rows, next_link = _query_page(cost_client.query.usage(scope, definition, params=params))
+        index = {name: i for i, name in enumerate(columns)}
+        cost_column = next((index[name] for name in _COST_COLUMNS if name in index), None)
+        if cost_column is None or "UsageDate" not in index:
+            raise ValueError(f"Beklenmeyen Cost Management sütunları: {columns}")
+        date_column = index["UsageDate"]
+        resource_column, service_column = index.get("ResourceId"), index.get("ServiceName")
+        currency_column = index.get("Currency")
+        for row in rows:
+            yield (_usage_day(row[date_column]),
+                   (row[resource_column] or "") if resource_column is not None else "",
+                   (row[service_column] or "") if service_column is not None else "",
+                   float(row[cost_column] or 0.0),
+                   row[currency_column] if currency_column is not None else "USD")
+        if not next_link:
+            break
+        skiptoken = parse_qs(urlparse(next_link).query).get("$skiptoken")
+        if not skiptoken:
+            raise ValueError(f"Sonraki sayfa bağlantısında $skiptoken yok: {next_link}")
+        params = {"$skiptoken": skiptoken[0]}
+
+
+def get_app_service_plan_metrics(monitor_client, plan_id: str, days_ago: int = DEFAULT_PLAN_METRICS_DAYS) -> Dict[str, Tuple[List[float], List[float]]]:
+    """
+    Bir plan için son N günün saatlik CPU ve bellek yüzdelerini tek çağrıda alır.
+    
+    Returns:
+        {"CpuPercentage": (ortalamalar, maksimumlar), "MemoryPercentage": (ortalamalar, maksimumlar)}
+    """
+    end_time = datetime.datetime.utcnow()
+    start_time = end_time - datetime.timedelta(days=days_ago)
+    series: Dict[str, Tuple[List[float], List[float]]] = {name: ([], []) for name in PLAN_METRIC_NAMES}
+    
+    with span("monitor.metrics.list"):
+        metrics_data = monitor_client.metrics.list(
+            resource_uri=plan_id,
+            timespan=f"{start_time.isoformat()}/{end_time.isoformat()}",
+            interval='PT1H',
+            metricnames=','.join(PLAN_METRIC_NAMES),
+            aggregation='Average,Maximum'
+        )
+    
+    for metric in metrics_data.value:
+        averages, maximums = series.setdefault(metric.name.value, ([], []))
+        for timeserie in metric.timeseries:
+            for data in timeserie.data:
+                if data.average is not None:
+                    averages.append(data.average)
+                if data.maximum is not None:
+                    maximums.append(data.maximum)
+    return series
+
+def fetch_app_service_plan_metrics(monitor_client, plan_ids: List[str], days_ago: int = DEFAULT_PLAN_METRICS_DAYS,
+                                   max_workers: int = METRICS_FETCH_WORKERS) -> List[Optional[Dict[str, Tuple[List[float], List[float]]]]]:
+    """
+    Planların metriklerini sınırlı sayıda eşzamanlı çağrıyla toplar; sonuçlar `plan_ids` sırasındadır.
+    Metriği alınamayan planlar için None döner.
+    """
+    def fetch(plan_id: str):
+        try:
+            return get_app_service_plan_metrics(monitor_client, plan_id, days_ago)
+        except Exception as e:
+            logger.warning("Plan metriği alınırken hata: %s", e, extra={"resource_id": plan_id, **RATE_LIMITED})
+            return None
+    
+    if not plan_ids:
+        return []
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(plan_ids))),
+                            thread_name_prefix="plan-metrics") as pool:
+        # Her görev isteğin izine (trace) span yazabilsin diye bağlam kopyalanır
+        futures = [pool.submit(contextvars.copy_context().run, fetch, plan_id) for plan_id in plan_ids]
+        return [future.result() for future in futures]
+
+def get_app_service_plan_instance_hours(monitor_client, plan_id: str, days_ago: int = DEFAULT_COMMITMENT_DAYS) -> np.ndarray:
+    """
+    Planın son N gündeki saatlik çalışan instance sayısı. CPU metriği `Instance` boyutunda ayrıştırılarak
+    tek çağrıda alınır; bir saatte verisi olan her instance o saatte çalışıyor sayılır.
+    """
+    end_time = datetime.datetime.now(datetime.timezone.utc)
+    start_time = end_time - datetime.timedelta(days=days_ago)
+    hours = days_ago * 24
+    counts = np.zeros(hours, dtype=np.int32)
+    
+    with span("monitor.metrics.list"):
+        metrics_data = monitor_client.metrics.list(
+            resource_uri=plan_id,
+            timespan=f"{start_time.isoformat()}/{end_time.isoformat()}",
+            interval='PT1H',
+            metricnames='CpuPercentage',
+            aggregation='Average',
+            filter="Instance eq '*'"
+        )
+    
+    start_epoch = start_time.timestamp()
+    for metric in metrics_data.value:
+        for timeserie in metric.timeseries:
+            hour_index = np.fromiter(
+                (int((data.time_stamp.timestamp() - start_epoch) // 3600)
+                 for data in timeserie.data if data.average is not None and data.time_stamp is not None),
+                dtype=np.int64
+            )
+            hour_index = np.unique(hour_index[(hour_index >= 0) & (hour_index < hours)])
+            counts[hour_index] += 1
+    return counts
+
+def get_app_service_commitment_recommendations(subscription_id: str, tenant_id: str, client_id: str, client_secret: str,
+                                               days_ago: int = DEFAULT_COMMITMENT_DAYS, currency: str = "USD") -> Dict[str, Any]:
     """
-    App Service planları için optimizasyon önerileri döndürür.
+    App Service planları için rezervasyon/tasarruf planı analizi. Planların saatlik instance sayıları
+    (bölge, SKU) başına toplanır ve tüm filo tek bir vektörel analizle değerlendirilir. Maliyetler fiyatlarla
+    doğrusal olduğundan fiyatlar analizden önce `currency` para birimine çevrilir.
     """
+    days_ago = max(1, min(days_ago, MAX_COMMITMENT_DAYS))
+    credential = _create_credential(tenant_id, client_id, client_secret)
+    web_client = _create_client("web", credential, subscription_id)
+    monitor_client = _create_client("monitor", credential, subscription_id)
+    
+    plans = [
+        plan for plan in traced_iter(web_client.app_service_plans.list(), "web.app_service_plans.list")
+        if plan.id and plan.sku and plan.sku.name
+    ]
+    
+    def fetch(plan_id: str) -> Optional[np.ndarray]:
+        try:
+            return get_app_service_plan_instance_hours(monitor_client, plan_id, days_ago)
+        except Exception as e:
+            logger.warning("Plan instance metriği alınırken hata: %s", e, extra={"resource_id": plan_id, **RATE_LIMITED})
+            return None
+    
+    usage_by_plan: List[Optional[np.ndarray]] = []
+    if plans:
+        with ThreadPoolExecutor(max_workers=max(1, min(METRICS_FETCH_WORKERS, len(plans))),
+                                thread_name_prefix="plan-instances") as pool:
+            futures = [pool.submit(contextvars.copy_context().run, fetch, plan.id) for plan in plans]
+            usage_by_plan = [future.result() for future in futures]
+    
+    # (bölge, SKU) başına saatlik toplam instance sayısı
+    keys: List[Tuple[str, str]] = []
+    key_index: Dict[Tuple[str, str], int] = {}
+    rows: List[int] = []
+    series: List[np.ndarray] = []
+    for plan, usage in zip(plans, usage_by_plan):
+        if usage is None:
+            continue
+        key = (region_key(plan.location), normalize_sku_name(plan.sku.name))
+        if key not in key_index:
+            key_index[key] = len(keys)
+            keys.append(key)
+        rows.append(key_index[key])
+        series.append(usage)
+    
+    options = list(COMMITMENT_OPTIONS)
+    prices_by_region = {region: get_commitment_prices(region) for region in {region for region, _ in keys}}
+    priced = [i for i, (region, sku) in enumerate(keys) if sku in prices_by_region[region]]
     try:
-        credential = ClientSecretCredential(
-            tenant_id=tenant_id,
-            client_id=client_id,
-            client_secret=client_secret
+        rate = exchange_rates.rate("USD", currency)
+    except KeyError:
+        rate, currency = 1.0, "USD"
+    result: Dict[str, Any] = {"days": days_ago, "currency": currency, "plans_analyzed": len(series),
+                              "skus": [], "fleet_savings_plans": {}}
+    if not priced:
+        return result
+    
+    usage_matrix = np.zeros((len(keys), days_ago * 24), dtype=np.int64)
+    np.add.at(usage_matrix, np.asarray(rows), np.vstack(series))
+    usage_matrix = usage_matrix[priced]
+    priced_keys = [keys[i] for i in priced]
+    sku_prices = [prices_by_region[region][sku] for region, sku in priced_keys]
+    payg = np.array([prices["payg"] for prices in sku_prices]) * rate
+    rates = np.array([[prices.get(option, np.nan) for option in options] for prices in sku_prices]) * rate
+    
+    with span("commitments.analyze"):
+        analysis = analyze_commitments(usage_matrix, payg, rates, options)
+        result["skus"] = commitment_recommendations(priced_keys, analysis)
+        for j, option in enumerate(options):
+            if COMMITMENT_OPTIONS[option].kind != "savings_plan":
+                continue
+            plan = fleet_savings_plan(usage_matrix, payg, rates[:, j])
+            if plan is not None:
+                result["fleet_savings_plans"][option] = plan._asdict()
+    
+    logger.info("%d plan, %d SKU için taahhüt analizi yapıldı", len(series), len(priced_keys),
+                extra={"days": days_ago})
+    return result
+
+def get_app_service_plan_rightsizing_recommendations(credential, subscription_id: str, plans: List[Any],
+                                                     app_counts: Counter, days_ago: int = DEFAULT_PLAN_METRICS_DAYS,
+                                                     peak_percentile: float = DEFAULT_PEAK_PERCENTILE,
+                                                     prices_by_region: Optional[Dict[str, Dict[str, float]]] = None
+                                                     ) -> Tuple[List[Recommendation], List[str]]:
+    """
+    Uygulama barındıran planların CPU/bellek kullanımını analiz eder ve gözlenen tepe yüke uyan en ucuz
+    SKU/instance sayısı mevcut yapılandırmadan ucuzsa yeniden boyutlandırma önerir.
+    `prices_by_region` verilmezse fiyatlar bölge başına bir kez çekilir. Öneriler ve metrikleri alınamadığı
+    için değerlendirilemeyen planların ID'leri döner.
+    """
+    plans = [plan for plan in plans if plan.sku and normalize_sku_name(plan.sku.name) in APP_SERVICE_SKU_SPECS]
+    if not plans:
+        return [], []
+    
+    monitor_client = _create_client("monitor", credential, subscription_id)
+    metrics = fetch_app_service_plan_metrics(monitor_client, [plan.id for plan in plans], days_ago)
+    # Metriği alınamayan planlar atlanır; eksik metrikle analiz önceki bulgularını çözülmüş gösterirdi
+    unmeasured = [plan.id for plan, series in zip(plans, metrics) if series is None]
+    measured = [(plan, series) for plan, series in zip(plans, metrics) if series is not None]
+    if unmeasured:
+        logger.warning("%d planın kullanım metriği alınamadı, bu planlar atlanıyor", len(unmeasured))
+    if not measured:
+        return [], unmeasured
+    
+    stats = utilization_stats(
+        [series["CpuPercentage"][0] for _, series in measured],
+        [series["CpuPercentage"][1] for _, series in measured],
+        [series["MemoryPercentage"][0] for _, series in measured],
+        [series["MemoryPercentage"][1] for _, series in measured],
+        peak_percentile
+    )
+    
+    # Fiyat tablosu bölge başına bir kez alınır; boyutlandırma bölge içinde vektörel yapılır
+    by_region: Dict[str, List[int]] = {}
+    for index, (plan, _) in enumerate(measured):
+        by_region.setdefault(region_key(plan.location or "westeurope"), []).append(index)
+    if prices_by_region is None:
+        prices_by_region = load_app_service_prices(by_region)
+    
+    recommendations: List[Recommendation] = []
+    for region, indices in by_region.items():
+        prices = prices_by_region.get(region, {})
+        indices = [i for i in indices if stats.samples[i] > 0]
+        if not indices:
+            continue
+        region_plans = [measured[i][0] for i in indices]
+        results = cheapest_fitting_skus(
+            [normalize_sku_name(plan.sku.name) for plan in region_plans],
+            [plan.sku.capacity or 1 for plan in region_plans],
+            stats.cpu_peak[indices],
+            stats.memory_peak[indices],
+            prices
         )
+        for i, plan, result in zip(indices, region_plans, results):
+            current_sku = normalize_sku_name(plan.sku.name)
+            current_instances = plan.sku.capacity or 1
+            if result.sku is None or result.target_monthly_cost >= result.current_monthly_cost:
+                continue
+            if result.sku == current_sku and result.instances == current_instances:
+                continue
+            recommendations.append(AppServicePlanRightsizeRecommendation(
+                name=plan.name,
+                resource_id=plan.id,
+                location=intern_str(plan.location),
+                resource_group=intern_str(plan.resource_group),
+                estimated_monthly_cost=result.current_monthly_cost,
+                current_sku=intern_str(current_sku),
+                current_tier=intern_str(plan.sku.tier or "Unknown"),
+                recommended_sku=intern_str(result.sku),
+                recommended_tier=intern_str(APP_SERVICE_SKU_SPECS[result.sku].tier),
+                apps_count=app_counts.get(plan.id.lower(), 0),
+                current_instances=current_instances,
+                recommended_instances=result.instances,
+                target_monthly_cost=result.target_monthly_cost,
+                cpu_average=round(float(stats.cpu_avg[i]), 2),
+                cpu_peak=round(float(stats.cpu_peak[i]), 2),
+                memory_average=round(float(stats.memory_avg[i]), 2),
+                memory_peak=round(float(stats.memory_peak[i]), 2),
+                days_analyzed=days_ago
+            ))
+    
+    logger.info("%d plan kullanım metriğiyle analiz edildi, %d yeniden boyutlandırma önerisi",
+                len(measured), len(recommendations),
+                extra={"plans_without_metrics": int(np.count_nonzero(stats.samples == 0)) + len(unmeasured)})
+    return recommendations, unmeasured
+
+def get_app_service_plan_recommendations(subscription_id: str, tenant_id: str, client_id: str, client_secret: str,
+                                         metrics_days: int = DEFAULT_PLAN_METRICS_DAYS) -> List[Recommendation]:
+    """
+    App Service planları için optimizasyon önerileri döndürür (kompakt öneri kayıtları olarak).
+    Boş planlar için F1'e geçiş, uygulama barındıran planlar için kullanım metriklerine göre
+    yeniden boyutlandırma önerilir. Listeleme başarısızsa hata fırlatılır; yalnızca bazı planların metrikleri
+    alınamazsa diğer öneriler PartialAnalysis ile döner.
+    """
+    try:
+        credential = _create_credential(tenant_id, client_id, client_secret)
         
-        web_client = WebSiteManagementClient(credential, subscription_id)
+        web_client = _create_client("web", credential, subscription_id)
         
         recommendations = []
-        plans = web_client.app_service_plans.list()
+        used_plans = []
+        # Plan başına listeleme yerine abonelikteki tüm uygulamalar tek seferde indekslenir
+        app_counts = build_app_count_index(web_client)
+        plans = traced_iter(web_client.app_service_plans.list(), "web.app_service_plans.list")
         
         for plan in plans:
             try:
-                # Plan detaylarını al
-                apps = list(web_client.web_apps.list_by_resource_group(plan.resource_group))
-                apps_in_plan = [app for app in apps if app.server_farm_id == plan.id]
+                apps_count = app_counts.get(plan.id.lower(), 0) if plan.id else 0
                 
-                current_sku = plan.sku.name if plan.sku else "Unknown"
+                current_sku = normalize_sku_name(plan.sku.name) if plan.sku else "Unknown"
                 
-                # Sahipsiz plan kontrolü
-                if len(apps_in_plan) == 0:
-                    estimated_monthly_cost = 59.86  # B1 plan yaklaşık maliyeti
-                    
-                    recommendation = {
-                        "id": f"asp_{plan.name}",
-                        "name": plan.name,
-                        "category": "Cost_Custom_AppServicePlan",
-                        "impact": "High",
-                        "impacted_field": "Microsoft.Web/serverfarms",
-                        "impacted_value": plan.name,
-                        "short_description_problem": f"App Service planı '{plan.name}' üzerinde aktif uygulama yok",
-                        "short_description_solution": "Planı F1 (Free) tier'a taşıyın veya silin",
-                        "potential_benefits": f"Aylık ~${estimated_monthly_cost:.2f} tasarruf",
-                        "extended_properties": {
-                            "current_sku": current_sku,
-                            "current_tier": plan.sku.tier if plan.sku else "Unknown",
-                            "recommended_sku": "F1",
-                            "recommended_tier": "Free",
-                            "apps_count": len(apps_in_plan),
-                            "estimated_monthly_cost_usd": estimated_monthly_cost,
-                            "optimization_type": "sku_downgrade"
-                        },
-                        "resource_metadata": {
-                            "resource_id": plan.id,
-                            "source": "Azure SDK",
-                            "location": plan.location,
-                            "resource_group": plan.resource_group
-                        },
-                        "action_details": {
-                            "action": "update_sku",
-                            "target_sku": "F1",
-                            "target_tier": "Free",
-                            "estimated_time_minutes": 5,
-                            "risk_level": "Low"
-                        }
-                    }
-                    
-                    recommendations.append(recommendation)
+                # Sahipsiz plan kontrolü; maliyet plan SKU'su ve instance sayısına göre toplu hesaplanır
+                if apps_count == 0:
+                    recommendations.append(AppServicePlanRecommendation(
+                        name=plan.name,
+                        resource_id=plan.id,
+                        location=intern_str(plan.location),
+                        resource_group=intern_str(plan.resource_group),
+                        estimated_monthly_cost=0.0,
+                        current_sku=intern_str(current_sku),
+                        current_tier=intern_str(plan.sku.tier if plan.sku else "Unknown"),
+                        recommended_sku="F1",
+                        recommended_tier="Free",
+                        apps_count=apps_count,
+                        current_instances=(plan.sku.capacity if plan.sku else None) or 1
+                    ))
+                else:
+                    used_plans.append(plan)
                     
             except Exception as e:
-                print(f"Plan {plan.name} analiz edilirken hata: {str(e)}")
+                logger.warning("Plan %s analiz edilirken hata: %s", plan.name, e,
+                               extra={"resource_id": plan.id, **RATE_LIMITED})
                 continue
         
-        return recommendations
+        # Fiyatlar bölge başına bir kez çekilir; boyutlandırma ve tasarruf hesabı aynı tabloyu kullanır
+        prices_by_region = load_app_service_prices(
+            [rec.location for rec in recommendations] + [plan.location for plan in used_plans]
+        )
+        rightsized, unmeasured = get_app_service_plan_rightsizing_recommendations(
+            credential, subscription_id, used_plans, app_counts, metrics_days,
+            prices_by_region=prices_by_region
+        )
+        recommendations.extend(rightsized)
+        
+        apply_savings(recommendations, app_service_price_book(prices_by_region))
         
     except Exception as e:
-        print(f"App Service plan önerileri alınırken hata: {str(e)}")
-        traceback.print_exc()
-        return []
+        logger.error("App Service plan önerileri alınırken hata: %s", e, exc_info=logger.isEnabledFor(logging.DEBUG))
+        raise
+    if unmeasured:
+        raise PartialAnalysis(recommendations, unmeasured)
+    return recommendations
 
 def get_app_service_plans_debug(subscription_id: str, tenant_id: str, client_id: str, client_secret: str):
     """
     Debug: Tüm App Service planlarını listeler
     """
     try:
-        credential = ClientSecretCredential(
-            tenant_id=tenant_id,
-            client_id=client_id,
-            client_secret=client_secret
-        )
+        credential = _create_credential(tenant_id, client_id, client_secret)
         
-        web_client = WebSiteManagementClient(credential, subscription_id)
-        plans = list(web_client.app_service_plans.list())
+        web_client = _create_client("web", credential, subscription_id)
+        plans = list(traced_iter(web_client.app_service_plans.list(), "web.app_service_plans.list"))
         
         debug_info = []
         for plan in plans:
@@ -334,9 +903,74 @@ def get_app_service_plans_debug(subscription_id: str, tenant_id: str, client_id:
         return debug_info
         
     except Exception as e:
-        print(f"Debug plan listesi alınırken hata: {str(e)}")
+        logger.error("Debug plan listesi alınırken hata: %s", e)
         return []
 
+def app_service_plan_id(subscription_id: str, resource_group_name: str, plan_name: str) -> str:
+    return (f"/subscriptions/{subscription_id}/resourceGroups/{resource_group_name}"
+            f"/providers/Microsoft.Web/serverfarms/{plan_name}")
+
+def build_app_count_index(web_client) -> Counter:
+    """
+    Abonelikteki tüm web uygulamalarını tek listelemeyle okur ve plan ID'si (küçük harf) başına
+    uygulama sayısını döndürür. Plan başına listeleme yapılmaz.
+    """
+    counts: Counter = Counter()
+    for app in traced_iter(web_client.web_apps.list(), "web.web_apps.list"):
+        if app.server_farm_id:
+            counts[app.server_farm_id.lower()] += 1
+    return counts
+
+def begin_update_app_service_plan_sku(web_client, resource_group_name: str, plan_name: str, target_sku_name: str,
+                                      target_sku_tier: str, target_sku_family: Optional[str] = None,
+                                      target_sku_size: Optional[str] = None, target_sku_capacity: int = 1):
+    """
+    Planı okur, SKU'sunu değiştirir ve güncelleme işlemini başlatır. Beklemeden poller döndürür.
+    Plan zaten hedef SKU'daysa None döner.
+    """
+    with span("web.app_service_plans.get"):
+        plan = web_client.app_service_plans.get(resource_group_name, plan_name)
+    if plan is None:
+        raise ValueError(f"App Service planı bulunamadı: {resource_group_name}/{plan_name}")
+    
+    capacity = target_sku_capacity or 1
+    if plan.sku is not None and plan.sku.name == target_sku_name and (plan.sku.capacity or 1) == capacity:
+        return None
+    
+    if plan.sku is None:
+        from azure.mgmt.web.models import SkuDescription
+        plan.sku = SkuDescription()
+    plan.sku.name = target_sku_name
+    plan.sku.tier = target_sku_tier
+    plan.sku.size = target_sku_size or target_sku_name
+    # Aile verilmezse eski değer taşınmaz; Azure SKU adından türetir
+    plan.sku.family = target_sku_family
+    plan.sku.capacity = capacity
+    
+    with span("web.app_service_plans.begin_create_or_update"):
+        return web_client.app_service_plans.begin_create_or_update(resource_group_name, plan_name, plan)
+
+def delete_empty_app_service_plan(web_client, subscription_id: str, resource_group_name: str, plan_name: str,
+                                  app_counts: Optional[Counter] = None) -> Tuple[bool, str, Dict[str, Any]]:
+    """
+    Plan boşsa siler. `app_counts` verilirse (build_app_count_index) boşluk kontrolü ek çağrı yapmadan
+    indeksten yapılır; verilmezse yalnızca bu planın uygulamaları listelenir.
+    """
+    if app_counts is not None:
+        app_count = app_counts.get(app_service_plan_id(subscription_id, resource_group_name, plan_name).lower(), 0)
+    else:
+        app_count = sum(1 for _ in traced_iter(
+            web_client.app_service_plans.list_web_apps(resource_group_name, plan_name),
+            "web.app_service_plans.list_web_apps"
+        ))
+    
+    if app_count > 0:
+        return False, f"{plan_name} planı üzerinde {app_count} uygulama olduğu için silinemedi.", {"app_count": app_count}
+    
+    with span("web.app_service_plans.delete"):
+        web_client.app_service_plans.delete(resource_group_name, plan_name)
+    return True, f"Plan {plan_name} başarıyla silindi", {"deleted": True, "app_count": 0}
+
 def update_app_service_plan_sku(subscription_id: str, tenant_id: str, client_id: str, client_secret: str,
                                resource_group_name: str, plan_name: str, target_sku_name: str,
                                target_sku_tier: str, target_sku_family: Optional[str] = None,
@@ -345,10 +979,29 @@ def update_app_service_plan_sku(subscription_id: str, tenant_id: str, client_id:
     Bir App Service Planının SKU'sunu günceller.
     """
     try:
-        # Bu basitleştirilmiş bir implementasyon
-        return True, f"Plan {plan_name} başarıyla {target_sku_name} SKU'suna güncellendi", {"updated": True}
+        credential = _create_credential(tenant_id, client_id, client_secret)
+        web_client = _create_client("web", credential, subscription_id)
+        
+        poller = begin_update_app_service_plan_sku(
+            web_client, resource_group_name, plan_name, target_sku_name, target_sku_tier,
+            target_sku_family, target_sku_size, target_sku_capacity
+        )
+        if poller is None:
+            return True, f"Plan {plan_name} zaten {target_sku_name} SKU'sunda", {"updated": False}
+        
+        with span("web.app_service_plans.create_or_update_wait"):
+            updated_plan = poller.result()
+        
+        sku = getattr(updated_plan, "sku", None)
+        return True, f"Plan {plan_name} başarıyla {target_sku_name} SKU'suna güncellendi", {
+            "updated": True,
+            "sku": sku.name if sku else target_sku_name,
+            "tier": sku.tier if sku else target_sku_tier,
+            "capacity": sku.capacity if sku else target_sku_capacity
+        }
         
     except Exception as e:
+        logger.error("Plan güncelleme hatası: %s", e, extra={"plan_name": plan_name})
         return False, f"Plan güncelleme hatası: {str(e)}", None
 
 def delete_app_service_plan(subscription_id: str, tenant_id: str, client_id: str, client_secret: str,
@@ -357,8 +1010,11 @@ def delete_app_service_plan(subscription_id: str, tenant_id: str, client_id: str
     Boş bir App Service Planını siler.
     """
     try:
-        # Bu basitleştirilmiş bir implementasyon
-        return True, f"Plan {plan_name} başarıyla silindi", {"deleted": True}
+        credential = _create_credential(tenant_id, client_id, client_secret)
+        web_client = _create_client("web", credential, subscription_id)
+        
+        return delete_empty_app_service_plan(web_client, subscription_id, resource_group_name, plan_name)
         
     except Exception as e:
-        return False, f"Plan silme hatası: {str(e)}", None
\ No newline at end of file
+        logger.error("Plan silme hatası: %s", e, extra={"plan_name": plan_name})
+        return False, f"Plan silme hatası: {str(e)}", None
@@ -1,13 +1,387 @@
-import requests
-import json
-from typing import Dict, Optional
-from datetime import datetime, timedelta
+import numpy as np
+import asyncio
+import logging
+import re
+from typing import Callable, Dict, Iterable, List, Optional, Tuple, Union
+from datetime import datetime
+
+from .logging_config import RATE_LIMITED
+from .pricing_http import PricingRequestError, retail_prices_client, run_pricing
+from .telemetry import span
+from .fx_rates import exchange_rates
+
+logger = logging.getLogger(__name__)
+
+# API'den alınamayan App Service SKU'ları için Microsoft 2025 aylık USD fiyatları
+FALLBACK_APP_SERVICE_MONTHLY_USD: Dict[str, float] = {
+    "F1": 0.0,
+    "D1": 9.36,    # Shared plan tahmini (değişmeyebilir)
+    "B1": 59.86,   # 2025 Microsoft resmi: $59.86/ay ($0.082/saat)
+    "B2": 118.99,  # 2025 Microsoft resmi: $118.99/ay ($0.163/saat)
+    "B3": 237.25,  # 2025 Microsoft resmi: $237.25/ay ($0.325/saat)
+    "S1": 68.40,   # Standard katman tahmini
+    "S2": 136.80,  # Standard katman tahmini
+    "S3": 273.60,  # Standard katman tahmini
+    "P1V2": 82.80, # Premium V2 tahmini
+    "P2V2": 166.32, # Premium V2 tahmini
+    "P3V2": 332.64, # Premium V2 tahmini
+    "P1V3": 135.71, # 2025 Microsoft resmi: $135.71/ay ($0.186/saat)
+    "P2V3": 271.41, # 2025 Microsoft resmi: $271.41/ay ($0.372/saat)
+    "P3V3": 542.83, # 2025 Microsoft resmi: $542.83/ay ($0.744/saat)
+    "P1mv3": 288.35, # 2025 Microsoft resmi: $288.35/ay ($0.395/saat)
+    "P2mv3": 576.63, # 2025 Microsoft resmi: $576.63/ay ($0.79/saat)
+    "P3mv3": 1153.25, # 2025 Microsoft resmi: $1153.25/ay ($1.58/saat)
+    "P4mv3": 2306.58  # 2025 Microsoft resmi: $2306.58/ay ($3.16/saat)
+}
+
+FALLBACK_APP_SERVICE_TIERS: Dict[str, str] = {
+    "F1": "Free", "D1": "Shared",
+    "B1": "Basic", "B2": "Basic", "B3": "Basic",
+    "S1": "Standard", "S2": "Standard", "S3": "Standard",
+    "P1V2": "Premium", "P2V2": "Premium", "P3V2": "Premium",
+    "P1V3": "Premium v3", "P2V3": "Premium v3", "P3V3": "Premium v3",
+    "P1mv3": "Premium mv3", "P2mv3": "Premium mv3", "P3mv3": "Premium mv3", "P4mv3": "Premium mv3",
+}
+
+RETAIL_PRICES_API_VERSION = '2023-01-01-preview'
+# Azure'un aylık fiyatlandırmada kullandığı saat sayısı (365 * 24 / 12)
+HOURS_PER_MONTH = 730
+MAX_PRICE_PAGES = 50
+# API fiyatı, referans fiyatın bu katları arasında değilse yanlış eşleşme sayılır (bölgesel farklar ~%50'ye kadar)
+PRICE_SANITY_BAND = (0.6, 1.8)
+# Rezervasyon/tasarruf planı dönemleri: Retail Prices dönem adı -> (anahtar eki, dönem saati)
+COMMITMENT_TERMS = {"1 Year": ("1y", 8760), "3 Years": ("3y", 26280)}
+
+# Yönetilen disk performans katmanları: katman numarası -> üst boyut sınırı (GiB)
+DISK_TIER_SIZES_GB: Tuple[Tuple[int, int], ...] = (
+    (1, 4), (2, 8), (3, 16), (4, 32), (6, 64), (10, 128), (15, 256), (20, 512),
+    (30, 1024), (40, 2048), (50, 4096), (60, 8192), (70, 16384), (80, 32767)
+)
+
+# Disk SKU adı -> (fiyat katmanı harfi, yedeklilik)
+DISK_SKU_PRICE_PREFIX: Dict[str, Tuple[str, str]] = {
+    "Premium_LRS": ("P", "LRS"),
+    "Premium_ZRS": ("P", "ZRS"),
+    "StandardSSD_LRS": ("E", "LRS"),
+    "StandardSSD_ZRS": ("E", "ZRS"),
+    "Standard_LRS": ("S", "LRS"),
+}
+
+# API'den alınamayan disk fiyatları için tahmini LRS aylık USD fiyatları (katman -> fiyat)
+FALLBACK_DISK_MONTHLY_USD: Dict[str, Dict[int, float]] = {
+    "P": {1: 0.77, 2: 1.54, 3: 3.01, 4: 5.28, 6: 10.21, 10: 19.71, 15: 38.01, 20: 73.22,
+          30: 135.17, 40: 259.05, 50: 495.57, 60: 946.08, 70: 1802.64, 80: 3604.96},
+    "E": {1: 0.30, 2: 0.60, 3: 1.20, 4: 2.40, 6: 4.80, 10: 9.60, 15: 19.20, 20: 38.40,
+          30: 76.80, 40: 153.60, 50: 307.20, 60: 614.40, 70: 1228.80, 80: 2457.60},
+    "S": {4: 1.54, 6: 3.01, 10: 5.89, 15: 11.33, 20: 21.76, 30: 40.96, 40: 77.83,
+          50: 148.48, 60: 286.72, 70: 573.44, 80: 1146.88},
+}
+FALLBACK_ZRS_MULTIPLIER = 1.5
+# Katmanı olmayan diskler (UltraSSD, PremiumV2) ve snapshot'lar için GB başına aylık USD tahmini
+FALLBACK_PER_GB_MONTHLY_USD = {"UltraSSD_LRS": 0.12, "PremiumV2_LRS": 0.08}
+FALLBACK_SNAPSHOT_PER_GB_MONTHLY_USD = {"LRS": 0.05, "ZRS": 0.0625}
+
+# Retail Prices meter/SKU adlarından SKU adlarımıza eşleme. Bir kalem birden fazla SKU ile eşleşebilir
+# (örn: "P1mv3" hem P1V3 hem P1mv3); adaylar sözlük sırasıyla denenir, fiyatı doğrulanan ilki kullanılır.
+APP_SERVICE_SKU_METERS: Dict[str, List[str]] = {
+    "F1": ["F1 App", "Free"],
+    "D1": ["D1 App", "Shared", "Shared App"],
+    "B1": ["B1 App", "B1"],
+    "B2": ["B2 App", "B2"],
+    "B3": ["B3 App", "B3"],
+    "S1": ["S1 App", "S1"],
+    "S2": ["S2 App", "S2"],
+    "S3": ["S3 App", "S3"],
+    "P1V2": ["P1 v2 App", "P1 v2"],
+    "P2V2": ["P2 v2 App", "P2 v2"],
+    "P3V2": ["P3 v2 App", "P3 v2"],
+    "P1V3": ["P1 v3 App", "P1mv3 App", "P1 v3", "P1mv3"],
+    "P2V3": ["P2 v3 App", "P2mv3 App", "P2 v3", "P2mv3"],
+    "P3V3": ["P3 v3 App", "P3mv3 App", "P3 v3", "P3mv3"],
+    "P1mv3": ["P1mv3 App", "P1mv3"],
+    "P2mv3": ["P2mv3 App", "P2mv3"],
+    "P3mv3": ["P3mv3 App", "P3mv3"],
+    "P4mv3": ["P4mv3 App", "P4mv3"]
+}
+
+def app_service_sku_candidates(item: Dict) -> List[str]:
+    """Bir Retail Prices kaleminin eşleşebileceği App Service SKU adları (deneme sırasıyla)."""
+    meter_name = item.get('meterName', '')
+    sku_name = item.get('skuName', '')
+    product_name = item.get('productName', '').lower()
+    return [
+        our_sku for our_sku, api_variations in APP_SERVICE_SKU_METERS.items()
+        if any(variation in meter_name or variation in sku_name or variation.lower() in product_name
+               for variation in api_variations)
+    ]
+
+def managed_disk_price_key(sku_name: Optional[str], size_gb: Optional[int]) -> Optional[str]:
+    """
+    Disk SKU'su ve boyutundan Retail Prices anahtarını üretir (örn: Premium_LRS, 100 GiB -> "P10 LRS").
+    Katman tabanlı fiyatlanmayan SKU'lar için None döner.
+    """
+    prefix = DISK_SKU_PRICE_PREFIX.get(sku_name or "")
+    if prefix is None or not size_gb:
+        return None
+    letter, redundancy = prefix
+    for tier, max_size in DISK_TIER_SIZES_GB:
+        if size_gb <= max_size and (letter != "S" or tier >= 4):
+            return f"{letter}{tier} {redundancy}"
+    return f"{letter}{DISK_TIER_SIZES_GB[-1][0]} {redundancy}"
+
+def _fallback_disk_price(price_key: str) -> Optional[float]:
+    tier_part, redundancy = price_key.split(" ", 1)
+    monthly = FALLBACK_DISK_MONTHLY_USD.get(tier_part[0], {}).get(int(tier_part[1:]))
+    if monthly is None:
+        return None
+    return round(monthly * (FALLBACK_ZRS_MULTIPLIER if redundancy == "ZRS" else 1.0), 2)
+
+def _managed_disk_filter(region: str) -> str:
+    return (f"serviceName eq 'Storage' and armRegionName eq '{region}' and priceType eq 'Consumption' "
+            f"and contains(productName, 'Managed Disks')")
+
+def _app_service_filter(region: str) -> str:
+    # 2023 API versiyonu kullanılıyor ancak fiyatlar Microsoft 2025 referanslarıyla doğrulanıyor
+    return f"serviceName eq 'Azure App Service' and armRegionName eq '{region}' and priceType eq 'Consumption'"
+
+def _public_ip_filter(region: str) -> str:
+    return (f"serviceName eq 'Virtual Network' and armRegionName eq '{region}' and priceType eq 'Consumption' "
+            f"and productName eq 'IP Addresses'")
+
+# Örn: "Standard IPv4 Static Public IP", "Basic IPv4 Dynamic Public IP Address"; Global ve prefix sayaçları hariç
+_PUBLIC_IP_METER = re.compile(r"^(Basic|Standard) IPv4 (Static|Dynamic) Public IP")
+
+def _public_ip_price_table(items: List[Dict]) -> Dict[Tuple[str, str], float]:
+    prices: Dict[Tuple[str, str], float] = {}
+    for item in items:
+        match = _PUBLIC_IP_METER.match(item.get('meterName', ''))
+        if match is None or item.get('unitOfMeasure') != '1 Hour':
+            continue
+        key = (match.group(1), match.group(2))
+        price = item.get('retailPrice', 0) or 0
+        if key not in prices or price < prices[key]:
+            prices[key] = price
+    return prices
+
+def _managed_disk_price_table(items: List[Dict]) -> Dict[str, float]:
+    prices: Dict[str, float] = {}
+    for item in items:
+        meter_name = item.get('meterName', '')
+        unit = item.get('unitOfMeasure', '')
+        price = item.get('retailPrice', 0) or 0
+        if meter_name.endswith(' Disk') and unit == '1/Month':
+            key = meter_name[:-len(' Disk')]
+        elif 'Snapshot' in meter_name and 'GB/Month' in unit:
+            key = f"snapshot {'ZRS' if 'ZRS' in meter_name else 'LRS'}"
+        else:
+            continue
+        if key not in prices or price < prices[key]:
+            prices[key] = price
+    return prices
+
+def _app_service_price_table(items: List[Dict], currency: str, region: str) -> Dict[str, Dict]:
+    """Retail Prices kalemlerinden SKU başına aylık fiyat tablosu; API'de bulunmayan SKU'lar tahmini fiyatla doldurulur."""
+    pricing_data = {}
+    
+    # Doğrulama aralığı: Microsoft 2025 referans fiyatının bölgesel farkları kapsayan bir bandı (USD/ay).
+    # Yanlış eşleşen meter'ları (örn: farklı ürün) eler; bölgeler arası fiyat farklarını korur.
+    expected_ranges = {
+        sku: (monthly_usd * PRICE_SANITY_BAND[0], monthly_usd * PRICE_SANITY_BAND[1])
+        for sku, monthly_usd in FALLBACK_APP_SERVICE_MONTHLY_USD.items() if monthly_usd > 0
+    }
+    
+    # Seviye kontrolü döngü dışında bir kez yapılır; DEBUG kapalıyken döngüde log maliyeti olmaz
+    debug_enabled = logger.isEnabledFor(logging.DEBUG)
+    items_processed = 0
+    for item in items:
+        items_processed += 1
+        sku_name = item.get('skuName', '')
+        meter_name = item.get('meterName', '')
+        retail_price = item.get('retailPrice', 0)
+        unit_price = item.get('unitPrice', 0)
+        product_name = item.get('productName', '')
+        item_type = item.get('type', '')
+        arm_region = item.get('armRegionName', '')
+        
+        # Debug: İlk birkaç item'i logla
+        if debug_enabled and items_processed <= 10:
+            logger.debug("Item %d: %s - %s - $%s", items_processed, meter_name, sku_name, retail_price)
+        
+        # Sadece Consumption tipindeki ve belirtilen bölgedeki fiyatları al
+        if item_type != 'Consumption' or arm_region != region:
+            continue
+        
+        # App Service plan SKU'larını tespit et
+        for our_sku in app_service_sku_candidates(item):
+            # Aylık fiyat hesapla (saatlik fiyat * 730)
+            monthly_price = retail_price * HOURS_PER_MONTH
+            
+            # Fiyat doğrulama - sadece beklenen aralıktaki fiyatları kabul et
+            if our_sku in expected_ranges:
+                min_price, max_price = expected_ranges[our_sku]
+                if not (min_price <= monthly_price <= max_price):
+                    logger.warning("%s beklenen aralık dışında: $%.2f/ay (beklenen: $%s-$%s)",
+                                   our_sku, monthly_price, min_price, max_price, extra=RATE_LIMITED)
+                    continue
+            
+            # En düşük geçerli fiyatı kaydet (eğer zaten varsa)
+            if our_sku not in pricing_data or pricing_data[our_sku]["price"] > monthly_price:
+                pricing_data[our_sku] = {
+                    "price": round(monthly_price, 2),
+                    "currency": currency,
+                    "hourly_price": retail_price,
+                    "unit_price": unit_price,
+                    "meter_name": meter_name,
+                    "sku_name": sku_name,
+                    "product_name": product_name,
+                    "region": region,
+                    "last_updated": datetime.now().isoformat(),
+                    "original_usd_price": monthly_price if currency == "USD" else 0
+                }
+                if debug_enabled:
+                    logger.debug("API'den fiyat bulundu: %s = $%s/saat ($%.2f/ay)", our_sku, retail_price, monthly_price)
+            break
+    
+    # F1 (Free) için özel işlem - genellikle API'de 0 olarak gelir
+    if "F1" not in pricing_data:
+        pricing_data["F1"] = {
+            "price": 0.0,
+            "currency": currency,
+            "hourly_price": 0.0,
+            "unit_price": 0.0,
+            "meter_name": "Free",
+            "sku_name": "F1",
+            "product_name": "App Service Free",
+            "region": region,
+            "last_updated": datetime.now().isoformat(),
+            "original_usd_price": 0.0
+        }
+    
+    # Eksik SKU'lar için Microsoft resmi 2025 fiyat tahmini
+    for sku, monthly_usd in FALLBACK_APP_SERVICE_MONTHLY_USD.items():
+        if sku == "F1":
+            continue
+        if sku not in pricing_data:
+            hourly_usd = monthly_usd / HOURS_PER_MONTH
+            pricing_data[sku] = {
+                "price": round(monthly_usd, 2),
+                "currency": currency,
+                "hourly_price": round(hourly_usd, 4),
+                "unit_price": round(hourly_usd, 4),
+                "meter_name": f"{sku} App",
+                "sku_name": sku,
+                "product_name": f"App Service {sku}",
+                "region": region,
+                "last_updated": datetime.now().isoformat(),
+                "original_usd_price": monthly_usd,
+                "source": "Microsoft Resmi 2025 Fiyat"
+            }
+            if debug_enabled:
+                logger.debug("2025 SKU eklendi: %s = $%.2f/ay (Microsoft resmi fiyat)", sku, monthly_usd)
+    
+    logger.info("%d App Service SKU fiyatı bulundu, %d item işlendi", len(pricing_data), items_processed,
+                extra={"region": region, "currency": currency})
+    return pricing_data
 
 class AzureRetailPrices:
     """Azure Retail Prices API'sinden gerçek fiyatları çeken sınıf"""
     
     BASE_URL = "https://prices.azure.com/api/retail/prices"
     
+    # Benchmark ve çevrimdışı çalışmalar için HTTP yerine kullanılacak kaynak: (url, params) -> JSON sözlüğü
+    transport = None
+    
+    @staticmethod
+    async def _fetch_json_async(params: Optional[Dict[str, str]], url: Optional[str] = None) -> Dict:
+        url = url or AzureRetailPrices.BASE_URL
+        with span("retail_prices.get"):
+            transport = AzureRetailPrices.transport
+            if transport is not None:
+                return await asyncio.to_thread(transport, url, params)
+            return await retail_prices_client().get_json(url, params)
+    
+    @staticmethod
+    async def _fetch_items_async(filter_query: str, currency: str = "USD") -> List[Dict]:
+        """Filtreye uyan tüm fiyat kalemlerini NextPageLink sayfalarını izleyerek çeker."""
+        params: Optional[Dict[str, str]] = {
+            '$filter': filter_query,
+            'currencyCode': currency,
+            'api-version': RETAIL_PRICES_API_VERSION
+        }
+        url = None
+        items: List[Dict] = []
+        for _ in range(MAX_PRICE_PAGES):
+            data = await AzureRetailPrices._fetch_json_async(params, url)
+            items.extend(data.get('Items', []))
+            url = data.get('NextPageLink')
+            params = None
+            if not url:
+                break
+        return items
+    
+    @staticmethod
+    def _fetch_items(filter_query: str, currency: str = "USD") -> List[Dict]:
+        return run_pricing(AzureRetailPrices._fetch_items_async(filter_query, currency))
+    
+    @staticmethod
+    def _fetch_regions(filter_for: Callable[[str], str], regions: Iterable[str],
+                       currency: str = "USD") -> Dict[str, Union[List[Dict], Exception]]:
+        """
+        Bölgelerin kalemlerini tek seferde, eşzamanlı çeker (her bölgenin sayfaları sırayla izlenir).
+        Başarısız bölgeler için istisna döner; diğer bölgeler etkilenmez.
+        """
+        regions = list(dict.fromkeys(regions))
+        
+        async def fetch_all():
+            return await asyncio.gather(
+                *(AzureRetailPrices._fetch_items_async(filter_for(region), currency) for region in regions),
+                return_exceptions=True
+            )
+        
+        return dict(zip(regions, run_pricing(fetch_all()))) if regions else {}
+    
+    @staticmethod
+    def get_managed_disk_prices(currency: str = "USD", region: str = "westeurope") -> Dict[str, float]:
+        """
+        Yönetilen disk ve snapshot fiyatlarını çeker.
+        
+        Returns:
+            {"P10 LRS": aylık disk fiyatı, ..., "snapshot LRS": GB başına aylık snapshot fiyatı}
+        """
+        return AzureRetailPrices.get_managed_disk_prices_many(currency, [region]).get(region, {})
+    
+    @staticmethod
+    def get_managed_disk_prices_many(currency: str = "USD", regions: Iterable[str] = ("westeurope",)) -> Dict[str, Dict[str, float]]:
+        """Birden fazla bölgenin disk/snapshot fiyatları; bölgeler eşzamanlı çekilir. Alınamayan bölge boş döner."""
+        fetched = AzureRetailPrices._fetch_regions(_managed_disk_filter, regions, currency)
+        tables: Dict[str, Dict[str, float]] = {}
+        for region, items in fetched.items():
+            if isinstance(items, Exception):
+                logger.warning("Disk fiyatları alınamadı, tahmini fiyatlar kullanılacak: %s", items, extra={"region": region})
+                tables[region] = {}
+                continue
+            tables[region] = _managed_disk_price_table(items)
+            logger.info("%d disk/snapshot fiyatı bulundu", len(tables[region]), extra={"region": region, "currency": currency})
+        return tables
+    
+    @staticmethod
+    def get_public_ip_prices_many(regions: Iterable[str]) -> Dict[str, Dict[Tuple[str, str], float]]:
+        """
+        Bölge başına genel IPv4 saatlik USD fiyatları: {(SKU, atama yöntemi): fiyat}; bölgeler eşzamanlı çekilir.
+        Alınamayan bölge ya da API'de bulunmayan SKU'lar sonuçta yer almaz.
+        """
+        fetched = AzureRetailPrices._fetch_regions(_public_ip_filter, regions)
+        tables: Dict[str, Dict[Tuple[str, str], float]] = {}
+        for region, items in fetched.items():
+            if isinstance(items, Exception):
+                logger.warning("Genel IP fiyatları alınamadı, tahmini fiyatlar kullanılacak: %s", items,
+                               extra={"region": region})
+                tables[region] = {}
+                continue
+            tables[region] = _public_ip_price_table(items)
+            logger.info("%d genel IP fiyatı bulundu", len(tables[region]), extra={"region": region})
+        return tables
+    
     @staticmethod
     def get_app_service_prices(currency: str = "USD", region: str = "westeurope") -> Dict[str, Dict]:
         """
@@ -18,210 +392,109 @@ class AzureRetailPrices:
             region: Azure bölgesi (westeurope, eastus vb.)
             
         Returns:
-            SKU fiyatlarını içeren dictionary
+            SKU fiyatlarını içeren dictionary (API'ye ulaşılamazsa boş)
+        """
+        return AzureRetailPrices.get_app_service_prices_many(currency, [region]).get(region, {})
+    
+    @staticmethod
+    def get_app_service_prices_many(currency: str = "USD", regions: Iterable[str] = ("westeurope",)) -> Dict[str, Dict[str, Dict]]:
+        """Birden fazla bölgenin App Service fiyat tabloları; bölgeler eşzamanlı çekilir. Alınamayan bölge boş döner."""
+        fetched = AzureRetailPrices._fetch_regions(_app_service_filter, regions, currency)
+        tables: Dict[str, Dict[str, Dict]] = {}
+        for region, items in fetched.items():
+            tables[region] = {}
+            if isinstance(items, PricingRequestError):
+                logger.error("Retail Prices API çağrısı başarısız: %s", items, extra={"region": region})
+                continue
+            try:
+                if isinstance(items, Exception):
+                    raise items
+                tables[region] = _app_service_price_table(items, currency, region)
+            except Exception as e:
+                logger.error("Fiyat çekme hatası: %s", e, extra={"region": region}, exc_info=logger.isEnabledFor(logging.DEBUG))
+        return tables
+    
+    @staticmethod
+    def get_app_service_commitment_prices(region: str = "westeurope") -> Dict[str, Dict[str, float]]:
+        """
+        App Service SKU'larının instance başına saatlik USD fiyatları: kullandıkça öde ("payg"), rezervasyon
+        ("reservation_1y", "reservation_3y") ve tasarruf planı ("savings_plan_1y", "savings_plan_3y").
+        Rezervasyon fiyatı API'de dönem toplamı olarak gelir, dönem saatine bölünerek efektif saatlik fiyata çevrilir.
         """
+        filter_query = f"serviceName eq 'Azure App Service' and armRegionName eq '{region}'"
         try:
-            # App Service planları için filtre - 2023 API versiyonu kullanılıyor ancak Microsoft 2025 fiyatları ile karşılaştırılıyor
-            filter_query = f"serviceName eq 'Azure App Service' and armRegionName eq '{region}' and priceType eq 'Consumption'"
-            
-            params = {
-                '$filter': filter_query,
-                'currencyCode': currency,
-                'api-version': '2023-01-01-preview'
-            }
-            
-            print(f"[DEBUG][PricingAPI] Azure Retail Prices API çağrısı yapılıyor (Microsoft 2025 fiyatları baz alınıyor)...")
-            print(f"[DEBUG][PricingAPI] Filter: {filter_query}")
-            
-            response = requests.get(AzureRetailPrices.BASE_URL, params=params, timeout=30)
-            response.raise_for_status()
-            
-            data = response.json()
-            pricing_data = {}
-            
-            # SKU mapping - Azure meter names/SKU names to our SKU names
-            sku_mapping = {
-                "F1": ["F1 App", "Free"],
-                "D1": ["D1 App", "Shared", "Shared App"],
-                "B1": ["B1 App", "B1"],
-                "B2": ["B2 App", "B2"],
-                "B3": ["B3 App", "B3"],
-                "S1": ["S1 App", "S1"],
-                "S2": ["S2 App", "S2"],
-                "S3": ["S3 App", "S3"],
-                "P1V2": ["P1 v2 App", "P1 v2"],
-                "P2V2": ["P2 v2 App", "P2 v2"],
-                "P3V2": ["P3 v2 App", "P3 v2"],
-                "P1V3": ["P1 v3 App", "P1mv3 App", "P1 v3", "P1mv3"],
-                "P2V3": ["P2 v3 App", "P2mv3 App", "P2 v3", "P2mv3"],
-                "P3V3": ["P3 v3 App", "P3mv3 App", "P3 v3", "P3mv3"],
-                "P1mv3": ["P1mv3 App", "P1mv3"],
-                "P2mv3": ["P2mv3 App", "P2mv3"],
-                "P3mv3": ["P3mv3 App", "P3mv3"],
-                "P4mv3": ["P4mv3 App", "P4mv3"]
-            }
-            
-            # Microsoft resmi fiyat aralıkları 2025 (USD/ay) - doğrulama için
-            expected_ranges = {
-                "B1": (55.0, 65.0),   # 2025: ~$59.86/ay ($0.082/saat)
-                "B2": (115.0, 125.0), # 2025: ~$118.99/ay ($0.163/saat)  
-                "B3": (230.0, 245.0), # 2025: ~$237.25/ay ($0.325/saat)
-                "S1": (60.0, 75.0),   # Standard katman için tahmini
-                "S2": (120.0, 140.0), # Standard katman için tahmini
-                "S3": (240.0, 280.0), # Standard katman için tahmini
-                "P1V3": (130.0, 140.0), # 2025: ~$135.71/ay ($0.186/saat)
-                "P2V3": (265.0, 280.0), # 2025: ~$271.41/ay ($0.372/saat)
-                "P3V3": (535.0, 550.0), # 2025: ~$542.83/ay ($0.744/saat)
-                "P1mv3": (280.0, 295.0), # 2025: ~$288.35/ay ($0.395/saat)
-                "P2mv3": (570.0, 585.0), # 2025: ~$576.63/ay ($0.79/saat)
-                "P3mv3": (1145.0, 1165.0), # 2025: ~$1153.25/ay ($1.58/saat)
-                "P4mv3": (2295.0, 2315.0), # 2025: ~$2306.58/ay ($3.16/saat)
-                "P1V2": (75.0, 90.0),   # V2 serisi için tahmini
-                "P2V2": (160.0, 180.0), # V2 serisi için tahmini
-                "P3V2": (320.0, 360.0)  # V2 serisi için tahmini
-            }
-            
-            items_processed = 0
-            for item in data.get('Items', []):
-                items_processed += 1
-                sku_name = item.get('skuName', '')
-                meter_name = item.get('meterName', '')
-                retail_price = item.get('retailPrice', 0)
-                unit_price = item.get('unitPrice', 0)
-                product_name = item.get('productName', '')
-                item_type = item.get('type', '')
-                arm_region = item.get('armRegionName', '')
-                
-                # Debug: İlk birkaç item'i logla
-                if items_processed <= 10:
-                    print(f"[DEBUG][PricingAPI] Item {items_processed}: {meter_name} - {sku_name} - ${retail_price}")
-                
-                # Sadece Consumption tipindeki ve belirtilen bölgedeki fiyatları al
-                if item_type != 'Consumption' or arm_region != region:
-                    continue
-                
-                # App Service plan SKU'larını tespit et
-                for our_sku, api_variations in sku_mapping.items():
-                    if any(variation in meter_name or 
-                          variation in sku_name or
-                          variation.lower() in product_name.lower() 
-                          for variation in api_variations):
-                        
-                        # Aylık fiyat hesapla (saatlik fiyat * 24 * 30)
-                        monthly_price = retail_price * 24 * 30
-                        
-                        # Fiyat doğrulama - sadece beklenen aralıktaki fiyatları kabul et
-                        if our_sku in expected_ranges:
-                            min_price, max_price = expected_ranges[our_sku]
-                            if not (min_price <= monthly_price <= max_price):
-                                print(f"[WARN][PricingAPI] {our_sku} beklenen aralık dışında: ${monthly_price:.2f}/ay (beklenen: ${min_price}-${max_price})")
-                                continue
-                        
-                        # En düşük geçerli fiyatı kaydet (eğer zaten varsa)
-                        if our_sku not in pricing_data or pricing_data[our_sku]["price"] > monthly_price:
-                            pricing_data[our_sku] = {
-                                "price": round(monthly_price, 2),
-                                "currency": currency,
-                                "hourly_price": retail_price,
-                                "unit_price": unit_price,
-                                "meter_name": meter_name,
-                                "sku_name": sku_name,
-                                "product_name": product_name,
-                                "region": region,
-                                "last_updated": datetime.now().isoformat(),
-                                "original_usd_price": monthly_price if currency == "USD" else 0
-                            }
-                            print(f"[DEBUG][PricingAPI] API'den fiyat bulundu: {our_sku} = ${retail_price}/saat (${monthly_price:,.2f}/ay)")
-                        break
-            
-            # F1 (Free) için özel işlem - genellikle API'de 0 olarak gelir
-            if "F1" not in pricing_data:
-                pricing_data["F1"] = {
-                    "price": 0.0,
-                    "currency": currency,
-                    "hourly_price": 0.0,
-                    "unit_price": 0.0,
-                    "meter_name": "Free",
-                    "sku_name": "F1",
-                    "product_name": "App Service Free",
-                    "region": region,
-                    "last_updated": datetime.now().isoformat(),
-                    "original_usd_price": 0.0
-                }
-            
-            # Eksik SKU'lar için Microsoft resmi 2025 fiyat tahmini
-            missing_skus = {
-                "D1": 9.36,    # Shared plan tahmini (değişmeyebilir)
-                "B1": 59.86,   # 2025 Microsoft resmi: $59.86/ay ($0.082/saat)
-                "B2": 118.99,  # 2025 Microsoft resmi: $118.99/ay ($0.163/saat)
-                "B3": 237.25,  # 2025 Microsoft resmi: $237.25/ay ($0.325/saat)
-                "S1": 68.40,   # Standard katman tahmini
-                "S2": 136.80,  # Standard katman tahmini
-                "S3": 273.60,  # Standard katman tahmini
-                "P1V2": 82.80, # Premium V2 tahmini
-                "P2V2": 166.32, # Premium V2 tahmini
-                "P3V2": 332.64, # Premium V2 tahmini
-                "P1V3": 135.71, # 2025 Microsoft resmi: $135.71/ay ($0.186/saat)
-                "P2V3": 271.41, # 2025 Microsoft resmi: $271.41/ay ($0.372/saat)
-                "P3V3": 542.83, # 2025 Microsoft resmi: $542.83/ay ($0.744/saat)
-                "P1mv3": 288.35, # 2025 Microsoft resmi: $288.35/ay ($0.395/saat)
-                "P2mv3": 576.63, # 2025 Microsoft resmi: $576.63/ay ($0.79/saat)
-                "P3mv3": 1153.25, # 2025 Microsoft resmi: $1153.25/ay ($1.58/saat)
-                "P4mv3": 2306.58  # 2025 Microsoft resmi: $2306.58/ay ($3.16/saat)
-            }
-            
-            for sku, monthly_usd in missing_skus.items():
-                if sku not in pricing_data:
-                    hourly_usd = monthly_usd / (24 * 30)
-                    pricing_data[sku] = {
-                        "price": round(monthly_usd, 2),
-                        "currency": currency,
-                        "hourly_price": round(hourly_usd, 4),
-                        "unit_price": round(hourly_usd, 4),
-                        "meter_name": f"{sku} App",
-                        "sku_name": sku,
-                        "product_name": f"App Service {sku}",
-                        "region": region,
-                        "last_updated": datetime.now().isoformat(),
-                        "original_usd_price": monthly_usd,
-                        "source": "Microsoft Resmi 2025 Fiyat"
-                    }
-                    print(f"[INFO][PricingAPI] 2025 SKU eklendi: {sku} = ${monthly_usd:.2f}/ay (Microsoft resmi fiyat)")
-            
-            print(f"[DEBUG][PricingAPI] {len(pricing_data)} App Service SKU fiyatı bulundu, {items_processed} item işlendi")
-            return pricing_data
-            
-        except requests.exceptions.RequestException as e:
-            print(f"[ERROR][PricingAPI] API çağrısı başarısız: {str(e)}")
-            return {}
+            items = AzureRetailPrices._fetch_items(filter_query)
         except Exception as e:
-            print(f"[ERROR][PricingAPI] Fiyat çekme hatası: {str(e)}")
+            logger.error("Taahhüt fiyatları alınamadı: %s", e, extra={"region": region},
+                         exc_info=logger.isEnabledFor(logging.DEBUG))
             return {}
+
+        prices: Dict[str, Dict[str, float]] = {}
+        for item in items:
+            if item.get('armRegionName') != region:
+                continue
+            candidates = app_service_sku_candidates(item)
+            if not candidates:
+                continue
+            # "P1mv3" gibi kalemler birden fazla SKU ile eşleşir; SKU adı birebir tutan aday tercih edilir
+            compact = item.get('skuName', '').replace(" ", "").upper()
+            sku = next((c for c in candidates if c.upper() == compact), candidates[0])
+
+            item_prices: List[Tuple[str, float]] = []
+            if item.get('type') == 'Reservation':
+                term = COMMITMENT_TERMS.get(item.get('reservationTerm'))
+                if term:
+                    item_prices.append((f"reservation_{term[0]}", item.get('retailPrice', 0) / term[1]))
+            elif item.get('type') == 'Consumption':
+                item_prices.append(("payg", item.get('retailPrice', 0)))
+                for plan in item.get('savingsPlan') or []:
+                    term = COMMITMENT_TERMS.get(plan.get('term'))
+                    if term:
+                        item_prices.append((f"savings_plan_{term[0]}", plan.get('retailPrice', 0)))
+
+            # Aynı SKU için birden fazla kalem (örn: Windows/Linux) varsa en düşük fiyat kullanılır
+            sku_prices = prices.setdefault(sku, {})
+            for option, hourly in item_prices:
+                if hourly > 0 and hourly < sku_prices.get(option, float("inf")):
+                    sku_prices[option] = hourly
+
+        prices = {sku: sku_prices for sku, sku_prices in prices.items() if "payg" in sku_prices}
+        logger.info("%d App Service SKU için taahhüt fiyatı bulundu", len(prices), extra={"region": region})
+        return prices
     
     @staticmethod
     def convert_currency(amount: float, from_currency: str, to_currency: str) -> float:
         """
-        Para birimi dönüştürme (basit sabit kur - gerçek uygulamada güncel kurlar kullanılmalı)
+        Para birimi dönüştürme (önbellekli güncel kurlarla, bkz. fx_rates.py)
         """
-        # Basit kur çevirimi - gerçek uygulamada exchange rate API'si kullanılmalı
-        rates = {
-            "USD_TO_TRY": 30.0,  # 1 USD = 30 TRY (yaklaşık)
-            "EUR_TO_TRY": 33.0,  # 1 EUR = 33 TRY (yaklaşık)
-            "USD_TO_EUR": 0.92   # 1 USD = 0.92 EUR (yaklaşık)
-        }
-        
         if from_currency == to_currency:
             return amount
-            
-        rate_key = f"{from_currency}_TO_{to_currency}"
-        if rate_key in rates:
-            return round(amount * rates[rate_key], 2)
-        
-        return amount
+        try:
+            return round(amount * exchange_rates.rate(from_currency, to_currency), 2)
+        except KeyError:
+            logger.warning("Bilinmeyen para birimi çifti: %s -> %s", from_currency, to_currency, extra=RATE_LIMITED)
+            return amount
+
+def convert_price_table(usd_prices: Dict[str, Dict], currency: str) -> Dict[str, Dict]:
+    """
+    USD fiyat tablosunu tek bir vektörel çarpımla `currency` para birimine çevirir.
+    Her SKU'nun USD fiyatı `original_usd_price` alanında korunur.
+    """
+    skus = list(usd_prices)
+    usd_amounts = np.fromiter((usd_prices[sku]["price"] for sku in skus), dtype=np.float64, count=len(skus))
+    try:
+        converted = np.round(exchange_rates.convert_many(usd_amounts, "USD", currency), 2)
+    except KeyError:
+        logger.warning("Bilinmeyen para birimi, fiyatlar USD bırakıldı: %s", currency, extra=RATE_LIMITED)
+        converted, currency = usd_amounts, "USD"
+    return {
+        sku: {**usd_prices[sku], "price": price, "currency": currency, "original_usd_price": usd_price}
+        for sku, price, usd_price in zip(skus, converted.tolist(), usd_amounts.tolist())
+    }
 
 def get_current_app_service_pricing(currency: str = "TRY", region: str = "westeurope") -> Dict[str, Dict]:
     """
-    App Service planları için güncel fiyatları TL olarak çeker
+    App Service planları için güncel fiyatları istenen para biriminde (varsayılan TL) çeker
     """
     pricing_api = AzureRetailPrices()
     
@@ -229,46 +502,30 @@ def get_current_app_service_pricing(currency: str = "TRY", region: str = "westeu
     usd_prices = pricing_api.get_app_service_prices("USD", region)
     
     if not usd_prices:
-        print("[WARN][Pricing] API'den fiyat alınamadı, varsayılan fiyatlar kullanılıyor")
-        return get_fallback_pricing()
-    
-    # TL'ye çevir
-    try_prices = {}
-    for sku, price_data in usd_prices.items():
-        usd_price = price_data["price"]
-        try_price = pricing_api.convert_currency(usd_price, "USD", "TRY")
-        
-        try_prices[sku] = {
-            **price_data,
-            "price": try_price,
-            "currency": "TRY",
-            "original_usd_price": usd_price
-        }
+        logger.warning("API'den fiyat alınamadı, varsayılan fiyatlar kullanılıyor", extra={"region": region})
+        return get_fallback_pricing(currency)
     
-    print(f"[DEBUG][Pricing] {len(try_prices)} SKU fiyatı TL'ye çevrildi")
-    return try_prices
+    prices = convert_price_table(usd_prices, currency)
+    logger.debug("%d SKU fiyatı %s'ye çevrildi", len(prices), currency)
+    return prices
+
+def usd_monthly_prices(pricing: Dict[str, Dict]) -> Dict[str, float]:
+    """Fiyat tablosundan SKU başına aylık USD fiyatları çıkarır (karşılaştırma ve tasarruf hesabı için)."""
+    prices = {}
+    for sku, price_data in pricing.items():
+        usd_price = price_data.get("original_usd_price")
+        if usd_price is None:
+            usd_price = price_data.get("price", 0) / exchange_rates.rate("USD", price_data.get("currency", "USD"))
+        prices[sku] = round(float(usd_price), 2)
+    return prices
 
-def get_fallback_pricing() -> Dict[str, Dict]:
+def get_fallback_pricing(currency: str = "TRY") -> Dict[str, Dict]:
     """
-    API başarısız olursa kullanılacak varsayılan fiyatlar (Microsoft resmi 2025 fiyatları)
+    API başarısız olursa kullanılacak varsayılan fiyatlar (Microsoft resmi 2025 USD fiyatlarından güncel kurla)
     """
-    return {
-        "F1": {"price": 0, "currency": "TRY", "tier": "Free", "last_updated": datetime.now().isoformat()},
-        "D1": {"price": 281, "currency": "TRY", "tier": "Shared", "last_updated": datetime.now().isoformat()},
-        "B1": {"price": 1796, "currency": "TRY", "tier": "Basic", "last_updated": datetime.now().isoformat()},  # $59.86 * 30
-        "B2": {"price": 3570, "currency": "TRY", "tier": "Basic", "last_updated": datetime.now().isoformat()},  # $118.99 * 30
-        "B3": {"price": 7118, "currency": "TRY", "tier": "Basic", "last_updated": datetime.now().isoformat()},  # $237.25 * 30
-        "S1": {"price": 2052, "currency": "TRY", "tier": "Standard", "last_updated": datetime.now().isoformat()},
-        "S2": {"price": 4104, "currency": "TRY", "tier": "Standard", "last_updated": datetime.now().isoformat()},
-        "S3": {"price": 8208, "currency": "TRY", "tier": "Standard", "last_updated": datetime.now().isoformat()},
-        "P1V2": {"price": 2484, "currency": "TRY", "tier": "Premium", "last_updated": datetime.now().isoformat()},
-        "P2V2": {"price": 4990, "currency": "TRY", "tier": "Premium", "last_updated": datetime.now().isoformat()},
-        "P3V2": {"price": 9979, "currency": "TRY", "tier": "Premium", "last_updated": datetime.now().isoformat()},
-        "P1V3": {"price": 4071, "currency": "TRY", "tier": "Premium v3", "last_updated": datetime.now().isoformat()},  # $135.71 * 30
-        "P2V3": {"price": 8142, "currency": "TRY", "tier": "Premium v3", "last_updated": datetime.now().isoformat()},  # $271.41 * 30
-        "P3V3": {"price": 16285, "currency": "TRY", "tier": "Premium v3", "last_updated": datetime.now().isoformat()}, # $542.83 * 30
-        "P1mv3": {"price": 8651, "currency": "TRY", "tier": "Premium mv3", "last_updated": datetime.now().isoformat()}, # $288.35 * 30
-        "P2mv3": {"price": 17299, "currency": "TRY", "tier": "Premium mv3", "last_updated": datetime.now().isoformat()}, # $576.63 * 30
-        "P3mv3": {"price": 34598, "currency": "TRY", "tier": "Premium mv3", "last_updated": datetime.now().isoformat()}, # $1153.25 * 30
-        "P4mv3": {"price": 69197, "currency": "TRY", "tier": "Premium mv3", "last_updated": datetime.now().isoformat()}  # $2306.58 * 30
-    }
\ No newline at end of file
+    now = datetime.now().isoformat()
+    usd_prices = {
+        sku: {"price": monthly_usd, "tier": FALLBACK_APP_SERVICE_TIERS[sku], "last_updated": now}
+        for sku, monthly_usd in FALLBACK_APP_SERVICE_MONTHLY_USD.items()
+    }
+    return convert_price_table(usd_prices, currency)
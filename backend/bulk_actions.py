@@ -0,0 +1,314 @@
+# Toplu iyileştirme eylemleri (VM durdurma, App Service Plan eylemleri).
+# Uzun süreli işlemler sınırlı eşzamanlılıkla başlatılır ve tek bir döngüde birlikte yoklanır;
+# toplam süre kaynak sayısıyla değil, eşzamanlılık sınırıyla ölçeklenir.
+import logging
+import threading
+import time
+import uuid
+from collections import OrderedDict, deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from enum import Enum
+from typing import Any, Callable, Dict, List, Optional
+
+from .logging_config import RATE_LIMITED
+from .azure_client import (
+    app_service_plan_id,
+    begin_deallocate_vm,
+    begin_update_app_service_plan_sku,
+    build_app_count_index,
+    create_clients,
+    delete_empty_app_service_plan,
+    parse_vm_id
+)
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_CONCURRENCY = 10
+# İstek başına üst sınırlar: aynı anda uçuşta olacak işlem ve batch başına işlem sayısı
+MAX_CONCURRENCY = 50
+MAX_BATCH_ITEMS = 1000
+MAX_START_WORKERS = 16
+POLL_INTERVAL_SECONDS = 2.0
+MAX_RETAINED_BATCHES = 100
+
+
+class BulkActionType(str, Enum):
+    STOP_VM = "stop_vm"
+    UPDATE_PLAN_SKU = "update_app_service_plan_sku"
+    DELETE_PLAN = "delete_app_service_plan"
+
+
+class BulkItemStatus(str, Enum):
+    PENDING = "pending"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+
+
+class _CompletedOperation:
+    """Senkron tamamlanan eylemleri poller arayüzüne uyarlar."""
+
+    def __init__(self, result: Any = None, error: Optional[Exception] = None):
+        self._result = result
+        self._error = error
+
+    def done(self) -> bool:
+        return True
+
+    def result(self, timeout: Optional[float] = None):
+        if self._error is not None:
+            raise self._error
+        return self._result
+
+
+class _ResultMessage:
+    """Poller'ı sarar; tamamlandığında SDK sonucu yerine sabit bir başarı mesajı döndürür."""
+
+    def __init__(self, poller, message: str):
+        self._poller = poller
+        self._message = message
+
+    def done(self) -> bool:
+        return self._poller.done()
+
+    def result(self, timeout: Optional[float] = None):
+        self._poller.result(timeout)
+        return self._message
+
+
+class BulkActionItem:
+    __slots__ = ("item_id", "action", "target", "params", "status", "message", "started_at", "finished_at")
+
+    def __init__(self, item_id: int, action: BulkActionType, target: str, params: Optional[Dict[str, Any]] = None):
+        self.item_id = item_id
+        self.action = action
+        self.target = target
+        self.params = params or {}
+        self.status = BulkItemStatus.PENDING
+        self.message: Optional[str] = None
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+
+    def finish(self, success: bool, message: str) -> None:
+        self.status = BulkItemStatus.SUCCEEDED if success else BulkItemStatus.FAILED
+        self.message = message
+        self.finished_at = time.time()
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "item_id": self.item_id,
+            "action": self.action.value,
+            "target": self.target,
+            "status": self.status.value,
+            "message": self.message,
+            "duration_seconds": round(self.finished_at - self.started_at, 3)
+            if self.started_at and self.finished_at else None,
+        }
+
+
+class BulkActionBatch:
+    def __init__(self, items: List[BulkActionItem], max_concurrency: int, dry_run: bool = False):
+        self.batch_id = uuid.uuid4().hex
+        self.items = items
+        self.max_concurrency = max_concurrency
+        self.dry_run = dry_run
+        self.created_at = time.time()
+        self.finished_at: Optional[float] = None
+
+    @property
+    def done(self) -> bool:
+        return self.finished_at is not None
+
+    def to_dict(self, include_items: bool = True) -> Dict[str, Any]:
+        counts = {status.value: 0 for status in BulkItemStatus}
+        for item in self.items:
+            counts[item.status.value] += 1
+        data = {
+            "batch_id": self.batch_id,
+            "status": "completed" if self.done else "running",
+            "max_concurrency": self.max_concurrency,
+            "dry_run": self.dry_run,
+            "total": len(self.items),
+            "counts": counts,
+            "elapsed_seconds": round((self.finished_at or time.time()) - self.created_at, 3),
+        }
+        if include_items:
+            data["items"] = [item.to_dict() for item in self.items]
+        return data
+
+
+class _BatchContext:
+    """Bir toplu işlemin tüm öğeleri arasında paylaşılan SDK istemcileri ve uygulama indeksi."""
+
+    def __init__(self, subscription_id: str, tenant_id: str, client_id: str, client_secret: str):
+        self.subscription_id = subscription_id
+        self._credentials = (subscription_id, tenant_id, client_id, client_secret)
+        self._clients: Dict[str, Any] = {}
+        self._app_counts = None
+        self._lock = threading.Lock()
+
+    def client(self, service: str):
+        with self._lock:
+            if service not in self._clients:
+                self._clients.update(create_clients(*self._credentials, [service]))
+            return self._clients[service]
+
+    def app_counts(self):
+        """Plan başına uygulama sayısı; toplu işlem başına yalnızca bir kez listelenir."""
+        web_client = self.client("web")
+        with self._lock:
+            if self._app_counts is None:
+                self._app_counts = build_app_count_index(web_client)
+            return self._app_counts
+
+
+def _build_starters(subscription_id: str, tenant_id: str, client_id: str, client_secret: str,
+                    dry_run: bool = False) -> Dict[BulkActionType, Callable[[BulkActionItem], Any]]:
+    """
+    Her eylem tipi için, işlemi başlatıp poller döndüren fonksiyonlar.
+    `dry_run` modunda yalnızca ön kontroller yapılır, hiçbir kaynak değiştirilmez.
+    """
+    context = _BatchContext(subscription_id, tenant_id, client_id, client_secret)
+
+    def start_stop_vm(item: BulkActionItem):
+        if dry_run:
+            _, vm_name = parse_vm_id(item.target)
+            return _CompletedOperation(f"[dry-run] VM {vm_name} durdurulup deallocate edilecek")
+        return begin_deallocate_vm(context.client("compute"), item.target)
+
+    def start_update_sku(item: BulkActionItem):
+        web_client = context.client("web")
+        resource_group_name = item.params["resource_group_name"]
+        target_sku_name = item.params["target_sku_name"]
+        if dry_run:
+            plan = web_client.app_service_plans.get(resource_group_name, item.target)
+            current = plan.sku.name if plan is not None and plan.sku else "Unknown"
+            return _CompletedOperation(f"[dry-run] Plan {item.target}: {current} -> {target_sku_name}")
+        poller = begin_update_app_service_plan_sku(
+            web_client, resource_group_name, item.target, target_sku_name,
+            item.params["target_sku_tier"],
+            target_sku_capacity=item.params.get("target_sku_capacity") or 1
+        )
+        if poller is None:
+            return _CompletedOperation(f"Plan {item.target} zaten {target_sku_name} SKU'sunda")
+        return _ResultMessage(poller, f"Plan {item.target} başarıyla {target_sku_name} SKU'suna güncellendi")
+
+    def start_delete_plan(item: BulkActionItem):
+        resource_group_name = item.params["resource_group_name"]
+        app_counts = context.app_counts()
+        if dry_run:
+            plan_id = app_service_plan_id(context.subscription_id, resource_group_name, item.target).lower()
+            app_count = app_counts.get(plan_id, 0)
+            if app_count:
+                return _CompletedOperation(error=RuntimeError(
+                    f"[dry-run] {item.target} planı üzerinde {app_count} uygulama var, silinemez"))
+            return _CompletedOperation(f"[dry-run] Plan {item.target} silinecek")
+        success, message, _ = delete_empty_app_service_plan(
+            context.client("web"), context.subscription_id, resource_group_name, item.target, app_counts
+        )
+        return _CompletedOperation(message) if success else _CompletedOperation(error=RuntimeError(message))
+
+    return {
+        BulkActionType.STOP_VM: start_stop_vm,
+        BulkActionType.UPDATE_PLAN_SKU: start_update_sku,
+        BulkActionType.DELETE_PLAN: start_delete_plan,
+    }
+
+
+def _success_message(item: BulkActionItem, result: Any) -> str:
+    if item.action == BulkActionType.STOP_VM:
+        _, vm_name = parse_vm_id(item.target)
+        return f"VM {vm_name} başarıyla durduruldu ve deallocate edildi."
+    return result if isinstance(result, str) else "İşlem tamamlandı"
+
+
+def run_batch(batch: BulkActionBatch, starters: Dict[BulkActionType, Callable[[BulkActionItem], Any]],
+              poll_interval: float = POLL_INTERVAL_SECONDS) -> BulkActionBatch:
+    """
+    Toplu işlemi çalıştırır: en fazla `max_concurrency` işlem aynı anda uçuştadır. Başlatma çağrıları
+    küçük bir thread havuzunda yapılır; başlatılan işlemler tek döngüde `done()` ile birlikte yoklanır.
+    """
+    pending = deque(batch.items)
+    starting: Dict[Future, BulkActionItem] = {}
+    polling: Dict[int, Any] = {}
+    items_by_id = {item.item_id: item for item in batch.items}
+
+    with ThreadPoolExecutor(max_workers=max(1, min(batch.max_concurrency, MAX_START_WORKERS)),
+                            thread_name_prefix="bulk-start") as starter_pool:
+        while pending or starting or polling:
+            progressed = False
+
+            while pending and len(starting) + len(polling) < batch.max_concurrency:
+                item = pending.popleft()
+                item.status = BulkItemStatus.RUNNING
+                item.started_at = time.time()
+                starting[starter_pool.submit(starters[item.action], item)] = item
+                progressed = True
+
+            for future in [f for f in starting if f.done()]:
+                item = starting.pop(future)
+                progressed = True
+                try:
+                    polling[item.item_id] = future.result()
+                except Exception as e:
+                    item.finish(False, f"İşlem başlatılamadı: {e}")
+                    logger.warning("Toplu işlem öğesi başlatılamadı: %s", e, extra={"resource_id": item.target, **RATE_LIMITED})
+
+            for item_id, poller in list(polling.items()):
+                if not poller.done():
+                    continue
+                del polling[item_id]
+                progressed = True
+                item = items_by_id[item_id]
+                try:
+                    item.finish(True, _success_message(item, poller.result()))
+                except Exception as e:
+                    item.finish(False, f"İşlem başarısız: {e}")
+                    logger.warning("Toplu işlem öğesi başarısız: %s", e, extra={"resource_id": item.target, **RATE_LIMITED})
+
+            if not progressed:
+                time.sleep(poll_interval)
+
+    batch.finished_at = time.time()
+    logger.info("Toplu işlem tamamlandı: %s", batch.batch_id,
+                extra={"batch_id": batch.batch_id, "counts": batch.to_dict(include_items=False)["counts"]})
+    return batch
+
+
+class BulkActionManager:
+    """Toplu işlemleri arka planda çalıştırır ve son MAX_RETAINED_BATCHES işlemin durumunu saklar."""
+
+    def __init__(self, poll_interval: float = POLL_INTERVAL_SECONDS):
+        self.poll_interval = poll_interval
+        self._batches: "OrderedDict[str, BulkActionBatch]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def submit(self, subscription_id: str, tenant_id: str, client_id: str, client_secret: str,
+               items: List[BulkActionItem], max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+               dry_run: bool = False) -> BulkActionBatch:
+        batch = BulkActionBatch(items, max(1, min(max_concurrency, MAX_CONCURRENCY)), dry_run)
+        starters = _build_starters(subscription_id, tenant_id, client_id, client_secret, dry_run)
+        with self._lock:
+            self._batches[batch.batch_id] = batch
+            while len(self._batches) > MAX_RETAINED_BATCHES:
+                self._batches.popitem(last=False)
+        thread = threading.Thread(target=self._run, args=(batch, starters), name=f"bulk-{batch.batch_id[:8]}", daemon=True)
+        thread.start()
+        return batch
+
+    def _run(self, batch: BulkActionBatch, starters) -> None:
+        try:
+            run_batch(batch, starters, self.poll_interval)
+        except Exception as e:
+            logger.error("Toplu işlem beklenmedik şekilde durdu: %s", e, exc_info=True)
+            for item in batch.items:
+                if item.status in (BulkItemStatus.PENDING, BulkItemStatus.RUNNING):
+                    item.finish(False, f"Toplu işlem durdu: {e}")
+            batch.finished_at = time.time()
+
+    def get(self, batch_id: str) -> Optional[BulkActionBatch]:
+        with self._lock:
+            return self._batches.get(batch_id)
+
+
+bulk_action_manager = BulkActionManager()
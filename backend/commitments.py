@@ -0,0 +1,212 @@
+# Rezervasyon ve tasarruf planı (taahhüt) analizi.
+# Her (bölge, SKU) için saatlik instance kullanımı bir histograma indirgenir; başabaş kullanım oranı, en uygun
+# taahhüt miktarı ve maliyetler tüm filo için tek seferde dizi işlemleriyle hesaplanır. Hesap süresi saat
+# sayısıyla değil, histogram genişliğiyle (en yüksek eşzamanlı instance sayısı) ölçeklenir.
+import threading
+import time
+from typing import Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .azure_pricing import COMMITMENT_TERMS, HOURS_PER_MONTH, AzureRetailPrices
+from .pricing_cache import DEFAULT_PRICING_REFRESH_SECONDS
+
+
+class CommitmentOption(NamedTuple):
+    kind: str
+    term_hours: int
+
+    @property
+    def term_months(self) -> float:
+        return self.term_hours / HOURS_PER_MONTH
+
+
+COMMITMENT_OPTIONS: Dict[str, CommitmentOption] = {
+    f"{kind}_{suffix}": CommitmentOption(kind, hours)
+    for kind in ("reservation", "savings_plan")
+    for suffix, hours in COMMITMENT_TERMS.values()
+}
+
+
+class CommitmentAnalysis(NamedTuple):
+    """
+    Satırlar SKU, sütunlar `options` sırasındaki taahhüt seçenekleridir. Maliyetler aylık USD'dir; fiyatı
+    olmayan ya da hiç kârlı olmayan seçeneklerde miktar 0, maliyet kullandıkça öde maliyetidir.
+    """
+    options: List[str]
+    hours: int
+    average_instances: np.ndarray
+    peak_instances: np.ndarray
+    payg_monthly: np.ndarray
+    break_even_utilization: np.ndarray
+    quantity: np.ndarray
+    coverage: np.ndarray
+    commitment_utilization: np.ndarray
+    monthly_cost: np.ndarray
+    best_option: np.ndarray
+    best_savings: np.ndarray
+
+
+def usage_histogram(usage: np.ndarray) -> np.ndarray:
+    """(SKU x saat) tamsayı instance sayılarından (SKU x seviye) saat histogramı; tek bir bincount ile."""
+    usage = np.asarray(np.rint(usage), dtype=np.int64)
+    n_rows = usage.shape[0]
+    levels = int(usage.max()) + 1 if usage.size else 1
+    offsets = (np.arange(n_rows, dtype=np.int64) * levels)[:, None]
+    counts = np.bincount((usage + offsets).ravel(), minlength=n_rows * levels)
+    return counts.reshape(n_rows, levels)
+
+
+def analyze_commitments(usage: np.ndarray, payg_hourly: np.ndarray, commitment_hourly: np.ndarray,
+                        options: Sequence[str]) -> CommitmentAnalysis:
+    """
+    usage: (n, H) saatlik instance sayıları; payg_hourly: (n,) instance başına saatlik fiyat;
+    commitment_hourly: (n, k) seçeneklerin instance başına saatlik efektif fiyatı (yoksa NaN).
+
+    `q` instance için taahhüt alındığında dönem maliyeti q*r*H + p*Σ max(u_t - q, 0) olur. q. instance'ın
+    taahhüdü, o instance'ın çalıştığı saat oranı başabaş oranını (r/p) aştığı sürece kârlıdır; en uygun
+    miktar bu koşulu sağlayan en büyük q'dur.
+    """
+    n, hours = usage.shape
+    hist = usage_histogram(usage).astype(np.float64)
+    levels = hist.shape[1]
+    # survival[:, c] = kullanımın c ve üstünde olduğu saat sayısı; tail[:, c] = Σ_{c' >= c} survival[:, c']
+    survival = np.cumsum(hist[:, ::-1], axis=1)[:, ::-1]
+    tail = np.concatenate([np.cumsum(survival[:, ::-1], axis=1)[:, ::-1], np.zeros((n, 1))], axis=1)
+    total_usage = tail[:, 1]
+    level_values = np.arange(levels, dtype=np.float64)
+
+    payg = np.asarray(payg_hourly, dtype=np.float64)
+    rates = np.asarray(commitment_hourly, dtype=np.float64).reshape(n, len(options))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        break_even = np.where(payg[:, None] > 0, rates / payg[:, None], np.nan)
+    usable = np.isfinite(break_even) & (break_even < 1.0)
+
+    # q = başabaş koşulunu sağlayan seviye sayısı (survival seviyeye göre azalandır)
+    required_hours = np.where(usable, break_even, np.inf) * hours
+    quantity = (survival[:, None, 1:] >= required_hours[:, :, None]).sum(axis=2).astype(np.float64)
+    uncovered = np.take_along_axis(tail, quantity.astype(np.int64) + 1, axis=1)
+    period_cost = quantity * np.nan_to_num(rates) * hours + payg[:, None] * uncovered
+    payg_period = payg * total_usage
+
+    to_monthly = HOURS_PER_MONTH / max(hours, 1)
+    monthly_cost = period_cost * to_monthly
+    payg_monthly = payg_period * to_monthly
+    savings = payg_monthly[:, None] - monthly_cost
+    best_option = np.where(savings.max(axis=1, initial=0.0) > 0, np.argmax(savings, axis=1), -1)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        coverage = np.where(total_usage[:, None] > 0, 1.0 - uncovered / total_usage[:, None], 0.0)
+        commitment_utilization = np.where(quantity > 0, (total_usage[:, None] - uncovered) / (quantity * hours), 0.0)
+
+    peak = np.where(hist > 0, level_values, 0.0).max(axis=1)
+    return CommitmentAnalysis(
+        options=list(options),
+        hours=hours,
+        average_instances=total_usage / max(hours, 1),
+        peak_instances=peak,
+        payg_monthly=payg_monthly,
+        break_even_utilization=break_even,
+        quantity=quantity,
+        coverage=coverage,
+        commitment_utilization=commitment_utilization,
+        monthly_cost=monthly_cost,
+        best_option=best_option,
+        best_savings=np.maximum(savings.max(axis=1, initial=0.0), 0.0),
+    )
+
+
+class FleetSavingsPlan(NamedTuple):
+    hourly_commitment: float
+    monthly_payg: float
+    monthly_cost: float
+    monthly_savings: float
+    coverage: float
+
+
+def fleet_savings_plan(usage: np.ndarray, payg_hourly: np.ndarray, plan_hourly: np.ndarray) -> Optional[FleetSavingsPlan]:
+    """
+    Tasarruf planı SKU'dan bağımsız, saatlik USD taahhüdüdür. Filonun saatlik tasarruf planı fiyatlı harcaması
+    (d_t) üzerinden en uygun taahhüt C, d_t >= C olan saat oranının filo indirim oranını aştığı en büyük değerdir.
+    """
+    eligible = np.isfinite(plan_hourly) & (payg_hourly > 0)
+    if not eligible.any():
+        return None
+    plan_spend = (usage[eligible] * plan_hourly[eligible, None]).sum(axis=0)
+    payg_spend = (usage[eligible] * payg_hourly[eligible, None]).sum(axis=0)
+    total_payg = float(payg_spend.sum())
+    if total_payg <= 0:
+        return None
+    ratio = float(plan_spend.sum()) / total_payg
+    hours = plan_spend.shape[0]
+    ordered = np.sort(plan_spend)
+    needed = int(np.ceil(ratio * hours))
+    commitment = float(ordered[hours - needed]) if 0 < needed <= hours and ratio < 1.0 else 0.0
+    # Taahhüdü aşan harcama kullandıkça öde fiyatından (filo ortalama oranıyla) ödenir
+    overflow = np.maximum(plan_spend - commitment, 0.0).sum() / ratio
+    cost = commitment * hours + overflow
+    to_monthly = HOURS_PER_MONTH / hours
+    return FleetSavingsPlan(
+        hourly_commitment=round(commitment, 4),
+        monthly_payg=round(total_payg * to_monthly, 2),
+        monthly_cost=round(cost * to_monthly, 2),
+        monthly_savings=round(max(total_payg - cost, 0.0) * to_monthly, 2),
+        coverage=round(float(np.minimum(plan_spend, commitment).sum() / plan_spend.sum()), 4)
+        if plan_spend.sum() > 0 else 0.0,
+    )
+
+
+def commitment_recommendations(keys: Sequence[Tuple[str, str]], analysis: CommitmentAnalysis) -> List[Dict]:
+    """Analiz dizilerinden SKU başına öneri sözlükleri; tasarrufa göre azalan sırada."""
+    order = np.argsort(-analysis.best_savings, kind="stable")
+    rows: List[Dict] = []
+    for i in order.tolist():
+        region, sku = keys[i]
+        options = {}
+        for j, name in enumerate(analysis.options):
+            break_even = analysis.break_even_utilization[i, j]
+            if not np.isfinite(break_even):
+                continue
+            options[name] = {
+                "break_even_utilization": round(float(break_even), 4),
+                "break_even_months": round(float(break_even) * COMMITMENT_OPTIONS[name].term_months, 1),
+                "quantity": int(analysis.quantity[i, j]),
+                "coverage": round(float(analysis.coverage[i, j]), 4),
+                "commitment_utilization": round(float(analysis.commitment_utilization[i, j]), 4),
+                "monthly_cost": round(float(analysis.monthly_cost[i, j]), 2),
+                "monthly_savings": round(float(analysis.payg_monthly[i] - analysis.monthly_cost[i, j]), 2),
+            }
+        best = int(analysis.best_option[i])
+        rows.append({
+            "region": region,
+            "sku": sku,
+            "average_instances": round(float(analysis.average_instances[i]), 2),
+            "peak_instances": int(analysis.peak_instances[i]),
+            "payg_monthly_cost": round(float(analysis.payg_monthly[i]), 2),
+            "recommended_option": analysis.options[best] if best >= 0 else None,
+            "recommended_quantity": int(analysis.quantity[i, best]) if best >= 0 else 0,
+            "monthly_savings": round(float(analysis.best_savings[i]), 2),
+            "options": options,
+        })
+    return rows
+
+
+_price_cache: Dict[str, Tuple[float, Dict[str, Dict[str, float]]]] = {}
+_price_cache_lock = threading.Lock()
+
+
+def get_commitment_prices(region: str, max_age_seconds: float = DEFAULT_PRICING_REFRESH_SECONDS) -> Dict[str, Dict[str, float]]:
+    """Bölgenin taahhüt fiyatları; fiyat önbelleğiyle aynı sürede yenilenir. Boş sonuç önbelleğe alınmaz."""
+    cached = _price_cache.get(region)
+    if cached is not None and time.time() - cached[0] < max_age_seconds:
+        return cached[1]
+    prices = AzureRetailPrices.get_app_service_commitment_prices(region)
+    if prices:
+        with _price_cache_lock:
+            _price_cache[region] = (time.time(), prices)
+    return prices
+
+
+def clear_commitment_prices() -> None:
+    with _price_cache_lock:
+        _price_cache.clear()
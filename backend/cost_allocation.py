@@ -0,0 +1,591 @@
+# Tag bazlı maliyet dağıtımı (chargeback) ve önceden toplanmış maliyet rollup'ları (SQLite).
+# Cost Management'ın gün x kaynak x servis maliyet satırları envanterdeki kaynak tag'leriyle birleştirilir: her
+# satır, yazıldığı andaki envantere göre bir tag kümesine (izlenen tag anahtarlarının değer kombinasyonu) ve
+# resource group'a bağlanır. (gün, tag kümesi, resource group, servis) rollup'ı yalnızca yeni ya da düzeltilmiş
+# günler için yeniden hesaplanır. Tag -> resource group -> kaynak hiyerarşisindeki group-by sorguları kaynak
+# satırlarına inmeden, rollup'ın bellekteki sütunsal (numpy) kopyasından yanıtlanır; kopya yalnızca tablo
+# değiştiğinde yeniden okunur. Kaynak kırılımı istenirse yaprak satırlar SQLite'ta gruplanır.
+import datetime
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .azure_client import get_resource_tags, iter_daily_costs
+from .fx_rates import BASE_CURRENCY, exchange_rates
+from .telemetry import span
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_COST_DB_PATH = os.path.join("data", "cost_allocation.db")
+# Dağıtımda izlenen tag anahtarları (virgülle ayrılmış, büyük/küçük harf duyarsız)
+DEFAULT_ALLOCATION_TAGS = "team,env,cost-center"
+# İlk yüklemede geriye dönük çekilen gün sayısı; sonraki yenilemeler yalnızca son günleri yeniden yazar
+# (Cost Management son ~72 saatin maliyetlerini düzeltmeye devam eder)
+COST_BACKFILL_DAYS = 30
+COST_REFRESH_DAYS = 3
+DEFAULT_QUERY_DAYS = 30
+MAX_QUERY_ROWS = 1000
+
+UNTAGGED = "(etiketsiz)"
+UNKNOWN = "(bilinmiyor)"
+
+TAG_PREFIX = "tag:"
+DIMENSION_RESOURCE_GROUP = "resource_group"
+DIMENSION_SERVICE = "service"
+DIMENSION_RESOURCE = "resource"
+DIMENSION_DAY = "day"
+DIMENSION_MONTH = "month"
+DIMENSIONS = (DIMENSION_RESOURCE_GROUP, DIMENSION_SERVICE, DIMENSION_RESOURCE, DIMENSION_DAY, DIMENSION_MONTH)
+
+_SCHEMA = """
+-- İzlenen tag anahtarlarının değer kombinasyonları; {} etiketsiz kümedir
+CREATE TABLE IF NOT EXISTS tag_sets (
+    tag_set_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    tags TEXT NOT NULL UNIQUE
+);
+
+-- Son envanter: kaynak -> resource group ve tag kümesi
+CREATE TABLE IF NOT EXISTS resources (
+    subscription_id TEXT NOT NULL,
+    resource_id TEXT NOT NULL,
+    resource_group TEXT NOT NULL,
+    tag_set_id INTEGER NOT NULL,
+    updated_at REAL NOT NULL,
+    PRIMARY KEY (subscription_id, resource_id)
+);
+
+-- Yaprak satırlar: gün x kaynak x servis maliyeti (USD)
+CREATE TABLE IF NOT EXISTS daily_costs (
+    subscription_id TEXT NOT NULL,
+    day TEXT NOT NULL,
+    resource_id TEXT NOT NULL,
+    service TEXT NOT NULL,
+    resource_group TEXT NOT NULL,
+    tag_set_id INTEGER NOT NULL,
+    cost REAL NOT NULL,
+    PRIMARY KEY (subscription_id, day, resource_id, service)
+);
+CREATE INDEX IF NOT EXISTS idx_daily_costs_allocation ON daily_costs(subscription_id, tag_set_id, resource_group, day);
+
+-- Rollup: gün x tag kümesi x resource group x servis
+CREATE TABLE IF NOT EXISTS cost_rollups (
+    subscription_id TEXT NOT NULL,
+    day TEXT NOT NULL,
+    tag_set_id INTEGER NOT NULL,
+    resource_group TEXT NOT NULL,
+    service TEXT NOT NULL,
+    cost REAL NOT NULL,
+    resources INTEGER NOT NULL,
+    PRIMARY KEY (subscription_id, day, tag_set_id, resource_group, service)
+);
+CREATE INDEX IF NOT EXISTS idx_cost_rollups_day ON cost_rollups(day);
+
+-- Yüklenmiş günler ve maliyetlerin geldiği para birimi
+CREATE TABLE IF NOT EXISTS cost_days (
+    subscription_id TEXT NOT NULL,
+    day TEXT NOT NULL,
+    source_currency TEXT NOT NULL,
+    ingested_at REAL NOT NULL,
+    PRIMARY KEY (subscription_id, day)
+);
+"""
+
+# Rollup'ın bir günü yaprak satırlardan yeniden hesaplanır
+_REBUILD_ROLLUP = """
+INSERT INTO cost_rollups (subscription_id, day, tag_set_id, resource_group, service, cost, resources)
+SELECT subscription_id, day, tag_set_id, resource_group, service, SUM(cost), COUNT(*)
+FROM daily_costs WHERE subscription_id = ? AND day = ?
+GROUP BY tag_set_id, resource_group, service
+"""
+
+
+class InvalidCostQuery(ValueError):
+    """Group-by ya da filtre bilinmeyen bir boyut içeriyor."""
+
+
+def allocation_tags() -> List[str]:
+    """İzlenen tag anahtarları (küçük harf, COST_ALLOCATION_TAGS)."""
+    value = os.getenv("COST_ALLOCATION_TAGS", DEFAULT_ALLOCATION_TAGS)
+    return [key.strip().lower() for key in value.split(",") if key.strip()]
+
+
+def resource_group_of(resource_id: str) -> str:
+    """ARM kimliğinden küçük harf resource group adı; abonelik düzeyindeki maliyetlerde boş."""
+    parts = resource_id.lower().split("/")
+    try:
+        return parts[parts.index("resourcegroups") + 1]
+    except (ValueError, IndexError):
+        return ""
+
+
+def _tracked_tags(tags: Dict[str, str], keys: Sequence[str]) -> Dict[str, str]:
+    lowered = {str(key).lower(): value for key, value in (tags or {}).items()}
+    return {key: lowered[key] for key in keys if lowered.get(key)}
+
+
+def _parse_dimensions(group_by: Sequence[str], tag_keys: Sequence[str]) -> List[str]:
+    dimensions = []
+    for dimension in group_by:
+        dimension = dimension.strip().lower()
+        if dimension.startswith(TAG_PREFIX):
+            if dimension[len(TAG_PREFIX):] not in tag_keys:
+                raise InvalidCostQuery(f"İzlenmeyen tag: {dimension[len(TAG_PREFIX):]} (izlenenler: {', '.join(tag_keys)})")
+        elif dimension not in DIMENSIONS:
+            raise InvalidCostQuery(f"Bilinmeyen boyut: {dimension} ({', '.join(DIMENSIONS)}, {TAG_PREFIX}<anahtar>)")
+        if dimension not in dimensions:
+            dimensions.append(dimension)
+    return dimensions
+
+
+def _filter_value(dimension: str, value: str) -> str:
+    """Filtre değerini saklanan biçime çevirir: resource group ve kaynak küçük harf, UNKNOWN boş değer."""
+    value = value.strip()
+    if dimension in (DIMENSION_RESOURCE_GROUP, DIMENSION_SERVICE, DIMENSION_RESOURCE) and value == UNKNOWN:
+        return ""
+    return value.lower() if dimension in (DIMENSION_RESOURCE_GROUP, DIMENSION_RESOURCE) else value
+
+
+def _factorize(values: Sequence[str]) -> Tuple[np.ndarray, np.ndarray]:
+    names, codes = np.unique(np.asarray(values, dtype=str), return_inverse=True)
+    return names, codes.reshape(-1)
+
+
+def _code_of(names: np.ndarray, value: str) -> Optional[int]:
+    index = int(np.searchsorted(names, value))
+    return index if index < len(names) and names[index] == value else None
+
+
+class _RollupColumns(NamedTuple):
+    """cost_rollups tablosunun sütunsal kopyası; metin sütunları sıralı ad + satır kodu olarak tutulur."""
+    subscriptions: np.ndarray
+    subscription_codes: np.ndarray
+    days: np.ndarray
+    day_codes: np.ndarray
+    tag_set_ids: np.ndarray
+    resource_groups: np.ndarray
+    resource_group_codes: np.ndarray
+    services: np.ndarray
+    service_codes: np.ndarray
+    costs: np.ndarray
+
+
+class CostAllocationStore:
+    """Günlük maliyetleri, envanter tag'lerini ve rollup'ları tutan SQLite deposu."""
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or os.getenv("COST_DB_PATH", DEFAULT_COST_DB_PATH)
+        if self.path != ":memory:":
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False, timeout=10.0)
+        self._conn.row_factory = sqlite3.Row
+        # tag_set_id <-> tag kümesi; kümeler değişmez, yalnızca eklenir
+        self._tag_sets: Dict[int, Dict[str, str]] = {}
+        self._tag_set_ids: Dict[str, int] = {}
+        # Rollup'ın bellekteki kopyası; bu bağlantının yazmaları `_generation`'ı, diğer süreçlerinkiler
+        # PRAGMA data_version'ı artırır
+        self._rollup: Optional[_RollupColumns] = None
+        self._rollup_version: Optional[Tuple[int, int]] = None
+        self._generation = 0
+        with self._lock:
+            if self.path != ":memory:":
+                self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.executescript(_SCHEMA)
+            self._load_tag_sets()
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    # --- Tag kümeleri (kilit altında çağrılır) ------------------------------
+
+    def _load_tag_sets(self) -> None:
+        for row in self._conn.execute("SELECT tag_set_id, tags FROM tag_sets"):
+            self._tag_sets[row[0]] = json.loads(row[1])
+            self._tag_set_ids[row[1]] = row[0]
+
+    def _tag_set_id(self, tags: Dict[str, str]) -> int:
+        key = json.dumps(tags, sort_keys=True, ensure_ascii=False)
+        tag_set_id = self._tag_set_ids.get(key)
+        if tag_set_id is None:
+            self._conn.execute("INSERT OR IGNORE INTO tag_sets (tags) VALUES (?)", (key,))
+            tag_set_id = self._conn.execute("SELECT tag_set_id FROM tag_sets WHERE tags = ?", (key,)).fetchone()[0]
+            self._tag_sets[tag_set_id] = tags
+            self._tag_set_ids[key] = tag_set_id
+        return tag_set_id
+
+    def _tag_set(self, tag_set_id: int) -> Dict[str, str]:
+        tags = self._tag_sets.get(tag_set_id)
+        if tags is None:
+            # Başka bir süreç (zamanlayıcı) yeni küme eklemiş olabilir
+            self._load_tag_sets()
+            tags = self._tag_sets.get(tag_set_id, {})
+        return tags
+
+    # --- Yazma ------------------------------------------------------------
+
+    def update_inventory(self, subscription_id: str, resources: Iterable[Tuple[str, Dict[str, str]]],
+                         tag_keys: Optional[Sequence[str]] = None) -> int:
+        """Aboneliğin envanterini (kaynak -> resource group, izlenen tag'ler) değiştirir; kaynak sayısını döndürür."""
+        tag_keys = tag_keys or allocation_tags()
+        now = time.time()
+        with self._lock, self._conn:
+            rows = [(subscription_id, resource_id.lower(), resource_group_of(resource_id),
+                     self._tag_set_id(_tracked_tags(tags, tag_keys)), now)
+                    for resource_id, tags in resources if resource_id]
+            self._conn.execute("DELETE FROM resources WHERE subscription_id = ?", (subscription_id,))
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO resources (subscription_id, resource_id, resource_group, tag_set_id, updated_at) "
+                "VALUES (?, ?, ?, ?, ?)", rows
+            )
+        return len(rows)
+
+    def ingest_costs(self, subscription_id: str, rows: Iterable[Tuple[str, str, str, float, str]],
+                     start: datetime.date, end: datetime.date) -> Dict[str, Any]:
+        """
+        [start, end] aralığının maliyetlerini (gün, kaynak, servis, tutar, para birimi) yazar. Aralıktaki günlerin
+        önceki satırları silinir; rollup yalnızca bu günler için yeniden hesaplanır. Tutarlar USD'ye çevrilir.
+        """
+        rates: Dict[str, float] = {}
+        costs: Dict[Tuple[str, str, str], float] = {}
+        currencies: Dict[str, str] = {}
+        for day, resource_id, service, cost, currency in rows:
+            currency = (currency or BASE_CURRENCY).upper()
+            rate = rates.get(currency)
+            if rate is None:
+                rate = rates[currency] = exchange_rates.rate(currency, BASE_CURRENCY)
+            key = (day, resource_id.lower(), service)
+            costs[key] = costs.get(key, 0.0) + cost * rate
+            currencies[day] = currency
+        days = [(start + datetime.timedelta(days=offset)).isoformat() for offset in range((end - start).days + 1)]
+
+        now = time.time()
+        with self._lock, self._conn:
+            inventory = {row[0]: (row[1], row[2]) for row in self._conn.execute(
+                "SELECT resource_id, resource_group, tag_set_id FROM resources WHERE subscription_id = ?",
+                (subscription_id,)
+            )}
+            untagged = self._tag_set_id({})
+            unmatched = set()
+            leaf_rows = []
+            for (day, resource_id, service), cost in costs.items():
+                allocation = inventory.get(resource_id)
+                if allocation is None:
+                    # Silinmiş kaynaklar ve abonelik düzeyindeki maliyetler etiketsiz sayılır
+                    unmatched.add(resource_id)
+                    allocation = (resource_group_of(resource_id), untagged)
+                leaf_rows.append((subscription_id, day, resource_id, service, allocation[0], allocation[1], cost))
+            for day in days:
+                self._conn.execute("DELETE FROM daily_costs WHERE subscription_id = ? AND day = ?", (subscription_id, day))
+            self._conn.executemany(
+                "INSERT INTO daily_costs (subscription_id, day, resource_id, service, resource_group, tag_set_id, cost) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)", leaf_rows
+            )
+            self._rebuild_rollups(subscription_id, days)
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO cost_days (subscription_id, day, source_currency, ingested_at) VALUES (?, ?, ?, ?)",
+                [(subscription_id, day, currencies.get(day, BASE_CURRENCY), now) for day in days]
+            )
+        return {"from": days[0] if days else None, "to": days[-1] if days else None, "days": len(days),
+                "cost_rows": len(leaf_rows), "unmatched_resources": len(unmatched)}
+
+    def reallocate(self, subscription_id: str, since: Optional[str] = None) -> int:
+        """
+        Güncel envanterin tag ve resource group'larını yüklenmiş günlere de uygular (tag düzeltmeleri için) ve
+        etkilenen günlerin rollup'ını yeniden hesaplar; güncellenen satır sayısını döndürür.
+        """
+        since = since or ""
+        with self._lock, self._conn:
+            cursor = self._conn.execute(
+                """
+                UPDATE daily_costs SET
+                    tag_set_id = (SELECT r.tag_set_id FROM resources AS r
+                                  WHERE r.subscription_id = daily_costs.subscription_id AND r.resource_id = daily_costs.resource_id),
+                    resource_group = (SELECT r.resource_group FROM resources AS r
+                                      WHERE r.subscription_id = daily_costs.subscription_id AND r.resource_id = daily_costs.resource_id)
+                WHERE subscription_id = ? AND day >= ? AND EXISTS (
+                    SELECT 1 FROM resources AS r WHERE r.subscription_id = daily_costs.subscription_id
+                    AND r.resource_id = daily_costs.resource_id
+                    AND (r.tag_set_id != daily_costs.tag_set_id OR r.resource_group != daily_costs.resource_group))
+                """,
+                (subscription_id, since)
+            )
+            updated = cursor.rowcount
+            days = [row[0] for row in self._conn.execute(
+                "SELECT day FROM cost_days WHERE subscription_id = ? AND day >= ?", (subscription_id, since)
+            )]
+            if updated:
+                self._rebuild_rollups(subscription_id, days)
+        return updated
+
+    def _rebuild_rollups(self, subscription_id: str, days: Sequence[str]) -> None:
+        self._generation += 1
+        for day in days:
+            self._conn.execute("DELETE FROM cost_rollups WHERE subscription_id = ? AND day = ?", (subscription_id, day))
+            self._conn.execute(_REBUILD_ROLLUP, (subscription_id, day))
+
+    # --- Okuma ------------------------------------------------------------
+
+    def last_day(self, subscription_id: str) -> Optional[str]:
+        with self._lock:
+            row = self._conn.execute("SELECT MAX(day) FROM cost_days WHERE subscription_id = ?",
+                                     (subscription_id,)).fetchone()
+        return row[0]
+
+    def query(self, group_by: Sequence[str], subscription_id: Optional[str] = None,
+              start: Optional[datetime.date] = None, end: Optional[datetime.date] = None,
+              filters: Optional[Dict[str, str]] = None, currency: str = BASE_CURRENCY,
+              top: int = 100) -> Dict[str, Any]:
+        """
+        Maliyetleri istenen boyutlara göre gruplar: `tag:<anahtar>`, resource_group, service, day, month ve
+        resource. Kaynak kırılımı istenmedikçe yalnızca rollup okunur. `filters` aynı boyut adlarıyla eşitlik
+        filtreleridir (`tag:team` = "payments"; etiketsiz kaynaklar için UNTAGGED). Satırlar maliyete göre azalan
+        sırada, en fazla `top` adet döner; toplam tüm satırları kapsar.
+        """
+        tag_keys = allocation_tags()
+        dimensions = _parse_dimensions(group_by, tag_keys)
+        filters = {key.strip().lower(): value for key, value in (filters or {}).items() if value is not None}
+        _parse_dimensions(filters, tag_keys)
+        filters = {key: _filter_value(key, value) for key, value in filters.items()}
+        if DIMENSION_DAY in filters or DIMENSION_MONTH in filters:
+            raise InvalidCostQuery("Tarih aralığı için start/end kullanın")
+        end = end or datetime.datetime.now(datetime.timezone.utc).date()
+        start = start or end - datetime.timedelta(days=DEFAULT_QUERY_DAYS - 1)
+        try:
+            rate = exchange_rates.rate(BASE_CURRENCY, currency)
+        except KeyError:
+            rate, currency = 1.0, BASE_CURRENCY
+
+        leaf = DIMENSION_RESOURCE in dimensions or DIMENSION_RESOURCE in filters
+        tag_filters = {key[len(TAG_PREFIX):]: value for key, value in filters.items() if key.startswith(TAG_PREFIX)}
+        with span("cost_allocation.query", source="resources" if leaf else "rollup"):
+            with self._lock:
+                matching = self._matching_tag_sets(tag_filters) if tag_filters else None
+                totals_of = self._leaf_totals if leaf else self._rollup_totals
+                totals = totals_of(dimensions, filters, matching, subscription_id, start.isoformat(), end.isoformat())
+
+        ordered = sorted(totals.items(), key=lambda item: (-item[1], item[0]))
+        top = max(1, min(top, MAX_QUERY_ROWS))
+        return {
+            "currency": currency,
+            "exchange_rate": round(rate, 6),
+            "from": start.isoformat(),
+            "to": end.isoformat(),
+            "group_by": dimensions,
+            "source": "resources" if leaf else "rollup",
+            "total": round(sum(totals.values()) * rate, 2),
+            "row_count": len(ordered),
+            "rows": [{**dict(zip(dimensions, key)), "cost": round(cost * rate, 2)} for key, cost in ordered[:top]],
+            "truncated": len(ordered) > top,
+        }
+
+    def _matching_tag_sets(self, tag_filters: Dict[str, str]) -> List[int]:
+        self._load_tag_sets()
+        return [tag_set_id for tag_set_id, tags in self._tag_sets.items()
+                if all(tags.get(key, UNTAGGED) == value for key, value in tag_filters.items())]
+
+    def _leaf_totals(self, dimensions: List[str], filters: Dict[str, str], matching: Optional[List[int]],
+                     subscription_id: Optional[str], start: str, end: str) -> Dict[Tuple, float]:
+        """Kaynak kırılımı: yaprak satırlar SQLite'ta gruplanır (kilit altında çağrılır)."""
+        columns = ["tag_set_id"]
+        for dimension, column in ((DIMENSION_RESOURCE_GROUP, "resource_group"), (DIMENSION_SERVICE, "service"),
+                                  (DIMENSION_RESOURCE, "resource_id"), (DIMENSION_DAY, "day"),
+                                  (DIMENSION_MONTH, "substr(day, 1, 7)")):
+            if dimension in dimensions:
+                columns.append(column)
+        where = ["day >= ?", "day <= ?"]
+        params: List[Any] = [start, end]
+        if subscription_id:
+            where.append("subscription_id = ?")
+            params.append(subscription_id)
+        for dimension, column in ((DIMENSION_RESOURCE_GROUP, "resource_group"), (DIMENSION_SERVICE, "service"),
+                                  (DIMENSION_RESOURCE, "resource_id")):
+            if dimension in filters:
+                where.append(f"{column} = ?")
+                params.append(filters[dimension])
+        if matching is not None:
+            where.append(f"tag_set_id IN ({','.join('?' * len(matching))})" if matching else "0")
+            params.extend(matching)
+        rows = self._conn.execute(
+            f"SELECT {', '.join(columns)}, SUM(cost) FROM daily_costs WHERE {' AND '.join(where)} "
+            f"GROUP BY {', '.join(columns)}", params
+        ).fetchall()
+
+        totals: Dict[Tuple, float] = {}
+        for row in rows:
+            values = dict(zip(columns, row))
+            tags = self._tag_set(values["tag_set_id"])
+            key = tuple(
+                tags.get(dimension[len(TAG_PREFIX):], UNTAGGED) if dimension.startswith(TAG_PREFIX)
+                else values["substr(day, 1, 7)"] if dimension == DIMENSION_MONTH
+                else values["resource_id" if dimension == DIMENSION_RESOURCE else dimension] or UNKNOWN
+                for dimension in dimensions
+            )
+            totals[key] = totals.get(key, 0.0) + row[-1]
+        return totals
+
+    def _rollup_columns(self) -> "_RollupColumns":
+        """
+        Rollup tablosunun bellekteki sütunsal kopyası. Tablo bu bağlantıdan ya da başka bir süreçten (zamanlayıcı)
+        değiştiğinde yeniden okunur (kilit altında çağrılır).
+        """
+        version = (self._conn.execute("PRAGMA data_version").fetchone()[0], self._generation)
+        if self._rollup is None or self._rollup_version != version:
+            rows = self._conn.execute(
+                "SELECT subscription_id, day, tag_set_id, resource_group, service, cost FROM cost_rollups"
+            ).fetchall()
+            subscriptions, days, tag_set_ids, resource_groups, services, costs = (
+                zip(*rows) if rows else ((),) * 6
+            )
+            self._rollup = _RollupColumns(
+                *_factorize(subscriptions), *_factorize(days), np.asarray(tag_set_ids, dtype=np.int64),
+                *_factorize(resource_groups), *_factorize(services), np.asarray(costs, dtype=np.float64)
+            )
+            self._rollup_version = version
+        return self._rollup
+
+    def _rollup_totals(self, dimensions: List[str], filters: Dict[str, str], matching: Optional[List[int]],
+                       subscription_id: Optional[str], start: str, end: str) -> Dict[Tuple, float]:
+        """Rollup'ın sütunsal kopyası üzerinde maske + np.bincount ile gruplama (kilit altında çağrılır)."""
+        rollup = self._rollup_columns()
+        first = np.searchsorted(rollup.days, start, side="left")
+        last = np.searchsorted(rollup.days, end, side="right")
+        mask = (rollup.day_codes >= first) & (rollup.day_codes < last)
+        for value, names, codes in (
+            (subscription_id, rollup.subscriptions, rollup.subscription_codes),
+            (filters.get(DIMENSION_RESOURCE_GROUP), rollup.resource_groups, rollup.resource_group_codes),
+            (filters.get(DIMENSION_SERVICE), rollup.services, rollup.service_codes),
+        ):
+            if value is None:
+                continue
+            code = _code_of(names, value)
+            if code is None:
+                return {}
+            mask &= codes == code
+        if matching is not None:
+            mask &= np.isin(rollup.tag_set_ids, matching)
+        if not mask.any():
+            return {}
+
+        tag_set_ids = rollup.tag_set_ids[mask]
+        key = np.zeros(len(tag_set_ids), dtype=np.int64)
+        labels: List[List[str]] = []
+        for dimension in dimensions:
+            if dimension.startswith(TAG_PREFIX):
+                present = np.unique(tag_set_ids)
+                values = [self._tag_set(int(tag_set_id)).get(dimension[len(TAG_PREFIX):], UNTAGGED)
+                          for tag_set_id in present]
+                names, value_codes = np.unique(np.asarray(values, dtype=str), return_inverse=True)
+                codes = value_codes.reshape(-1)[np.searchsorted(present, tag_set_ids)]
+            elif dimension == DIMENSION_RESOURCE_GROUP:
+                names, codes = rollup.resource_groups, rollup.resource_group_codes[mask]
+            elif dimension == DIMENSION_SERVICE:
+                names, codes = rollup.services, rollup.service_codes[mask]
+            elif dimension == DIMENSION_DAY:
+                names, codes = rollup.days, rollup.day_codes[mask]
+            else:
+                names, month_codes = np.unique(np.asarray([day[:7] for day in rollup.days], dtype=str),
+                                               return_inverse=True)
+                codes = month_codes.reshape(-1)[rollup.day_codes[mask]]
+            labels.append([str(name) or UNKNOWN for name in names])
+            key = key * len(names) + codes
+
+        groups, inverse = np.unique(key, return_inverse=True)
+        sums = np.bincount(inverse.reshape(-1), weights=rollup.costs[mask], minlength=len(groups))
+        group_codes = []
+        for names in reversed(labels):
+            group_codes.append(groups % len(names))
+            groups = groups // len(names)
+        group_codes.reverse()
+        return {
+            tuple(names[code] for names, code in zip(labels, codes)): float(total)
+            for codes, total in zip(zip(*group_codes) if group_codes else [()] * len(sums), sums)
+        }
+
+    def cost_details(self, subscription_id: str, days: int = DEFAULT_QUERY_DAYS,
+                     currency: str = BASE_CURRENCY) -> Optional[Dict[str, Any]]:
+        """/cost-details yanıtı (servis, resource group ve izlenen tag kırılımları); veri yoksa None."""
+        end = datetime.datetime.now(datetime.timezone.utc).date()
+        start = end - datetime.timedelta(days=max(days, 1) - 1)
+
+        def breakdown(dimension: str) -> Dict[str, Any]:
+            return self.query([dimension], subscription_id, start, end, currency=currency, top=MAX_QUERY_ROWS)
+
+        by_service = breakdown(DIMENSION_SERVICE)
+        if not by_service["row_count"]:
+            return None
+        by_resource_group = breakdown(DIMENSION_RESOURCE_GROUP)
+        return {
+            "total_cost": by_service["total"],
+            "currency": by_service["currency"],
+            "costs_by_service": {row[DIMENSION_SERVICE]: row["cost"] for row in by_service["rows"]},
+            "costs_by_resource_group": {row[DIMENSION_RESOURCE_GROUP]: row["cost"] for row in by_resource_group["rows"]},
+            "costs_by_tag": {
+                key: {row[TAG_PREFIX + key]: row["cost"] for row in breakdown(TAG_PREFIX + key)["rows"]}
+                for key in allocation_tags()
+            },
+            "from_date": start.isoformat(),
+            "to_date": end.isoformat(),
+        }
+
+
+_store: Optional[CostAllocationStore] = None
+_store_lock = threading.Lock()
+
+
+def get_cost_store() -> CostAllocationStore:
+    """Süreç genelinde paylaşılan maliyet dağıtım deposu (COST_DB_PATH)."""
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = CostAllocationStore()
+    return _store
+
+
+def refresh_start(last_day: Optional[str], today: datetime.date, days: Optional[int] = None) -> datetime.date:
+    """
+    Yenilemenin ilk günü. `days` verilirse son `days` gün çekilir. Verilmezse ilk yüklemede COST_BACKFILL_DAYS
+    gün; sonrasında son yüklenen günden COST_REFRESH_DAYS gün geriden başlanır, böylece yenilemenin
+    aksadığı günler de doldurulur. Aralık en fazla COST_BACKFILL_DAYS gündür.
+    """
+    if days is not None:
+        return today - datetime.timedelta(days=max(days, 1) - 1)
+    backfill_start = today - datetime.timedelta(days=COST_BACKFILL_DAYS - 1)
+    if last_day is None:
+        return backfill_start
+    overlap = datetime.timedelta(days=COST_REFRESH_DAYS - 1)
+    start = min(datetime.date.fromisoformat(last_day) - overlap, today - overlap)
+    return max(start, backfill_start)
+
+
+def refresh_cost_allocation(subscription_id: str, tenant_id: str, client_id: str, client_secret: str,
+                            days: Optional[int] = None, reallocate: bool = False,
+                            store: Optional[CostAllocationStore] = None) -> Dict[str, Any]:
+    """
+    Envanter tag'lerini günceller ve son günlerin maliyetlerini yeniden yazar (aralık için bkz. refresh_start).
+    `reallocate` ile güncel tag'ler daha önce yüklenmiş günlere de uygulanır.
+    """
+    store = store or get_cost_store()
+    start_time = time.perf_counter()
+    with span("cost_allocation.refresh"):
+        resources = store.update_inventory(subscription_id, get_resource_tags(subscription_id, tenant_id, client_id,
+                                                                               client_secret))
+        end = datetime.datetime.now(datetime.timezone.utc).date()
+        start = refresh_start(store.last_day(subscription_id), end, days)
+        reallocated = store.reallocate(subscription_id) if reallocate else 0
+        result = store.ingest_costs(subscription_id, iter_daily_costs(subscription_id, tenant_id, client_id,
+                                                                      client_secret, start, end), start, end)
+    result.update(resources=resources, reallocated_rows=reallocated,
+                  duration_seconds=round(time.perf_counter() - start_time, 3))
+    logger.info("Maliyet dağıtımı güncellendi", extra={"subscription_id": subscription_id, **result})
+    return result
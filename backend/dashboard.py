@@ -0,0 +1,89 @@
+# Dashboard için önceden toplanmış, sütunsal özetler.
+# Son taramanın sütunları (kategori, bölge, resource group, SKU, aylık tasarruf) numpy ile tek geçişte
+# gruplanır; frontend bulgu sayısından bağımsız olarak yalnızca birkaç küçük dizi alır ve grafik çizer.
+# Çok büyük taramalarda etiket kodlaması ve grup toplamları analiz süreç havuzunda parça parça yapılır
+# (bkz. analysis_pool).
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from .analysis_pool import factorize, grouped_sums
+from .fx_rates import exchange_rates
+from .recommendations import region_key
+
+# Kırılım başına döndürülecek en fazla grup; kalanlar tek bir "Diğer" grubunda toplanır
+DEFAULT_TOP_GROUPS = 15
+OTHER_GROUP = "Diğer"
+UNKNOWN_GROUP = "(bilinmiyor)"
+
+BREAKDOWNS = ("category", "region", "resource_group", "sku")
+# Etiket kodlaması ve grup toplamlarının süreç havuzunda paralel yapılması için parça başına en az satır
+PARALLEL_MIN_ROWS = 250_000
+
+
+def _labels(values: Sequence[Optional[str]]) -> np.ndarray:
+    return np.asarray([value or UNKNOWN_GROUP for value in values], dtype=str)
+
+
+def _mapped_labels(values: Sequence[Optional[str]], transform: Callable[[str], str]) -> np.ndarray:
+    """Etiket dönüşümünü (bölge adı, küçük harf) yalnızca farklı değerlere uygular."""
+    names, codes = factorize(np.asarray([value or "" for value in values], dtype=str), PARALLEL_MIN_ROWS)
+    return np.asarray([transform(name) or UNKNOWN_GROUP for name in names.tolist()], dtype=str)[codes]
+
+
+def group_totals(labels: np.ndarray, savings: np.ndarray, top: int = DEFAULT_TOP_GROUPS) -> Dict[str, List]:
+    """
+    Etiket başına bulgu sayısı ve tasarruf toplamı; tasarrufa göre azalan sırada. `top`'tan fazla grup
+    varsa kalanlar "Diğer" satırında birleştirilir.
+    """
+    if labels.size == 0:
+        return {"keys": [], "count": [], "monthly_savings": []}
+    names, codes = factorize(labels, PARALLEL_MIN_ROWS)
+    totals, counts = grouped_sums(codes, savings, len(names), PARALLEL_MIN_ROWS)
+    order = np.lexsort((names, -totals))
+    keys = names[order].tolist()
+    totals, counts = totals[order], counts[order]
+    if top > 0 and len(keys) > top:
+        keys = keys[:top] + [OTHER_GROUP]
+        totals = np.append(totals[:top], totals[top:].sum())
+        counts = np.append(counts[:top], counts[top:].sum())
+    return {"keys": keys, "count": counts.astype(int).tolist(), "monthly_savings": np.round(totals, 2).tolist()}
+
+
+def cross_totals(rows: np.ndarray, columns: np.ndarray, savings: np.ndarray) -> Dict[str, List]:
+    """İki etiketin (örn. kategori x bölge) tasarruf matrisi; yığılmış grafikler için."""
+    row_names, row_codes = factorize(rows, PARALLEL_MIN_ROWS)
+    column_names, column_codes = factorize(columns, PARALLEL_MIN_ROWS)
+    flat, _ = grouped_sums(row_codes * len(column_names) + column_codes, savings,
+                           len(row_names) * len(column_names), PARALLEL_MIN_ROWS)
+    return {
+        "rows": row_names.tolist(),
+        "columns": column_names.tolist(),
+        "monthly_savings": np.round(flat.reshape(len(row_names), len(column_names)), 2).tolist(),
+    }
+
+
+def dashboard_summary(columns: Dict[str, List], currency: str = "TRY",
+                      top: int = DEFAULT_TOP_GROUPS) -> Dict[str, Any]:
+    """Sonuç deposunun sütunlarından (bkz. LatestResultsStore.columns) dashboard özeti; tutarlar `currency`."""
+    try:
+        rate = exchange_rates.rate("USD", currency)
+    except KeyError:
+        rate, currency = 1.0, "USD"
+    savings = np.asarray(columns["monthly_savings"], dtype=np.float64) * rate
+    labels = {
+        "category": _labels(columns["category"]),
+        "region": _mapped_labels(columns["location"], region_key),
+        "resource_group": _mapped_labels(columns["resource_group"], str.lower),
+        "sku": _labels(columns["sku"]),
+    }
+    region_top = group_totals(labels["region"], savings, top)["keys"]
+    regions = np.where(np.isin(labels["region"], region_top), labels["region"], OTHER_GROUP)
+    return {
+        "currency": currency,
+        "exchange_rate": round(rate, 6),
+        "finding_count": int(savings.size),
+        "monthly_savings": round(float(savings.sum()), 2),
+        "breakdowns": {name: group_totals(labels[name], savings, top) for name in BREAKDOWNS},
+        "category_by_region": cross_totals(labels["category"], regions, savings),
+    }
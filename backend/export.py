@@ -0,0 +1,304 @@
+# Tarama sonuçlarının CSV/NDJSON/Parquet olarak dışa aktarımı.
+# Veri kümeleri satırları sabit boyutlu parçalar halinde üretir; yazıcılar her parçayı hemen çıktıya
+# (dosya ya da HTTP yanıtı) aktarır. Bellek kullanımı satır sayısına değil parça boyutuna bağlıdır.
+#
+# Kullanım (proje kök dizininden):
+#     python -m backend.export recommendations --subscription-id <id> --output oneriler.parquet
+#     python -m backend.export findings --days 90 --output bulgular.csv
+#     python -m backend.export vms --output vm_kullanim.parquet   # AZURE_* ortam değişkenleri
+import argparse
+import csv
+import datetime
+import io
+import itertools
+import json
+import os
+import sys
+import time
+from typing import Iterable, Iterator, List, NamedTuple, Optional, Tuple
+
+from .azure_client import DEFAULT_CPU_THRESHOLD, DEFAULT_DAYS_AGO, iter_azure_vms_with_cpu
+from .history import get_history_store
+from .recommendations import Recommendation, region_key
+from .results_store import get_results_store
+
+EXPORT_CHUNK_ROWS = 10_000
+PARQUET_COMPRESSION = "zstd"
+
+# Biçim -> (içerik türü, dosya uzantısı)
+EXPORT_FORMATS = {
+    "csv": ("text/csv; charset=utf-8", "csv"),
+    "ndjson": ("application/x-ndjson", "ndjson"),
+    "parquet": ("application/vnd.apache.parquet", "parquet"),
+}
+
+
+class ExportColumn(NamedTuple):
+    name: str
+    # "string" | "int" | "float" | "timestamp" (Unix saniyesi, UTC)
+    type: str
+
+
+class Dataset(NamedTuple):
+    name: str
+    columns: List[ExportColumn]
+    chunks: Iterator[List[tuple]]
+
+
+class ExportUnavailable(RuntimeError):
+    """İstenen biçim için gereken isteğe bağlı bağımlılık kurulu değil."""
+
+
+def _columns(spec: str) -> List[ExportColumn]:
+    return [ExportColumn(*item.split(":")) for item in spec.split()]
+
+
+RECOMMENDATION_COLUMNS = _columns(
+    "subscription_id:string scanned_at:timestamp resource_id:string name:string category:string impact:string "
+    "region:string resource_group:string sku:string monthly_savings_usd:float solution:string"
+)
+FINDING_COLUMNS = _columns(
+    "scan_id:int subscription_id:string scanned_at:timestamp resource_id:string name:string category:string "
+    "impact:string location:string resource_group:string monthly_savings_usd:float"
+)
+VM_COLUMNS = _columns(
+    "vm_id:string vm_name:string vm_size:string location:string resource_group:string cpu_average:float "
+    "recommendation:string days_analyzed:int cpu_threshold:float"
+)
+
+
+def _recommendation_row(row: tuple) -> tuple:
+    subscription_id, scanned_at, name, category, impact, region, resource_group, sku, savings, payload = row
+    data = json.loads(payload)
+    return (subscription_id, scanned_at, (data.get("resource_metadata") or {}).get("resource_id"), name, category,
+            impact, region, resource_group, sku, savings, data.get("short_description_solution"))
+
+
+def recommendations_dataset(subscription_id: Optional[str] = None, chunk_size: int = EXPORT_CHUNK_ROWS) -> Dataset:
+    """Son tarama sonuçları (abonelik verilmezse tüm abonelikler)."""
+    chunks = ([_recommendation_row(row) for row in chunk]
+              for chunk in get_results_store().iter_rows(subscription_id, chunk_size))
+    return Dataset("recommendations", RECOMMENDATION_COLUMNS, chunks)
+
+
+def records_dataset(results: Iterable[Tuple[str, float, List[Recommendation]]]) -> Dataset:
+    """
+    (abonelik, tarama zamanı, kayıtlar) üçlülerinden öneri veri kümesi; her abonelik bir parçadır.
+    Sütunlar `recommendations_dataset` ile aynıdır.
+    """
+    chunks = (
+        [(subscription_id, scanned_at, record.resource_id, record.name, record.category.value, record.impact.value,
+          region_key(record.location) or None, record.resource_group, record.resource_sku(),
+          float(record.monthly_savings), record.solution())
+         for record in records]
+        for subscription_id, scanned_at, records in results
+    )
+    return Dataset("recommendations", RECOMMENDATION_COLUMNS, (chunk for chunk in chunks if chunk))
+
+
+def findings_dataset(subscription_id: Optional[str] = None, days: Optional[int] = None,
+                     chunk_size: int = EXPORT_CHUNK_ROWS) -> Dataset:
+    """Geçmiş deposundaki tarama başına kaynak bulguları ve aylık maliyetleri."""
+    since = time.time() - days * 86400 if days else None
+    return Dataset("findings", FINDING_COLUMNS, get_history_store().iter_findings(subscription_id, since, chunk_size))
+
+
+def vms_dataset(subscription_id: str, tenant_id: str, client_id: str, client_secret: str,
+                cpu_threshold: float = DEFAULT_CPU_THRESHOLD, days_for_metrics: int = DEFAULT_DAYS_AGO,
+                chunk_size: int = EXPORT_CHUNK_ROWS) -> Dataset:
+    """Çalışan VM'lerin CPU kullanımı; VM'ler Azure'dan okundukça yazılır."""
+    names = [column.name for column in VM_COLUMNS]
+    vms = iter_azure_vms_with_cpu(subscription_id, tenant_id, client_id, client_secret,
+                                  cpu_threshold, days_for_metrics)
+    rows = (tuple(vm.get(name) for name in names) for vm in vms)
+    return Dataset("vms", VM_COLUMNS, _batched(rows, chunk_size))
+
+
+def _batched(rows: Iterable[tuple], size: int) -> Iterator[List[tuple]]:
+    iterator = iter(rows)
+    while True:
+        chunk = list(itertools.islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def _iso(timestamp: Optional[float]) -> Optional[str]:
+    if timestamp is None:
+        return None
+    return datetime.datetime.fromtimestamp(timestamp, tz=datetime.timezone.utc).isoformat(timespec="seconds")
+
+
+def iter_csv(dataset: Dataset) -> Iterator[bytes]:
+    """Başlık satırı ve her parça için bir UTF-8 blok üretir. Zaman damgaları ISO 8601 (UTC) yazılır."""
+    timestamps = [i for i, column in enumerate(dataset.columns) if column.type == "timestamp"]
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator="\n")
+    writer.writerow([column.name for column in dataset.columns])
+    for chunk in dataset.chunks:
+        if timestamps:
+            chunk = [tuple(_iso(value) if i in timestamps else value for i, value in enumerate(row)) for row in chunk]
+        writer.writerows(chunk)
+        yield buffer.getvalue().encode("utf-8")
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode("utf-8")
+
+
+def iter_ndjson(dataset: Dataset) -> Iterator[bytes]:
+    """Satır başına bir JSON nesnesi; parça başına bir UTF-8 blok."""
+    names = [column.name for column in dataset.columns]
+    timestamps = {column.name for column in dataset.columns if column.type == "timestamp"}
+    for chunk in dataset.chunks:
+        lines = []
+        for row in chunk:
+            record = dict(zip(names, row))
+            for name in timestamps:
+                record[name] = _iso(record[name])
+            lines.append(json.dumps(record, ensure_ascii=False))
+        yield ("\n".join(lines) + "\n").encode("utf-8")
+
+
+def _pyarrow():
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError as e:
+        raise ExportUnavailable("Parquet dışa aktarımı için pyarrow kurulu olmalı (pip install pyarrow)") from e
+    return pa, pq
+
+
+class _ChunkSink:
+    """ParquetWriter'ın yazdığı baytları biriktirir; akış her satır grubundan sonra boşaltır."""
+
+    def __init__(self):
+        self._parts: List[bytes] = []
+        self._position = 0
+        self.closed = False
+
+    def write(self, data) -> int:
+        data = bytes(data)
+        self._parts.append(data)
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def flush(self) -> None:
+        pass
+
+    def close(self) -> None:
+        self.closed = True
+
+    def writable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return False
+
+    def drain(self) -> Iterator[bytes]:
+        if self._parts:
+            data, self._parts = b"".join(self._parts), []
+            yield data
+
+
+def iter_parquet(dataset: Dataset, compression: str = PARQUET_COMPRESSION) -> Iterator[bytes]:
+    """Her parçayı bir satır grubu olarak yazar ve oluşan baytları hemen üretir."""
+    pa, pq = _pyarrow()
+    types = {"string": pa.string(), "int": pa.int64(), "float": pa.float64(), "timestamp": pa.timestamp("us", tz="UTC")}
+    schema = pa.schema([(column.name, types[column.type]) for column in dataset.columns])
+
+    def to_batch(chunk: List[tuple]):
+        arrays = []
+        for column, values in zip(dataset.columns, zip(*chunk)):
+            if column.type == "timestamp":
+                values = [None if value is None else int(value * 1_000_000) for value in values]
+            arrays.append(pa.array(values, type=types[column.type]))
+        return pa.RecordBatch.from_arrays(arrays, schema=schema)
+
+    sink = _ChunkSink()
+    with pq.ParquetWriter(sink, schema, compression=compression) as writer:
+        for chunk in dataset.chunks:
+            writer.write_batch(to_batch(chunk))
+            yield from sink.drain()
+    yield from sink.drain()
+
+
+_WRITERS = {"csv": iter_csv, "ndjson": iter_ndjson, "parquet": iter_parquet}
+
+
+def check_format(fmt: str) -> None:
+    """Biçim desteklenmiyorsa ValueError, bağımlılığı eksikse ExportUnavailable fırlatır."""
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Desteklenmeyen biçim: {fmt} ({', '.join(EXPORT_FORMATS)})")
+    if fmt == "parquet":
+        _pyarrow()
+
+
+def stream_export(dataset: Dataset, fmt: str) -> Iterator[bytes]:
+    check_format(fmt)
+    return _WRITERS[fmt](dataset)
+
+
+def export_to_file(dataset: Dataset, fmt: str, output) -> int:
+    """Veri kümesini ikili bir dosya nesnesine yazar; yazılan bayt sayısını döndürür."""
+    written = 0
+    for block in stream_export(dataset, fmt):
+        output.write(block)
+        written += len(block)
+    return written
+
+
+def format_for_path(path: str, explicit: Optional[str] = None, default: str = "csv") -> str:
+    """Açıkça verilmemişse biçimi dosya uzantısından belirler."""
+    if explicit:
+        return explicit
+    extension = os.path.splitext(path)[1].lstrip(".").lower()
+    return extension if extension in EXPORT_FORMATS else default
+
+
+def _credentials_from_env(parser: argparse.ArgumentParser, subscription_id: Optional[str]) -> Tuple[str, str, str, str]:
+    values = (subscription_id, os.getenv("AZURE_TENANT_ID"), os.getenv("AZURE_CLIENT_ID"), os.getenv("AZURE_CLIENT_SECRET"))
+    if not all(values):
+        parser.error("vms için --subscription-id ve AZURE_TENANT_ID, AZURE_CLIENT_ID, AZURE_CLIENT_SECRET gerekli")
+    return values
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Tarama sonuçlarını CSV/NDJSON/Parquet olarak dışa aktarır")
+    parser.add_argument("dataset", choices=["recommendations", "findings", "vms"])
+    parser.add_argument("--subscription-id", default=os.getenv("AZURE_SUBSCRIPTION_ID"))
+    parser.add_argument("--days", type=int, default=None, help="findings: yalnızca son N günün taramaları")
+    parser.add_argument("--cpu-threshold", type=float, default=DEFAULT_CPU_THRESHOLD)
+    parser.add_argument("--metrics-days", type=int, default=DEFAULT_DAYS_AGO)
+    parser.add_argument("--format", choices=sorted(EXPORT_FORMATS), default=None,
+                        help="Verilmezse dosya uzantısından belirlenir")
+    parser.add_argument("--output", "-o", default="-", help="Çıktı dosyası ('-' = stdout)")
+    parser.add_argument("--chunk-size", type=int, default=EXPORT_CHUNK_ROWS)
+    args = parser.parse_args(argv)
+
+    fmt = format_for_path(args.output, args.format)
+    try:
+        check_format(fmt)
+    except (ValueError, ExportUnavailable) as e:
+        parser.error(str(e))
+    builders = {
+        "recommendations": lambda: recommendations_dataset(args.subscription_id, args.chunk_size),
+        "findings": lambda: findings_dataset(args.subscription_id, args.days, args.chunk_size),
+        "vms": lambda: vms_dataset(*_credentials_from_env(parser, args.subscription_id),
+                                   args.cpu_threshold, args.metrics_days, args.chunk_size),
+    }
+    dataset = builders[args.dataset]()
+    if args.output == "-":
+        written = export_to_file(dataset, fmt, sys.stdout.buffer)
+    else:
+        with open(args.output, "wb") as f:
+            written = export_to_file(dataset, fmt, f)
+    print(f"{args.dataset}: {written:,} bayt yazıldı ({fmt})", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,713 @@
+# Benchmark ve çevrimdışı çalışmalar için süreç içi sahte Azure.
+# azure_client.py ve azure_pricing.py'nin kullandığı compute (VM, disk, snapshot), network (genel IP, NAT gateway,
+# load balancer, NIC), web, monitor, resource (tag envanteri), Cost Management sorgusu ve Retail Prices yüzeylerini
+# taklit eder; gecikme ve hata oranı enjekte edilebilir.
+import random
+import threading
+import time
+import zlib
+from collections import Counter
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+from typing import Dict, Iterator, List, Optional
+
+from . import azure_client
+from .azure_pricing import AzureRetailPrices
+from .commitments import clear_commitment_prices
+from .fx_rates import StaticRateProvider, exchange_rates
+from .pricing_cache import pricing_cache
+
+FAKE_SUBSCRIPTION_ID = "00000000-0000-0000-0000-000000000000"
+# Cost Management sorgu sayfası başına satır sayısı
+COST_QUERY_PAGE_SIZE = 5000
+# Tag envanterindeki değerler; anahtarlar kaynaklar arasında farklı yazılır (Azure tag anahtarları büyük/küçük
+# harf duyarsızdır). Her beşinci kaynak etiketsizdir.
+_TEAMS = ("payments", "search", "platform", "data")
+_TAG_KEY_SPELLINGS = (("team", "env", "cost-center"), ("Team", "Env", "Cost-Center"), ("TEAM", "env", "CostCenter"))
+# Cost Management satırlarındaki servis adları
+_SERVICE_NAMES = {
+    "virtualmachines": "Virtual Machines",
+    "disks": "Storage",
+    "snapshots": "Storage",
+    "publicipaddresses": "Virtual Network",
+    "natgateways": "Virtual Network",
+    "loadbalancers": "Load Balancer",
+    "networkinterfaces": "Virtual Network",
+    "serverfarms": "Azure App Service",
+    "sites": "Azure App Service",
+}
+
+# Sahte Retail Prices akışının saatlik USD fiyatları
+_APP_SERVICE_HOURLY_USD = {
+    "B1": 0.082, "B2": 0.163, "B3": 0.325,
+    "S1": 0.095, "S2": 0.19, "S3": 0.38,
+    "P1 v2": 0.115, "P2 v2": 0.231, "P3 v2": 0.462,
+    "P1 v3": 0.186, "P2 v3": 0.372, "P3 v3": 0.744,
+}
+
+# Rezervasyon ve tasarruf planı sunulan SKU'lar ile kullandıkça öde fiyatına göre oranları
+_COMMITMENT_SKUS = ("P1 v3", "P2 v3", "P3 v3")
+_RESERVATION_DISCOUNTS = {"1 Year": (0.65, 8760), "3 Years": (0.45, 26280)}
+_SAVINGS_PLAN_DISCOUNTS = {"1 Year": 0.83, "3 Years": 0.72}
+
+# Bölgeler arası fiyat farkı (westeurope = 1.0); listede olmayan bölgeler adlarından türetilen sabit bir çarpan alır
+_REGION_PRICE_FACTORS = {"westeurope": 1.0, "northeurope": 0.96, "eastus": 0.88}
+
+
+def _region_price_factor(region: str) -> float:
+    return _REGION_PRICE_FACTORS.get(region, 0.85 + (zlib.crc32(region.encode()) % 30) / 100.0)
+
+# Sahte Retail Prices akışının aylık USD disk fiyatları ve GB başına snapshot fiyatları
+_DISK_MONTHLY_USD = {
+    "P4 LRS": 5.28, "P10 LRS": 19.71, "P15 LRS": 38.01, "P30 LRS": 135.17,
+    "E4 LRS": 2.40, "E10 LRS": 9.60, "E30 LRS": 76.80,
+    "S4 LRS": 1.54, "S10 LRS": 5.89, "S30 LRS": 40.96,
+}
+_SNAPSHOT_PER_GB_USD = {"LRS": 0.05, "ZRS": 0.0625}
+
+# Sahte Retail Prices akışının genel IPv4 saatlik USD fiyatları
+_PUBLIC_IP_HOURLY_USD = {("Basic", "Static"): 0.0036, ("Basic", "Dynamic"): 0.004, ("Standard", "Static"): 0.005}
+# Bağlı genel IP'lerin kaynak türü dağılımı
+_IP_ATTACHMENTS = ("nic", "nic", "nic", "nic", "nic", "load_balancer", "load_balancer", "nat_gateway", "other")
+
+_DISK_SKUS = ["Premium_LRS", "StandardSSD_LRS", "Standard_LRS"]
+_DISK_SIZES_GB = [32, 128, 256, 1024]
+_PLAN_SKUS = [("B1", "Basic"), ("B2", "Basic"), ("S1", "Standard"), ("P1V3", "PremiumV3"), ("P2V3", "PremiumV3")]
+_VM_SIZES = ["Standard_B2s", "Standard_D2s_v5", "Standard_D4s_v5", "Standard_E4s_v5"]
+_LOCATIONS = ["westeurope", "northeurope", "eastus"]
+
+
+class FakeAzureError(Exception):
+    """Enjekte edilen hata oranı nedeniyle başarısız olan sahte ARM çağrısı."""
+
+
+class FakeAzure:
+    """
+    Yapılandırılabilir boyutta sahte bir Azure aboneliği.
+
+    Her ARM/HTTP çağrısı `calls` sayacına işlenir; `latency_ms` kadar beklenir ve
+    `error_rate` olasılıkla FakeAzureError fırlatılır.
+    """
+
+    def __init__(self, vms: int = 100, public_ips: int = 50, app_service_plans: int = 20,
+                 resource_groups: int = 10, running_ratio: float = 0.8, orphan_ip_ratio: float = 0.3,
+                 empty_plan_ratio: float = 0.3, latency_ms: float = 0.0, error_rate: float = 0.0,
+                 page_size: int = 100, lro_seconds: float = 0.0, disks: int = 50, snapshots: int = 20,
+                 orphan_disk_ratio: float = 0.3, seed: int = 42):
+        self.latency_ms = latency_ms
+        self.lro_seconds = lro_seconds
+        self.error_rate = error_rate
+        self.page_size = page_size
+        self.calls: Counter = Counter()
+        self._lock = threading.Lock()
+        self._rng = random.Random(seed)
+        self._error_rng = random.Random(seed + 1)
+
+        rng = self._rng
+        groups = [f"rg-{i}" for i in range(max(resource_groups, 1))]
+        sub = FAKE_SUBSCRIPTION_ID
+
+        self.vms = []
+        self.power_states: Dict[str, str] = {}
+        self.cpu_levels: Dict[str, float] = {}
+        for i in range(vms):
+            rg = groups[i % len(groups)]
+            vm_id = f"/subscriptions/{sub}/resourceGroups/{rg}/providers/Microsoft.Compute/virtualMachines/vm-{i}"
+            self.vms.append(SimpleNamespace(
+                id=vm_id,
+                name=f"vm-{i}",
+                location=_LOCATIONS[i % len(_LOCATIONS)],
+                hardware_profile=SimpleNamespace(vm_size=_VM_SIZES[i % len(_VM_SIZES)]),
+                tags={"env": "prod" if i % 3 else "dev"}
+            ))
+            self.power_states[vm_id] = "PowerState/running" if rng.random() < running_ratio else "PowerState/deallocated"
+            self.cpu_levels[vm_id] = rng.uniform(0.5, 60.0)
+
+        # Bağlı IP'ler NIC, load balancer frontend'i, NAT gateway ve indekste olmayan kaynaklar (örn: VPN
+        # gateway) arasında dağıtılır; bu kaynakların bir kısmı boştadır (VM'siz NIC, kuralsız frontend, subnet'siz NAT)
+        self.public_ips = []
+        self.network_interfaces = []
+        self.load_balancers = []
+        self.nat_gateways = []
+        for i in range(public_ips):
+            rg = groups[i % len(groups)]
+            location = _LOCATIONS[i % len(_LOCATIONS)]
+            orphaned = rng.random() < orphan_ip_ratio
+            ip_id = f"/subscriptions/{sub}/resourceGroups/{rg}/providers/Microsoft.Network/publicIPAddresses/pip-{i}"
+            network = f"/subscriptions/{sub}/resourceGroups/{rg}/providers/Microsoft.Network"
+            ip_configuration = nat_gateway = None
+            attachment = None if orphaned else _IP_ATTACHMENTS[i % len(_IP_ATTACHMENTS)]
+            if attachment == "nic":
+                nic_id = f"{network}/networkInterfaces/nic-{i}"
+                ip_configuration = SimpleNamespace(id=f"{nic_id}/ipConfigurations/ipconfig1")
+                vm = self.vms[i % len(self.vms)] if self.vms and i % 7 else None
+                self.network_interfaces.append(SimpleNamespace(
+                    id=nic_id, name=f"nic-{i}", location=location,
+                    virtual_machine=SimpleNamespace(id=vm.id) if vm else None,
+                    ip_configurations=[SimpleNamespace(id=ip_configuration.id,
+                                                       public_ip_address=SimpleNamespace(id=ip_id))]
+                ))
+            elif attachment == "load_balancer":
+                lb_id = f"{network}/loadBalancers/lb-{i}"
+                ip_configuration = SimpleNamespace(id=f"{lb_id}/frontendIPConfigurations/frontend")
+                rules = [SimpleNamespace(id=f"{lb_id}/loadBalancingRules/http")] if i % 4 else None
+                self.load_balancers.append(SimpleNamespace(
+                    id=lb_id, name=f"lb-{i}", location=location,
+                    frontend_ip_configurations=[SimpleNamespace(
+                        id=ip_configuration.id, public_ip_address=SimpleNamespace(id=ip_id),
+                        load_balancing_rules=rules, inbound_nat_rules=None, inbound_nat_pools=None, outbound_rules=None
+                    )]
+                ))
+            elif attachment == "nat_gateway":
+                # NAT gateway'e bağlı IP'lerde ip_configuration boştur
+                nat_id = f"{network}/natGateways/nat-{i}"
+                nat_gateway = SimpleNamespace(id=nat_id)
+                self.nat_gateways.append(SimpleNamespace(
+                    id=nat_id, name=f"nat-{i}", location=location,
+                    public_ip_addresses=[SimpleNamespace(id=ip_id)],
+                    subnets=[SimpleNamespace(id=f"{network}/virtualNetworks/vnet/subnets/s-{i}")] if i % 4 != 3 else None
+                ))
+            elif attachment == "other":
+                ip_configuration = SimpleNamespace(id=f"{network}/virtualNetworkGateways/vpn-{i}/ipConfigurations/default")
+            self.public_ips.append(SimpleNamespace(
+                id=ip_id,
+                name=f"pip-{i}",
+                location=location,
+                ip_address=f"20.0.{i // 256}.{i % 256}",
+                ip_configuration=ip_configuration,
+                nat_gateway=nat_gateway,
+                public_ip_allocation_method=SimpleNamespace(value="Static"),
+                sku=SimpleNamespace(name="Standard" if i % 2 else "Basic")
+            ))
+
+        self.disks = []
+        for i in range(disks):
+            rg = groups[i % len(groups)]
+            orphaned = rng.random() < orphan_disk_ratio
+            owner = f"/subscriptions/{sub}/resourceGroups/{rg}/providers/Microsoft.Compute/virtualMachines/vm-{i}"
+            self.disks.append(SimpleNamespace(
+                id=f"/subscriptions/{sub}/resourceGroups/{rg}/providers/Microsoft.Compute/disks/disk-{i}",
+                name=f"disk-{i}",
+                location=_LOCATIONS[i % len(_LOCATIONS)],
+                sku=SimpleNamespace(name=_DISK_SKUS[i % len(_DISK_SKUS)]),
+                disk_size_gb=_DISK_SIZES_GB[i % len(_DISK_SIZES_GB)],
+                disk_state="Unattached" if orphaned else "Attached",
+                managed_by=None if orphaned else owner,
+                time_created=datetime.now(timezone.utc) - timedelta(days=rng.randint(1, 400))
+            ))
+
+        self.snapshots = []
+        for i in range(snapshots):
+            rg = groups[i % len(groups)]
+            source = self.disks[i % len(self.disks)].id if self.disks else None
+            self.snapshots.append(SimpleNamespace(
+                id=f"/subscriptions/{sub}/resourceGroups/{rg}/providers/Microsoft.Compute/snapshots/snap-{i}",
+                name=f"snap-{i}",
+                location=_LOCATIONS[i % len(_LOCATIONS)],
+                sku=SimpleNamespace(name="Standard_ZRS" if i % 4 == 0 else "Standard_LRS"),
+                disk_size_gb=_DISK_SIZES_GB[i % len(_DISK_SIZES_GB)],
+                time_created=datetime.now(timezone.utc) - timedelta(days=rng.randint(1, 400)),
+                creation_data=SimpleNamespace(source_resource_id=source)
+            ))
+
+        self.plans = []
+        self.web_apps = []
+        self.memory_levels: Dict[str, float] = {}
+        self.plan_capacities: Dict[str, int] = {}
+        for i in range(app_service_plans):
+            rg = groups[i % len(groups)]
+            sku_name, tier = _PLAN_SKUS[i % len(_PLAN_SKUS)]
+            plan_id = f"/subscriptions/{sub}/resourceGroups/{rg}/providers/Microsoft.Web/serverfarms/asp-{i}"
+            self.plans.append(SimpleNamespace(
+                id=plan_id,
+                name=f"asp-{i}",
+                location=_LOCATIONS[i % len(_LOCATIONS)],
+                resource_group=rg,
+                sku=SimpleNamespace(name=sku_name, tier=tier, capacity=rng.choice((1, 1, 2, 3)))
+            ))
+            self.plan_capacities[plan_id] = self.plans[-1].sku.capacity
+            self.cpu_levels[plan_id] = rng.uniform(2.0, 70.0)
+            self.memory_levels[plan_id] = rng.uniform(20.0, 80.0)
+            if rng.random() >= empty_plan_ratio:
+                for j in range(rng.randint(1, 3)):
+                    self.web_apps.append(SimpleNamespace(
+                        id=f"/subscriptions/{sub}/resourceGroups/{rg}/providers/Microsoft.Web/sites/app-{i}-{j}",
+                        name=f"app-{i}-{j}",
+                        resource_group=rg,
+                        server_farm_id=plan_id
+                    ))
+
+        # Envanterde artık olmayan (silinmiş) bir kaynağın maliyeti de sorgu sonucunda yer alır
+        self.deleted_resource_id = (f"/subscriptions/{sub}/resourceGroups/{groups[0]}"
+                                    f"/providers/Microsoft.Compute/virtualMachines/vm-deleted")
+
+    # --- Çağrı muhasebesi -------------------------------------------------
+
+    def _call(self, operation: str) -> None:
+        with self._lock:
+            self.calls[operation] += 1
+            fail = self.error_rate > 0 and self._error_rng.random() < self.error_rate
+        if self.latency_ms > 0:
+            time.sleep(self.latency_ms / 1000.0)
+        if fail:
+            raise FakeAzureError(f"Sahte hata: {operation}")
+
+    def _paged(self, operation: str, items: List) -> Iterator:
+        """ARM sayfalamasını taklit eder: her sayfa için bir çağrı sayılır."""
+        for start in range(0, max(len(items), 1), self.page_size):
+            self._call(operation)
+            yield from items[start:start + self.page_size]
+
+    def reset_calls(self) -> None:
+        with self._lock:
+            self.calls.clear()
+
+    @property
+    def total_calls(self) -> int:
+        return sum(self.calls.values())
+
+    @property
+    def resource_count(self) -> int:
+        return (len(self.vms) + len(self.public_ips) + len(self.plans) + len(self.web_apps)
+                + len(self.disks) + len(self.snapshots) + len(self.network_interfaces) + len(self.load_balancers)
+                + len(self.nat_gateways))
+
+    # --- Tag envanteri ve maliyetler --------------------------------------
+
+    def inventory(self) -> List:
+        return [*self.vms, *self.public_ips, *self.disks, *self.snapshots, *self.plans, *self.web_apps,
+                *self.network_interfaces, *self.load_balancers, *self.nat_gateways]
+
+    @staticmethod
+    def resource_tags(resource_id: str) -> Dict[str, str]:
+        """Kaynak kimliğinden türetilen sabit team/env/cost-center tag'leri."""
+        seed = zlib.crc32(resource_id.encode())
+        if seed % 5 == 0:
+            return {}
+        team_key, env_key, center_key = _TAG_KEY_SPELLINGS[seed % len(_TAG_KEY_SPELLINGS)]
+        team = _TEAMS[(seed // 7) % len(_TEAMS)]
+        tags = {team_key: team, env_key: "prod" if seed % 3 else "dev"}
+        if seed % 4:
+            tags[center_key] = f"cc-{_TEAMS.index(team) + 100}"
+        return tags
+
+    def daily_cost_rows(self, start: datetime, end: datetime) -> List[List]:
+        """[start, end] günleri için Cost Management satırları: [Cost, UsageDate, ResourceId, ServiceName, Currency]."""
+        resources = [resource.id for resource in self.inventory()] + [self.deleted_resource_id]
+        rows = []
+        day = start.date()
+        while day <= end.date():
+            usage_date = int(day.strftime("%Y%m%d"))
+            for resource_id in resources:
+                seed = zlib.crc32(resource_id.encode())
+                service = _SERVICE_NAMES.get(resource_id.split("/")[-2].lower(), "Other")
+                cost = (seed % 1000) / 100.0 * (0.9 + 0.2 * ((seed + day.toordinal()) % 10) / 10.0)
+                rows.append([round(cost, 4), usage_date, resource_id, service, "USD"])
+            # Kaynağa bağlanmayan abonelik düzeyi maliyet (örn: destek planı)
+            rows.append([1.5, usage_date, "", "Azure Support", "USD"])
+            day += timedelta(days=1)
+        return rows
+
+    # --- azure_client fabrika arayüzü -------------------------------------
+
+    def credential(self, tenant_id: str, client_id: str, client_secret: str):
+        return _FakeCredential(self)
+
+    def client(self, service: str, credential, subscription_id: str):
+        factories = {
+            "compute": _FakeComputeClient,
+            "network": _FakeNetworkClient,
+            "web": _FakeWebClient,
+            "monitor": _FakeMonitorClient,
+            "resource": _FakeResourceClient,
+            "costmanagement": _FakeCostManagementClient,
+        }
+        if service not in factories:
+            raise FakeAzureError(f"Sahte Azure bu servisi desteklemiyor: {service}")
+        return factories[service](self)
+
+    # --- Retail Prices ----------------------------------------------------
+
+    def retail_prices(self, url: str, params: Optional[Dict[str, str]]) -> Dict:
+        self._call("retail_prices.get")
+        if params is None:
+            # NextPageLink: "<BASE_URL>?region=<bölge>&skip=<n>" (yalnızca disk fiyatları sayfalanır)
+            query = dict(part.split("=", 1) for part in url.split("?", 1)[1].split("&"))
+            return self._storage_prices(query["region"], int(query["skip"]))
+        filter_query = params.get("$filter", "")
+        region = "westeurope"
+        if "armRegionName eq '" in filter_query:
+            region = filter_query.split("armRegionName eq '", 1)[1].split("'", 1)[0]
+        if "serviceName eq 'Storage'" in filter_query:
+            return self._storage_prices(region, 0)
+        if "serviceName eq 'Virtual Network'" in filter_query:
+            return {"Items": [
+                {
+                    "skuName": sku,
+                    "meterName": f"{sku} IPv4 {allocation} Public IP",
+                    "productName": "IP Addresses",
+                    "retailPrice": round(hourly * _region_price_factor(region), 4),
+                    "unitOfMeasure": "1 Hour",
+                    "type": "Consumption",
+                    "armRegionName": region,
+                }
+                for (sku, allocation), hourly in _PUBLIC_IP_HOURLY_USD.items()
+            ], "NextPageLink": None}
+        factor = _region_price_factor(region)
+        items = [
+            {
+                "skuName": sku,
+                "meterName": f"{sku} App",
+                "productName": "Azure App Service",
+                "retailPrice": round(hourly * factor, 4),
+                "unitPrice": round(hourly * factor, 4),
+                "type": "Consumption",
+                "armRegionName": region,
+                "currencyCode": params.get("currencyCode", "USD"),
+                "savingsPlan": [
+                    {"term": term, "retailPrice": round(hourly * factor * discount, 4),
+                     "unitPrice": round(hourly * factor * discount, 4)}
+                    for term, discount in _SAVINGS_PLAN_DISCOUNTS.items()
+                ] if sku in _COMMITMENT_SKUS else None,
+            }
+            for sku, hourly in _APP_SERVICE_HOURLY_USD.items()
+        ]
+        if "priceType eq 'Consumption'" not in filter_query:
+            items += [
+                {
+                    "skuName": sku,
+                    "meterName": f"{sku} App",
+                    "productName": "Azure App Service",
+                    "retailPrice": round(_APP_SERVICE_HOURLY_USD[sku] * factor * discount * hours, 2),
+                    "unitPrice": round(_APP_SERVICE_HOURLY_USD[sku] * factor * discount * hours, 2),
+                    "type": "Reservation",
+                    "reservationTerm": term,
+                    "armRegionName": region,
+                    "currencyCode": params.get("currencyCode", "USD"),
+                }
+                for sku in _COMMITMENT_SKUS
+                for term, (discount, hours) in _RESERVATION_DISCOUNTS.items()
+            ]
+        return {"Items": items, "NextPageLink": None, "Count": len(items)}
+
+    def _storage_prices(self, region: str, skip: int, page_size: int = 8) -> Dict:
+        """Yönetilen disk fiyatlarını gerçek API gibi küçük sayfalar halinde döndürür."""
+        items = [
+            {
+                "skuName": key,
+                "meterName": f"{key} Disk",
+                "productName": "Premium SSD Managed Disks",
+                "retailPrice": monthly,
+                "unitOfMeasure": "1/Month",
+                "type": "Consumption",
+                "armRegionName": region,
+            }
+            for key, monthly in _DISK_MONTHLY_USD.items()
+        ] + [
+            {
+                "skuName": f"Snapshots {redundancy}",
+                "meterName": f"{redundancy} Snapshot",
+                "productName": "Standard HDD Managed Disks",
+                "retailPrice": per_gb,
+                "unitOfMeasure": "1 GB/Month",
+                "type": "Consumption",
+                "armRegionName": region,
+            }
+            for redundancy, per_gb in _SNAPSHOT_PER_GB_USD.items()
+        ]
+        page = items[skip:skip + page_size]
+        next_skip = skip + page_size
+        next_link = f"{AzureRetailPrices.BASE_URL}?region={region}&skip={next_skip}" if next_skip < len(items) else None
+        return {"Items": page, "NextPageLink": next_link, "Count": len(page)}
+
+    @contextmanager
+    def install(self):
+        """
+        Sahte Azure'u azure_client ve azure_pricing modüllerine takar; çıkışta eski hale döner.
+        Döviz kurları ağa çıkmayan sabit tabloya bağlanır; fiyat önbelleği boş ve snapshot'sız başlar.
+        """
+        previous_factory = azure_client._client_factory
+        previous_transport = AzureRetailPrices.transport
+        previous_fx = (exchange_rates.providers, exchange_rates.cache_path)
+        previous_snapshot_path = pricing_cache.snapshot_path
+        azure_client.set_client_factory(self)
+        AzureRetailPrices.transport = self.retail_prices
+        exchange_rates.providers, exchange_rates.cache_path = [StaticRateProvider()], None
+        exchange_rates.reset()
+        pricing_cache.snapshot_path = None
+        pricing_cache.clear()
+        clear_commitment_prices()
+        try:
+            yield self
+        finally:
+            azure_client.set_client_factory(previous_factory)
+            AzureRetailPrices.transport = previous_transport
+            exchange_rates.providers, exchange_rates.cache_path = previous_fx
+            exchange_rates.reset()
+            pricing_cache.snapshot_path = previous_snapshot_path
+            pricing_cache.clear()
+            clear_commitment_prices()
+
+
+class _FakeCredential:
+    def __init__(self, azure: FakeAzure):
+        self._azure = azure
+
+    def get_token(self, *scopes, **kwargs):
+        self._azure._call("auth.get_token")
+        return SimpleNamespace(token="fake-token", expires_on=int(time.time()) + 3600)
+
+
+class _FakePoller:
+    """`lro_seconds` sonra tamamlanan uzun süreli işlem taklidi."""
+
+    def __init__(self, result=None, duration: float = 0.0, on_done=None):
+        self._result = result
+        self._done_at = time.monotonic() + duration
+        self._on_done = on_done
+
+    def done(self) -> bool:
+        finished = time.monotonic() >= self._done_at
+        if finished and self._on_done is not None:
+            self._on_done()
+            self._on_done = None
+        return finished
+
+    def result(self, timeout: Optional[float] = None):
+        remaining = self._done_at - time.monotonic()
+        if remaining > 0:
+            time.sleep(remaining if timeout is None else min(remaining, timeout))
+        self.done()
+        return self._result
+
+
+class _FakeVirtualMachines:
+    def __init__(self, azure: FakeAzure):
+        self._azure = azure
+
+    def list_all(self):
+        return self._azure._paged("compute.virtual_machines.list_all", self._azure.vms)
+
+    def instance_view(self, resource_group_name: str, vm_name: str):
+        self._azure._call("compute.virtual_machines.instance_view")
+        vm_id = (f"/subscriptions/{FAKE_SUBSCRIPTION_ID}/resourceGroups/{resource_group_name}"
+                 f"/providers/Microsoft.Compute/virtualMachines/{vm_name}")
+        code = self._azure.power_states.get(vm_id, "PowerState/unknown")
+        return SimpleNamespace(statuses=[SimpleNamespace(code="ProvisioningState/succeeded"), SimpleNamespace(code=code)])
+
+    def begin_deallocate(self, resource_group_name: str, vm_name: str):
+        self._azure._call("compute.virtual_machines.begin_deallocate")
+        vm_id = (f"/subscriptions/{FAKE_SUBSCRIPTION_ID}/resourceGroups/{resource_group_name}"
+                 f"/providers/Microsoft.Compute/virtualMachines/{vm_name}")
+        def mark_deallocated():
+            self._azure.power_states[vm_id] = "PowerState/deallocated"
+        return _FakePoller(duration=self._azure.lro_seconds, on_done=mark_deallocated)
+
+
+class _FakeDisks:
+    def __init__(self, azure: FakeAzure):
+        self._azure = azure
+
+    def list(self):
+        return self._azure._paged("compute.disks.list", self._azure.disks)
+
+
+class _FakeSnapshots:
+    def __init__(self, azure: FakeAzure):
+        self._azure = azure
+
+    def list(self):
+        return self._azure._paged("compute.snapshots.list", self._azure.snapshots)
+
+
+class _FakeComputeClient:
+    def __init__(self, azure: FakeAzure):
+        self.virtual_machines = _FakeVirtualMachines(azure)
+        self.disks = _FakeDisks(azure)
+        self.snapshots = _FakeSnapshots(azure)
+
+
+class _FakePublicIpAddresses:
+    def __init__(self, azure: FakeAzure):
+        self._azure = azure
+
+    def list_all(self):
+        return self._azure._paged("network.public_ip_addresses.list_all", self._azure.public_ips)
+
+
+class _FakeListAll:
+    """Yalnızca abonelik geneli listeleme sunan ağ kaynağı koleksiyonu."""
+
+    def __init__(self, azure: FakeAzure, operation: str, items: List):
+        self._azure = azure
+        self._operation = operation
+        self._items = items
+
+    def list_all(self):
+        return self._azure._paged(self._operation, self._items)
+
+
+class _FakeNetworkClient:
+    def __init__(self, azure: FakeAzure):
+        self.public_ip_addresses = _FakePublicIpAddresses(azure)
+        self.nat_gateways = _FakeListAll(azure, "network.nat_gateways.list_all", azure.nat_gateways)
+        self.load_balancers = _FakeListAll(azure, "network.load_balancers.list_all", azure.load_balancers)
+        self.network_interfaces = _FakeListAll(azure, "network.network_interfaces.list_all", azure.network_interfaces)
+
+
+class _FakeAppServicePlans:
+    def __init__(self, azure: FakeAzure):
+        self._azure = azure
+
+    def list(self):
+        return self._azure._paged("web.app_service_plans.list", self._azure.plans)
+
+    def _find(self, resource_group_name: str, name: str):
+        for plan in self._azure.plans:
+            if plan.resource_group == resource_group_name and plan.name == name:
+                return plan
+        raise FakeAzureError(f"Plan bulunamadı: {resource_group_name}/{name}")
+
+    def get(self, resource_group_name: str, name: str):
+        self._azure._call("web.app_service_plans.get")
+        return self._find(resource_group_name, name)
+
+    def begin_create_or_update(self, resource_group_name: str, name: str, app_service_plan):
+        self._azure._call("web.app_service_plans.begin_create_or_update")
+        plan = self._find(resource_group_name, name)
+        plan.sku = app_service_plan.sku
+        return _FakePoller(result=plan, duration=self._azure.lro_seconds)
+
+    def delete(self, resource_group_name: str, name: str):
+        self._azure._call("web.app_service_plans.delete")
+        plan = self._find(resource_group_name, name)
+        self._azure.plans.remove(plan)
+
+    def list_web_apps(self, resource_group_name: str, name: str):
+        plan_id = self._find(resource_group_name, name).id
+        apps = [app for app in self._azure.web_apps if app.server_farm_id == plan_id]
+        return self._azure._paged("web.app_service_plans.list_web_apps", apps)
+
+
+class _FakeWebApps:
+    def __init__(self, azure: FakeAzure):
+        self._azure = azure
+
+    def list(self):
+        return self._azure._paged("web.web_apps.list", self._azure.web_apps)
+
+    def list_by_resource_group(self, resource_group_name: str):
+        apps = [app for app in self._azure.web_apps if app.resource_group == resource_group_name]
+        return self._azure._paged("web.web_apps.list_by_resource_group", apps)
+
+
+class _FakeWebClient:
+    def __init__(self, azure: FakeAzure):
+        self.app_service_plans = _FakeAppServicePlans(azure)
+        self.web_apps = _FakeWebApps(azure)
+
+
+class _FakeMetrics:
+    def __init__(self, azure: FakeAzure):
+        self._azure = azure
+
+    def list(self, resource_uri: str, timespan: str = None, interval: str = None,
+             metricnames: str = None, aggregation: str = None, filter: str = None, **kwargs):
+        self._azure._call("monitor.metrics.list")
+        points = 7
+        step = timedelta(hours=1) if interval == "PT1H" else timedelta(days=1)
+        start_time = datetime.now(timezone.utc) - step * points
+        if timespan and "/" in timespan:
+            start, end = timespan.split("/", 1)
+            try:
+                start_time = datetime.fromisoformat(start)
+                span_seconds = (datetime.fromisoformat(end) - start_time).total_seconds()
+                points = max(int(span_seconds // step.total_seconds()), 1)
+            except ValueError:
+                pass
+        if start_time.tzinfo is None:
+            start_time = start_time.replace(tzinfo=timezone.utc)
+        value = []
+        for name in (metricnames or "").split(","):
+            levels = self._azure.memory_levels if name == "MemoryPercentage" else self._azure.cpu_levels
+            level = levels.get(resource_uri, 10.0)
+            data = [
+                SimpleNamespace(time_stamp=start_time + step * i,
+                                average=level * (0.8 + 0.4 * ((i * 7919) % 10) / 10.0),
+                                maximum=min(level * (1.0 + 0.5 * ((i * 104729) % 10) / 10.0), 100.0))
+                for i in range(points)
+            ]
+            if filter and "Instance eq '*'" in filter:
+                timeseries = self._instance_series(resource_uri, data)
+            else:
+                timeseries = [SimpleNamespace(data=data)]
+            value.append(SimpleNamespace(name=SimpleNamespace(value=name), timeseries=timeseries))
+        return SimpleNamespace(value=value)
+
+    def _instance_series(self, resource_uri: str, data: List) -> List:
+        """
+        Instance başına seriler. Planların yarısı otomatik ölçeklenir gibi davranır: mesai saatlerinde
+        (08-18) tam kapasitede, diğer saatlerde yarı kapasitede çalışır.
+        """
+        capacity = self._azure.plan_capacities.get(resource_uri, 1)
+        autoscaled = zlib.crc32(resource_uri.encode()) % 2 == 0
+        base = max(1, capacity // 2) if autoscaled else capacity
+        return [
+            SimpleNamespace(data=[point for point in data
+                                  if instance < base or 8 <= point.time_stamp.hour < 18])
+            for instance in range(capacity)
+        ]
+
+
+class _FakeMonitorClient:
+    def __init__(self, azure: FakeAzure):
+        self.metrics = _FakeMetrics(azure)
+
+
+class _FakeResources:
+    def __init__(self, azure: FakeAzure):
+        self._azure = azure
+
+    def list(self):
+        resources = [SimpleNamespace(id=resource.id, tags=self._azure.resource_tags(resource.id))
+                     for resource in self._azure.inventory()]
+        return self._azure._paged("resource.resources.list", resources)
+
+
+class _FakeResourceClient:
+    def __init__(self, azure: FakeAzure):
+        self.resources = _FakeResources(azure)
+
+
+_COST_COLUMNS = ["Cost", "UsageDate", "ResourceId", "ServiceName", "Currency"]
+
+
+class _FakeQuery:
+    def __init__(self, azure: FakeAzure):
+        self._azure = azure
+
+    def usage(self, scope: str, parameters: Dict, params: Optional[Dict[str, str]] = None):
+        """Sorgu sonucunun bir sayfası; tarih aralığı JSON gövdesinden, konum $skiptoken parametresinden okunur."""
+        self._azure._call("costmanagement.query.usage")
+        period = parameters["timePeriod"]
+        skip = int((params or {}).get("$skiptoken", 0))
+        columns, rows, next_link = self._page(scope, datetime.fromisoformat(period["from"]),
+                                              datetime.fromisoformat(period["to"]), skip)
+        return SimpleNamespace(properties=SimpleNamespace(
+            columns=[SimpleNamespace(name=name) for name in columns], rows=rows, next_link=next_link
+        ))
+
+    def _page(self, scope: str, start: datetime, end: datetime, skip: int):
+        rows = self._azure.daily_cost_rows(start, end)
+        page = rows[skip:skip + COST_QUERY_PAGE_SIZE]
+        next_skip = skip + COST_QUERY_PAGE_SIZE
+        next_link = (f"https://management.azure.com{scope}/providers/Microsoft.CostManagement/query"
+                     f"?api-version=2022-10-01&$skiptoken={next_skip}") if next_skip < len(rows) else None
+        return _COST_COLUMNS, page, next_link
+
+
+class _FakeCostManagementClient:
+    def __init__(self, azure: FakeAzure):
+        self._azure = azure
+        self.query = _FakeQuery(azure)
@@ -0,0 +1,214 @@
+# Döviz kuru sağlayıcıları ve önbellekli kur tablosu.
+# Kurlar USD bazlı tutulur; sırasıyla HTTP kaynağı, yerel dosya ve sabit tablo denenir. Son başarılı
+# sonuç bellekte ve diskte saklanır, TTL dolunca yenilenir; yenileme başarısızsa eski kur kullanılmaya devam eder.
+import json
+import logging
+import os
+import threading
+import time
+from typing import Dict, Iterable, List, NamedTuple, Optional
+
+import numpy as np
+import requests
+
+from .telemetry import registry, span
+
+logger = logging.getLogger(__name__)
+
+BASE_CURRENCY = "USD"
+DEFAULT_FX_RATES_URL = "https://open.er-api.com/v6/latest/USD"
+DEFAULT_FX_CACHE_PATH = os.path.join("data", "fx_rates.json")
+DEFAULT_FX_TTL_SECONDS = 6 * 3600
+# Yenileme başarısız olduğunda eski tabloyla devam edilir ve bu kadar süre sonra yeniden denenir
+FX_RETRY_SECONDS = 300
+
+# Hiçbir kaynağa ulaşılamazsa kullanılan yaklaşık kurlar (1 USD = x)
+STATIC_USD_RATES: Dict[str, float] = {
+    "USD": 1.0,
+    "TRY": 30.0,
+    "EUR": 0.92,
+}
+
+
+class RateSnapshot(NamedTuple):
+    """USD bazlı kur tablosu ve kaynağı."""
+    rates: Dict[str, float]
+    source: str
+    fetched_at: float
+
+
+class HttpRateProvider:
+    """USD bazlı kurları JSON döndüren bir HTTP servisinden çeker ({"rates": {"TRY": ..}} biçimi)."""
+
+    def __init__(self, url: str = DEFAULT_FX_RATES_URL, timeout: float = 10.0):
+        self.url = url
+        self.timeout = timeout
+        self.name = f"http:{url}"
+
+    def fetch(self) -> Dict[str, float]:
+        with span("fx_rates.get"):
+            response = requests.get(self.url, timeout=self.timeout)
+            response.raise_for_status()
+            data = response.json()
+        base = data.get("base_code") or data.get("base") or BASE_CURRENCY
+        if base != BASE_CURRENCY:
+            raise ValueError(f"Beklenmeyen kur bazı: {base}")
+        return data["rates"]
+
+
+class FileRateProvider:
+    """Çevrimdışı ortamlar için yerel JSON dosyasından kur okur ({"base": "USD", "rates": {...}})."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.name = f"file:{path}"
+
+    def fetch(self) -> Dict[str, float]:
+        with open(self.path, encoding="utf-8") as f:
+            data = json.load(f)
+        if data.get("base", BASE_CURRENCY) != BASE_CURRENCY:
+            raise ValueError(f"Beklenmeyen kur bazı: {data.get('base')}")
+        return data["rates"]
+
+
+class StaticRateProvider:
+    """Sabit kur tablosu; zincirin son halkası olarak her zaman sonuç döndürür."""
+
+    def __init__(self, rates: Optional[Dict[str, float]] = None):
+        self.rates = dict(rates or STATIC_USD_RATES)
+        self.name = "static"
+
+    def fetch(self) -> Dict[str, float]:
+        return dict(self.rates)
+
+
+class ExchangeRates:
+    """
+    Sağlayıcı zinciri üzerinde bellek + disk önbellekli kur tablosu.
+
+    Tablo `ttl_seconds` dolunca ilk okumada yenilenir; aynı anda yalnızca bir thread yeniler, diğerleri
+    eski tabloyu kullanır. Süreç yeniden başladığında disk önbelleği ağ çağrısı yapmadan yüklenir.
+    """
+
+    def __init__(self, providers: List, cache_path: Optional[str] = DEFAULT_FX_CACHE_PATH,
+                 ttl_seconds: float = DEFAULT_FX_TTL_SECONDS):
+        self.providers = providers
+        self.cache_path = cache_path
+        self.ttl_seconds = ttl_seconds
+        self._snapshot: Optional[RateSnapshot] = None
+        self._retry_after = 0.0
+        self._refresh_lock = threading.Lock()
+
+    def _load_disk_cache(self) -> Optional[RateSnapshot]:
+        if not self.cache_path or not os.path.exists(self.cache_path):
+            return None
+        try:
+            with open(self.cache_path, encoding="utf-8") as f:
+                data = json.load(f)
+            return RateSnapshot(data["rates"], data["source"], float(data["fetched_at"]))
+        except (OSError, ValueError, KeyError) as e:
+            logger.warning("Kur önbelleği okunamadı: %s", e, extra={"path": self.cache_path})
+            return None
+
+    def _save_disk_cache(self, snapshot: RateSnapshot) -> None:
+        if not self.cache_path:
+            return
+        try:
+            directory = os.path.dirname(self.cache_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            tmp_path = f"{self.cache_path}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({"base": BASE_CURRENCY, **snapshot._asdict()}, f)
+            os.replace(tmp_path, self.cache_path)
+        except OSError as e:
+            logger.warning("Kur önbelleği yazılamadı: %s", e, extra={"path": self.cache_path})
+
+    def reset(self) -> None:
+        """Bellekteki tabloyu bırakır; sonraki okuma disk önbelleğinden ya da sağlayıcılardan yükler."""
+        self._snapshot = None
+        self._retry_after = 0.0
+
+    def _is_fresh(self, snapshot: Optional[RateSnapshot]) -> bool:
+        return snapshot is not None and time.time() - snapshot.fetched_at < self.ttl_seconds
+
+    def refresh(self) -> RateSnapshot:
+        """
+        Sağlayıcıları sırayla dener; ilk başarılı sonucu önbelleğe alır. Canlı kaynaklar başarısız olursa
+        elde gerçek (eski) bir tablo varsa sabit tablo yerine o kullanılmaya devam eder.
+        """
+        for provider in self.providers:
+            if isinstance(provider, StaticRateProvider) and self._snapshot is not None \
+                    and self._snapshot.source != provider.name:
+                self._retry_after = time.time() + FX_RETRY_SECONDS
+                logger.warning("Kurlar yenilenemedi, eski tablo kullanılıyor", extra={"source": self._snapshot.source})
+                return self._snapshot
+            try:
+                rates = {code.upper(): float(value) for code, value in provider.fetch().items() if value}
+            except Exception as e:
+                logger.warning("Kur sağlayıcısı başarısız: %s", e, extra={"provider": provider.name})
+                continue
+            rates[BASE_CURRENCY] = 1.0
+            snapshot = RateSnapshot(rates, provider.name, time.time())
+            self._snapshot = snapshot
+            if isinstance(provider, StaticRateProvider):
+                self._retry_after = time.time() + FX_RETRY_SECONDS
+            else:
+                self._save_disk_cache(snapshot)
+            logger.info("Döviz kurları yenilendi", extra={"provider": provider.name, "currencies": len(rates)})
+            return snapshot
+        # Hiçbir sağlayıcı sonuç vermediyse eldeki (eski) tablo korunur
+        if self._snapshot is None:
+            self._snapshot = RateSnapshot(dict(STATIC_USD_RATES), "static", time.time())
+        return self._snapshot
+
+    def snapshot(self) -> RateSnapshot:
+        snapshot = self._snapshot
+        if snapshot is None:
+            snapshot = self._snapshot = self._load_disk_cache()
+        fresh = self._is_fresh(snapshot)
+        registry.record_cache_access("fx_rates", fresh)
+        if fresh or (snapshot is not None and time.time() < self._retry_after):
+            return snapshot
+        if snapshot is not None and not self._refresh_lock.acquire(blocking=False):
+            # Başka bir thread yeniliyor; beklemeden eski tablo kullanılır
+            return snapshot
+        if snapshot is None:
+            self._refresh_lock.acquire()
+        try:
+            if self._is_fresh(self._snapshot):
+                return self._snapshot
+            return self.refresh()
+        finally:
+            self._refresh_lock.release()
+
+    def rate(self, from_currency: str, to_currency: str) -> float:
+        """1 birim `from_currency`'nin `to_currency` karşılığı. Bilinmeyen para biriminde KeyError."""
+        if from_currency == to_currency:
+            return 1.0
+        rates = self.snapshot().rates
+        return rates[to_currency.upper()] / rates[from_currency.upper()]
+
+    def convert_many(self, amounts: Iterable[float], from_currency: str, to_currency: str) -> np.ndarray:
+        """Bir tutar dizisini tek bir vektörel çarpımla çevirir."""
+        values = np.fromiter(amounts, dtype=np.float64)
+        return values * self.rate(from_currency, to_currency)
+
+
+def _default_providers() -> List:
+    providers: List = []
+    url = os.getenv("FX_RATES_URL", DEFAULT_FX_RATES_URL)
+    if url:
+        providers.append(HttpRateProvider(url))
+    rates_file = os.getenv("FX_RATES_FILE")
+    if rates_file:
+        providers.append(FileRateProvider(rates_file))
+    providers.append(StaticRateProvider())
+    return providers
+
+
+exchange_rates = ExchangeRates(
+    _default_providers(),
+    cache_path=os.getenv("FX_CACHE_PATH", DEFAULT_FX_CACHE_PATH),
+    ttl_seconds=float(os.getenv("FX_RATES_TTL_SECONDS", DEFAULT_FX_TTL_SECONDS))
+)
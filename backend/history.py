@@ -0,0 +1,312 @@
+# Öneri geçmişi ve trend deposu (SQLite).
+# Her taramanın bulguları zaman damgasıyla saklanır; kaynak ve kategori indeksleri sayesinde
+# "bu IP ne zamandır sahipsiz" veya "90 günlük tasarruf trendi" gibi sorgular Azure'a gitmeden yanıtlanır.
+import datetime
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+from .recommendations import Category, Recommendation
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_HISTORY_DB_PATH = os.path.join("data", "recommendation_history.db")
+EXPORT_CHUNK_ROWS = 10_000
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS scans (
+    scan_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    subscription_id TEXT NOT NULL,
+    scanned_at REAL NOT NULL,
+    finding_count INTEGER NOT NULL,
+    total_monthly_savings REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_scans_subscription_time ON scans(subscription_id, scanned_at);
+
+CREATE TABLE IF NOT EXISTS findings (
+    scan_id INTEGER NOT NULL REFERENCES scans(scan_id),
+    resource_id TEXT NOT NULL,
+    name TEXT,
+    category TEXT NOT NULL,
+    impact TEXT,
+    location TEXT,
+    resource_group TEXT,
+    monthly_savings REAL NOT NULL,
+    observed_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_findings_resource_time ON findings(resource_id, observed_at);
+CREATE INDEX IF NOT EXISTS idx_findings_category_time ON findings(category, observed_at);
+CREATE INDEX IF NOT EXISTS idx_findings_scan ON findings(scan_id);
+
+-- Kaynağın güncel "bulgu serisi": ilk/son görülme zamanı, çözülme zamanı
+CREATE TABLE IF NOT EXISTS resource_state (
+    resource_id TEXT NOT NULL,
+    category TEXT NOT NULL,
+    subscription_id TEXT NOT NULL,
+    first_seen REAL NOT NULL,
+    last_seen REAL NOT NULL,
+    occurrences INTEGER NOT NULL,
+    resolved_at REAL,
+    last_monthly_savings REAL NOT NULL,
+    PRIMARY KEY (resource_id, category)
+);
+CREATE INDEX IF NOT EXISTS idx_resource_state_open ON resource_state(subscription_id, category, resolved_at);
+
+-- Günün son taramasına göre kategori bazlı tasarruf özeti (trend sorguları için)
+CREATE TABLE IF NOT EXISTS daily_savings (
+    subscription_id TEXT NOT NULL,
+    day TEXT NOT NULL,
+    category TEXT NOT NULL,
+    monthly_savings REAL NOT NULL,
+    finding_count INTEGER NOT NULL,
+    PRIMARY KEY (subscription_id, day, category)
+);
+CREATE INDEX IF NOT EXISTS idx_daily_savings_day ON daily_savings(day, category);
+"""
+
+
+def _iso(timestamp: Optional[float]) -> Optional[str]:
+    if timestamp is None:
+        return None
+    return datetime.datetime.fromtimestamp(timestamp, tz=datetime.timezone.utc).isoformat()
+
+
+def _day(timestamp: float) -> str:
+    return datetime.datetime.fromtimestamp(timestamp, tz=datetime.timezone.utc).date().isoformat()
+
+
+class RecommendationHistoryStore:
+    """Tarama bulgularını saklayan ve geçmiş sorgularını indekslerden yanıtlayan SQLite deposu."""
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or os.getenv("HISTORY_DB_PATH", DEFAULT_HISTORY_DB_PATH)
+        if self.path != ":memory:":
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        with self._lock:
+            if self.path != ":memory:":
+                self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.executescript(_SCHEMA)
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def record_scan(self, subscription_id: str, records: Iterable[Recommendation],
+                    categories: Optional[Iterable[Category]] = None, scanned_at: Optional[float] = None,
+                    keep: Iterable[str] = ()) -> int:
+        """
+        Bir taramanın bulgularını kaydeder ve scan_id döndürür.
+
+        `categories` taramanın kapsadığı kategorilerdir; bu kategorilerde artık görülmeyen kaynakların
+        serisi çözülmüş (resolved) olarak işaretlenir. Verilmezse yalnızca bulgulardaki kategoriler kullanılır.
+        `keep` bu taramada değerlendirilemeyen kaynaklardır; açık serileri çözülmez ve günlük tasarrufa son
+        bilinen tutarlarıyla eklenir.
+        """
+        scanned_at = scanned_at or time.time()
+        rows = [
+            (record.resource_id or record.name, record.name, record.category.value, record.impact.value,
+             record.location, record.resource_group, float(record.monthly_savings))
+            for record in records
+        ]
+        covered = {c.value for c in categories} if categories is not None else {row[2] for row in rows}
+        total_savings = sum(row[6] for row in rows)
+        day = _day(scanned_at)
+
+        daily: Dict[str, List[float]] = {category: [0.0, 0] for category in covered}
+        for row in rows:
+            entry = daily.setdefault(row[2], [0.0, 0])
+            entry[0] += row[6]
+            entry[1] += 1
+
+        keep = list(dict.fromkeys(keep))
+        keep_clause = f" AND resource_id NOT IN ({','.join('?' * len(keep))})" if keep else ""
+
+        with self._lock, self._conn:
+            for category, savings in self._open_savings(subscription_id, keep, covered):
+                entry = daily.setdefault(category, [0.0, 0])
+                entry[0] += savings
+                entry[1] += 1
+            cursor = self._conn.execute(
+                "INSERT INTO scans (subscription_id, scanned_at, finding_count, total_monthly_savings) VALUES (?, ?, ?, ?)",
+                (subscription_id, scanned_at, len(rows), total_savings)
+            )
+            scan_id = cursor.lastrowid
+            self._conn.executemany(
+                "INSERT INTO findings (scan_id, resource_id, name, category, impact, location, resource_group, "
+                "monthly_savings, observed_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                [(scan_id, *row, scanned_at) for row in rows]
+            )
+            # Yeni ya da daha önce çözülmüş kaynaklar için seri baştan başlar
+            self._conn.executemany(
+                """
+                INSERT INTO resource_state (resource_id, category, subscription_id, first_seen, last_seen,
+                                            occurrences, resolved_at, last_monthly_savings)
+                VALUES (?, ?, ?, ?, ?, 1, NULL, ?)
+                ON CONFLICT(resource_id, category) DO UPDATE SET
+                    first_seen = CASE WHEN resolved_at IS NOT NULL THEN excluded.first_seen ELSE first_seen END,
+                    occurrences = CASE WHEN resolved_at IS NOT NULL THEN 1 ELSE occurrences + 1 END,
+                    last_seen = excluded.last_seen,
+                    resolved_at = NULL,
+                    last_monthly_savings = excluded.last_monthly_savings
+                """,
+                [(row[0], row[2], subscription_id, scanned_at, scanned_at, row[6]) for row in rows]
+            )
+            # Bu taramada görülmeyen açık bulgular çözüldü sayılır
+            for category in covered:
+                self._conn.execute(
+                    "UPDATE resource_state SET resolved_at = ? WHERE subscription_id = ? AND category = ? "
+                    "AND resolved_at IS NULL AND last_seen < ?" + keep_clause,
+                    (scanned_at, subscription_id, category, scanned_at, *keep)
+                )
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO daily_savings (subscription_id, day, category, monthly_savings, finding_count) "
+                "VALUES (?, ?, ?, ?, ?)",
+                [(subscription_id, day, category, savings, count) for category, (savings, count) in daily.items()]
+            )
+        logger.debug("Tarama geçmişe kaydedildi: scan_id=%s, %d bulgu", scan_id, len(rows))
+        return scan_id
+
+    def _open_savings(self, subscription_id: str, resource_ids: List[str], categories: Iterable[str]) -> List[tuple]:
+        """Verilen kaynakların kapsanan kategorilerdeki açık serileri: (kategori, son aylık tasarruf)."""
+        if not resource_ids:
+            return []
+        rows = self._conn.execute(
+            "SELECT category, last_monthly_savings FROM resource_state WHERE subscription_id = ? AND resolved_at IS NULL "
+            f"AND resource_id IN ({','.join('?' * len(resource_ids))})",
+            (subscription_id, *resource_ids)
+        ).fetchall()
+        categories = set(categories)
+        return [(row[0], row[1]) for row in rows if row[0] in categories]
+
+    def resource_history(self, resource_id: str, limit: int = 100) -> Dict[str, Any]:
+        """Bir kaynağın bulgu serileri (ne zamandan beri, çözüldü mü) ve son gözlemleri."""
+        now = time.time()
+        with self._lock:
+            states = self._conn.execute(
+                "SELECT * FROM resource_state WHERE resource_id = ?", (resource_id,)
+            ).fetchall()
+            observations = self._conn.execute(
+                "SELECT scan_id, category, monthly_savings, observed_at FROM findings "
+                "WHERE resource_id = ? ORDER BY observed_at DESC LIMIT ?",
+                (resource_id, limit)
+            ).fetchall()
+        return {
+            "resource_id": resource_id,
+            "findings": [
+                {
+                    "category": state["category"],
+                    "subscription_id": state["subscription_id"],
+                    "first_seen": _iso(state["first_seen"]),
+                    "last_seen": _iso(state["last_seen"]),
+                    "resolved_at": _iso(state["resolved_at"]),
+                    "open": state["resolved_at"] is None,
+                    "occurrences": state["occurrences"],
+                    "duration_days": round(((state["resolved_at"] or now) - state["first_seen"]) / 86400.0, 2),
+                    "last_monthly_savings": state["last_monthly_savings"],
+                }
+                for state in states
+            ],
+            "observations": [
+                {
+                    "scan_id": row["scan_id"],
+                    "category": row["category"],
+                    "monthly_savings": row["monthly_savings"],
+                    "observed_at": _iso(row["observed_at"]),
+                }
+                for row in observations
+            ],
+        }
+
+    def savings_trend(self, days: int = 90, subscription_id: Optional[str] = None,
+                      category: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Günlük toplam potansiyel aylık tasarruf (her günün son taramasına göre)."""
+        since = (datetime.datetime.now(datetime.timezone.utc).date() - datetime.timedelta(days=days)).isoformat()
+        query = "SELECT day, SUM(monthly_savings) AS savings, SUM(finding_count) AS findings FROM daily_savings WHERE day >= ?"
+        params: List[Any] = [since]
+        if subscription_id:
+            query += " AND subscription_id = ?"
+            params.append(subscription_id)
+        if category:
+            query += " AND category = ?"
+            params.append(category)
+        query += " GROUP BY day ORDER BY day"
+        with self._lock:
+            rows = self._conn.execute(query, params).fetchall()
+        return [
+            {"day": row["day"], "monthly_savings": round(row["savings"], 2), "finding_count": row["findings"]}
+            for row in rows
+        ]
+
+    def iter_findings(self, subscription_id: Optional[str] = None, since: Optional[float] = None,
+                      chunk_size: int = EXPORT_CHUNK_ROWS) -> Iterator[List[tuple]]:
+        """
+        Bulgu satırlarını (scan_id, subscription_id, scanned_at, resource_id, name, category, impact, location,
+        resource_group, monthly_savings) parça parça döndürür. Ayrı bir okuma bağlantısı kullanılır; uzun
+        dışa aktarımlar depoya yazan taramaları bekletmez.
+        """
+        where, params = [], []
+        if subscription_id:
+            where.append("s.subscription_id = ?")
+            params.append(subscription_id)
+        if since is not None:
+            where.append("s.scanned_at >= ?")
+            params.append(since)
+        query = (
+            "SELECT s.scan_id, s.subscription_id, s.scanned_at, f.resource_id, f.name, f.category, f.impact, "
+            "f.location, f.resource_group, f.monthly_savings FROM scans AS s JOIN findings AS f ON f.scan_id = s.scan_id"
+            + (" WHERE " + " AND ".join(where) if where else "") + " ORDER BY s.scanned_at, f.rowid"
+        )
+        conn = sqlite3.connect(self.path, check_same_thread=False)
+        try:
+            cursor = conn.execute(query, params)
+            while True:
+                rows = cursor.fetchmany(chunk_size)
+                if not rows:
+                    break
+                yield rows
+        finally:
+            conn.close()
+
+    def recent_scans(self, subscription_id: Optional[str] = None, limit: int = 20) -> List[Dict[str, Any]]:
+        query = "SELECT * FROM scans"
+        params: List[Any] = []
+        if subscription_id:
+            query += " WHERE subscription_id = ?"
+            params.append(subscription_id)
+        query += " ORDER BY scanned_at DESC LIMIT ?"
+        params.append(limit)
+        with self._lock:
+            rows = self._conn.execute(query, params).fetchall()
+        return [
+            {
+                "scan_id": row["scan_id"],
+                "subscription_id": row["subscription_id"],
+                "scanned_at": _iso(row["scanned_at"]),
+                "finding_count": row["finding_count"],
+                "total_monthly_savings": round(row["total_monthly_savings"], 2),
+            }
+            for row in rows
+        ]
+
+
+_store: Optional[RecommendationHistoryStore] = None
+_store_lock = threading.Lock()
+
+
+def get_history_store() -> RecommendationHistoryStore:
+    """Süreç genelinde paylaşılan geçmiş deposu (HISTORY_DB_PATH)."""
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = RecommendationHistoryStore()
+    return _store
@@ -0,0 +1,161 @@
+# Backend için düşük maliyetli, seviyeli ve yapılandırılmış (JSON) loglama.
+# Kayıtlar bir kuyruğa bırakılır ve ayrı bir thread tarafından yazılır; istek yolu stdout I/O'su beklemez.
+import atexit
+import copy
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import sys
+import threading
+import time
+from typing import Dict, Optional, Tuple
+
+from .telemetry import current_trace
+
+LOGGER_NAME = "backend"
+DEFAULT_LEVEL = "INFO"
+DEFAULT_FORMAT = "json"
+DEFAULT_RATE_LIMIT_SECONDS = 60.0
+
+# Kaynak başına hatalarda kullanılır: aynı mesaj şablonu + hata tipi aralık başına bir kez yazılır
+RATE_LIMITED = {"rate_limit": True}
+
+_STANDARD_ATTRS = frozenset(vars(logging.LogRecord("", 0, "", 0, "", (), None)).keys()) | {"message", "asctime"}
+
+_EXCEPTION_FORMATTER = logging.Formatter()
+_listener: Optional[logging.handlers.QueueListener] = None
+_configure_lock = threading.Lock()
+
+
+class JsonFormatter(logging.Formatter):
+    """Her kaydı tek satırlık JSON olarak biçimlendirir; `extra` alanları da eklenir."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        payload = {
+            "ts": round(record.created, 3),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        trace_id = getattr(record, "trace_id", None)
+        if trace_id:
+            payload["trace_id"] = trace_id
+        for key, value in record.__dict__.items():
+            if key not in _STANDARD_ATTRS and key not in payload and key not in ("rate_limit", "trace_id"):
+                payload[key] = value
+        if record.exc_info:
+            payload["exception"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            payload["exception"] = record.exc_text
+        return json.dumps(payload, ensure_ascii=False, default=str)
+
+
+class _StructuredQueueHandler(logging.handlers.QueueHandler):
+    """
+    Kaydı kuyruğa bırakmadan önce yalnızca mesajı birleştirir; asıl biçimlendirme (JSON) dinleyici
+    thread'inde yapılır. Hata izi metne çevrilip `exc_text` alanında taşınır.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        record.message = record.getMessage()
+        record.msg = record.message
+        record.args = None
+        if record.exc_info:
+            record.exc_text = _EXCEPTION_FORMATTER.formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+class TraceContextFilter(logging.Filter):
+    """Kayda, kaydın üretildiği isteğin iz kimliğini ekler (kuyruğa bırakılmadan önce)."""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        trace = current_trace()
+        if trace is not None:
+            record.trace_id = trace.trace_id
+        return True
+
+
+class RateLimitFilter(logging.Filter):
+    """
+    `rate_limit` işaretli kayıtları (örn: her kaynak için tekrarlanan aynı hata) aralık başına bir kez geçirir.
+    Bastırılan kayıt sayısı bir sonraki geçen kayda `suppressed` alanı olarak eklenir.
+    """
+
+    def __init__(self, interval_seconds: float = DEFAULT_RATE_LIMIT_SECONDS):
+        super().__init__()
+        self.interval_seconds = interval_seconds
+        self._lock = threading.Lock()
+        self._state: Dict[Tuple, Tuple[float, int]] = {}
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if not getattr(record, "rate_limit", False):
+            return True
+        exc_type = record.exc_info[0].__name__ if record.exc_info and record.exc_info[0] else None
+        key = (record.name, record.msg, exc_type)
+        now = time.monotonic()
+        with self._lock:
+            last, suppressed = self._state.get(key, (0.0, 0))
+            if last and now - last < self.interval_seconds:
+                self._state[key] = (last, suppressed + 1)
+                return False
+            self._state[key] = (now, 0)
+        if suppressed:
+            record.suppressed = suppressed
+        return True
+
+
+def configure_logging(level: Optional[str] = None, fmt: Optional[str] = None,
+                      rate_limit_seconds: Optional[float] = None, stream=None) -> logging.Logger:
+    """
+    `backend` logger'ını kuyruk tabanlı, bloklamayan bir handler ile yapılandırır.
+    Seviye/format LOG_LEVEL, LOG_FORMAT (json|text) ve LOG_RATE_LIMIT_SECONDS ortam değişkenlerinden okunur.
+    Kayıtlar `stream`'e (varsayılan stdout) yazılır. Tekrar çağrıldığında önceki yapılandırma değiştirilir.
+    """
+    global _listener
+    level = (level or os.getenv("LOG_LEVEL", DEFAULT_LEVEL)).upper()
+    fmt = (fmt or os.getenv("LOG_FORMAT", DEFAULT_FORMAT)).lower()
+    if rate_limit_seconds is None:
+        rate_limit_seconds = float(os.getenv("LOG_RATE_LIMIT_SECONDS", DEFAULT_RATE_LIMIT_SECONDS))
+
+    with _configure_lock:
+        logger = logging.getLogger(LOGGER_NAME)
+        if _listener is not None:
+            _listener.stop()
+            _listener = None
+        for handler in list(logger.handlers):
+            logger.removeHandler(handler)
+
+        stream_handler = logging.StreamHandler(stream or sys.stdout)
+        if fmt == "json":
+            stream_handler.setFormatter(JsonFormatter())
+        else:
+            stream_handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s [%(name)s] %(message)s"))
+
+        log_queue: queue.SimpleQueue = queue.SimpleQueue()
+        queue_handler = _StructuredQueueHandler(log_queue)
+        queue_handler.addFilter(RateLimitFilter(rate_limit_seconds))
+        queue_handler.addFilter(TraceContextFilter())
+
+        logger.addHandler(queue_handler)
+        logger.setLevel(level)
+        logger.propagate = False
+
+        _listener = logging.handlers.QueueListener(log_queue, stream_handler, respect_handler_level=True)
+        _listener.start()
+    return logger
+
+
+def shutdown_logging() -> None:
+    """Kuyrukta bekleyen kayıtları yazar ve dinleyici thread'i durdurur."""
+    global _listener
+    with _configure_lock:
+        if _listener is not None:
+            _listener.stop()
+            _listener = None
+
+
+atexit.register(shutdown_logging)
@@ -1,23 +1,114 @@
-from fastapi import FastAPI, HTTPException, Path
+import datetime
+import itertools
+import json
+import logging
+import re
+import time
+from contextlib import asynccontextmanager
+
+from fastapi import Depends, FastAPI, HTTPException, Path, Query, Request, Response
+from fastapi.responses import PlainTextResponse, StreamingResponse
+from starlette.concurrency import run_in_threadpool
 from pydantic import BaseModel, Field
-from typing import List, Dict, Optional, Any
+from typing import List, Dict, Iterable, Iterator, Optional, Any
 
 from .azure_client import (
-    get_unattached_public_ips,
+    get_app_service_commitment_recommendations,
     get_cost_details,
-    get_app_service_plan_recommendations,
     update_app_service_plan_sku,
     delete_app_service_plan,
-    get_azure_vms_with_cpu,
+    VM_SCAN_BATCH_SIZE,
+    iter_azure_vms_with_cpu,
     stop_and_deallocate_vm
 )
+from .recommendations import Category, Impact, recommendations_to_dicts
+from .history import get_history_store
+from .results_store import (
+    DEFAULT_SORT,
+    MAX_PAGE_SIZE,
+    SORT_ORDERS,
+    InvalidCursor,
+    RecommendationQuery,
+    get_results_store
+)
+from .scan import ScanIncomplete, scan_subscription
+from .scheduler import get_job_queue
+from .savings import summarize_savings
+from .dashboard import DEFAULT_TOP_GROUPS, dashboard_summary
+from .cost_allocation import InvalidCostQuery, get_cost_store, refresh_cost_allocation
+from .export import (
+    EXPORT_FORMATS,
+    Dataset,
+    ExportUnavailable,
+    check_format,
+    findings_dataset,
+    recommendations_dataset,
+    stream_export,
+    vms_dataset
+)
+from .fx_rates import BASE_CURRENCY, exchange_rates
+from .azure_pricing import convert_price_table
+from .pricing_http import close_pricing_client
+from .analysis_pool import shutdown_analysis_pool, start_analysis_pool
+from .pricing_cache import pricing_cache
+from .region_pricing import region_pricing
+from .bulk_actions import (
+    DEFAULT_MAX_CONCURRENCY,
+    MAX_BATCH_ITEMS,
+    MAX_CONCURRENCY,
+    BulkActionItem,
+    BulkActionType,
+    bulk_action_manager
+)
+from . import telemetry
+from .logging_config import configure_logging
+
+configure_logging()
+logger = logging.getLogger(__name__)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Fiyatları disk snapshot'ından yükler ve arka plan yenilemesini başlatır; ilk istek soğuk fiyat çekmez.
+    ANALYSIS_WORKERS > 0 ise analiz süreç havuzu da açılışta başlatılır.
+    """
+    pricing_cache.start()
+    await run_in_threadpool(start_analysis_pool)
+    try:
+        yield
+    finally:
+        pricing_cache.stop()
+        close_pricing_client()
+        shutdown_analysis_pool()
 
 app = FastAPI(
     title="Bulut Maliyet Optimizasyon Aracı API",
     description="Özel analizlerden (örn: sahipsiz genel IP'ler, App Service Plan optimizasyonları) maliyet optimizasyon önerileri ve eylemleri API'si.",
     version="0.7.0",
+    lifespan=lifespan,
 )
 
+@app.middleware("http")
+async def tracing_middleware(request: Request, call_next):
+    """Her istek için bir iz başlatır; operasyon sürelerini Server-Timing başlığında döndürür."""
+    with telemetry.start_trace(f"{request.method} {request.url.path}", request.headers.get("x-trace-id")) as trace:
+        start = time.perf_counter()
+        response = await call_next(request)
+        elapsed = time.perf_counter() - start
+
+    route = request.scope.get("route")
+    route_path = getattr(route, "path", request.url.path)
+    telemetry.registry.observe_request(request.method, route_path, response.status_code, elapsed)
+
+    timings = [
+        f'{operation.replace(".", "_")};dur={entry["total_ms"]};desc="{entry["count"]}x"'
+        for operation, entry in trace.summary().items()
+    ]
+    timings.append(f"total;dur={elapsed * 1000.0:.3f}")
+    response.headers["X-Trace-Id"] = trace.trace_id
+    response.headers["Server-Timing"] = ", ".join(timings)
+    return response
+
 class AzureCredentials(BaseModel):
     subscription_id: str = Field(..., example="00000000-0000-0000-0000-000000000000")
     tenant_id: str = Field(..., example="00000000-0000-0000-0000-000000000000")
@@ -51,6 +142,7 @@ class CostDetailsResponse(BaseModel):
     currency: str
     costs_by_service: Dict[str, float]
     costs_by_resource_group: Dict[str, float]
+    costs_by_tag: Optional[Dict[str, Dict[str, float]]] = None
     from_date: str
     to_date: str
     raw_rows: Optional[List[Any]] = None
@@ -60,6 +152,11 @@ class CostDetailsRequest(BaseModel):
     scope: str = Field(..., example="subscriptions/00000000-0000-0000-0000-000000000000")
     time_period_days: Optional[int] = 30
 
+class CostAllocationRefreshRequest(BaseModel):
+    credentials: AzureCredentials
+    days: Optional[int] = Field(None, ge=1, le=365, description="Yeniden yazılacak gün sayısı; boşsa son yüklenen günün 3 gün gerisinden başlanır (ilk yüklemede 30)")
+    reallocate: bool = Field(False, description="Güncel tag'leri daha önce yüklenmiş günlere de uygula")
+
 class ActionResponse(BaseModel):
     success: bool
     message: str
@@ -80,6 +177,11 @@ class DeleteAppServicePlanRequest(BaseModel):
     resource_group_name: str
     plan_name: str
 
+class CommitmentAnalysisRequest(BaseModel):
+    credentials: AzureCredentials
+    days: int = Field(30, ge=1, le=93, description="Analiz edilecek saatlik kullanım geçmişi (gün)")
+    currency: str = "TRY"
+
 class VMListRequest(BaseModel):
     subscription_id: str = Field(..., example="00000000-0000-0000-0000-000000000000")
     tenant_id: str = Field(..., example="00000000-0000-0000-0000-000000000000")
@@ -92,50 +194,187 @@ class StopVMRequest(BaseModel):
     credentials: AzureCredentials
     vm_id: str = Field(..., description="Durdurulacak VM'in tam resource ID'si")
 
+class BulkPlanAction(BaseModel):
+    action: str = Field(..., description="update_sku veya delete")
+    resource_group_name: str
+    plan_name: str
+    target_sku_name: Optional[str] = Field(None, description="update_sku için hedef SKU adı (örn: B1)")
+    target_sku_tier: Optional[str] = Field(None, description="update_sku için hedef SKU katmanı (örn: Basic)")
+    target_sku_capacity: Optional[int] = Field(1, description="Hedef örnek sayısı")
+
+class BulkActionRequest(BaseModel):
+    credentials: AzureCredentials
+    vm_ids: List[str] = Field(default_factory=list, max_length=MAX_BATCH_ITEMS,
+                              description="Durdurulup deallocate edilecek VM resource ID'leri")
+    plan_actions: List[BulkPlanAction] = Field(default_factory=list, max_length=MAX_BATCH_ITEMS)
+    max_concurrency: Optional[int] = Field(DEFAULT_MAX_CONCURRENCY, ge=1, le=MAX_CONCURRENCY,
+                                           description="Aynı anda yürütülecek en fazla işlem")
+    dry_run: bool = Field(False, description="Yalnızca ön kontrolleri yap, kaynakları değiştirme")
+
 @app.get("/")
 async def read_root():
     return {"message": "Bulut Maliyet Optimizasyon Aracı API'sine hoş geldiniz! Endpoint'ler: /list-custom-recommendations, /list-vms-detailed, /stop-vm, /cost-details, ve App Service Plan eylemleri."}
 
+@app.get("/metrics", response_class=PlainTextResponse, tags=["Gözlemlenebilirlik"])
+async def metrics_endpoint():
+    """Gecikme histogramları, çağrı sayıları ve önbellek isabet oranları (Prometheus metin formatı)."""
+    return PlainTextResponse(telemetry.registry.render_prometheus(), media_type="text/plain; version=0.0.4")
+
+@app.get("/debug/traces", tags=["Debug"])
+async def debug_traces_endpoint(limit: int = 10, include_spans: bool = False):
+    """Debug: Son isteklerin izlerini operasyon tipine göre gruplanmış sürelerle listeler."""
+    traces = list(telemetry.registry.recent_traces)[-limit:]
+    return [trace.to_dict(include_spans=include_spans) for trace in reversed(traces)]
+
+def recommendation_query(
+    category: Optional[List[str]] = Query(None),
+    impact: Optional[List[str]] = Query(None),
+    resource_group: Optional[str] = None,
+    region: Optional[str] = None,
+    min_savings: Optional[float] = Query(None, ge=0),
+    sort: str = DEFAULT_SORT
+) -> RecommendationQuery:
+    """Öneri listeleme endpoint'lerinin ortak filtre ve sıralama parametreleri."""
+    invalid = [value for value in category or [] if value not in {c.value for c in Category}]
+    invalid += [value for value in impact or [] if value not in {i.value for i in Impact}]
+    if invalid:
+        raise HTTPException(status_code=400, detail=f"Geçersiz filtre değeri: {', '.join(invalid)}")
+    if sort not in SORT_ORDERS:
+        raise HTTPException(status_code=400, detail=f"Sıralama şunlardan biri olmalı: {', '.join(SORT_ORDERS)}")
+    return RecommendationQuery(tuple(category or ()), tuple(impact or ()), resource_group, region, min_savings, sort)
+
+async def _query_latest(subscription_id: str, query: RecommendationQuery, limit: int, cursor: Optional[str]):
+    try:
+        return await run_in_threadpool(get_results_store().query, subscription_id, query, limit=limit, cursor=cursor)
+    except InvalidCursor as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
 @app.post("/list-custom-recommendations", response_model=List[CustomRecommendation], tags=["Özel Öneriler"])
-async def list_custom_recommendations_endpoint(credentials: AzureCredentials):
-    """Tüm özel maliyet optimizasyon önerilerini (sahipsiz genel IP'ler, App Service Plan optimizasyonları vb.) listeler."""
-    all_recommendations = []
-    
-    # 1. Sahipsiz Genel IP Önerileri
-    unattached_ip_recs = get_unattached_public_ips(
-        subscription_id=credentials.subscription_id,
-        tenant_id=credentials.tenant_id,
-        client_id=credentials.client_id,
-        client_secret=credentials.client_secret
-    )
-    if unattached_ip_recs:
-        all_recommendations.extend(unattached_ip_recs)
-    
-    # 2. App Service Plan Önerileri
-    asp_recs = get_app_service_plan_recommendations(
-        subscription_id=credentials.subscription_id,
-        tenant_id=credentials.tenant_id,
-        client_id=credentials.client_id,
-        client_secret=credentials.client_secret
-    )
-    if asp_recs:
-        all_recommendations.extend(asp_recs)
-        
-    # Gelecekte diğer özel öneri türleri buraya eklenebilir
-    # Örneğin: get_unattached_disks_recommendations(...)
+async def list_custom_recommendations_endpoint(
+    credentials: AzureCredentials,
+    response: Response,
+    query: RecommendationQuery = Depends(recommendation_query),
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE)
+):
+    """
+    Tüm özel maliyet optimizasyon önerilerini (sahipsiz genel IP'ler, App Service Plan optimizasyonları vb.)
+    canlı tarama ile listeler. Sonuçlar ayrıca `/recommendations/latest`'in okuduğu depoya yazılır.
+    Filtre ya da `limit` verilirse yalnızca ilk sayfa döner; toplam `X-Total-Count`, sonraki sayfanın imleci
+    `X-Next-Cursor` başlığındadır (devamı `GET /recommendations` ile alınır). Başarısız analizler
+    `X-Failed-Analyzers` başlığında listelenir; bu kategorilerin önceki sonuçları depoda korunur.
+    """
+    try:
+        all_recommendations = await run_in_threadpool(
+            scan_subscription,
+            credentials.subscription_id, credentials.tenant_id, credentials.client_id, credentials.client_secret
+        )
+    except ScanIncomplete as e:
+        # Başarılı analizlerin sonuçları döner; eksik kategoriler başlıkta bildirilir
+        all_recommendations = e.records
+        response.headers["X-Failed-Analyzers"] = ",".join(e.failed)
+
+    if limit is not None or query != RecommendationQuery():
+        page = await _query_latest(credentials.subscription_id, query, limit or MAX_PAGE_SIZE, None)
+        response.headers["X-Total-Count"] = str(page.total)
+        if page.next_cursor:
+            response.headers["X-Next-Cursor"] = page.next_cursor
+        return page.items
 
     if not all_recommendations:
         # Eğer hiçbir öneri bulunamazsa boş liste döndürür, bu frontend tarafından normal karşılanmalı.
         return []
         
-    return all_recommendations
+    # Kompakt kayıtlar yalnızca burada JSON sözlüklerine çevrilir
+    return recommendations_to_dicts(all_recommendations)
+
+@app.get("/recommendations", tags=["Özel Öneriler"])
+async def query_recommendations_endpoint(
+    subscription_id: str,
+    query: RecommendationQuery = Depends(recommendation_query),
+    limit: int = Query(50, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None
+):
+    """
+    Son taramanın önerilerinden filtrelenmiş, sıralanmış bir sayfa (kategori, etki, resource group, bölge,
+    en az aylık tasarruf). Sonraki sayfa için yanıttaki `next_cursor` gönderilir; imleç yeni bir tarama
+    yazılınca geçersiz olur (400).
+    """
+    scan = await run_in_threadpool(get_results_store().scan_info, subscription_id)
+    if scan is None:
+        raise HTTPException(status_code=404, detail="Bu abonelik için kayıtlı tarama sonucu yok.")
+    page = await _query_latest(subscription_id, query, limit, cursor)
+    return {"scan": scan, "total": page.total, "next_cursor": page.next_cursor, "items": page.items}
+
+@app.get("/recommendations/latest", tags=["Özel Öneriler"])
+async def latest_recommendations_endpoint(subscription_id: str):
+    """
+    Aboneliğin son taramasının (zamanlanmış ya da canlı) önerileri. Yalnızca sonuç deposundan okunur,
+    Azure'a çağrı yapılmaz; henüz tarama yoksa 404 döner.
+    """
+    store = get_results_store()
+    scan = await run_in_threadpool(store.scan_info, subscription_id)
+    if scan is None:
+        raise HTTPException(status_code=404, detail="Bu abonelik için kayıtlı tarama sonucu yok.")
+    return {"scan": scan, "recommendations": await run_in_threadpool(store.recommendations, subscription_id)}
+
+@app.get("/dashboard/summary", tags=["Özel Öneriler"])
+async def dashboard_summary_endpoint(subscription_id: str, currency: str = "TRY", top: int = DEFAULT_TOP_GROUPS):
+    """
+    Son taramanın kategori, bölge, resource group ve SKU kırılımları (sütunsal diziler). Yanıt boyutu bulgu
+    sayısına değil grup sayısına bağlıdır; `top`'tan fazla grup "Diğer" altında toplanır.
+    """
+    store = get_results_store()
+    scan = await run_in_threadpool(store.scan_info, subscription_id)
+    if scan is None:
+        raise HTTPException(status_code=404, detail="Bu abonelik için kayıtlı tarama sonucu yok.")
+    columns = await run_in_threadpool(store.columns, subscription_id)
+    summary = await run_in_threadpool(dashboard_summary, columns, currency.upper(), max(1, min(top, 100)))
+    return {"scan": scan, **summary}
+
+@app.get("/scheduler/status", tags=["Özel Öneriler"])
+async def scheduler_status_endpoint(subscription_id: Optional[str] = None, limit: int = 20):
+    """Zamanlanmış taramaların planı ve son işleri (zamanlayıcı süreci ayrı çalışır)."""
+    # Kuyruk zamanlayıcı süreciyle paylaşılan SQLite dosyasıdır; yazma kilidi beklenirken event loop bloklanmamalı
+    return await run_in_threadpool(get_job_queue().status, subscription_id=subscription_id, limit=limit)
+
+@app.get("/history/resource", tags=["Geçmiş"])
+async def resource_history_endpoint(resource_id: str, limit: int = 100):
+    """Bir kaynağın bulgu geçmişi: ne zamandan beri açık, çözüldü mü, son gözlemler."""
+    return await run_in_threadpool(get_history_store().resource_history, resource_id, limit=limit)
+
+@app.get("/history/savings-trend", tags=["Geçmiş"])
+async def savings_trend_endpoint(days: int = 90, subscription_id: Optional[str] = None, category: Optional[str] = None):
+    """Günlük potansiyel aylık tasarruf trendi (Azure taranmadan, kayıtlı geçmişten)."""
+    return {
+        "days": days,
+        "trend": await run_in_threadpool(get_history_store().savings_trend, days=days, subscription_id=subscription_id,
+                                         category=category)
+    }
+
+@app.get("/savings/summary", tags=["Geçmiş"])
+async def savings_summary_endpoint(subscription_id: str, currency: str = "TRY"):
+    """
+    Son taramanın toplam ve kategori bazlı tasarrufu; dashboard'daki tutarların tek kaynağı. `/dashboard/summary`
+    ile aynı sonuç deposundan okunur: başarısız analizlerin önceki bulguları toplamda yer alır.
+    """
+    store = get_results_store()
+    scan = await run_in_threadpool(store.scan_info, subscription_id)
+    columns = await run_in_threadpool(store.columns, subscription_id)
+    summary = await run_in_threadpool(summarize_savings, columns["category"], columns["monthly_savings"], currency)
+    return {"scan_id": scan["scan_id"] if scan else None, **summary}
+
+@app.get("/history/scans", tags=["Geçmiş"])
+async def recent_scans_endpoint(subscription_id: Optional[str] = None, limit: int = 20):
+    """Son taramaların özeti."""
+    return await run_in_threadpool(get_history_store().recent_scans, subscription_id=subscription_id, limit=limit)
 
 @app.post("/debug/list-app-service-plans", tags=["Debug"])
 async def debug_list_app_service_plans(credentials: AzureCredentials):
     """Debug: Tüm App Service planlarını listeler"""
     from .azure_client import get_app_service_plans_debug
     
-    plans = get_app_service_plans_debug(
+    plans = await run_in_threadpool(
+        get_app_service_plans_debug,
         subscription_id=credentials.subscription_id,
         tenant_id=credentials.tenant_id,
         client_id=credentials.client_id,
@@ -146,29 +385,37 @@ async def debug_list_app_service_plans(credentials: AzureCredentials):
 
 @app.get("/get-current-pricing/{region}", tags=["Fiyatlandırma"])
 async def get_current_pricing_endpoint(region: str = "westeurope"):
-    """Güncel Azure App Service planları fiyatlarını Microsoft'un resmi API'sinden çeker"""
+    """
+    Güncel Azure App Service planları fiyatlarını döndürür (bellekteki, arka planda yenilenen tablodan).
+    Önbellekte olmayan bölgenin fiyatları thread havuzunda çekilir.
+    """
+    region = region.strip().lower().replace(" ", "")
+    if not _REGION_NAME.match(region):
+        raise HTTPException(status_code=400, detail=f"Geçersiz bölge adı: {region}")
     try:
-        from .azure_pricing import get_current_app_service_pricing
-        
-        pricing_data = get_current_app_service_pricing("TRY", region)
+        entry = pricing_cache.cached(region) or await run_in_threadpool(pricing_cache.get_usd_prices, region)
+        # Kur tablosu eskiyse çevrim sırasında yenilenir (HTTP); event loop'u bloklamamak için thread havuzunda
+        pricing_data = await run_in_threadpool(convert_price_table, entry.prices, "TRY")
         
         if not pricing_data:
             raise HTTPException(status_code=503, detail="Fiyat verisi alınamadı")
         
         return {
-            "success": True,
+            "success": not entry.is_fallback,
             "region": region,
             "currency": "TRY",
             "pricing": pricing_data,
-            "source": "Azure Retail Prices API",
-            "updated_at": pricing_data.get(list(pricing_data.keys())[0], {}).get("last_updated") if pricing_data else None
+            "source": entry.source,
+            "updated_at": datetime.datetime.fromtimestamp(entry.fetched_at).isoformat()
         }
     
+    except HTTPException:
+        raise
     except Exception as e:
-        print(f"Fiyat endpoint'inde hata: {str(e)}")
-        # Hata durumunda fallback fiyatları döndür
+        logger.error("Fiyat endpoint'inde hata: %s", e, extra={"region": region})
+        # Hata durumunda fallback fiyatları döndür (TRY çevrimi kur tablosunu yenileyebilir)
         from .azure_pricing import get_fallback_pricing
-        fallback_pricing = get_fallback_pricing()
+        fallback_pricing = await run_in_threadpool(get_fallback_pricing)
         
         return {
             "success": False,
@@ -180,28 +427,173 @@ async def get_current_pricing_endpoint(region: str = "westeurope"):
             "updated_at": None
         }
 
-@app.post("/list-vms-detailed", response_model=List[Dict], tags=["VM Analizi"])
-async def list_vms_detailed_endpoint(request_data: VMListRequest):
-    """Tüm VM'leri listeler ve CPU kullanım analizleriyle birlikte döndürür."""
+MAX_COMPARED_REGIONS = 30
+_REGION_NAME = re.compile(r"^[a-z0-9]+$")
+
+def _parse_regions(regions: Optional[str]) -> List[str]:
+    """Virgülle ayrılmış bölge listesi; verilmezse arka planda yenilenen bölgeler kullanılır."""
+    names = [name.strip().lower().replace(" ", "") for name in (regions or "").split(",") if name.strip()]
+    names = list(dict.fromkeys(names)) or list(pricing_cache.regions)
+    invalid = [name for name in names if not _REGION_NAME.match(name)]
+    if invalid:
+        raise HTTPException(status_code=400, detail=f"Geçersiz bölge adı: {', '.join(invalid)}")
+    if len(names) > MAX_COMPARED_REGIONS:
+        raise HTTPException(status_code=400, detail=f"En fazla {MAX_COMPARED_REGIONS} bölge karşılaştırılabilir.")
+    return names
+
+@app.get("/pricing/regions", tags=["Fiyatlandırma"])
+async def multi_region_pricing_endpoint(regions: Optional[str] = None, currency: str = "TRY"):
+    """
+    Birden fazla bölgenin App Service fiyatları (bölge x SKU matrisi) ve SKU başına en ucuz bölge.
+    Önbellekte olmayan bölgeler paralel çekilir. Örn: ?regions=westeurope,northeurope,eastus
+    """
+    matrix = await run_in_threadpool(region_pricing.matrix, _parse_regions(regions))
+    return await run_in_threadpool(matrix.to_dict, currency.upper())
+
+@app.get("/pricing/cheapest-region/{sku}", tags=["Fiyatlandırma"])
+async def cheapest_region_endpoint(sku: str, regions: Optional[str] = None, currency: str = "TRY"):
+    """Verilen SKU için en ucuz bölge ve bölge başına fiyatlar (ucuzdan pahalıya)."""
+    matrix = await run_in_threadpool(region_pricing.matrix, _parse_regions(regions))
+    best = matrix.cheapest_region(sku)
+    if best is None:
+        raise HTTPException(status_code=404, detail=f"{sku} SKU'su için karşılaştırılan bölgelerde fiyat bulunamadı.")
     try:
-        vms_data = get_azure_vms_with_cpu(
-            subscription_id=request_data.subscription_id,
-            tenant_id=request_data.tenant_id,
-            client_id=request_data.client_id,
-            client_secret=request_data.client_secret,
-            cpu_threshold=request_data.cpu_threshold,
-            days_ago_for_metrics=request_data.days_for_metrics
+        rate = await run_in_threadpool(exchange_rates.rate, BASE_CURRENCY, currency.upper())
+    except KeyError:
+        rate, currency = 1.0, BASE_CURRENCY
+    return {
+        "sku": sku,
+        "currency": currency.upper(),
+        "region": best.region,
+        "monthly_price": round(best.monthly_usd * rate, 2),
+        "by_region": {region: round(price * rate, 2) for region, price in matrix.sku_prices(sku).items()},
+        "unavailable_regions": matrix.unavailable,
+    }
+
+@app.get("/pricing/status", tags=["Fiyatlandırma"])
+async def pricing_status_endpoint():
+    """Önbellekteki bölge fiyat tablolarının kaynağı ve yaşı."""
+    return {"refresh_seconds": pricing_cache.refresh_seconds, "regions": pricing_cache.status()}
+
+@app.get("/fx-rates", tags=["Fiyatlandırma"])
+async def fx_rates_endpoint():
+    """Kullanılan döviz kurları (USD bazlı), kaynağı ve alınma zamanı. Tablo eskiyse thread havuzunda yenilenir."""
+    snapshot = await run_in_threadpool(exchange_rates.snapshot)
+    return {
+        "base": BASE_CURRENCY,
+        "source": snapshot.source,
+        "fetched_at": snapshot.fetched_at,
+        "rates": snapshot.rates
+    }
+
+@app.post("/commitments/app-service", tags=["Fiyatlandırma"])
+async def app_service_commitments_endpoint(request_data: CommitmentAnalysisRequest):
+    """
+    App Service planları için rezervasyon ve tasarruf planı analizi: SKU başına başabaş kullanım oranı,
+    en uygun taahhüt miktarı ve seçeneği, filo geneli tasarruf planı taahhüdü.
+    """
+    credentials = request_data.credentials
+    try:
+        return await run_in_threadpool(
+            get_app_service_commitment_recommendations,
+            credentials.subscription_id, credentials.tenant_id, credentials.client_id, credentials.client_secret,
+            request_data.days, request_data.currency.upper()
         )
-        return vms_data
     except Exception as e:
-        print(f"VM listesi endpoint'inde hata: {str(e)}")
-        raise HTTPException(status_code=500, detail=f"VM'ler listelenirken hata: {str(e)}")
+        logger.error("Taahhüt analizi endpoint'inde hata: %s", e, exc_info=True)
+        raise HTTPException(status_code=500, detail=f"Taahhüt analizi yapılırken hata: {str(e)}")
+
+def _json_array_chunks(items: Iterable[Dict], chunk_size: int = VM_SCAN_BATCH_SIZE) -> Iterator[bytes]:
+    """Öğeleri parça parça yazılan tek bir JSON dizisine çevirir; dizinin tamamı bellekte oluşturulmaz."""
+    iterator = iter(items)
+    yield b"["
+    separator = b""
+    while True:
+        chunk = [json.dumps(item, ensure_ascii=False) for item in itertools.islice(iterator, chunk_size)]
+        if not chunk:
+            break
+        yield separator + ",".join(chunk).encode("utf-8")
+        separator = b","
+    yield b"]"
+
+async def _start_stream(items: Iterator, error_detail: str) -> Iterator:
+    """
+    Akışın ilk öğesini yanıt başlamadan (thread havuzunda) çeker: kimlik doğrulama ya da listeleme hatası 500
+    olarak döner. Akış başladıktan sonraki hatalar yanıtı yarıda keser; gövde geçersiz kalır, eksik sonuç tam
+    sonuç gibi görünmez.
+    """
+    end = object()
+    try:
+        first = await run_in_threadpool(next, items, end)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"{error_detail}: {str(e)}")
+    return iter(()) if first is end else itertools.chain([first], items)
+
+@app.post("/list-vms-detailed", response_model=List[Dict], tags=["VM Analizi"])
+async def list_vms_detailed_endpoint(request_data: VMListRequest):
+    """
+    Çalışan VM'leri CPU kullanım analizleriyle birlikte döndürür. VM'ler partiler halinde analiz edilip JSON dizisi
+    olarak akıtılır; yanıt filo büyüklüğünden bağımsız, sabit bellekle üretilir. Akış ortasında bir hata olursa
+    yanıt yarıda kesilir (geçersiz JSON).
+    """
+    vms = iter_azure_vms_with_cpu(
+        subscription_id=request_data.subscription_id,
+        tenant_id=request_data.tenant_id,
+        client_id=request_data.client_id,
+        client_secret=request_data.client_secret,
+        cpu_threshold=request_data.cpu_threshold,
+        days_ago_for_metrics=request_data.days_for_metrics
+    )
+    vms = await _start_stream(vms, "VM'ler listelenemedi")
+    return StreamingResponse(_json_array_chunks(vms), media_type="application/json")
+
+def _export_response(dataset: Dataset, fmt: str) -> StreamingResponse:
+    """Veri kümesini parça parça yazan indirme yanıtı; tüm satırlar bellekte toplanmaz."""
+    media_type, extension = EXPORT_FORMATS[fmt]
+    filename = f"{dataset.name}_{datetime.datetime.now(datetime.timezone.utc):%Y%m%d_%H%M%S}.{extension}"
+    # Senkron üreteç Starlette tarafından thread havuzunda tüketilir; olay döngüsü bloklanmaz
+    return StreamingResponse(stream_export(dataset, fmt), media_type=media_type,
+                             headers={"Content-Disposition": f'attachment; filename="{filename}"'})
+
+def _check_export_format(fmt: str) -> None:
+    try:
+        check_format(fmt)
+    except (ValueError, ExportUnavailable) as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@app.get("/export/recommendations", tags=["Dışa Aktarım"])
+async def export_recommendations_endpoint(subscription_id: Optional[str] = None, format: str = "csv"):
+    """Son tarama sonuçlarını CSV, NDJSON ya da Parquet olarak indirir (abonelik verilmezse tümü)."""
+    _check_export_format(format)
+    return _export_response(recommendations_dataset(subscription_id), format)
+
+@app.get("/export/findings", tags=["Dışa Aktarım"])
+async def export_findings_endpoint(subscription_id: Optional[str] = None, days: Optional[int] = Query(None, ge=1),
+                                   format: str = "csv"):
+    """Geçmiş deposundaki tarama başına kaynak bulgularını ve aylık maliyetlerini indirir."""
+    _check_export_format(format)
+    return _export_response(findings_dataset(subscription_id, days), format)
+
+@app.post("/export/vms", tags=["Dışa Aktarım"])
+async def export_vms_endpoint(request_data: VMListRequest, format: str = "csv"):
+    """
+    VM CPU kullanım analizini, VM'ler Azure'dan okundukça yanıta yazarak indirir. Listeleme hatası 500 döner;
+    akış ortasındaki bir hata indirmeyi yarıda keser.
+    """
+    _check_export_format(format)
+    dataset = vms_dataset(
+        request_data.subscription_id, request_data.tenant_id, request_data.client_id, request_data.client_secret,
+        request_data.cpu_threshold, request_data.days_for_metrics
+    )
+    dataset = dataset._replace(chunks=await _start_stream(dataset.chunks, "VM'ler listelenemedi"))
+    return _export_response(dataset, format)
 
 @app.post("/stop-vm", response_model=Dict, tags=["VM Eylemleri"])
 async def stop_vm_endpoint(request_data: StopVMRequest):
     """Belirtilen VM'i durdurur ve deallocate eder."""
     try:
-        success, message = stop_and_deallocate_vm(
+        success, message = await run_in_threadpool(
+            stop_and_deallocate_vm,
             subscription_id=request_data.credentials.subscription_id,
             tenant_id=request_data.credentials.tenant_id,
             client_id=request_data.credentials.client_id,
@@ -210,13 +602,78 @@ async def stop_vm_endpoint(request_data: StopVMRequest):
         )
         return {"success": success, "message": message}
     except Exception as e:
-        print(f"VM durdurma endpoint'inde hata: {str(e)}")
+        logger.error("VM durdurma endpoint'inde hata: %s", e, exc_info=True)
         raise HTTPException(status_code=500, detail=f"VM durdurulamadı: {str(e)}")
 
+@app.post("/actions/bulk", tags=["Eylemler - Toplu"])
+async def submit_bulk_actions_endpoint(request_data: BulkActionRequest):
+    """
+    Çok sayıda VM/App Service Plan eylemini (örn: taramadan gelen plan küçültmeleri) eşzamanlı başlatır;
+    durum için batch_id döndürür. Plan silmelerinin boşluk kontrolü tek bir uygulama indeksinden yapılır.
+    """
+    items: List[BulkActionItem] = []
+    for vm_id in request_data.vm_ids:
+        items.append(BulkActionItem(len(items), BulkActionType.STOP_VM, vm_id))
+    for plan_action in request_data.plan_actions:
+        params = {"resource_group_name": plan_action.resource_group_name}
+        if plan_action.action == "update_sku":
+            if not plan_action.target_sku_name or not plan_action.target_sku_tier:
+                raise HTTPException(status_code=400, detail=f"{plan_action.plan_name}: update_sku için target_sku_name ve target_sku_tier gerekli.")
+            params.update(target_sku_name=plan_action.target_sku_name, target_sku_tier=plan_action.target_sku_tier,
+                          target_sku_capacity=plan_action.target_sku_capacity)
+            items.append(BulkActionItem(len(items), BulkActionType.UPDATE_PLAN_SKU, plan_action.plan_name, params))
+        elif plan_action.action == "delete":
+            items.append(BulkActionItem(len(items), BulkActionType.DELETE_PLAN, plan_action.plan_name, params))
+        else:
+            raise HTTPException(status_code=400, detail=f"Bilinmeyen plan eylemi: {plan_action.action}")
+    if not items:
+        raise HTTPException(status_code=400, detail="En az bir VM veya plan eylemi belirtilmeli.")
+    if len(items) > MAX_BATCH_ITEMS:
+        raise HTTPException(status_code=400, detail=f"Bir toplu işlemde en fazla {MAX_BATCH_ITEMS} eylem olabilir.")
+
+    credentials = request_data.credentials
+    batch = bulk_action_manager.submit(
+        subscription_id=credentials.subscription_id,
+        tenant_id=credentials.tenant_id,
+        client_id=credentials.client_id,
+        client_secret=credentials.client_secret,
+        items=items,
+        max_concurrency=request_data.max_concurrency or DEFAULT_MAX_CONCURRENCY,
+        dry_run=request_data.dry_run
+    )
+    return batch.to_dict()
+
+@app.get("/actions/bulk/{batch_id}", tags=["Eylemler - Toplu"])
+async def get_bulk_actions_endpoint(batch_id: str, include_items: bool = True):
+    """Toplu işlemin genel durumunu ve öğe bazlı sonuçlarını döndürür."""
+    batch = bulk_action_manager.get(batch_id)
+    if batch is None:
+        raise HTTPException(status_code=404, detail="Toplu işlem bulunamadı")
+    return batch.to_dict(include_items=include_items)
+
 @app.post("/cost-details", response_model=Optional[CostDetailsResponse], tags=["Maliyet Detayları"])
 async def get_cost_details_endpoint(request_data: CostDetailsRequest):
-    """Belirtilen Azure kapsamı için maliyet ve kullanım detaylarını alır."""
-    cost_data = get_cost_details(
+    """
+    Belirtilen Azure kapsamı için maliyet ve kullanım detaylarını alır. Kapsam abonelikse yanıt maliyet dağıtımı
+    rollup'ından (tag kırılımıyla birlikte) üretilir; abonelik için henüz veri yoksa önce Cost Management'tan
+    yüklenir.
+    """
+    credentials = request_data.credentials
+    subscription_id = credentials.subscription_id
+    if request_data.scope.strip("/").lower() == f"subscriptions/{subscription_id}".lower():
+        days = request_data.time_period_days or 30
+        cost_data = await run_in_threadpool(get_cost_store().cost_details, subscription_id, days)
+        if not cost_data:
+            try:
+                await run_in_threadpool(refresh_cost_allocation, subscription_id, credentials.tenant_id,
+                                        credentials.client_id, credentials.client_secret)
+                cost_data = await run_in_threadpool(get_cost_store().cost_details, subscription_id, days)
+            except Exception as e:
+                logger.error("Maliyet dağıtımı yüklenemedi: %s", e, exc_info=logger.isEnabledFor(logging.DEBUG))
+        if cost_data:
+            return cost_data
+    cost_data = await run_in_threadpool(
+        get_cost_details,
         subscription_id=request_data.credentials.subscription_id,
         tenant_id=request_data.credentials.tenant_id,
         client_id=request_data.credentials.client_id,
@@ -228,11 +685,54 @@ async def get_cost_details_endpoint(request_data: CostDetailsRequest):
         return None
     return cost_data
 
+@app.post("/cost-allocation/refresh", tags=["Maliyet Detayları"])
+async def refresh_cost_allocation_endpoint(request_data: CostAllocationRefreshRequest):
+    """Envanter tag'lerini ve son günlerin maliyetlerini çekip maliyet dağıtım rollup'ını günceller."""
+    credentials = request_data.credentials
+    try:
+        return await run_in_threadpool(
+            refresh_cost_allocation,
+            credentials.subscription_id, credentials.tenant_id, credentials.client_id, credentials.client_secret,
+            request_data.days, request_data.reallocate
+        )
+    except Exception as e:
+        logger.error("Maliyet dağıtımı güncellenirken hata: %s", e, exc_info=True)
+        raise HTTPException(status_code=500, detail=f"Maliyet dağıtımı güncellenirken hata: {str(e)}")
+
+@app.get("/cost-allocation", tags=["Maliyet Detayları"])
+async def cost_allocation_endpoint(
+    group_by: List[str] = Query(..., description="Boyutlar: tag:<anahtar>, resource_group, service, resource, day, month"),
+    subscription_id: Optional[str] = None,
+    start: Optional[datetime.date] = None,
+    end: Optional[datetime.date] = None,
+    tag: Optional[List[str]] = Query(None, description="anahtar=değer tag filtresi, örn: team=payments"),
+    resource_group: Optional[str] = None,
+    service: Optional[str] = None,
+    currency: str = BASE_CURRENCY,
+    top: int = 100
+):
+    """
+    Tag bazlı maliyet dağıtımı: maliyetleri istenen boyutlara göre gruplar (örn: group_by=tag:team&group_by=
+    resource_group). Yanıt Cost Management'a gitmeden önceden hesaplanmış günlük rollup'tan üretilir.
+    """
+    filters: Dict[str, str] = {"resource_group": resource_group, "service": service}
+    for item in tag or []:
+        key, separator, value = item.partition("=")
+        if not separator or not key.strip():
+            raise HTTPException(status_code=400, detail=f"Tag filtresi anahtar=değer biçiminde olmalı: {item}")
+        filters[f"tag:{key.strip()}"] = value.strip()
+    try:
+        return await run_in_threadpool(get_cost_store().query, group_by, subscription_id, start, end, filters,
+                                       currency.upper(), top)
+    except InvalidCostQuery as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
 @app.post("/actions/update-app-service-plan-sku", response_model=ActionResponse, tags=["Eylemler - App Service Plan"])
 async def update_asp_sku_endpoint(request_data: UpdateAppServicePlanSkuRequest):
     """Bir App Service Planının SKU'sunu günceller."""
     try:
-        success, message, details = update_app_service_plan_sku(
+        success, message, details = await run_in_threadpool(
+            update_app_service_plan_sku,
             subscription_id=request_data.credentials.subscription_id,
             tenant_id=request_data.credentials.tenant_id,
             client_id=request_data.credentials.client_id,
@@ -252,14 +752,15 @@ async def update_asp_sku_endpoint(request_data: UpdateAppServicePlanSkuRequest):
     except HTTPException: 
         raise
     except Exception as e:
-        print(f"Update ASP SKU endpoint'inde beklenmedik hata: {str(e)}")
+        logger.error("Update ASP SKU endpoint'inde beklenmedik hata: %s", e, exc_info=True)
         raise HTTPException(status_code=500, detail=f"App Service Plan SKU güncellenirken sunucu hatası: {str(e)}")
 
 @app.post("/actions/delete-app-service-plan", response_model=ActionResponse, tags=["Eylemler - App Service Plan"])
 async def delete_asp_endpoint(request_data: DeleteAppServicePlanRequest):
     """Boş bir App Service Planını siler."""
     try:
-        success, message, details = delete_app_service_plan(
+        success, message, details = await run_in_threadpool(
+            delete_app_service_plan,
             subscription_id=request_data.credentials.subscription_id,
             tenant_id=request_data.credentials.tenant_id,
             client_id=request_data.credentials.client_id,
@@ -280,7 +781,7 @@ async def delete_asp_endpoint(request_data: DeleteAppServicePlanRequest):
     except HTTPException:
         raise
     except Exception as e:
-        print(f"Delete ASP endpoint'inde beklenmedik hata: {str(e)}")
+        logger.error("Delete ASP endpoint'inde beklenmedik hata: %s", e, exc_info=True)
         raise HTTPException(status_code=500, detail=f"App Service Plan silinirken sunucu hatası: {str(e)}")
 
 # Sahipsiz Genel IP silme endpoint'i (Yorum satırı olarak kalabilir veya gelecekte eklenebilir)
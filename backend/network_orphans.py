@@ -0,0 +1,112 @@
+# Genel IP'lerin ağ kaynaklarıyla ilişkisinden sahipsiz/boşta IP tespiti.
+# NAT gateway, load balancer ve NIC listeleri abonelik genelinde birer kez alınır ve IP kimliğinden referansa
+# bir indeks kurulur; her IP tek geçişte bu indeksle sınıflandırılır (IP başına ek API çağrısı yapılmaz).
+# NAT gateway'e bağlı IP'lerde `ip_configuration` boştur; indeks bunları sahipsiz saymayı önler.
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+# Referans türleri
+REF_NAT_GATEWAY = "nat_gateway"
+REF_LOAD_BALANCER = "load_balancer"
+REF_NETWORK_INTERFACE = "network_interface"
+
+# Sahipsiz/boşta IP nedenleri
+REASON_UNATTACHED = "unattached"
+REASON_IDLE_NAT_GATEWAY = "idle_nat_gateway"
+REASON_UNUSED_LB_FRONTEND = "unused_lb_frontend"
+REASON_DETACHED_NIC = "detached_nic"
+
+_IDLE_REASONS = {
+    REF_NAT_GATEWAY: REASON_IDLE_NAT_GATEWAY,
+    REF_LOAD_BALANCER: REASON_UNUSED_LB_FRONTEND,
+    REF_NETWORK_INTERFACE: REASON_DETACHED_NIC,
+}
+
+# Load balancer frontend'ini kullanan kural listeleri; hiçbiri yoksa frontend trafik almaz
+_LB_FRONTEND_RULES = ("load_balancing_rules", "inbound_nat_rules", "inbound_nat_pools", "outbound_rules")
+
+
+class IpReference(NamedTuple):
+    """Bir IP'yi kullanan kaynak ve o kaynağın gerçekten kullanımda olup olmadığı."""
+    kind: str
+    owner_id: Optional[str]
+    active: bool
+
+
+class OrphanIp(NamedTuple):
+    public_ip: object
+    reason: str
+    attached_to: Optional[str]
+
+
+def _key(resource_id: Optional[str]) -> Optional[str]:
+    # ARM kimlikleri büyük/küçük harf duyarsızdır
+    return resource_id.lower() if resource_id else None
+
+
+def _sub_resource_ids(items) -> List[str]:
+    return [item.id for item in items or [] if getattr(item, "id", None)]
+
+
+def build_reference_index(nat_gateways: Iterable, load_balancers: Iterable,
+                          network_interfaces: Iterable) -> Dict[str, IpReference]:
+    """
+    Genel IP kimliği (küçük harf) -> referans. Bir IP birden fazla yerde görünürse etkin referans tercih edilir.
+    - NAT gateway: hiçbir subnet'e bağlı değilse boşta
+    - Load balancer frontend'i: hiçbir kural kullanmıyorsa boşta
+    - NIC: bir VM'e bağlı değilse boşta
+    """
+    index: Dict[str, IpReference] = {}
+
+    def add(ip_id: Optional[str], reference: IpReference) -> None:
+        key = _key(ip_id)
+        if key is None:
+            return
+        previous = index.get(key)
+        if previous is None or (reference.active and not previous.active):
+            index[key] = reference
+
+    for gateway in nat_gateways:
+        active = bool(getattr(gateway, "subnets", None))
+        for ip_id in _sub_resource_ids(getattr(gateway, "public_ip_addresses", None)):
+            add(ip_id, IpReference(REF_NAT_GATEWAY, gateway.id, active))
+
+    for balancer in load_balancers:
+        for frontend in getattr(balancer, "frontend_ip_configurations", None) or []:
+            public_ip = getattr(frontend, "public_ip_address", None)
+            if public_ip is None:
+                continue
+            active = any(getattr(frontend, rules, None) for rules in _LB_FRONTEND_RULES)
+            add(public_ip.id, IpReference(REF_LOAD_BALANCER, balancer.id, active))
+
+    for nic in network_interfaces:
+        active = getattr(nic, "virtual_machine", None) is not None
+        for ip_configuration in getattr(nic, "ip_configurations", None) or []:
+            public_ip = getattr(ip_configuration, "public_ip_address", None)
+            if public_ip is not None:
+                add(public_ip.id, IpReference(REF_NETWORK_INTERFACE, nic.id, active))
+
+    return index
+
+
+def classify_public_ip(public_ip, index: Dict[str, IpReference]) -> Optional[Tuple[str, Optional[str]]]:
+    """
+    IP sahipsiz ya da boştaki bir kaynağa bağlıysa (neden, bağlı kaynak), kullanımdaysa None.
+    İndekste olmayan ama `ip_configuration`/`nat_gateway` alanı dolu IP'ler (VPN gateway, Application Gateway,
+    Bastion, Firewall vb.) kullanımda sayılır.
+    """
+    reference = index.get(_key(public_ip.id))
+    if reference is not None:
+        return None if reference.active else (_IDLE_REASONS[reference.kind], reference.owner_id)
+    if getattr(public_ip, "ip_configuration", None) is not None or getattr(public_ip, "nat_gateway", None) is not None:
+        return None
+    return REASON_UNATTACHED, None
+
+
+def find_orphan_ips(public_ips: Iterable, index: Dict[str, IpReference]) -> List[OrphanIp]:
+    """Tüm IP'leri tek geçişte sınıflandırır; yalnızca sahipsiz/boştaki IP'leri döndürür."""
+    orphans = []
+    for public_ip in public_ips:
+        result = classify_public_ip(public_ip, index)
+        if result is not None:
+            orphans.append(OrphanIp(public_ip, *result))
+    return orphans
@@ -0,0 +1,262 @@
+# App Service fiyat tablolarının süreç içi önbelleği.
+# Başlangıçta disk snapshot'ından yüklenir, arka plan thread'i tarafından periyodik olarak yenilenir ve
+# bölge tablosu atomik olarak değiştirilir. İstekler yalnızca bellekteki tabloyu okur; önbellekte olmayan
+# bir bölge istenirse aynı bölge için tek bir Retail Prices çağrısı yapılır (single-flight).
+import json
+import logging
+import os
+import threading
+import time
+from typing import Dict, Iterable, List, NamedTuple, Optional
+
+from .azure_pricing import AzureRetailPrices, convert_price_table, get_fallback_pricing
+from .fx_rates import exchange_rates
+from .telemetry import registry
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PRICING_REGIONS = ("westeurope",)
+DEFAULT_PRICING_SNAPSHOT_PATH = os.path.join("data", "pricing_snapshot.json")
+DEFAULT_PRICING_REFRESH_SECONDS = 3600.0
+# Fiyatı alınamayıp tahmini tabloyla doldurulan bölgeler bu aralıkla yeniden denenir
+FALLBACK_RETRY_SECONDS = 300.0
+# PRICING_REGIONS dışında istek üzerine önbelleğe alınan en fazla bölge; aşılırsa en eski tablolar çıkarılır
+MAX_REQUESTED_REGIONS = 50
+SOURCE_API = "Azure Retail Prices API"
+SOURCE_FALLBACK = "Fallback Pricing"
+
+
+class PricingEntry(NamedTuple):
+    """Bir bölgenin USD fiyat tablosu; `source` API ya da tahmini tablo olduğunu belirtir."""
+    prices: Dict[str, Dict]
+    fetched_at: float
+    source: str
+
+    @property
+    def is_fallback(self) -> bool:
+        return self.source == SOURCE_FALLBACK
+
+
+class PricingCache:
+    """Bölge başına USD App Service fiyat tabloları; para birimi çevrimi okuma sırasında yapılır."""
+
+    def __init__(self, regions: Iterable[str] = DEFAULT_PRICING_REGIONS,
+                 snapshot_path: Optional[str] = DEFAULT_PRICING_SNAPSHOT_PATH,
+                 refresh_seconds: float = DEFAULT_PRICING_REFRESH_SECONDS):
+        self.regions = [region for region in regions if region]
+        self.snapshot_path = snapshot_path
+        self.refresh_seconds = refresh_seconds
+        # Okuyucular kilitsiz okur; yazarlar yeni bir sözlük oluşturup referansı değiştirir
+        self._tables: Dict[str, PricingEntry] = {}
+        # Her tablo değişiminde artar; türetilmiş yapılar (bölge x SKU matrisi) geçerliliği buna göre kontrol eder
+        self.version = 0
+        self._write_lock = threading.Lock()
+        self._inflight: Dict[str, threading.Event] = {}
+        self._inflight_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    # --- Okuma ------------------------------------------------------------
+
+    def get_usd_prices(self, region: str) -> PricingEntry:
+        """Bölgenin USD fiyat tablosu. Önbellekte yoksa bölge başına tek bir çağrıyla çekilir."""
+        return self.get_many([region])[region]
+
+    def get_many(self, regions: Iterable[str]) -> Dict[str, PricingEntry]:
+        """
+        Birden fazla bölgenin tablosu. Önbellekte olmayan bölgeler tek seferde eşzamanlı çekilir; başka bir
+        isteğin zaten çektiği bölgeler için o çekimin bitmesi beklenir (single-flight).
+        """
+        regions = list(dict.fromkeys(regions))
+        tables = self._tables
+        result: Dict[str, PricingEntry] = {}
+        for region in regions:
+            entry = tables.get(region)
+            registry.record_cache_access("app_service_pricing", entry is not None)
+            if entry is not None:
+                result[region] = entry
+        missing = [region for region in regions if region not in result]
+        if not missing:
+            return result
+
+        led: Dict[str, threading.Event] = {}
+        waiting: Dict[str, threading.Event] = {}
+        with self._inflight_lock:
+            for region in missing:
+                event = self._inflight.get(region)
+                if event is None:
+                    led[region] = self._inflight[region] = threading.Event()
+                else:
+                    waiting[region] = event
+        try:
+            if led:
+                updates = self._fetch_many(list(led))
+                self._swap(updates)
+                result.update(updates)
+        finally:
+            with self._inflight_lock:
+                for region in led:
+                    del self._inflight[region]
+            for event in led.values():
+                event.set()
+
+        for region, event in waiting.items():
+            event.wait()
+            entry = self._tables.get(region)
+            result[region] = entry if entry is not None else PricingEntry(get_fallback_pricing("USD"), time.time(),
+                                                                          SOURCE_FALLBACK)
+        return {region: result[region] for region in regions}
+
+    def cached(self, region: str) -> Optional[PricingEntry]:
+        """Bölgenin önbellekteki tablosu; yoksa None (çağrı yapılmaz)."""
+        entry = self._tables.get(region)
+        if entry is not None:
+            registry.record_cache_access("app_service_pricing", True)
+        return entry
+
+    def get_pricing(self, region: str, currency: str = "TRY") -> Dict[str, Dict]:
+        """Bölgenin fiyat tablosunu istenen para biriminde döndürür."""
+        return convert_price_table(self.get_usd_prices(region).prices, currency)
+
+    def status(self) -> List[Dict]:
+        now = time.time()
+        return [
+            {"region": region, "source": entry.source, "sku_count": len(entry.prices),
+             "fetched_at": entry.fetched_at, "age_seconds": round(now - entry.fetched_at, 1)}
+            for region, entry in sorted(self._tables.items())
+        ]
+
+    # --- Yazma ------------------------------------------------------------
+
+    def _swap(self, updates: Dict[str, PricingEntry], drop: Iterable[str] = ()) -> None:
+        with self._write_lock:
+            tables = {**self._tables, **updates}
+            for region in drop:
+                tables.pop(region, None)
+            requested = [region for region in tables if region not in self.regions]
+            if len(requested) > MAX_REQUESTED_REGIONS:
+                requested.sort(key=lambda region: tables[region].fetched_at)
+                for region in requested[:len(requested) - MAX_REQUESTED_REGIONS]:
+                    del tables[region]
+            self._tables = tables
+            self.version += 1
+
+    def clear(self) -> None:
+        with self._write_lock:
+            self._tables = {}
+            self.version += 1
+
+    def _entry(self, region: str, prices: Dict[str, Dict]) -> PricingEntry:
+        if prices:
+            return PricingEntry(prices, time.time(), SOURCE_API)
+        previous = self._tables.get(region)
+        if previous is not None and not previous.is_fallback:
+            # API geçici olarak başarısız; eski gerçek fiyatlar tahmini tablodan iyidir
+            logger.warning("Fiyatlar yenilenemedi, eski tablo korunuyor", extra={"region": region})
+            return previous
+        logger.warning("API'den fiyat alınamadı, varsayılan fiyatlar kullanılıyor", extra={"region": region})
+        return PricingEntry(get_fallback_pricing("USD"), time.time(), SOURCE_FALLBACK)
+
+    def _fetch_many(self, regions: List[str]) -> Dict[str, PricingEntry]:
+        tables = AzureRetailPrices.get_app_service_prices_many("USD", regions)
+        return {region: self._entry(region, tables.get(region, {})) for region in regions}
+
+    def refresh_region(self, region: str) -> PricingEntry:
+        entry = self._fetch_many([region])[region]
+        self._swap({region: entry})
+        return entry
+
+    def refresh_all(self) -> None:
+        """
+        Yapılandırılmış ve o ana kadar istenmiş bölgeleri yeniler; sonuçlar tek seferde yerleştirilir. İstek
+        üzerine eklenip hiç gerçek fiyatı alınamamış bölgeler (örn: var olmayan bölge adı) yenilenmez, çıkarılır.
+        """
+        tables = self._tables
+        unknown = [region for region, entry in tables.items() if region not in self.regions and entry.is_fallback]
+        regions = list(dict.fromkeys(self.regions + [region for region in tables if region not in unknown]))
+        if regions or unknown:
+            self._swap(self._fetch_many(regions), drop=unknown)
+        self.save_snapshot()
+        # Kur tablosu da aynı döngüde tazelenir (TTL dolmadıysa çağrı yapılmaz)
+        exchange_rates.snapshot()
+
+    # --- Disk snapshot ----------------------------------------------------
+
+    def load_snapshot(self) -> int:
+        """Disk snapshot'ındaki tabloları belleğe yükler; yüklenen bölge sayısını döndürür."""
+        if not self.snapshot_path or not os.path.exists(self.snapshot_path):
+            return 0
+        try:
+            with open(self.snapshot_path, encoding="utf-8") as f:
+                data = json.load(f)
+            entries = {
+                region: PricingEntry(item["prices"], float(item["fetched_at"]), item["source"])
+                for region, item in data.get("regions", {}).items()
+            }
+        except (OSError, ValueError, KeyError) as e:
+            logger.warning("Fiyat snapshot'ı okunamadı: %s", e, extra={"path": self.snapshot_path})
+            return 0
+        self._swap(entries)
+        logger.info("Fiyat snapshot'ı yüklendi", extra={"regions": len(entries), "path": self.snapshot_path})
+        return len(entries)
+
+    def save_snapshot(self) -> None:
+        if not self.snapshot_path:
+            return
+        tables = {region: entry for region, entry in self._tables.items() if not entry.is_fallback}
+        if not tables:
+            return
+        try:
+            directory = os.path.dirname(self.snapshot_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            tmp_path = f"{self.snapshot_path}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({"regions": {region: entry._asdict() for region, entry in tables.items()}}, f)
+            os.replace(tmp_path, self.snapshot_path)
+        except OSError as e:
+            logger.warning("Fiyat snapshot'ı yazılamadı: %s", e, extra={"path": self.snapshot_path})
+
+    # --- Arka plan yenileme -----------------------------------------------
+
+    def _next_wait(self) -> float:
+        tables = self._tables
+        if any(region not in tables for region in self.regions):
+            return 0.0
+        if not tables:
+            return self.refresh_seconds
+        if any(entry.is_fallback for entry in tables.values()):
+            return min(self.refresh_seconds, FALLBACK_RETRY_SECONDS)
+        oldest = min(entry.fetched_at for entry in tables.values())
+        return max(oldest + self.refresh_seconds - time.time(), 0.0)
+
+    def _run(self) -> None:
+        while not self._stop.wait(self._next_wait()):
+            try:
+                self.refresh_all()
+            except Exception as e:
+                logger.error("Fiyat yenileme başarısız: %s", e, exc_info=logger.isEnabledFor(logging.DEBUG))
+                if self._stop.wait(FALLBACK_RETRY_SECONDS):
+                    break
+
+    def start(self) -> None:
+        """Snapshot'ı yükler ve yenileme thread'ini başlatır; eksik ya da eski bölgeler hemen yenilenir."""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self.load_snapshot()
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="pricing-refresher", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 5.0) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+
+pricing_cache = PricingCache(
+    regions=[region.strip() for region in os.getenv("PRICING_REGIONS", ",".join(DEFAULT_PRICING_REGIONS)).split(",")],
+    snapshot_path=os.getenv("PRICING_SNAPSHOT_PATH", DEFAULT_PRICING_SNAPSHOT_PATH),
+    refresh_seconds=float(os.getenv("PRICING_REFRESH_SECONDS", DEFAULT_PRICING_REFRESH_SECONDS))
+)
@@ -0,0 +1,175 @@
+# Azure Retail Prices için paylaşılan, asenkron HTTP istemcisi.
+# Tek bir arka plan event loop'unda çalışan httpx.AsyncClient bağlantıları açık tutar (keep-alive; `h2` kuruluysa
+# HTTP/2), host başına eşzamanlı istek sayısını sınırlar, bağlantı ve okuma zaman aşımlarını ayırır ve yanıtları
+# gzip ile ister. Senkron kod (thread havuzları, tarayıcı) coroutine'leri `run_pricing()` ile çalıştırır;
+# sayfalı ve çok bölgeli çekimler aynı loop'ta eşzamanlı yürür. httpx ilk istekte yüklenir.
+import asyncio
+import contextvars
+import importlib
+import importlib.util
+import logging
+import os
+import threading
+from concurrent.futures import Future
+from typing import Any, Coroutine, Dict, Optional, TypeVar
+from urllib.parse import urlsplit
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Havuzdaki toplam bağlantı ve aynı host'a aynı anda gönderilecek istek sayısı
+PRICE_HTTP_MAX_CONNECTIONS = int(os.getenv("PRICE_HTTP_MAX_CONNECTIONS", 16))
+PRICE_HTTP_PER_HOST = int(os.getenv("PRICE_HTTP_PER_HOST", 8))
+PRICE_HTTP_CONNECT_TIMEOUT = float(os.getenv("PRICE_HTTP_CONNECT_TIMEOUT", 5.0))
+PRICE_HTTP_READ_TIMEOUT = float(os.getenv("PRICE_HTTP_READ_TIMEOUT", 30.0))
+# Boştaki bağlantıların açık tutulacağı süre; fiyat yenileme aralığından kısa olduğundan yenilemeler arası kapanır
+PRICE_HTTP_KEEPALIVE_SECONDS = 60.0
+# Yalnızca bağlantı kurulamadığında (istek gönderilmeden) yapılacak tekrar sayısı
+PRICE_HTTP_CONNECT_RETRIES = 1
+
+
+class PricingRequestError(Exception):
+    """Retail Prices isteği ağ hatası, zaman aşımı ya da başarısız HTTP durumu ile sonuçlandı."""
+
+
+def http2_available() -> bool:
+    return importlib.util.find_spec("h2") is not None
+
+
+class RetailPricesClient:
+    """
+    Süreç başına bir httpx.AsyncClient ve onu çalıştıran event loop thread'i. İlk kullanımda başlar;
+    `close()` sonrası tekrar kullanılırsa yeniden başlar.
+    """
+
+    def __init__(self, max_connections: int = PRICE_HTTP_MAX_CONNECTIONS, per_host: int = PRICE_HTTP_PER_HOST,
+                 connect_timeout: float = PRICE_HTTP_CONNECT_TIMEOUT, read_timeout: float = PRICE_HTTP_READ_TIMEOUT,
+                 http2: Optional[bool] = None):
+        self.max_connections = max_connections
+        self.per_host = per_host
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.http2 = http2_available() if http2 is None else http2
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._client = None
+        # Semaforlar loop thread'inde oluşturulur ve yalnızca orada kullanılır
+        self._host_limits: Dict[str, asyncio.Semaphore] = {}
+        self._lock = threading.Lock()
+
+    # --- Loop yaşam döngüsü -----------------------------------------------
+
+    def _ensure_loop(self) -> asyncio.AbstractEventLoop:
+        with self._lock:
+            if self._loop is None:
+                loop = asyncio.new_event_loop()
+                thread = threading.Thread(target=loop.run_forever, name="pricing-http", daemon=True)
+                thread.start()
+                self._loop, self._thread = loop, thread
+            return self._loop
+
+    def run(self, coro: Coroutine[Any, Any, T], timeout: Optional[float] = None) -> T:
+        """
+        Coroutine'i istemcinin loop'unda çalıştırır ve sonucunu bekler. Görev çağıranın bağlamıyla
+        (aktif iz dahil) oluşturulur; span'ler çağıranın izine yazılır.
+        """
+        loop = self._ensure_loop()
+        if threading.current_thread() is self._thread:
+            coro.close()
+            raise RuntimeError("run() fiyat istemcisinin kendi loop'undan çağrılamaz; coroutine'i await edin")
+        result: Future = Future()
+
+        def start() -> None:
+            task = loop.create_task(coro)
+            task.add_done_callback(lambda done: _copy_result(done, result))
+
+        loop.call_soon_threadsafe(start, context=contextvars.copy_context())
+        return result.result(timeout)
+
+    def close(self, timeout: float = 5.0) -> None:
+        """Açık bağlantıları kapatır ve loop thread'ini durdurur."""
+        with self._lock:
+            loop, thread = self._loop, self._thread
+            self._loop = self._thread = None
+        if loop is None:
+            return
+        if self._client is not None:
+            try:
+                asyncio.run_coroutine_threadsafe(self._client.aclose(), loop).result(timeout)
+            except Exception as e:
+                logger.warning("Fiyat HTTP istemcisi kapatılamadı: %s", e)
+            self._client = None
+        self._host_limits = {}
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join(timeout)
+        loop.close()
+
+    # --- İstekler (loop içinde) -------------------------------------------
+
+    def _http_client(self):
+        if self._client is None:
+            httpx = importlib.import_module("httpx")
+            transport = httpx.AsyncHTTPTransport(
+                http2=self.http2, retries=PRICE_HTTP_CONNECT_RETRIES,
+                limits=httpx.Limits(max_connections=self.max_connections,
+                                    max_keepalive_connections=self.max_connections,
+                                    keepalive_expiry=PRICE_HTTP_KEEPALIVE_SECONDS),
+            )
+            self._client = httpx.AsyncClient(
+                transport=transport,
+                timeout=httpx.Timeout(self.read_timeout, connect=self.connect_timeout),
+                headers={"Accept": "application/json", "Accept-Encoding": "gzip"},
+            )
+        return self._client
+
+    def _host_limit(self, url: str) -> asyncio.Semaphore:
+        host = urlsplit(url).netloc
+        limit = self._host_limits.get(host)
+        if limit is None:
+            limit = self._host_limits[host] = asyncio.Semaphore(self.per_host)
+        return limit
+
+    async def get_json(self, url: str, params: Optional[Dict[str, str]] = None) -> Dict:
+        """GET isteği; ağ hataları ve 4xx/5xx yanıtları PricingRequestError olarak yükseltilir."""
+        httpx = importlib.import_module("httpx")
+        client = self._http_client()
+        async with self._host_limit(url):
+            try:
+                response = await client.get(url, params=params)
+                response.raise_for_status()
+            except httpx.HTTPError as e:
+                raise PricingRequestError(f"{type(e).__name__}: {e}") from e
+        return response.json()
+
+
+def _copy_result(task: "asyncio.Task", result: Future) -> None:
+    if task.cancelled():
+        result.cancel()
+    elif task.exception() is not None:
+        result.set_exception(task.exception())
+    else:
+        result.set_result(task.result())
+
+
+_client: Optional[RetailPricesClient] = None
+_client_lock = threading.Lock()
+
+
+def retail_prices_client() -> RetailPricesClient:
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = RetailPricesClient()
+    return _client
+
+
+def run_pricing(coro: Coroutine[Any, Any, T]) -> T:
+    """Fiyat coroutine'ini paylaşılan istemcinin loop'unda çalıştırır (senkron çağıranlar için)."""
+    return retail_prices_client().run(coro)
+
+
+def close_pricing_client() -> None:
+    if _client is not None:
+        _client.close()
@@ -0,0 +1,376 @@
+# Özel öneriler için kompakt, tipli iç temsil.
+# Analiz fonksiyonları bu kayıtları üretir; JSON'a dönüşüm yalnızca API sınırında (to_dict) yapılır.
+import sys
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from enum import Enum
+from typing import Any, ClassVar, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+SOURCE_AZURE_SDK = "Azure SDK"
+
+
+class Category(str, Enum):
+    PUBLIC_IP = "Cost_Custom_PublicIP"
+    APP_SERVICE_PLAN = "Cost_Custom_AppServicePlan"
+    UNATTACHED_DISK = "Cost_Custom_UnattachedDisk"
+    OLD_SNAPSHOT = "Cost_Custom_OldSnapshot"
+
+
+class Impact(str, Enum):
+    LOW = "Low"
+    MEDIUM = "Medium"
+    HIGH = "High"
+
+
+class Action(str, Enum):
+    DELETE = "delete"
+    UPDATE_SKU = "update_sku"
+
+
+class _CategorySpec(NamedTuple):
+    """Bir kategorideki tüm önerilerde aynı olan sabit alanlar."""
+    impacted_field: str
+    resource_type: Optional[str]
+    estimated_time_minutes: int
+    risk_level: Impact
+
+
+_CATEGORY_SPECS: Dict[Category, _CategorySpec] = {
+    Category.PUBLIC_IP: _CategorySpec("Microsoft.Network/publicIPAddresses", "public_ip", 2, Impact.LOW),
+    Category.APP_SERVICE_PLAN: _CategorySpec("Microsoft.Web/serverfarms", None, 5, Impact.LOW),
+    Category.UNATTACHED_DISK: _CategorySpec("Microsoft.Compute/disks", "disk", 2, Impact.MEDIUM),
+    Category.OLD_SNAPSHOT: _CategorySpec("Microsoft.Compute/snapshots", "snapshot", 2, Impact.MEDIUM),
+}
+
+
+# Fiyat tablosu anahtarı, örn: ("app_service", "westeurope", "P1V3") veya ("public_ip", "westeurope", "Standard", "Static")
+PriceKey = Tuple[str, ...]
+
+
+class PriceInputs(NamedTuple):
+    """Tasarruf hesabının girdileri: mevcut ve hedef fiyat anahtarları ile adetleri."""
+    current_key: PriceKey
+    current_quantity: float
+    target_key: Optional[PriceKey]
+    target_quantity: float
+
+
+def intern_str(value: Optional[str]) -> Optional[str]:
+    """Çok tekrar eden kısa metinleri (bölge, resource group, SKU) tek kopyada tutar."""
+    return sys.intern(value) if value else value
+
+
+def region_key(location: Optional[str]) -> str:
+    """Bölge görünen adını ARM adına çevirir (örn: "West Europe" -> "westeurope")."""
+    return (location or "").lower().replace(" ", "")
+
+
+@dataclass
+class Recommendation(ABC):
+    """Tüm öneri kayıtlarının ortak alanları. Sabit metinler sınıf düzeyinde tutulur; alt sınıflar problem/çözüm metnini verir."""
+    __slots__ = ("name", "resource_id", "location", "resource_group", "estimated_monthly_cost")
+
+    name: str
+    resource_id: Optional[str]
+    location: Optional[str]
+    resource_group: Optional[str]
+    estimated_monthly_cost: float
+
+    category: ClassVar[Category]
+    impact: ClassVar[Impact]
+    action: ClassVar[Action]
+    id_prefix: ClassVar[str]
+
+    @property
+    def monthly_savings(self) -> float:
+        """Öneri uygulandığında beklenen aylık tasarruf."""
+        return self.estimated_monthly_cost
+
+    def price_inputs(self) -> Optional[PriceInputs]:
+        """
+        Maliyetin fiyat tablosundan hesaplanması için girdiler. None ise `estimated_monthly_cost`
+        analiz sırasında belirlenmiştir (örn: disk fiyatı) ve hedef maliyet sıfırdır.
+        """
+        return None
+
+    def resource_sku(self) -> Optional[str]:
+        """Dashboard kırılımlarında kullanılan kaynak SKU'su (yoksa None)."""
+        return None
+
+    @abstractmethod
+    def problem(self) -> str:
+        """Önerinin kısa problem açıklaması."""
+
+    @abstractmethod
+    def solution(self) -> str:
+        """Önerinin kısa çözüm açıklaması."""
+
+    def extended_properties(self) -> Dict[str, Any]:
+        return {}
+
+    def action_details(self) -> Dict[str, Any]:
+        spec = _CATEGORY_SPECS[self.category]
+        details: Dict[str, Any] = {"action": self.action.value}
+        if spec.resource_type:
+            details["resource_type"] = spec.resource_type
+        return details
+
+    def to_dict(self) -> Dict[str, Any]:
+        """API'nin döndürdüğü iç içe öneri sözlüğünü üretir."""
+        spec = _CATEGORY_SPECS[self.category]
+        action_details = self.action_details()
+        action_details["estimated_time_minutes"] = spec.estimated_time_minutes
+        action_details["risk_level"] = spec.risk_level.value
+        return {
+            "id": f"{self.id_prefix}_{self.name}",
+            "name": self.name,
+            "category": self.category.value,
+            "impact": self.impact.value,
+            "impacted_field": spec.impacted_field,
+            "impacted_value": self.name,
+            "short_description_problem": self.problem(),
+            "short_description_solution": self.solution(),
+            "potential_benefits": f"Aylık ~${self.monthly_savings:.2f} tasarruf",
+            "extended_properties": self.extended_properties(),
+            "resource_metadata": {
+                "resource_id": self.resource_id,
+                "source": SOURCE_AZURE_SDK,
+                "location": self.location,
+                "resource_group": self.resource_group
+            },
+            "action_details": action_details
+        }
+
+
+@dataclass
+class PublicIpRecommendation(Recommendation):
+    """Hiçbir kaynağa bağlı olmayan ya da boştaki bir kaynağa (NAT gateway, LB, NIC) bağlı genel IP adresi."""
+    __slots__ = ("ip_address", "allocation_method", "sku", "reason", "attached_to")
+
+    ip_address: Optional[str]
+    allocation_method: str
+    sku: str
+    # Bkz. network_orphans.py: "unattached", "idle_nat_gateway", "unused_lb_frontend", "detached_nic"
+    reason: str
+    attached_to: Optional[str]
+
+    category: ClassVar[Category] = Category.PUBLIC_IP
+    impact: ClassVar[Impact] = Impact.MEDIUM
+    action: ClassVar[Action] = Action.DELETE
+    id_prefix: ClassVar[str] = "public_ip"
+
+    _PROBLEMS: ClassVar[Dict[str, str]] = {
+        "idle_nat_gateway": "Genel IP adresi '{name}' hiçbir subnet'e bağlı olmayan bir NAT gateway'de",
+        "unused_lb_frontend": "Genel IP adresi '{name}' hiçbir kuralın kullanmadığı bir load balancer frontend'inde",
+        "detached_nic": "Genel IP adresi '{name}' hiçbir VM'e bağlı olmayan bir ağ arayüzünde",
+    }
+    _SOLUTIONS: ClassVar[Dict[str, str]] = {
+        "idle_nat_gateway": "NAT gateway'i bir subnet'e bağlayın ya da IP'yi ayırıp silin",
+        "unused_lb_frontend": "Frontend'i kaldırın ya da IP'yi bir kurala bağlayın; kullanılmıyorsa silin",
+        "detached_nic": "Ağ arayüzünü bir VM'e bağlayın ya da IP'yi ayırıp silin",
+    }
+
+    def problem(self) -> str:
+        template = self._PROBLEMS.get(self.reason, "Genel IP adresi '{name}' herhangi bir kaynağa bağlı değil")
+        return template.format(name=self.name)
+
+    def solution(self) -> str:
+        return self._SOLUTIONS.get(self.reason, "Kullanılmayan genel IP adresini silin veya bir kaynağa atayın")
+
+    def price_inputs(self) -> Optional[PriceInputs]:
+        return PriceInputs(("public_ip", region_key(self.location), self.sku, self.allocation_method), 1, None, 0)
+
+    def resource_sku(self) -> Optional[str]:
+        return self.sku
+
+    def extended_properties(self) -> Dict[str, Any]:
+        return {
+            "resource_id": self.resource_id,
+            "location": self.location,
+            "estimated_monthly_cost_usd": self.estimated_monthly_cost,
+            "ip_address": self.ip_address,
+            "allocation_method": self.allocation_method,
+            "sku": self.sku,
+            "orphan_reason": self.reason,
+            "attached_to": self.attached_to
+        }
+
+
+@dataclass
+class AppServicePlanRecommendation(Recommendation):
+    """Üzerinde uygulama olmayan ya da küçültülebilecek App Service planı."""
+    __slots__ = ("current_sku", "current_tier", "recommended_sku", "recommended_tier", "apps_count", "current_instances")
+
+    current_sku: str
+    current_tier: str
+    recommended_sku: str
+    recommended_tier: str
+    apps_count: int
+    current_instances: int
+
+    category: ClassVar[Category] = Category.APP_SERVICE_PLAN
+    impact: ClassVar[Impact] = Impact.HIGH
+    action: ClassVar[Action] = Action.UPDATE_SKU
+    id_prefix: ClassVar[str] = "asp"
+
+    def problem(self) -> str:
+        return f"App Service planı '{self.name}' üzerinde aktif uygulama yok"
+
+    def solution(self) -> str:
+        return f"Planı {self.recommended_sku} ({self.recommended_tier}) tier'a taşıyın veya silin"
+
+    def price_inputs(self) -> Optional[PriceInputs]:
+        region = region_key(self.location)
+        return PriceInputs(("app_service", region, self.current_sku), self.current_instances,
+                           ("app_service", region, self.recommended_sku), 1)
+
+    def resource_sku(self) -> Optional[str]:
+        return self.current_sku
+
+    def extended_properties(self) -> Dict[str, Any]:
+        return {
+            "current_sku": self.current_sku,
+            "current_tier": self.current_tier,
+            "current_instances": self.current_instances,
+            "recommended_sku": self.recommended_sku,
+            "recommended_tier": self.recommended_tier,
+            "apps_count": self.apps_count,
+            "estimated_monthly_cost_usd": self.estimated_monthly_cost,
+            "optimization_type": "sku_downgrade"
+        }
+
+    def action_details(self) -> Dict[str, Any]:
+        details = super().action_details()
+        details["target_sku"] = self.recommended_sku
+        details["target_tier"] = self.recommended_tier
+        return details
+
+
+@dataclass
+class AppServicePlanRightsizeRecommendation(AppServicePlanRecommendation):
+    """Gözlenen tepe yükü daha ucuz bir SKU/instance sayısıyla karşılanabilecek plan."""
+    __slots__ = ("recommended_instances", "target_monthly_cost",
+                 "cpu_average", "cpu_peak", "memory_average", "memory_peak", "days_analyzed")
+
+    recommended_instances: int
+    target_monthly_cost: float
+    cpu_average: float
+    cpu_peak: float
+    memory_average: float
+    memory_peak: float
+    days_analyzed: int
+
+    id_prefix: ClassVar[str] = "asp_rightsize"
+
+    @property
+    def monthly_savings(self) -> float:
+        return round(self.estimated_monthly_cost - self.target_monthly_cost, 2)
+
+    def problem(self) -> str:
+        return (f"App Service planı '{self.name}' gözlenen yüke göre fazla maliyetli yapılandırılmış "
+                f"(CPU tepe %{self.cpu_peak:.0f}, bellek tepe %{self.memory_peak:.0f})")
+
+    def solution(self) -> str:
+        return (f"Planı {self.current_instances} x {self.current_sku} yerine "
+                f"{self.recommended_instances} x {self.recommended_sku} olarak yeniden boyutlandırın")
+
+    def price_inputs(self) -> Optional[PriceInputs]:
+        region = region_key(self.location)
+        return PriceInputs(("app_service", region, self.current_sku), self.current_instances,
+                           ("app_service", region, self.recommended_sku), self.recommended_instances)
+
+    def extended_properties(self) -> Dict[str, Any]:
+        return {
+            "current_sku": self.current_sku,
+            "current_tier": self.current_tier,
+            "current_instances": self.current_instances,
+            "recommended_sku": self.recommended_sku,
+            "recommended_tier": self.recommended_tier,
+            "recommended_instances": self.recommended_instances,
+            "apps_count": self.apps_count,
+            "estimated_monthly_cost_usd": self.estimated_monthly_cost,
+            "target_monthly_cost_usd": self.target_monthly_cost,
+            "cpu_average_percent": self.cpu_average,
+            "cpu_peak_percent": self.cpu_peak,
+            "memory_average_percent": self.memory_average,
+            "memory_peak_percent": self.memory_peak,
+            "days_analyzed": self.days_analyzed,
+            "optimization_type": "rightsize"
+        }
+
+    def action_details(self) -> Dict[str, Any]:
+        details = super().action_details()
+        details["target_capacity"] = self.recommended_instances
+        return details
+
+
+@dataclass
+class DiskRecommendation(Recommendation):
+    """Hiçbir VM'e bağlı olmayan yönetilen disk."""
+    __slots__ = ("sku", "size_gb", "price_key", "time_created")
+
+    sku: Optional[str]
+    size_gb: Optional[int]
+    price_key: Optional[str]
+    time_created: Optional[str]
+
+    category: ClassVar[Category] = Category.UNATTACHED_DISK
+    impact: ClassVar[Impact] = Impact.MEDIUM
+    action: ClassVar[Action] = Action.DELETE
+    id_prefix: ClassVar[str] = "disk"
+
+    def resource_sku(self) -> Optional[str]:
+        return self.sku
+
+    def problem(self) -> str:
+        return f"Yönetilen disk '{self.name}' herhangi bir VM'e bağlı değil"
+
+    def solution(self) -> str:
+        return "Gerekliyse snapshot alıp diski silin"
+
+    def extended_properties(self) -> Dict[str, Any]:
+        return {
+            "resource_id": self.resource_id,
+            "location": self.location,
+            "estimated_monthly_cost_usd": self.estimated_monthly_cost,
+            "sku": self.sku,
+            "size_gb": self.size_gb,
+            "price_tier": self.price_key,
+            "time_created": self.time_created
+        }
+
+
+@dataclass
+class SnapshotRecommendation(Recommendation):
+    """Saklama süresini aşmış disk snapshot'ı."""
+    __slots__ = ("size_gb", "age_days", "source_resource_id")
+
+    size_gb: Optional[int]
+    age_days: int
+    source_resource_id: Optional[str]
+
+    category: ClassVar[Category] = Category.OLD_SNAPSHOT
+    impact: ClassVar[Impact] = Impact.LOW
+    action: ClassVar[Action] = Action.DELETE
+    id_prefix: ClassVar[str] = "snapshot"
+
+    def problem(self) -> str:
+        return f"Snapshot '{self.name}' {self.age_days} gündür saklanıyor"
+
+    def solution(self) -> str:
+        return "Artık gerekmeyen eski snapshot'ı silin"
+
+    def extended_properties(self) -> Dict[str, Any]:
+        return {
+            "resource_id": self.resource_id,
+            "location": self.location,
+            "estimated_monthly_cost_usd": self.estimated_monthly_cost,
+            "size_gb": self.size_gb,
+            "age_days": self.age_days,
+            "source_resource_id": self.source_resource_id
+        }
+
+
+def recommendations_to_dicts(records: Iterable[Recommendation]) -> List[Dict[str, Any]]:
+    """Kayıtları API yanıtı için JSON uyumlu sözlüklere çevirir."""
+    return [record.to_dict() for record in records]
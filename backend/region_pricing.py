@@ -0,0 +1,130 @@
+# Bölgeler arası App Service fiyat karşılaştırması.
+# Bölge tabloları fiyat önbelleğinden (eksikler paralel) alınır ve tek bir (bölge x SKU) aylık USD matrisine
+# dönüştürülür. SKU başına en ucuz bölge matris oluşturulurken hesaplanır; sorgular sözlükten O(1) yanıtlanır.
+import threading
+from collections import OrderedDict
+from typing import Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .azure_pricing import usd_monthly_prices
+from .fx_rates import exchange_rates
+from .pricing_cache import PricingCache, pricing_cache
+from .recommendations import region_key
+
+# Farklı bölge kümeleri için saklanacak matris sayısı
+MAX_CACHED_MATRICES = 32
+
+
+class CheapestRegion(NamedTuple):
+    region: str
+    monthly_usd: float
+
+
+class PriceMatrix:
+    """
+    Bölge x SKU aylık USD fiyat matrisi. Bir bölgede bulunmayan SKU'lar NaN'dır. Fiyatı API'den
+    alınamayan (tahmini tablo kullanan) bölgeler karşılaştırmaya katılmaz, `unavailable` listesinde döner.
+    """
+
+    def __init__(self, regions: List[str], skus: List[str], prices: np.ndarray,
+                 unavailable: List[str], version: int):
+        self.regions = regions
+        self.skus = skus
+        self.prices = prices
+        self.unavailable = unavailable
+        self.version = version
+        self.sku_index = {sku: i for i, sku in enumerate(skus)}
+        self.cheapest: Dict[str, CheapestRegion] = {}
+        if regions and skus:
+            filled = np.where(np.isnan(prices), np.inf, prices)
+            best = np.argmin(filled, axis=0)
+            best_price = filled[best, np.arange(len(skus))]
+            for sku, row, price in zip(skus, best.tolist(), best_price.tolist()):
+                if np.isfinite(price):
+                    self.cheapest[sku] = CheapestRegion(regions[row], price)
+
+    def cheapest_region(self, sku: str) -> Optional[CheapestRegion]:
+        return self.cheapest.get(sku)
+
+    def sku_prices(self, sku: str) -> Dict[str, float]:
+        """SKU'nun bölge başına aylık USD fiyatı (ucuzdan pahalıya)."""
+        column = self.sku_index.get(sku)
+        if column is None:
+            return {}
+        values = self.prices[:, column]
+        order = np.argsort(np.where(np.isnan(values), np.inf, values), kind="stable")
+        return {self.regions[i]: float(values[i]) for i in order.tolist() if not np.isnan(values[i])}
+
+    def to_dict(self, currency: str = "USD") -> Dict:
+        """Kompakt yanıt: satırlar `regions`, sütunlar `skus` sırasındadır; bulunmayan fiyatlar None."""
+        try:
+            rate = exchange_rates.rate("USD", currency)
+        except KeyError:
+            rate, currency = 1.0, "USD"
+        converted = np.round(self.prices * rate, 2)
+        return {
+            "currency": currency,
+            "regions": self.regions,
+            "skus": self.skus,
+            "monthly_prices": [[None if np.isnan(v) else v for v in row] for row in converted.tolist()],
+            "cheapest": {
+                sku: {"region": best.region, "monthly_price": round(best.monthly_usd * rate, 2)}
+                for sku, best in self.cheapest.items()
+            },
+            "unavailable_regions": self.unavailable,
+        }
+
+
+def build_price_matrix(tables: Dict[str, Dict[str, float]], unavailable: Sequence[str] = (),
+                       version: int = 0) -> PriceMatrix:
+    """{bölge: {SKU: aylık USD}} tablolarından matrisi oluşturur."""
+    regions = sorted(tables)
+    skus = sorted({sku for prices in tables.values() for sku in prices})
+    sku_index = {sku: i for i, sku in enumerate(skus)}
+    matrix = np.full((len(regions), len(skus)), np.nan, dtype=np.float64)
+    for row, region in enumerate(regions):
+        prices = tables[region]
+        if prices:
+            columns = np.fromiter((sku_index[sku] for sku in prices), dtype=np.int64, count=len(prices))
+            matrix[row, columns] = np.fromiter(prices.values(), dtype=np.float64, count=len(prices))
+    return PriceMatrix(regions, skus, matrix, sorted(unavailable), version)
+
+
+def _api_prices(pricing: Dict[str, Dict]) -> Dict[str, Dict]:
+    """API'de bulunmayıp referans fiyatla tamamlanan SKU'lar bölge karşılaştırmasına katılmaz."""
+    return {sku: data for sku, data in pricing.items() if not data.get("source")}
+
+
+class RegionPricing:
+    """Bölge kümesi başına matris önbelleği; fiyat önbelleği değiştiğinde matris yeniden oluşturulur."""
+
+    def __init__(self, cache: PricingCache):
+        self.cache = cache
+        self._matrices: "OrderedDict[Tuple[str, ...], PriceMatrix]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def matrix(self, regions: Sequence[str]) -> PriceMatrix:
+        key = tuple(sorted({region_key(region) for region in regions if region}))
+        version = self.cache.version
+        with self._lock:
+            matrix = self._matrices.get(key)
+            if matrix is not None and matrix.version == version:
+                self._matrices.move_to_end(key)
+                return matrix
+
+        entries = self.cache.get_many(key)
+        tables = {region: usd_monthly_prices(_api_prices(entry.prices))
+                  for region, entry in entries.items() if not entry.is_fallback}
+        unavailable = [region for region, entry in entries.items() if entry.is_fallback]
+        # Çekim sırasında tablo değiştiyse bir sonraki istek matrisi yeniden oluşturur
+        matrix = build_price_matrix(tables, unavailable, version)
+        with self._lock:
+            self._matrices[key] = matrix
+            self._matrices.move_to_end(key)
+            while len(self._matrices) > MAX_CACHED_MATRICES:
+                self._matrices.popitem(last=False)
+        return matrix
+
+
+region_pricing = RegionPricing(pricing_cache)
@@ -0,0 +1,312 @@
+# Aboneliklerin son tarama sonuçları (SQLite).
+# Zamanlanmış tarayıcı (backend/scheduler.py) ve canlı tarama endpoint'i sonuçları buraya yazar; dashboard
+# istekleri yalnızca bu depodan okur, Azure'a gitmez. Ayrı süreçler aynı dosyayı WAL modunda paylaşır.
+import base64
+import binascii
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Iterable, Iterator, List, NamedTuple, Optional, Sequence, Tuple
+
+from .recommendations import Category, Recommendation, region_key
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_RESULTS_DB_PATH = os.path.join("data", "latest_results.db")
+# Depo yalnızca son taramayı tuttuğu için şema değiştiğinde tablolar silinip yeniden oluşturulur
+SCHEMA_VERSION = 2
+MAX_PAGE_SIZE = 500
+EXPORT_CHUNK_ROWS = 10_000
+
+# Sıralama adı -> (sütun, azalan mı)
+SORT_ORDERS: Dict[str, Tuple[str, bool]] = {
+    "-monthly_savings": ("monthly_savings", True),
+    "monthly_savings": ("monthly_savings", False),
+    "name": ("name", False),
+    "-name": ("name", True),
+}
+DEFAULT_SORT = "-monthly_savings"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS latest_scans (
+    subscription_id TEXT PRIMARY KEY,
+    scan_id INTEGER,
+    scanned_at REAL NOT NULL,
+    duration_seconds REAL NOT NULL,
+    finding_count INTEGER NOT NULL,
+    total_monthly_savings REAL NOT NULL,
+    source TEXT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS latest_recommendations (
+    subscription_id TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    name TEXT NOT NULL,
+    category TEXT NOT NULL,
+    impact TEXT,
+    location TEXT,
+    region TEXT,
+    resource_group TEXT COLLATE NOCASE,
+    sku TEXT,
+    monthly_savings REAL NOT NULL,
+    payload TEXT NOT NULL,
+    PRIMARY KEY (subscription_id, position)
+);
+CREATE INDEX IF NOT EXISTS idx_latest_savings ON latest_recommendations(subscription_id, monthly_savings, position);
+CREATE INDEX IF NOT EXISTS idx_latest_category ON latest_recommendations(subscription_id, category, monthly_savings);
+CREATE INDEX IF NOT EXISTS idx_latest_region ON latest_recommendations(subscription_id, region);
+CREATE INDEX IF NOT EXISTS idx_latest_resource_group ON latest_recommendations(subscription_id, resource_group);
+CREATE INDEX IF NOT EXISTS idx_latest_name ON latest_recommendations(subscription_id, name, position);
+"""
+
+
+class RecommendationQuery(NamedTuple):
+    """Son tarama sonuçları üzerinde filtre ve sıralama; boş alanlar filtre uygulamaz."""
+    categories: Tuple[str, ...] = ()
+    impacts: Tuple[str, ...] = ()
+    resource_group: Optional[str] = None
+    region: Optional[str] = None
+    min_savings: Optional[float] = None
+    sort: str = DEFAULT_SORT
+
+
+class RecommendationPage(NamedTuple):
+    items: List[Dict[str, Any]]
+    total: int
+    next_cursor: Optional[str]
+
+
+class InvalidCursor(ValueError):
+    """İmleç çözülemedi ya da başka bir taramaya/sıralamaya ait."""
+
+
+def encode_cursor(scanned_at: float, sort: str, value: Any, position: int) -> str:
+    raw = json.dumps([scanned_at, sort, value, position], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[float, str, Any, int]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        scanned_at, sort, value, position = json.loads(raw)
+        return float(scanned_at), str(sort), value, int(position)
+    except (binascii.Error, ValueError, TypeError) as e:
+        raise InvalidCursor("Geçersiz sayfa imleci") from e
+
+
+class LatestResultsStore:
+    """Abonelik başına son taramanın önerilerini tutar; her tarama öncekini tek işlemde değiştirir."""
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or os.getenv("RESULTS_DB_PATH", DEFAULT_RESULTS_DB_PATH)
+        if self.path != ":memory:":
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        # Başka bir süreç yazarken okuyucular beklemek yerine kısa süre yeniden dener
+        self._conn = sqlite3.connect(self.path, check_same_thread=False, timeout=10.0)
+        self._conn.row_factory = sqlite3.Row
+        with self._lock:
+            if self.path != ":memory:":
+                self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            if self._conn.execute("PRAGMA user_version").fetchone()[0] < SCHEMA_VERSION:
+                self._conn.executescript(
+                    "DROP TABLE IF EXISTS latest_recommendations; DROP TABLE IF EXISTS latest_scans;"
+                )
+            self._conn.executescript(_SCHEMA)
+            self._conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def replace(self, subscription_id: str, records: Sequence[Recommendation], scan_id: Optional[int] = None,
+                scanned_at: Optional[float] = None, duration_seconds: float = 0.0, source: str = "api",
+                categories: Optional[Iterable[Category]] = None, keep: Iterable[str] = ()) -> None:
+        """
+        Aboneliğin sonuçlarını verilen taramanınkilerle değiştirir. `categories` verilirse yalnızca bu
+        kategorilerin sonuçları değişir; diğer kategorilerin (örn: analizi başarısız olan) önceki sonuçları kalır.
+        `keep` taramada değerlendirilemeyen kaynakların ID'leridir; bu kaynakların önceki sonuçları da kalır.
+        """
+        scanned_at = scanned_at or time.time()
+        rows = [
+            (record.name, record.category.value, record.impact.value, record.location,
+             region_key(record.location) or None, record.resource_group, record.resource_sku(),
+             float(record.monthly_savings), json.dumps(record.to_dict(), ensure_ascii=False))
+            for record in records
+        ]
+        retained, params = [], []
+        if categories is not None:
+            replaced = [category.value for category in categories]
+            retained.append(f"category NOT IN ({','.join('?' * len(replaced))})")
+            params += replaced
+        keep = list(dict.fromkeys(keep))
+        if keep:
+            retained.append(f"json_extract(payload, '$.resource_metadata.resource_id') IN ({','.join('?' * len(keep))})")
+            params += keep
+        with self._lock, self._conn:
+            if retained:
+                rows += [tuple(row) for row in self._conn.execute(
+                    "SELECT name, category, impact, location, region, resource_group, sku, monthly_savings, payload "
+                    f"FROM latest_recommendations WHERE subscription_id = ? AND ({' OR '.join(retained)}) "
+                    "ORDER BY position",
+                    (subscription_id, *params)
+                )]
+            self._conn.execute("DELETE FROM latest_recommendations WHERE subscription_id = ?", (subscription_id,))
+            self._conn.executemany(
+                "INSERT INTO latest_recommendations (subscription_id, position, name, category, impact, location, "
+                "region, resource_group, sku, monthly_savings, payload) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                [(subscription_id, position, *row) for position, row in enumerate(rows)]
+            )
+            self._conn.execute(
+                "INSERT OR REPLACE INTO latest_scans (subscription_id, scan_id, scanned_at, duration_seconds, "
+                "finding_count, total_monthly_savings, source) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (subscription_id, scan_id, scanned_at, duration_seconds, len(rows),
+                 sum(row[7] for row in rows), source)
+            )
+
+    def scan_info(self, subscription_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT * FROM latest_scans WHERE subscription_id = ?", (subscription_id,)
+            ).fetchone()
+        if row is None:
+            return None
+        return {
+            "subscription_id": row["subscription_id"],
+            "scan_id": row["scan_id"],
+            "scanned_at": row["scanned_at"],
+            "age_seconds": round(time.time() - row["scanned_at"], 1),
+            "duration_seconds": round(row["duration_seconds"], 3),
+            "finding_count": row["finding_count"],
+            "total_monthly_savings": round(row["total_monthly_savings"], 2),
+            "source": row["source"],
+        }
+
+    def recommendations(self, subscription_id: str) -> List[Dict[str, Any]]:
+        """Son taramanın öneri sözlükleri (API yanıtıyla aynı biçimde)."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT payload FROM latest_recommendations WHERE subscription_id = ? ORDER BY position",
+                (subscription_id,)
+            ).fetchall()
+        return [json.loads(row[0]) for row in rows]
+
+    def columns(self, subscription_id: str) -> Dict[str, List]:
+        """Dashboard toplamları için son taramanın sütunları; öneri JSON'ları çözülmez."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT category, impact, location, resource_group, sku, monthly_savings "
+                "FROM latest_recommendations WHERE subscription_id = ? ORDER BY position",
+                (subscription_id,)
+            ).fetchall()
+        names = ("category", "impact", "location", "resource_group", "sku", "monthly_savings")
+        values = list(zip(*rows)) if rows else [()] * len(names)
+        return {name: list(column) for name, column in zip(names, values)}
+
+    def iter_rows(self, subscription_id: Optional[str] = None,
+                  chunk_size: int = EXPORT_CHUNK_ROWS) -> Iterator[List[tuple]]:
+        """
+        Son tarama satırlarını (subscription_id, scanned_at, name, category, impact, region, resource_group, sku,
+        monthly_savings, payload) parça parça döndürür; dışa aktarım ayrı bir okuma bağlantısı kullanır.
+        """
+        query = (
+            "SELECT r.subscription_id, s.scanned_at, r.name, r.category, r.impact, r.region, r.resource_group, "
+            "r.sku, r.monthly_savings, r.payload FROM latest_recommendations AS r "
+            "JOIN latest_scans AS s ON s.subscription_id = r.subscription_id"
+        )
+        params: List[Any] = []
+        if subscription_id:
+            query += " WHERE r.subscription_id = ?"
+            params.append(subscription_id)
+        query += " ORDER BY r.subscription_id, r.position"
+        conn = sqlite3.connect(self.path, check_same_thread=False, timeout=10.0)
+        try:
+            cursor = conn.execute(query, params)
+            while True:
+                rows = cursor.fetchmany(chunk_size)
+                if not rows:
+                    break
+                yield rows
+        finally:
+            conn.close()
+
+    def query(self, subscription_id: str, query: RecommendationQuery, limit: int = 50,
+              cursor: Optional[str] = None) -> RecommendationPage:
+        """
+        Filtrelenmiş ve sıralanmış sonuçlardan bir sayfa. Sayfalama imleçlidir (son satırın sıralama değeri ve
+        sırası); sayfa ne kadar ileride olursa olsun sorgu indeksten yalnızca `limit` satır okur. İmleç
+        alındığı taramaya bağlıdır, arada yeni tarama yazılırsa InvalidCursor fırlatılır.
+        """
+        if query.sort not in SORT_ORDERS:
+            raise ValueError(f"Geçersiz sıralama: {query.sort}")
+        column, descending = SORT_ORDERS[query.sort]
+        limit = max(1, min(limit, MAX_PAGE_SIZE))
+
+        where = ["subscription_id = ?"]
+        params: List[Any] = [subscription_id]
+        if query.categories:
+            where.append(f"category IN ({', '.join('?' * len(query.categories))})")
+            params.extend(query.categories)
+        if query.impacts:
+            where.append(f"impact IN ({', '.join('?' * len(query.impacts))})")
+            params.extend(query.impacts)
+        if query.resource_group:
+            where.append("resource_group = ?")
+            params.append(query.resource_group)
+        if query.region:
+            where.append("region = ?")
+            params.append(region_key(query.region))
+        if query.min_savings is not None:
+            where.append("monthly_savings >= ?")
+            params.append(query.min_savings)
+        filters = " AND ".join(where)
+
+        with self._lock:
+            scan = self._conn.execute(
+                "SELECT scanned_at FROM latest_scans WHERE subscription_id = ?", (subscription_id,)
+            ).fetchone()
+            if scan is None:
+                return RecommendationPage([], 0, None)
+            page_where, page_params = filters, list(params)
+            if cursor:
+                scanned_at, sort, value, position = decode_cursor(cursor)
+                if scanned_at != scan["scanned_at"] or sort != query.sort:
+                    raise InvalidCursor("İmleç güncel taramaya ya da sıralamaya ait değil")
+                op = "<" if descending else ">"
+                page_where += f" AND ({column} {op} ? OR ({column} = ? AND position > ?))"
+                page_params.extend([value, value, position])
+            rows = self._conn.execute(
+                f"SELECT position, {column} AS sort_value, payload FROM latest_recommendations "
+                f"WHERE {page_where} ORDER BY {column} {'DESC' if descending else 'ASC'}, position LIMIT ?",
+                page_params + [limit + 1]
+            ).fetchall()
+            total = self._conn.execute(
+                f"SELECT COUNT(*) FROM latest_recommendations WHERE {filters}", params
+            ).fetchone()[0]
+
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            last = rows[-1]
+            next_cursor = encode_cursor(scan["scanned_at"], query.sort, last["sort_value"], last["position"])
+        return RecommendationPage([json.loads(row["payload"]) for row in rows], total, next_cursor)
+
+
+_store: Optional[LatestResultsStore] = None
+_store_lock = threading.Lock()
+
+
+def get_results_store() -> LatestResultsStore:
+    """Süreç genelinde paylaşılan sonuç deposu (RESULTS_DB_PATH)."""
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = LatestResultsStore()
+    return _store
@@ -0,0 +1,166 @@
+# Öneriler için toplu (vektörel) tasarruf hesabı.
+# Tüm kayıtların mevcut/hedef fiyat anahtarları tek bir fiyat vektörüne indekslenir; mevcut maliyet,
+# hedef maliyet ve tasarruf dizi işlemleriyle hesaplanır. Dashboard'daki tüm tutarlar buradan gelir.
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Sequence
+
+import numpy as np
+
+from .analysis_pool import factorize, grouped_sums
+from .azure_pricing import HOURS_PER_MONTH, AzureRetailPrices, usd_monthly_prices
+from .fx_rates import exchange_rates
+from .pricing_cache import pricing_cache
+from .recommendations import Category, PriceKey, Recommendation, region_key
+
+MONTHS_PER_YEAR = 12
+# Kategori toplamlarının süreç havuzunda paralel hesaplanması için parça başına en az bulgu
+PARALLEL_MIN_ROWS = 250_000
+
+# Genel IPv4 adresi saatlik USD fiyatları (SKU, atama yöntemi); Retail Prices'ta bölge fiyatı bulunamazsa
+# kullanılır. Bağlı olmayan Basic dinamik IP'nin adresi yoktur ve ücretlendirilmez.
+PUBLIC_IP_HOURLY_USD: Dict[tuple, float] = {
+    ("Basic", "Static"): 0.0036,
+    ("Basic", "Dynamic"): 0.0,
+    ("Standard", "Static"): 0.005,
+    ("Standard", "Dynamic"): 0.005,
+}
+
+
+class SavingsTable(NamedTuple):
+    """Kayıtlarla aynı sırada aylık USD mevcut maliyet, hedef maliyet ve tasarruf dizileri."""
+    current: np.ndarray
+    target: np.ndarray
+    savings: np.ndarray
+
+
+def hourly_to_monthly(hourly_price: float) -> float:
+    return hourly_price * HOURS_PER_MONTH
+
+
+def public_ip_price_book(hourly_by_region: Dict[str, Dict[tuple, float]]) -> Dict[PriceKey, float]:
+    """
+    {bölge: {(SKU, atama yöntemi): saatlik USD}} tablosunu aylık fiyat anahtarlarına düzleştirir;
+    bölgede fiyatı bulunamayan SKU'lar için PUBLIC_IP_HOURLY_USD kullanılır.
+    """
+    # Ücretsiz olan sahipsiz Basic dinamik IP'nin fiyatı API'deki (bağlıyken geçerli) fiyatla değiştirilmez
+    return {("public_ip", region, sku, allocation):
+            round(hourly_to_monthly(prices.get((sku, allocation), hourly) if hourly else 0.0), 4)
+            for region, prices in hourly_by_region.items()
+            for (sku, allocation), hourly in PUBLIC_IP_HOURLY_USD.items()}
+
+
+def load_public_ip_prices(locations: Iterable[Optional[str]]) -> Dict[str, Dict[tuple, float]]:
+    """Verilen bölgelerin genel IP saatlik USD fiyatları (Retail Prices; bölgeler tek seferde çekilir)."""
+    regions = sorted({region_key(location) for location in locations if location})
+    return AzureRetailPrices.get_public_ip_prices_many(regions)
+
+
+def app_service_price_book(prices_by_region: Dict[str, Dict[str, float]]) -> Dict[PriceKey, float]:
+    """{bölge: {SKU: aylık USD}} tablosunu fiyat anahtarlarına düzleştirir."""
+    return {("app_service", region, sku): price
+            for region, prices in prices_by_region.items() for sku, price in prices.items()}
+
+
+def load_app_service_prices(locations: Iterable[Optional[str]]) -> Dict[str, Dict[str, float]]:
+    """Verilen bölgelerin App Service fiyatlarını (aylık USD) fiyat önbelleğinden okur."""
+    return {region: usd_monthly_prices(pricing_cache.get_usd_prices(region).prices)
+            for region in {region_key(location) for location in locations if location}}
+
+
+def build_price_book(records: Sequence[Recommendation]) -> Dict[PriceKey, float]:
+    """Kayıtların ihtiyaç duyduğu tüm fiyatları içeren tablo."""
+    locations = [record.location for record in records if record.category == Category.APP_SERVICE_PLAN]
+    ip_locations = [record.location for record in records if record.category == Category.PUBLIC_IP]
+    price_book = public_ip_price_book(load_public_ip_prices(ip_locations))
+    price_book.update(app_service_price_book(load_app_service_prices(locations)))
+    return price_book
+
+
+def compute_savings(records: Sequence[Recommendation], price_book: Dict[PriceKey, float]) -> SavingsTable:
+    """
+    Kayıtların maliyet ve tasarruflarını hesaplar. Fiyat anahtarı tabloda olmayan ya da fiyat girdisi
+    olmayan kayıtlarda mevcut maliyet olarak `estimated_monthly_cost` kullanılır.
+    """
+    keys = list(price_book)
+    key_index = {key: i for i, key in enumerate(keys)}
+    prices = np.fromiter((price_book[key] for key in keys), dtype=np.float64, count=len(keys))
+
+    n = len(records)
+    current_idx = np.full(n, -1, dtype=np.int64)
+    target_idx = np.full(n, -1, dtype=np.int64)
+    current_qty = np.ones(n, dtype=np.float64)
+    target_qty = np.zeros(n, dtype=np.float64)
+    fixed_cost = np.empty(n, dtype=np.float64)
+    fixed_target = np.zeros(n, dtype=np.float64)
+    has_target = np.zeros(n, dtype=bool)
+
+    for i, record in enumerate(records):
+        fixed_cost[i] = record.estimated_monthly_cost
+        fixed_target[i] = getattr(record, "target_monthly_cost", 0.0)
+        inputs = record.price_inputs()
+        if inputs is None:
+            continue
+        current_idx[i] = key_index.get(inputs.current_key, -1)
+        current_qty[i] = inputs.current_quantity
+        if inputs.target_key is not None:
+            has_target[i] = True
+            target_idx[i] = key_index.get(inputs.target_key, -1)
+            target_qty[i] = inputs.target_quantity
+
+    if len(prices) == 0:
+        prices = np.zeros(1)
+    current = np.where(current_idx >= 0, prices[np.maximum(current_idx, 0)] * current_qty, fixed_cost)
+    # Hedef fiyatı tabloda yoksa analiz sırasında belirlenen hedef maliyet korunur
+    target = np.where(target_idx >= 0, prices[np.maximum(target_idx, 0)] * target_qty,
+                      np.where(has_target, fixed_target, 0.0))
+    current = np.round(current, 2)
+    target = np.round(target, 2)
+    return SavingsTable(current, target, np.maximum(current - target, 0.0))
+
+
+def apply_savings(records: Sequence[Recommendation], price_book: Optional[Dict[PriceKey, float]] = None) -> SavingsTable:
+    """Maliyetleri hesaplar ve kayıtlara yazar (`estimated_monthly_cost`, varsa `target_monthly_cost`)."""
+    if price_book is None:
+        price_book = build_price_book(records)
+    table = compute_savings(records, price_book)
+    for record, current, target in zip(records, table.current.tolist(), table.target.tolist()):
+        record.estimated_monthly_cost = current
+        if hasattr(record, "target_monthly_cost"):
+            record.target_monthly_cost = target
+    return table
+
+
+def summarize_savings(categories: Sequence[str], monthly_savings_usd: Sequence[float],
+                      currency: str = "TRY") -> Dict[str, Any]:
+    """
+    Kategori ve aylık USD tasarruf dizilerinden dashboard özeti üretir (aylık/yıllık/3 yıllık, kategori kırılımı).
+    Tutarlar istenen para birimine tek bir kurla çevrilir.
+    """
+    savings = np.asarray(monthly_savings_usd, dtype=np.float64)
+    names, codes = factorize(np.asarray(categories, dtype=str), PARALLEL_MIN_ROWS)
+    per_category, counts = grouped_sums(codes, savings, len(names), PARALLEL_MIN_ROWS)
+    try:
+        rate = exchange_rates.rate("USD", currency)
+    except KeyError:
+        rate, currency = 1.0, "USD"
+    monthly_usd = float(savings.sum())
+    monthly = monthly_usd * rate
+    by_category: List[Dict[str, Any]] = [
+        {
+            "category": str(name),
+            "count": int(count),
+            "monthly_savings_usd": round(float(total), 2),
+            "monthly_savings": round(float(total) * rate, 2),
+        }
+        for name, count, total in zip(names, counts, per_category)
+    ]
+    return {
+        "currency": currency,
+        "exchange_rate": round(rate, 6),
+        "hours_per_month": HOURS_PER_MONTH,
+        "finding_count": int(len(savings)),
+        "monthly_savings_usd": round(monthly_usd, 2),
+        "monthly_savings": round(monthly, 2),
+        "yearly_savings": round(monthly * MONTHS_PER_YEAR, 2),
+        "three_year_savings": round(monthly * MONTHS_PER_YEAR * 3, 2),
+        "by_category": by_category,
+    }
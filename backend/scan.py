@@ -0,0 +1,101 @@
+# Bir aboneliğin tüm özel analizlerini çalıştıran ortak tarama akışı.
+# Canlı tarama endpoint'i ve zamanlanmış tarayıcı aynı fonksiyonu kullanır; sonuçlar geçmiş deposuna ve
+# dashboard'un okuduğu son sonuç deposuna yazılır.
+import logging
+import time
+from typing import Callable, List, Tuple
+
+from .azure_client import (
+    PartialAnalysis,
+    get_app_service_plan_recommendations,
+    get_unattached_disks_recommendations,
+    get_unattached_public_ips
+)
+from .history import get_history_store
+from .recommendations import Category, Recommendation
+from .results_store import get_results_store
+from .telemetry import span
+
+logger = logging.getLogger(__name__)
+
+# Analizler ve kapsadıkları kategoriler; başarılı bir analizin kategorilerinde artık görülmeyen bulgular
+# çözülmüş sayılır, başarısız olanlarınkiler olduğu gibi kalır. Analiz bazı kaynakları değerlendiremezse
+# (PartialAnalysis) kategori yine güncellenir ama o kaynakların önceki bulguları korunur
+_ANALYZERS: List[Tuple[str, Callable[..., List[Recommendation]], Tuple[Category, ...]]] = [
+    # 1. Sahipsiz Genel IP Önerileri
+    ("public_ips", get_unattached_public_ips, (Category.PUBLIC_IP,)),
+    # 2. App Service Plan Önerileri
+    ("app_service_plans", get_app_service_plan_recommendations, (Category.APP_SERVICE_PLAN,)),
+    # 3. Sahipsiz Disk ve Eski Snapshot Önerileri
+    ("disks", get_unattached_disks_recommendations, (Category.UNATTACHED_DISK, Category.OLD_SNAPSHOT)),
+    # Gelecekte diğer özel öneri türleri buraya eklenebilir
+]
+
+
+class ScanIncomplete(RuntimeError):
+    """
+    Bazı analizler başarısız oldu. Başarılı analizlerin sonuçları depolara yazılmıştır ve `records`'tadır;
+    başarısız kategorilerin önceki sonuçları korunur.
+    """
+
+    def __init__(self, failed: List[str], records: List[Recommendation]):
+        super().__init__(f"Başarısız analizler: {', '.join(failed)}")
+        self.failed = failed
+        self.records = records
+
+
+def scan_subscription(subscription_id: str, tenant_id: str, client_id: str, client_secret: str,
+                      source: str = "api", persist: bool = True) -> List[Recommendation]:
+    """
+    Sahipsiz IP, App Service planı ve disk/snapshot analizlerini çalıştırır ve sonuçları depolara yazar
+    (`persist=False` ise yalnızca döndürür). Başarısız bir analiz diğerlerini durdurmaz; depolarda yalnızca
+    başarılı analizlerin kategorileri güncellenir ve ardından ScanIncomplete fırlatılır.
+    """
+    start = time.perf_counter()
+    all_recommendations: List[Recommendation] = []
+    covered: List[Category] = []
+    kept: List[str] = []
+    failed: List[str] = []
+
+    with span("scan.subscription", source=source):
+        for name, analyzer, categories in _ANALYZERS:
+            try:
+                records = analyzer(subscription_id, tenant_id, client_id, client_secret)
+            except PartialAnalysis as e:
+                records = e.records
+                kept.extend(e.resource_ids)
+            except Exception:
+                # Hata analizörde loglandı
+                failed.append(name)
+                continue
+            all_recommendations.extend(records)
+            covered.extend(categories)
+
+    scanned_at = time.time()
+    duration = time.perf_counter() - start
+    if persist:
+        _persist(subscription_id, all_recommendations, covered, kept, scanned_at, duration, source)
+        logger.info("Abonelik taraması tamamlandı", extra={"subscription_id": subscription_id, "source": source,
+                                                          "findings": len(all_recommendations),
+                                                          "failed_analyzers": failed,
+                                                          "unevaluated_resources": len(kept),
+                                                          "duration_seconds": round(duration, 3)})
+    if failed:
+        raise ScanIncomplete(failed, all_recommendations)
+    return all_recommendations
+
+
+def _persist(subscription_id: str, records: List[Recommendation], covered: List[Category], kept: List[str],
+             scanned_at: float, duration: float, source: str) -> None:
+    # Depo hataları taramayı bozmamalı
+    scan_id = None
+    try:
+        scan_id = get_history_store().record_scan(subscription_id, records, categories=covered, keep=kept,
+                                                  scanned_at=scanned_at)
+    except Exception as e:
+        logger.error("Tarama geçmişe kaydedilemedi: %s", e)
+    try:
+        get_results_store().replace(subscription_id, records, scan_id=scan_id, scanned_at=scanned_at,
+                                    duration_seconds=duration, source=source, categories=covered, keep=kept)
+    except Exception as e:
+        logger.error("Tarama sonuçları kaydedilemedi: %s", e)
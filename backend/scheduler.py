@@ -0,0 +1,499 @@
+# Zamanlanmış tarayıcı: abonelik başına cron planı, SQLite tabanlı kalıcı iş kuyruğu ve sınırlı sayıda worker.
+# API sürecinden ayrı çalışır (python -m backend.scheduler); tarama sonuçlarını dashboard'un okuduğu son sonuç
+# deposuna yazar. Aynı cron'a sahip abonelikler abonelik ID'sinden türetilen sabit bir gecikmeyle dağıtılır.
+import argparse
+import datetime
+import json
+import logging
+import os
+import socket
+import sqlite3
+import sys
+import threading
+import time
+import zlib
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Set
+
+from .cost_allocation import refresh_cost_allocation
+from .logging_config import configure_logging
+from .scan import scan_subscription
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SCHEDULER_DB_PATH = os.path.join("data", "scheduler.db")
+DEFAULT_SCHEDULE_CONFIG_PATH = os.path.join("data", "schedules.json")
+DEFAULT_CRON = "0 */6 * * *"
+DEFAULT_STAGGER_SECONDS = 600.0
+DEFAULT_SCHEDULER_WORKERS = 4
+DEFAULT_POLL_SECONDS = 15.0
+# Çalışan bir işin kilidi bu süre içinde bitmezse (worker öldü) iş yeniden kuyruğa alınır
+DEFAULT_LEASE_SECONDS = 3600.0
+MAX_JOB_ATTEMPTS = 3
+RETRY_DELAY_SECONDS = 300.0
+JOB_RETENTION_DAYS = 30
+# Başarılı taramadan sonra maliyet dağıtımı (tag envanteri ve son günlerin maliyetleri) da güncellenir
+COST_ALLOCATION_REFRESH = os.getenv("COST_ALLOCATION_REFRESH", "0").lower() in ("1", "true", "yes")
+
+_CRON_ALIASES = {
+    "@hourly": "0 * * * *",
+    "@daily": "0 0 * * *",
+    "@weekly": "0 0 * * 0",
+    "@monthly": "0 0 1 * *",
+}
+# (en küçük, en büyük) değerler: dakika, saat, ayın günü, ay, haftanın günü (0 = Pazar)
+_CRON_FIELDS = ((0, 59), (0, 23), (1, 31), (1, 12), (0, 6))
+
+
+def _parse_cron_field(field: str, low: int, high: int) -> Set[int]:
+    values: Set[int] = set()
+    for part in field.split(","):
+        step = 1
+        if "/" in part:
+            part, step_text = part.split("/", 1)
+            step = int(step_text)
+            if step <= 0:
+                raise ValueError(f"Geçersiz cron adımı: {field}")
+        if part == "*":
+            start, end = low, high
+        elif "-" in part:
+            start, end = (int(value) for value in part.split("-", 1))
+        else:
+            start = int(part)
+            end = high if step > 1 else start
+        if start < low or end > high or start > end:
+            raise ValueError(f"Cron alanı aralık dışında: {field}")
+        values.update(range(start, end + 1, step))
+    return values
+
+
+class CronSchedule:
+    """Beş alanlı cron ifadesi (dakika saat gün ay haftanın-günü), UTC. Örn: "0 */6 * * *", "@daily"."""
+
+    def __init__(self, expression: str):
+        self.expression = expression
+        fields = _CRON_ALIASES.get(expression.strip(), expression).split()
+        if len(fields) != 5:
+            raise ValueError(f"Cron ifadesi 5 alan içermeli: {expression}")
+        self.minutes, self.hours, self.days, self.months = (
+            _parse_cron_field(field, low, high) for field, (low, high) in zip(fields[:4], _CRON_FIELDS)
+        )
+        # Haftanın gününde 7 de Pazar kabul edilir
+        self.weekdays = {day % 7 for day in _parse_cron_field(fields[4], 0, 7)}
+        self._any_day = fields[2] == "*"
+        self._any_weekday = fields[4] == "*"
+
+    def _day_matches(self, moment: datetime.datetime) -> bool:
+        day_ok = moment.day in self.days
+        weekday_ok = (moment.weekday() + 1) % 7 in self.weekdays
+        # Standart cron: iki alan da kısıtlıysa biri tutması yeterlidir
+        if self._any_day or self._any_weekday:
+            return day_ok and weekday_ok
+        return day_ok or weekday_ok
+
+    def next_after(self, timestamp: float) -> float:
+        """`timestamp`'ten sonraki ilk eşleşen dakikanın zaman damgası."""
+        moment = datetime.datetime.fromtimestamp(timestamp, tz=datetime.timezone.utc)
+        moment = moment.replace(second=0, microsecond=0) + datetime.timedelta(minutes=1)
+        limit = moment + datetime.timedelta(days=366 * 5)
+        while moment < limit:
+            if moment.month not in self.months:
+                year, month = (moment.year + 1, 1) if moment.month == 12 else (moment.year, moment.month + 1)
+                moment = moment.replace(year=year, month=month, day=1, hour=0, minute=0)
+            elif not self._day_matches(moment):
+                moment = (moment + datetime.timedelta(days=1)).replace(hour=0, minute=0)
+            elif moment.hour not in self.hours:
+                moment = (moment + datetime.timedelta(hours=1)).replace(minute=0)
+            elif moment.minute not in self.minutes:
+                moment += datetime.timedelta(minutes=1)
+            else:
+                return moment.timestamp()
+        raise ValueError(f"Cron ifadesi hiçbir zaman eşleşmiyor: {self.expression}")
+
+
+def stagger_offset(subscription_id: str, stagger_seconds: float) -> float:
+    """Aboneliğe özgü sabit başlangıç gecikmesi; aynı cron'daki abonelikler ARM'a aynı anda yüklenmez."""
+    if stagger_seconds <= 0:
+        return 0.0
+    return (zlib.crc32(subscription_id.encode()) % 10_000) / 10_000 * stagger_seconds
+
+
+class ScheduleConfig(NamedTuple):
+    subscription_id: str
+    tenant_id: str
+    client_id: str
+    # Secret kuyruğa yazılmaz; zamanlayıcı süreci bu ortam değişkeninden okur
+    client_secret_env: str = "AZURE_CLIENT_SECRET"
+    cron: str = DEFAULT_CRON
+    stagger_seconds: float = DEFAULT_STAGGER_SECONDS
+    enabled: bool = True
+
+
+class Job(NamedTuple):
+    job_id: int
+    subscription_id: str
+    attempts: int
+
+
+def load_schedule_config(path: str) -> List[ScheduleConfig]:
+    """JSON dosyasından abonelik planlarını okur: [{"subscription_id": .., "tenant_id": .., "client_id": .., ...}]."""
+    with open(path, encoding="utf-8") as f:
+        entries = json.load(f)
+    configs = [ScheduleConfig(**entry) for entry in entries]
+    for config in configs:
+        CronSchedule(config.cron)
+    return configs
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS schedules (
+    subscription_id TEXT PRIMARY KEY,
+    tenant_id TEXT NOT NULL,
+    client_id TEXT NOT NULL,
+    client_secret_env TEXT NOT NULL,
+    cron TEXT NOT NULL,
+    stagger_seconds REAL NOT NULL,
+    enabled INTEGER NOT NULL,
+    next_run_at REAL NOT NULL,
+    last_enqueued_at REAL
+);
+
+CREATE TABLE IF NOT EXISTS jobs (
+    job_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    subscription_id TEXT NOT NULL,
+    status TEXT NOT NULL,
+    enqueued_at REAL NOT NULL,
+    not_before REAL NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    worker TEXT,
+    started_at REAL,
+    lease_expires_at REAL,
+    finished_at REAL,
+    finding_count INTEGER,
+    error TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs(status, not_before);
+CREATE INDEX IF NOT EXISTS idx_jobs_subscription ON jobs(subscription_id, enqueued_at);
+"""
+
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_SUCCEEDED = "succeeded"
+JOB_FAILED = "failed"
+
+
+class JobQueue:
+    """
+    SQLite tabanlı kalıcı iş kuyruğu. İş alma tek bir UPDATE ... RETURNING ifadesiyle yapılır; aynı dosyayı
+    paylaşan birden fazla zamanlayıcı süreci aynı işi iki kez alamaz. Bir abonelik için aynı anda tek iş çalışır.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or os.getenv("SCHEDULER_DB_PATH", DEFAULT_SCHEDULER_DB_PATH)
+        if self.path != ":memory:":
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False, timeout=10.0)
+        self._conn.row_factory = sqlite3.Row
+        with self._lock:
+            if self.path != ":memory:":
+                self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.executescript(_SCHEMA)
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    # --- Planlar ----------------------------------------------------------
+
+    def sync_schedules(self, configs: List[ScheduleConfig], now: Optional[float] = None) -> None:
+        """Planları yapılandırmaya eşitler; cron'u değişen planın bir sonraki çalışması yeniden hesaplanır."""
+        now = now or time.time()
+        with self._lock, self._conn:
+            existing = {row["subscription_id"]: row for row in self._conn.execute("SELECT * FROM schedules")}
+            for config in configs:
+                row = existing.get(config.subscription_id)
+                next_run_at = row["next_run_at"] if row is not None and row["cron"] == config.cron \
+                    else CronSchedule(config.cron).next_after(now)
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO schedules (subscription_id, tenant_id, client_id, client_secret_env, cron, "
+                    "stagger_seconds, enabled, next_run_at, last_enqueued_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (config.subscription_id, config.tenant_id, config.client_id, config.client_secret_env, config.cron,
+                     config.stagger_seconds, int(config.enabled), next_run_at,
+                     row["last_enqueued_at"] if row is not None else None)
+                )
+            configured = {config.subscription_id for config in configs}
+            self._conn.executemany(
+                "UPDATE schedules SET enabled = 0 WHERE subscription_id = ?",
+                [(subscription_id,) for subscription_id in existing if subscription_id not in configured]
+            )
+
+    def schedule(self, subscription_id: str) -> Optional[ScheduleConfig]:
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM schedules WHERE subscription_id = ?", (subscription_id,)).fetchone()
+        if row is None:
+            return None
+        return ScheduleConfig(row["subscription_id"], row["tenant_id"], row["client_id"], row["client_secret_env"],
+                              row["cron"], row["stagger_seconds"], bool(row["enabled"]))
+
+    def enqueue_due(self, now: Optional[float] = None) -> int:
+        """Zamanı gelen planlar için iş ekler (abonelikte bekleyen/çalışan iş yoksa); eklenen iş sayısı."""
+        now = now or time.time()
+        enqueued = 0
+        with self._lock, self._conn:
+            due = self._conn.execute(
+                "SELECT * FROM schedules WHERE enabled = 1 AND next_run_at <= ?", (now,)
+            ).fetchall()
+            for row in due:
+                active = self._conn.execute(
+                    "SELECT 1 FROM jobs WHERE subscription_id = ? AND status IN (?, ?) LIMIT 1",
+                    (row["subscription_id"], JOB_QUEUED, JOB_RUNNING)
+                ).fetchone()
+                if active is None:
+                    self._conn.execute(
+                        "INSERT INTO jobs (subscription_id, status, enqueued_at, not_before) VALUES (?, ?, ?, ?)",
+                        (row["subscription_id"], JOB_QUEUED, now,
+                         row["next_run_at"] + stagger_offset(row["subscription_id"], row["stagger_seconds"]))
+                    )
+                    enqueued += 1
+                self._conn.execute(
+                    "UPDATE schedules SET next_run_at = ?, last_enqueued_at = ? WHERE subscription_id = ?",
+                    (CronSchedule(row["cron"]).next_after(now), now, row["subscription_id"])
+                )
+        return enqueued
+
+    def enqueue(self, subscription_id: str, not_before: Optional[float] = None) -> int:
+        """Plandan bağımsız, hemen çalışacak bir iş ekler."""
+        now = time.time()
+        with self._lock, self._conn:
+            cursor = self._conn.execute(
+                "INSERT INTO jobs (subscription_id, status, enqueued_at, not_before) VALUES (?, ?, ?, ?)",
+                (subscription_id, JOB_QUEUED, now, not_before or now)
+            )
+            return cursor.lastrowid
+
+    # --- İşler ------------------------------------------------------------
+
+    def claim(self, worker: str, now: Optional[float] = None,
+              lease_seconds: float = DEFAULT_LEASE_SECONDS) -> Optional[Job]:
+        """Zamanı gelmiş en eski işi alır; aboneliği için çalışan iş varsa atlanır."""
+        now = now or time.time()
+        with self._lock, self._conn:
+            row = self._conn.execute(
+                """
+                UPDATE jobs SET status = ?, worker = ?, started_at = ?, lease_expires_at = ?, attempts = attempts + 1
+                WHERE job_id = (
+                    SELECT job_id FROM jobs AS queued
+                    WHERE status = ? AND not_before <= ?
+                      AND NOT EXISTS (SELECT 1 FROM jobs AS running
+                                      WHERE running.subscription_id = queued.subscription_id AND running.status = ?)
+                    ORDER BY not_before LIMIT 1
+                )
+                RETURNING job_id, subscription_id, attempts
+                """,
+                (JOB_RUNNING, worker, now, now + lease_seconds, JOB_QUEUED, now, JOB_RUNNING)
+            ).fetchone()
+        return Job(row["job_id"], row["subscription_id"], row["attempts"]) if row is not None else None
+
+    def complete(self, job_id: int, finding_count: int) -> None:
+        with self._lock, self._conn:
+            self._conn.execute(
+                "UPDATE jobs SET status = ?, finished_at = ?, finding_count = ?, error = NULL WHERE job_id = ?",
+                (JOB_SUCCEEDED, time.time(), finding_count, job_id)
+            )
+
+    def fail(self, job: Job, error: str, max_attempts: int = MAX_JOB_ATTEMPTS,
+             retry_delay: float = RETRY_DELAY_SECONDS) -> bool:
+        """İşi başarısız işaretler; deneme hakkı varsa gecikmeyle yeniden kuyruğa alır (True döner)."""
+        now = time.time()
+        retry = job.attempts < max_attempts
+        with self._lock, self._conn:
+            self._conn.execute(
+                "UPDATE jobs SET status = ?, not_before = ?, finished_at = ?, error = ?, worker = NULL, "
+                "lease_expires_at = NULL WHERE job_id = ?",
+                (JOB_QUEUED if retry else JOB_FAILED, now + retry_delay * job.attempts,
+                 None if retry else now, error[:2000], job.job_id)
+            )
+        return retry
+
+    def requeue_expired(self, now: Optional[float] = None) -> int:
+        """Kilidi dolmuş (worker'ı ölmüş) çalışan işleri yeniden kuyruğa alır."""
+        now = now or time.time()
+        with self._lock, self._conn:
+            cursor = self._conn.execute(
+                "UPDATE jobs SET status = ?, worker = NULL, lease_expires_at = NULL, not_before = ? "
+                "WHERE status = ? AND lease_expires_at < ?",
+                (JOB_QUEUED, now, JOB_RUNNING, now)
+            )
+            return cursor.rowcount
+
+    def prune(self, retention_days: float = JOB_RETENTION_DAYS) -> int:
+        cutoff = time.time() - retention_days * 86400
+        with self._lock, self._conn:
+            cursor = self._conn.execute(
+                "DELETE FROM jobs WHERE status IN (?, ?) AND finished_at < ?", (JOB_SUCCEEDED, JOB_FAILED, cutoff)
+            )
+            return cursor.rowcount
+
+    def status(self, subscription_id: Optional[str] = None, limit: int = 20) -> Dict[str, Any]:
+        """Planlar, durum başına iş sayıları ve son işler."""
+        where, params = ("WHERE subscription_id = ?", [subscription_id]) if subscription_id else ("", [])
+        with self._lock:
+            schedules = self._conn.execute(f"SELECT * FROM schedules {where} ORDER BY subscription_id", params).fetchall()
+            counts = self._conn.execute(f"SELECT status, COUNT(*) FROM jobs {where} GROUP BY status", params).fetchall()
+            jobs = self._conn.execute(
+                f"SELECT * FROM jobs {where} ORDER BY job_id DESC LIMIT ?", params + [limit]
+            ).fetchall()
+        return {
+            "schedules": [
+                {"subscription_id": row["subscription_id"], "cron": row["cron"], "enabled": bool(row["enabled"]),
+                 "next_run_at": row["next_run_at"], "last_enqueued_at": row["last_enqueued_at"]}
+                for row in schedules
+            ],
+            "job_counts": {row[0]: row[1] for row in counts},
+            "jobs": [
+                {key: row[key] for key in ("job_id", "subscription_id", "status", "attempts", "enqueued_at",
+                                           "not_before", "started_at", "finished_at", "finding_count", "error")}
+                for row in jobs
+            ],
+        }
+
+
+_queue: Optional[JobQueue] = None
+_queue_lock = threading.Lock()
+
+
+def get_job_queue() -> JobQueue:
+    """Süreç genelinde paylaşılan iş kuyruğu (SCHEDULER_DB_PATH)."""
+    global _queue
+    if _queue is None:
+        with _queue_lock:
+            if _queue is None:
+                _queue = JobQueue()
+    return _queue
+
+
+class ScanScheduler:
+    """
+    Kuyruktan iş alıp en fazla `max_workers` taramayı aynı anda çalıştırır. Her döngüde zamanı gelen planlar
+    kuyruğa eklenir, kilidi dolmuş işler geri alınır ve boş worker sayısı kadar iş başlatılır.
+    """
+
+    def __init__(self, queue: JobQueue, max_workers: int = DEFAULT_SCHEDULER_WORKERS,
+                 poll_seconds: float = DEFAULT_POLL_SECONDS, lease_seconds: float = DEFAULT_LEASE_SECONDS,
+                 scan: Callable[..., List] = scan_subscription):
+        self.queue = queue
+        self.max_workers = max(1, max_workers)
+        self.poll_seconds = poll_seconds
+        self.lease_seconds = lease_seconds
+        self.scan = scan
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}"
+        self._pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="scan-worker")
+        self._running: Dict[int, Future] = {}
+        self._stop = threading.Event()
+
+    def _execute(self, job: Job) -> None:
+        schedule = self.queue.schedule(job.subscription_id)
+        try:
+            if schedule is None:
+                raise RuntimeError("Abonelik için plan bulunamadı")
+            client_secret = os.getenv(schedule.client_secret_env)
+            if not client_secret:
+                raise RuntimeError(f"{schedule.client_secret_env} ortam değişkeni tanımlı değil")
+            records = self.scan(schedule.subscription_id, schedule.tenant_id, schedule.client_id, client_secret,
+                                source="scheduler")
+        except Exception as e:
+            # ScanIncomplete dahil: başarılı analizlerin sonuçları yazıldı, iş yeniden denenir
+            retry = self.queue.fail(job, str(e))
+            logger.error("Zamanlanmış tarama başarısız: %s", e, extra={"subscription_id": job.subscription_id,
+                                                                        "job_id": job.job_id, "retry": retry},
+                         exc_info=logger.isEnabledFor(logging.DEBUG))
+            return
+        self.queue.complete(job.job_id, len(records))
+        if COST_ALLOCATION_REFRESH:
+            try:
+                refresh_cost_allocation(schedule.subscription_id, schedule.tenant_id, schedule.client_id, client_secret)
+            except Exception as e:
+                # Tarama sonucu kaydedildi; maliyet dağıtımı bir sonraki taramada yeniden denenir
+                logger.error("Maliyet dağıtımı güncellenemedi: %s", e, extra={"subscription_id": job.subscription_id},
+                             exc_info=logger.isEnabledFor(logging.DEBUG))
+
+    def run_once(self, now: Optional[float] = None) -> int:
+        """Bir zamanlama döngüsü; başlatılan iş sayısını döndürür."""
+        for job_id in [job_id for job_id, future in self._running.items() if future.done()]:
+            del self._running[job_id]
+        self.queue.requeue_expired(now)
+        self.queue.enqueue_due(now)
+        started = 0
+        while len(self._running) < self.max_workers:
+            job = self.queue.claim(self.worker_id, now, self.lease_seconds)
+            if job is None:
+                break
+            logger.info("Zamanlanmış tarama başlatıldı", extra={"subscription_id": job.subscription_id,
+                                                                "job_id": job.job_id, "attempt": job.attempts})
+            self._running[job.job_id] = self._pool.submit(self._execute, job)
+            started += 1
+        return started
+
+    def drain(self) -> None:
+        """Çalışan işlerin bitmesini bekler."""
+        for future in list(self._running.values()):
+            future.result()
+        self._running.clear()
+
+    def run(self) -> None:
+        """Durdurulana kadar döngüyü çalıştırır."""
+        logger.info("Zamanlayıcı başladı", extra={"workers": self.max_workers, "worker_id": self.worker_id})
+        last_prune = 0.0
+        while not self._stop.is_set():
+            try:
+                self.run_once()
+                if time.time() - last_prune > 86400:
+                    self.queue.prune()
+                    last_prune = time.time()
+            except Exception as e:
+                logger.error("Zamanlayıcı döngüsünde hata: %s", e, exc_info=True)
+            self._stop.wait(self.poll_seconds)
+        self.drain()
+        self._pool.shutdown(wait=True)
+
+    def stop(self) -> None:
+        self._stop.set()
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Zamanlanmış abonelik tarayıcısı")
+    parser.add_argument("--config", default=os.getenv("SCHEDULE_CONFIG_PATH", DEFAULT_SCHEDULE_CONFIG_PATH),
+                        help="Abonelik planları (JSON)")
+    parser.add_argument("--workers", type=int, default=int(os.getenv("SCHEDULER_WORKERS", DEFAULT_SCHEDULER_WORKERS)))
+    parser.add_argument("--poll-seconds", type=float, default=DEFAULT_POLL_SECONDS)
+    parser.add_argument("--run-now", action="store_true", help="Tüm planlı abonelikleri hemen kuyruğa ekle")
+    parser.add_argument("--once", action="store_true", help="Zamanı gelen işleri çalıştır ve çık")
+    args = parser.parse_args(argv)
+
+    configure_logging()
+    queue = get_job_queue()
+    queue.sync_schedules(load_schedule_config(args.config))
+    if args.run_now:
+        for schedule in queue.status()["schedules"]:
+            if schedule["enabled"]:
+                queue.enqueue(schedule["subscription_id"])
+
+    scheduler = ScanScheduler(queue, max_workers=args.workers, poll_seconds=args.poll_seconds)
+    if args.once:
+        while scheduler.run_once():
+            scheduler.drain()
+        scheduler.drain()
+        return 0
+    try:
+        scheduler.run()
+    except KeyboardInterrupt:
+        scheduler.stop()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
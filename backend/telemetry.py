@@ -0,0 +1,293 @@
+# İstek bazlı izleme (span) ve sıcak yol ölçümleri.
+# Her SDK/HTTP çağrısı operasyon tipine göre zamanlanır; sonuçlar Prometheus formatında /metrics'ten sunulur.
+import threading
+import time
+import uuid
+from bisect import bisect_left
+from collections import defaultdict, deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Deque, Dict, Iterable, Iterator, List, Optional, Tuple
+
+# Prometheus gecikme histogramı kovaları (saniye)
+LATENCY_BUCKETS: Tuple[float, ...] = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+RECENT_TRACES_LIMIT = 50
+
+
+class Histogram:
+    """Sabit kovalı, kümülatif olmayan sayaçlarla tutulan basit gecikme histogramı."""
+    __slots__ = ("bucket_counts", "count", "total")
+
+    def __init__(self):
+        self.bucket_counts = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.count = 0
+        self.total = 0.0
+
+    def observe(self, seconds: float) -> None:
+        self.bucket_counts[bisect_left(LATENCY_BUCKETS, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+
+
+class Span:
+    __slots__ = ("operation", "start", "duration", "error", "attributes")
+
+    def __init__(self, operation: str, start: float, duration: float, error: Optional[str], attributes: Dict[str, Any]):
+        self.operation = operation
+        self.start = start
+        self.duration = duration
+        self.error = error
+        self.attributes = attributes
+
+    def to_dict(self, trace_start: float) -> Dict[str, Any]:
+        data = {
+            "operation": self.operation,
+            "offset_ms": round((self.start - trace_start) * 1000.0, 3),
+            "duration_ms": round(self.duration * 1000.0, 3),
+        }
+        if self.error:
+            data["error"] = self.error
+        if self.attributes:
+            data["attributes"] = self.attributes
+        return data
+
+
+class Trace:
+    """Tek bir API isteği boyunca toplanan span'ler."""
+
+    def __init__(self, name: str, trace_id: Optional[str] = None):
+        self.trace_id = trace_id or uuid.uuid4().hex
+        self.name = name
+        self.start = time.perf_counter()
+        self.duration: Optional[float] = None
+        self.spans: List[Span] = []
+        self._lock = threading.Lock()
+
+    def add(self, span: Span) -> None:
+        with self._lock:
+            self.spans.append(span)
+
+    def finish(self) -> None:
+        self.duration = time.perf_counter() - self.start
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        """Span sürelerini operasyon tipine göre gruplar."""
+        grouped: Dict[str, Dict[str, float]] = {}
+        with self._lock:
+            spans = list(self.spans)
+        for span in spans:
+            entry = grouped.setdefault(span.operation, {"count": 0, "total_ms": 0.0, "max_ms": 0.0, "errors": 0})
+            duration_ms = span.duration * 1000.0
+            entry["count"] += 1
+            entry["total_ms"] = round(entry["total_ms"] + duration_ms, 3)
+            entry["max_ms"] = round(max(entry["max_ms"], duration_ms), 3)
+            if span.error:
+                entry["errors"] += 1
+        return grouped
+
+    def to_dict(self, include_spans: bool = False) -> Dict[str, Any]:
+        data = {
+            "trace_id": self.trace_id,
+            "name": self.name,
+            "duration_ms": round((self.duration or 0.0) * 1000.0, 3),
+            "operations": self.summary(),
+        }
+        if include_spans:
+            with self._lock:
+                data["spans"] = [span.to_dict(self.start) for span in self.spans]
+        return data
+
+
+class MetricsRegistry:
+    """Süreç genelinde operasyon gecikmeleri, çağrı sayıları ve önbellek isabetleri."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._operations: Dict[str, Histogram] = defaultdict(Histogram)
+        self._errors: Dict[str, int] = defaultdict(int)
+        self._requests: Dict[Tuple[str, str], Histogram] = defaultdict(Histogram)
+        self._cache: Dict[Tuple[str, str], int] = defaultdict(int)
+        self.recent_traces: Deque[Trace] = deque(maxlen=RECENT_TRACES_LIMIT)
+
+    def observe_operation(self, operation: str, seconds: float, error: bool = False) -> None:
+        with self._lock:
+            self._operations[operation].observe(seconds)
+            if error:
+                self._errors[operation] += 1
+
+    def observe_request(self, method: str, route: str, status_code: int, seconds: float) -> None:
+        with self._lock:
+            self._requests[(f"{method} {route}", str(status_code))].observe(seconds)
+
+    def record_cache_access(self, cache: str, hit: bool) -> None:
+        with self._lock:
+            self._cache[(cache, "hit" if hit else "miss")] += 1
+
+    def add_trace(self, trace: Trace) -> None:
+        with self._lock:
+            self.recent_traces.append(trace)
+
+    def operation_snapshot(self) -> Dict[str, Dict[str, float]]:
+        """Operasyon başına çağrı sayısı, toplam süre ve hata sayısı."""
+        with self._lock:
+            return {
+                operation: {
+                    "count": hist.count,
+                    "total_ms": round(hist.total * 1000.0, 3),
+                    "avg_ms": round(hist.total * 1000.0 / hist.count, 3) if hist.count else 0.0,
+                    "errors": self._errors.get(operation, 0),
+                }
+                for operation, hist in sorted(self._operations.items())
+            }
+
+    def reset(self) -> None:
+        with self._lock:
+            self._operations.clear()
+            self._errors.clear()
+            self._requests.clear()
+            self._cache.clear()
+            self.recent_traces.clear()
+
+    def render_prometheus(self) -> str:
+        """Kayıtlı metrikleri Prometheus metin formatında döndürür."""
+        lines: List[str] = []
+        with self._lock:
+            lines.append("# HELP azure_call_duration_seconds Azure SDK ve Retail Prices çağrılarının süresi")
+            lines.append("# TYPE azure_call_duration_seconds histogram")
+            for operation, hist in sorted(self._operations.items()):
+                _render_histogram(lines, "azure_call_duration_seconds", f'operation="{_escape(operation)}"', hist)
+
+            lines.append("# HELP azure_calls_total Operasyon tipine göre Azure çağrı sayısı")
+            lines.append("# TYPE azure_calls_total counter")
+            for operation, hist in sorted(self._operations.items()):
+                errors = self._errors.get(operation, 0)
+                label = _escape(operation)
+                lines.append(f'azure_calls_total{{operation="{label}",outcome="success"}} {hist.count - errors}')
+                lines.append(f'azure_calls_total{{operation="{label}",outcome="error"}} {errors}')
+
+            lines.append("# HELP http_request_duration_seconds API isteklerinin uçtan uca süresi")
+            lines.append("# TYPE http_request_duration_seconds histogram")
+            for (route, status), hist in sorted(self._requests.items()):
+                _render_histogram(lines, "http_request_duration_seconds",
+                                  f'route="{_escape(route)}",status="{status}"', hist)
+
+            lines.append("# HELP cache_requests_total Önbellek erişimleri (hit/miss)")
+            lines.append("# TYPE cache_requests_total counter")
+            caches = sorted({cache for cache, _ in self._cache})
+            for cache in caches:
+                for result in ("hit", "miss"):
+                    lines.append(f'cache_requests_total{{cache="{_escape(cache)}",result="{result}"}} {self._cache.get((cache, result), 0)}')
+
+            lines.append("# HELP cache_hit_ratio Önbellek isabet oranı")
+            lines.append("# TYPE cache_hit_ratio gauge")
+            for cache in caches:
+                hits = self._cache.get((cache, "hit"), 0)
+                total = hits + self._cache.get((cache, "miss"), 0)
+                lines.append(f'cache_hit_ratio{{cache="{_escape(cache)}"}} {hits / total if total else 0.0:.6f}')
+        return "\n".join(lines) + "\n"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _render_histogram(lines: List[str], name: str, labels: str, hist: Histogram) -> None:
+    cumulative = 0
+    for bound, count in zip(LATENCY_BUCKETS, hist.bucket_counts):
+        cumulative += count
+        lines.append(f'{name}_bucket{{{labels},le="{bound}"}} {cumulative}')
+    lines.append(f'{name}_bucket{{{labels},le="+Inf"}} {hist.count}')
+    lines.append(f"{name}_sum{{{labels}}} {hist.total:.6f}")
+    lines.append(f"{name}_count{{{labels}}} {hist.count}")
+
+
+registry = MetricsRegistry()
+_current_trace: ContextVar[Optional[Trace]] = ContextVar("current_trace", default=None)
+
+
+def current_trace() -> Optional[Trace]:
+    return _current_trace.get()
+
+
+@contextmanager
+def start_trace(name: str, trace_id: Optional[str] = None) -> Iterator[Trace]:
+    """Bir isteğin tüm span'lerini toplayacak izi başlatır."""
+    trace = Trace(name, trace_id)
+    token = _current_trace.set(trace)
+    try:
+        yield trace
+    finally:
+        trace.finish()
+        _current_trace.reset(token)
+        registry.add_trace(trace)
+
+
+def _record(operation: str, start: float, duration: float, error: Optional[str], attributes: Dict[str, Any]) -> None:
+    registry.observe_operation(operation, duration, error is not None)
+    trace = _current_trace.get()
+    if trace is not None:
+        trace.add(Span(operation, start, duration, error, attributes))
+
+
+@contextmanager
+def span(operation: str, **attributes: Any) -> Iterator[Dict[str, Any]]:
+    """Bir operasyonu zamanlar; süre histogramına ve aktif ize işlenir."""
+    start = time.perf_counter()
+    error = None
+    try:
+        yield attributes
+    except BaseException as e:
+        error = type(e).__name__
+        raise
+    finally:
+        _record(operation, start, time.perf_counter() - start, error, attributes)
+
+
+def traced_iter(iterable: Iterable, operation: str) -> Iterator:
+    """
+    Sayfalı SDK listelerini (ItemPaged) zamanlar. Yalnızca sonraki öğeyi beklerken geçen süre
+    ölçülür; tüketicinin işleme süresi dahil edilmez. Liste bitince tek bir span yazılır.
+    """
+    iterator = iter(iterable)
+    first_start = time.perf_counter()
+    waited = 0.0
+    items = 0
+    error = None
+    try:
+        while True:
+            step = time.perf_counter()
+            try:
+                item = next(iterator)
+            except StopIteration:
+                waited += time.perf_counter() - step
+                break
+            waited += time.perf_counter() - step
+            items += 1
+            yield item
+    except GeneratorExit:
+        raise
+    except BaseException as e:
+        error = type(e).__name__
+        raise
+    finally:
+        _record(operation, first_start, waited, error, {"items": items})
+
+
+class InstrumentedCredential:
+    """Token alma süresini `auth.get_token` operasyonu olarak ölçen kimlik bilgisi sarmalayıcısı."""
+
+    def __init__(self, credential):
+        self._credential = credential
+
+    def get_token(self, *scopes, **kwargs):
+        with span("auth.get_token"):
+            return self._credential.get_token(*scopes, **kwargs)
+
+    def __getattr__(self, name: str):
+        attribute = getattr(self._credential, name)
+        if name == "get_token_info":
+            def get_token_info(*scopes, **kwargs):
+                with span("auth.get_token"):
+                    return attribute(*scopes, **kwargs)
+            return get_token_info
+        return attribute
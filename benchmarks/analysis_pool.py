@@ -0,0 +1,110 @@
+"""
+Analiz süreç havuzu (backend/analysis_pool.py) ölçekleme benchmark'ı.
+
+Sentetik verilerle CPU yoğun iki adım farklı worker sayılarıyla ölçülür:
+  - utilization_stats: (plan x saat) CPU/bellek matrislerinden ortalama, yüzdelik tepe ve maksimum
+  - dashboard_summary: bulgu sütunlarının kategori/bölge/resource group/SKU toplamları
+Worker sayısı 0 aynı süreçte hesaptır. Her ölçümde sonuçların aynı süreçteki hesapla aynı olduğu doğrulanır.
+
+Kullanım (proje kök dizininden):
+    python -m benchmarks.analysis_pool --plans 20000 --hours 720 --findings 4000000 --workers 0,2,4,8,16
+"""
+import argparse
+import json
+import os
+import statistics
+import time
+from typing import Callable, Dict, List
+
+import numpy as np
+
+from backend import analysis_pool
+from backend.app_service_sizing import utilization_stats
+from backend.dashboard import dashboard_summary
+
+
+def _series(rng: np.random.Generator, plans: int, hours: int) -> List[List[float]]:
+    # Planların bir kısmı daha kısa süredir var; matris NaN ile doldurulur
+    lengths = np.where(rng.random(plans) < 0.1, rng.integers(1, hours, plans), hours)
+    base = rng.uniform(5, 60, (plans, 1))
+    values = np.clip(base + rng.normal(0, 15, (plans, hours)), 0, 100)
+    return [row[:length].tolist() for row, length in zip(values, lengths)]
+
+
+def _columns(rng: np.random.Generator, findings: int) -> Dict[str, List]:
+    categories = np.array(["Public IP", "App Service Plan", "Unattached Disk", "Old Snapshot"])
+    regions = np.array(["westeurope", "northeurope", "eastus", "westus2", "uksouth", "francecentral"])
+    return {
+        "category": categories[rng.integers(0, len(categories), findings)].tolist(),
+        "location": regions[rng.integers(0, len(regions), findings)].tolist(),
+        "resource_group": [f"rg-{i}" for i in rng.integers(0, 400, findings)],
+        "sku": [f"S{i}" for i in rng.integers(0, 40, findings)],
+        "monthly_savings": rng.gamma(2.0, 20.0, findings).round(2).tolist(),
+    }
+
+
+def _measure(fn: Callable[[], object], repeats: int) -> float:
+    durations = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        durations.append(time.perf_counter() - start)
+    return statistics.median(durations) * 1000
+
+
+def _same(left, right) -> bool:
+    if isinstance(left, tuple):
+        return all(np.allclose(a, b, equal_nan=True) for a, b in zip(left, right))
+    return json.dumps(left, sort_keys=True) == json.dumps(right, sort_keys=True)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Analiz süreç havuzu ölçekleme benchmark'ı")
+    parser.add_argument("--plans", type=int, default=20000)
+    parser.add_argument("--hours", type=int, default=720, help="Plan başına saatlik örnek (30 gün = 720)")
+    parser.add_argument("--findings", type=int, default=2000000)
+    parser.add_argument("--workers", default="0,2,4,8,16", help="Virgülle ayrılmış worker sayıları")
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--json", action="store_true", help="Sonuçları JSON olarak yazdır")
+    args = parser.parse_args(argv)
+
+    rng = np.random.default_rng(42)
+    cpu_avg, cpu_max = _series(rng, args.plans, args.hours), _series(rng, args.plans, args.hours)
+    mem_avg, mem_max = _series(rng, args.plans, args.hours), _series(rng, args.plans, args.hours)
+    columns = _columns(rng, args.findings)
+    steps = {
+        "utilization_stats": lambda: utilization_stats(cpu_avg, cpu_max, mem_avg, mem_max),
+        "dashboard_summary": lambda: dashboard_summary(columns, "USD"),
+    }
+
+    results = []
+    expected = {}
+    try:
+        for workers in [int(value) for value in args.workers.split(",")]:
+            analysis_pool.shutdown_analysis_pool()
+            analysis_pool.ANALYSIS_WORKERS = workers
+            analysis_pool.start_analysis_pool()
+            for name, step in steps.items():
+                result = step()
+                expected.setdefault(name, result)
+                results.append({"step": name, "workers": workers, "median_ms": _measure(step, args.repeats),
+                                "matches": _same(expected[name], result)})
+    finally:
+        analysis_pool.shutdown_analysis_pool()
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return 0
+    print(f"{args.plans} plan x {args.hours} saat, {args.findings:,} bulgu, {os.cpu_count()} çekirdek")
+    print(f"{'Adım':<20} {'worker':>7} {'medyan ms':>10} {'hızlanma':>9} {'aynı':>5}")
+    print("-" * 55)
+    baseline = {}
+    for row in results:
+        base = baseline.setdefault(row["step"], row["median_ms"])
+        print(f"{row['step']:<20} {row['workers']:>7} {row['median_ms']:>10.1f} "
+              f"{base / row['median_ms']:>8.2f}x {'evet' if row['matches'] else 'HAYIR':>5}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
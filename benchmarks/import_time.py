@@ -0,0 +1,172 @@
+"""
+Backend başlangıç (import) süresi benchmark'ı.
+
+Modül ayrı bir Python sürecinde `-X importtime` ile import edilir; her backend modülünün kümülatif import
+süresi ve en ağır üçüncü parti paketler raporlanır. Başlangıçta yüklenmemesi gereken paketler
+(azure.mgmt.*, azure.identity) yüklenirse bu da gerileme sayılır.
+
+Kullanım (proje kök dizininden):
+    python -m benchmarks.import_time
+    python -m benchmarks.import_time --save-baseline
+    python -m benchmarks.import_time --check            # gerileme varsa çıkış kodu 1
+"""
+import argparse
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+from collections import defaultdict
+from typing import Dict, List, NamedTuple
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_BASELINE_PATH = os.path.join(os.path.dirname(__file__), "import_baseline.json")
+DEFAULT_MODULE = "backend.main"
+
+# İlk kullanımda yüklenmesi gereken, başlangıçta görülmemesi gereken paketler
+FORBIDDEN_AT_STARTUP = ("azure.mgmt", "azure.identity")
+
+# Ölçüm gürültüsü yüksek olduğundan tolerans geniştir; çok küçük modüller karşılaştırılmaz
+REGRESSION_TOLERANCE = 0.5
+MIN_COMPARED_MS = 5.0
+
+_LINE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+
+class ImportEntry(NamedTuple):
+    self_ms: float
+    cumulative_ms: float
+
+
+def _run_once(module: str) -> Dict[str, ImportEntry]:
+    """Modülü taze bir süreçte import eder ve `-X importtime` çıktısını ayrıştırır."""
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=PROJECT_ROOT, capture_output=True, text=True, check=False
+    )
+    if completed.returncode != 0:
+        raise RuntimeError(f"{module} import edilemedi:\n{completed.stderr[-2000:]}")
+    entries: Dict[str, ImportEntry] = {}
+    for line in completed.stderr.splitlines():
+        match = _LINE.match(line)
+        if match:
+            self_us, cumulative_us, _, name = match.groups()
+            entries[name] = ImportEntry(int(self_us) / 1000.0, int(cumulative_us) / 1000.0)
+    return entries
+
+
+def measure(module: str = DEFAULT_MODULE, repeats: int = 5) -> Dict[str, object]:
+    """
+    Modülü `repeats` kez import eder; süreler medyan olarak raporlanır. İlk çalıştırma .pyc
+    derlemesini içerebileceği için ölçüme katılmaz.
+    """
+    _run_once(module)
+    runs = [_run_once(module) for _ in range(max(repeats, 1))]
+
+    def median(name: str, field: str) -> float:
+        return round(statistics.median(getattr(run[name], field) for run in runs if name in run), 2)
+
+    names = set().union(*runs)
+    backend_modules = {name: median(name, "cumulative_ms") for name in sorted(names)
+                       if name == "backend" or name.startswith("backend.")}
+
+    # Üçüncü parti paketlerin toplam (self) süresi, en üst paket adına göre
+    packages: Dict[str, List[float]] = defaultdict(list)
+    for run in runs:
+        totals: Dict[str, float] = defaultdict(float)
+        for name, entry in run.items():
+            if not name.startswith("backend"):
+                totals[name.split(".")[0]] += entry.self_ms
+        for package, total in totals.items():
+            packages[package].append(total)
+    package_ms = {package: round(statistics.median(values), 2) for package, values in packages.items()}
+
+    return {
+        "module": module,
+        "total_ms": median(module, "cumulative_ms"),
+        "backend_modules": backend_modules,
+        "packages": dict(sorted(package_ms.items(), key=lambda item: item[1], reverse=True)),
+        "forbidden_loaded": sorted(name for name in names if name.startswith(FORBIDDEN_AT_STARTUP)),
+    }
+
+
+def compare_with_baseline(results: Dict, baseline: Dict, tolerance_scale: float = 1.0) -> List[str]:
+    """Toplam süre ve backend modülleri için izin verilen artışı aşanları listeler."""
+    regressions = []
+    old_modules = {"<total>": baseline.get("total_ms"), **baseline.get("backend_modules", {})}
+    new_modules = {"<total>": results["total_ms"], **results["backend_modules"]}
+    for name, new in new_modules.items():
+        old = old_modules.get(name)
+        if old is None or max(old, new) < MIN_COMPARED_MS:
+            continue
+        limit = old * (1.0 + REGRESSION_TOLERANCE * tolerance_scale)
+        if new > limit:
+            regressions.append(f"{name}: {old} ms -> {new} ms (limit {limit:.1f} ms)")
+    return regressions
+
+
+def _print_report(results: Dict, top: int) -> None:
+    print(f"{results['module']} import süresi: {results['total_ms']:.1f} ms\n")
+    header = f"{'Backend modülü':<40} {'kümülatif ms':>13}"
+    print(header)
+    print("-" * len(header))
+    for name, ms in sorted(results["backend_modules"].items(), key=lambda item: item[1], reverse=True):
+        print(f"{name:<40} {ms:>13.1f}")
+    print()
+    header = f"{'Paket':<40} {'self ms':>13}"
+    print(header)
+    print("-" * len(header))
+    for name, ms in list(results["packages"].items())[:top]:
+        print(f"{name:<40} {ms:>13.1f}")
+    if results["forbidden_loaded"]:
+        print(f"\n[WARN] Başlangıçta yüklenmemesi gereken modüller: {len(results['forbidden_loaded'])} "
+              f"(örn: {', '.join(results['forbidden_loaded'][:3])})")
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Backend import süresi benchmark'ı")
+    parser.add_argument("--module", default=DEFAULT_MODULE)
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--top", type=int, default=15, help="Raporlanacak en ağır paket sayısı")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE_PATH)
+    parser.add_argument("--save-baseline", action="store_true", help="Sonuçları baseline olarak kaydet")
+    parser.add_argument("--check", action="store_true", help="Gerileme varsa 1 ile çık")
+    parser.add_argument("--tolerance-scale", type=float, default=1.0, help="Gerileme toleransını ölçekler")
+    parser.add_argument("--json", action="store_true", help="Sonuçları JSON olarak yazdır")
+    args = parser.parse_args(argv)
+
+    results = measure(args.module, args.repeats)
+    if args.json:
+        print(json.dumps(results, indent=2, ensure_ascii=False))
+    else:
+        _print_report(results, args.top)
+
+    if args.save_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2, ensure_ascii=False)
+        print(f"Baseline kaydedildi: {args.baseline}")
+        return 0
+
+    regressions = [f"başlangıçta yüklendi: {name}" for name in results["forbidden_loaded"][:5]]
+    if os.path.exists(args.baseline):
+        with open(args.baseline, encoding="utf-8") as f:
+            stored = json.load(f)
+        if stored.get("module") != results["module"]:
+            print("[WARN] Baseline farklı bir modül için alınmış; karşılaştırma yanıltıcı olabilir.")
+        regressions += compare_with_baseline(results, stored, args.tolerance_scale)
+    elif args.check:
+        print(f"Baseline bulunamadı: {args.baseline} (önce --save-baseline ile oluşturun)")
+        return 1
+
+    if regressions:
+        print("\nGerilemeler:")
+        for line in regressions:
+            print(f"  - {line}")
+        return 1 if args.check else 0
+    print("\nGerileme yok.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,207 @@
+"""
+Retail Prices HTTP istemcisi benchmark'ı (yerel sahte sunucuya karşı).
+
+Süreç içinde, Retail Prices API'sini taklit eden bir HTTP/1.1 sunucusu başlatılır (sayfalı yanıtlar,
+istenirse gzip, yanıt gecikmesi ve yeni bağlantı başına el sıkışma gecikmesi). Aynı çok bölgeli App Service
+fiyat çekimi (yalnızca HTTP, ayrıştırma hariç) iki yolla ölçülür:
+  - requests.get: eski yol; her sayfa için yeni bağlantı, bölgeler thread havuzunda
+  - httpx async: backend/pricing_http.py; paylaşılan bağlantı havuzu, bölgeler tek loop'ta eşzamanlı
+Süre, açılan bağlantı sayısı ve ağdan geçen bayt raporlanır. Sunucu TLS kullanmadığından TCP+TLS el sıkışması
+`--handshake-ms` ile taklit edilir; HTTP/2 burada ölçülmez.
+
+Kullanım (proje kök dizininden):
+    python -m benchmarks.pricing_http --regions 16 --pages 5 --latency-ms 20 --handshake-ms 40
+"""
+import argparse
+import gzip
+import json
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, List
+from urllib.parse import parse_qs, urlsplit
+
+import requests
+
+from backend.azure_pricing import FALLBACK_APP_SERVICE_MONTHLY_USD, HOURS_PER_MONTH, AzureRetailPrices
+from backend import pricing_http
+
+PAGE_SIZE = 100
+# Eski yolun (pricing_cache) bölge başına paralel çekim sayısı
+LEGACY_WORKERS = 8
+REGIONS = ["westeurope", "northeurope", "eastus", "eastus2", "westus", "westus2", "westus3", "centralus",
+           "uksouth", "ukwest", "francecentral", "germanywestcentral", "swedencentral", "switzerlandnorth",
+           "southeastasia", "eastasia", "japaneast", "japanwest", "koreacentral", "australiaeast",
+           "canadacentral", "brazilsouth", "centralindia", "southafricanorth"]
+
+
+class _Stats:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.connections = 0
+        self.requests = 0
+        self.bytes_sent = 0
+
+    def add(self, connections: int = 0, requests_: int = 0, bytes_sent: int = 0) -> None:
+        with self.lock:
+            self.connections += connections
+            self.requests += requests_
+            self.bytes_sent += bytes_sent
+
+    def reset(self) -> None:
+        with self.lock:
+            self.connections = self.requests = self.bytes_sent = 0
+
+
+def _items(region: str, count: int) -> List[Dict]:
+    """App Service kalemleri; ilk sayfalar gerçek SKU'lar, kalanlar eşleşmeyen dolgu kalemleridir."""
+    skus = list(FALLBACK_APP_SERVICE_MONTHLY_USD.items())
+    items = []
+    for i in range(count):
+        sku, monthly = skus[i % len(skus)] if i < len(skus) else (f"X{i}", 1.0)
+        items.append({
+            "currencyCode": "USD", "retailPrice": round(monthly / HOURS_PER_MONTH, 4),
+            "unitPrice": round(monthly / HOURS_PER_MONTH, 4), "armRegionName": region, "location": region,
+            "meterName": f"{sku} App", "skuName": sku, "productName": "Azure App Service", "type": "Consumption",
+            "serviceName": "Azure App Service", "unitOfMeasure": "1 Hour", "isPrimaryMeterRegion": True,
+        })
+    return items
+
+
+def start_stub_server(pages: int, latency_ms: float, handshake_ms: float, stats: _Stats) -> ThreadingHTTPServer:
+    """Retail Prices API'sini taklit eden yerel sunucu; `server.url` taban adrestir."""
+    catalogue: Dict[str, List[Dict]] = {}
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        # Başlık ve gövde ayrı yazılır; Nagle açıkken keep-alive bağlantılar gecikmeli ACK'ı bekler
+        disable_nagle_algorithm = True
+
+        def setup(self):
+            super().setup()
+            stats.add(connections=1)
+            if handshake_ms:
+                time.sleep(handshake_ms / 1000.0)
+
+        def log_message(self, format, *args):
+            pass
+
+        def do_GET(self):
+            query = {key: values[0] for key, values in parse_qs(urlsplit(self.path).query).items()}
+            region = query.get("region")
+            if region is None:
+                filter_query = query.get("$filter", "")
+                region = filter_query.split("armRegionName eq '", 1)[1].split("'", 1)[0]
+            skip = int(query.get("skip", 0))
+            items = catalogue.get(region)
+            if items is None:
+                items = catalogue.setdefault(region, _items(region, pages * PAGE_SIZE))
+            next_skip = skip + PAGE_SIZE
+            body = json.dumps({
+                "BillingCurrency": "USD", "Items": items[skip:next_skip], "Count": len(items[skip:next_skip]),
+                "NextPageLink": f"{server.url}?region={region}&skip={next_skip}" if next_skip < len(items) else None,
+            }).encode()
+            if latency_ms:
+                time.sleep(latency_ms / 1000.0)
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            if "gzip" in self.headers.get("Accept-Encoding", ""):
+                body = gzip.compress(body, compresslevel=5)
+                self.send_header("Content-Encoding", "gzip")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+            stats.add(requests_=1, bytes_sent=len(body))
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    server.daemon_threads = True
+    server.url = f"http://127.0.0.1:{server.server_address[1]}/api/retail/prices"
+    threading.Thread(target=server.serve_forever, name="pricing-stub", daemon=True).start()
+    return server
+
+
+def _filter(region: str) -> str:
+    return f"serviceName eq 'Azure App Service' and armRegionName eq '{region}' and priceType eq 'Consumption'"
+
+
+def _legacy_fetch(base_url: str, regions: List[str]) -> Dict[str, int]:
+    """Eski yol: oturumsuz requests.get, sayfalar sırayla, bölgeler thread havuzunda."""
+    def fetch(region: str) -> int:
+        params = {"$filter": _filter(region), "currencyCode": "USD"}
+        url, count = base_url, 0
+        while url:
+            response = requests.get(url, params=params, timeout=30)
+            response.raise_for_status()
+            data = response.json()
+            count += len(data.get("Items", []))
+            url, params = data.get("NextPageLink"), None
+        return count
+
+    with ThreadPoolExecutor(max_workers=min(LEGACY_WORKERS, len(regions))) as pool:
+        return dict(zip(regions, pool.map(fetch, regions)))
+
+
+def _async_fetch(base_url: str, regions: List[str]) -> Dict[str, int]:
+    previous = AzureRetailPrices.BASE_URL
+    AzureRetailPrices.BASE_URL = base_url
+    try:
+        fetched = AzureRetailPrices._fetch_regions(_filter, regions)
+    finally:
+        AzureRetailPrices.BASE_URL = previous
+    return {region: len(items) for region, items in fetched.items()}
+
+
+def _measure(name: str, fetch: Callable[[], Dict[str, int]], stats: _Stats, repeats: int) -> Dict[str, float]:
+    durations = []
+    for _ in range(repeats):
+        stats.reset()
+        start = time.perf_counter()
+        fetch()
+        durations.append(time.perf_counter() - start)
+    return {"name": name, "median_ms": statistics.median(durations) * 1000, "min_ms": min(durations) * 1000,
+            "requests": stats.requests, "connections": stats.connections, "kb_sent": stats.bytes_sent / 1024}
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Retail Prices HTTP istemcisi benchmark'ı (yerel sahte sunucu)")
+    parser.add_argument("--regions", type=int, default=16, help=f"En fazla {len(REGIONS)}")
+    parser.add_argument("--pages", type=int, default=5, help="Bölge başına sayfa sayısı (sayfa başına 100 kalem)")
+    parser.add_argument("--latency-ms", type=float, default=20.0, help="Her yanıta eklenen sunucu gecikmesi")
+    parser.add_argument("--handshake-ms", type=float, default=40.0,
+                        help="Yeni bağlantı başına eklenen gecikme (TCP+TLS el sıkışmasını taklit eder)")
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--json", action="store_true", help="Sonuçları JSON olarak yazdır")
+    args = parser.parse_args(argv)
+
+    stats = _Stats()
+    server = start_stub_server(args.pages, args.latency_ms, args.handshake_ms, stats)
+    regions = REGIONS[:max(1, min(args.regions, len(REGIONS)))]
+    try:
+        # Isınma: loop thread'i ve havuz bağlantıları ölçümden önce kurulur
+        _async_fetch(server.url, regions)
+        results = [
+            _measure("requests.get (oturumsuz)", lambda: _legacy_fetch(server.url, regions), stats, args.repeats),
+            _measure("httpx async (havuz)", lambda: _async_fetch(server.url, regions), stats, args.repeats),
+        ]
+    finally:
+        pricing_http.close_pricing_client()
+        server.shutdown()
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return 0
+    print(f"{len(regions)} bölge x {args.pages} sayfa, yanıt gecikmesi {args.latency_ms:g} ms, "
+          f"el sıkışma {args.handshake_ms:g} ms, "
+          f"HTTP/2: {'var' if pricing_http.http2_available() else 'yok'} (yerel sunucu HTTP/1.1)")
+    print(f"{'Yol':<28} {'medyan ms':>10} {'min ms':>9} {'istek':>7} {'bağlantı':>9} {'KB':>9}")
+    print("-" * 76)
+    for row in results:
+        print(f"{row['name']:<28} {row['median_ms']:>10.1f} {row['min_ms']:>9.1f} {row['requests']:>7} "
+              f"{row['connections']:>9} {row['kb_sent']:>9.1f}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,344 @@
+"""
+Sahte Azure (backend/fake_azure.py) üzerinde her FastAPI endpoint'i için benchmark.
+
+Her endpoint için uçtan uca gecikme (p50/p95), kaynak başına ARM çağrısı ve tepe bellek ölçülür.
+Sonuçlar kayıtlı bir baseline ile karşılaştırılıp gerilemeler işaretlenir. Depolar ve fiyat/kur snapshot'ları
+geçici bir dizinde tutulur (data/ değişmez). stdout'a yalnızca sonuçlar (tablo ya da --json) yazılır; loglar,
+baseline ve gerileme mesajları stderr'e gider.
+
+Baseline süreleri makineye bağlıdır ve repoda tutulmaz: --check'ten önce aynı makinede ve aynı filo
+parametreleriyle --save-baseline çalıştırılmalıdır (baseline yoksa --check 1 ile çıkar).
+
+Kullanım (proje kök dizininden):
+    python -m benchmarks.run_benchmarks --vms 500 --public-ips 200 --plans 50
+    python -m benchmarks.run_benchmarks --save-baseline        # baseline'ı güncelle
+    python -m benchmarks.run_benchmarks --check                 # gerileme varsa çıkış kodu 1
+
+Not: FastAPI TestClient için `httpx` paketi gereklidir.
+"""
+import argparse
+import atexit
+import json
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, List
+
+from fastapi.testclient import TestClient
+
+# Benchmark gerçek data/ dosyalarına (sonuç/geçmiş/maliyet depoları, fiyat ve kur snapshot'ları) dokunmamalı;
+# yollar backend içe aktarılmadan önce geçici bir dizine yönlendirilir
+_DATA_DIR = tempfile.mkdtemp(prefix="bench-data-")
+atexit.register(shutil.rmtree, _DATA_DIR, ignore_errors=True)
+for _env, _name in (("RESULTS_DB_PATH", "results.db"), ("HISTORY_DB_PATH", "history.db"),
+                    ("COST_DB_PATH", "cost.db"), ("SCHEDULER_DB_PATH", "scheduler.db"),
+                    ("PRICING_SNAPSHOT_PATH", "pricing_snapshot.json"), ("FX_CACHE_PATH", "fx_rates.json")):
+    os.environ[_env] = os.path.join(_DATA_DIR, _name)
+
+from backend.fake_azure import FAKE_SUBSCRIPTION_ID, FakeAzure  # noqa: E402
+from backend.logging_config import configure_logging  # noqa: E402
+from backend.main import app  # noqa: E402
+
+DEFAULT_BASELINE_PATH = os.path.join(os.path.dirname(__file__), "baseline.json")
+
+CREDENTIALS = {
+    "subscription_id": FAKE_SUBSCRIPTION_ID,
+    "tenant_id": "fake-tenant",
+    "client_id": "fake-client",
+    "client_secret": "fake-secret"
+}
+
+# Çok bölgeli fiyat karşılaştırması senaryosunun bölgeleri
+_COMPARED_REGIONS = ["westeurope", "northeurope", "eastus", "westus2", "uksouth", "francecentral",
+                     "southeastasia", "japaneast"]
+
+
+def _run_bulk(client: TestClient, body: Dict[str, Any]):
+    """Toplu işlemi başlatır ve bitene kadar bekler; ölçüm arka plandaki eylemleri de kapsar."""
+    response = client.post("/actions/bulk", json=body)
+    if response.status_code != 200:
+        return response
+    batch_id = response.json()["batch_id"]
+    while True:
+        response = client.get(f"/actions/bulk/{batch_id}", params={"include_items": False})
+        if response.status_code != 200 or response.json()["status"] == "completed":
+            return response
+        time.sleep(0.005)
+
+
+def _scenarios(azure: FakeAzure) -> Dict[str, Dict[str, Any]]:
+    """
+    Endpoint adı -> (istek fonksiyonu, kaynak sayısı) eşlemesi. Depolardan okuyan senaryolar (sonuçlar, geçmiş,
+    maliyet dağıtımı) kendilerinden önce çalışan tarama ve yenileme senaryolarının yazdıklarını okur.
+    """
+    first_vm = azure.vms[0].id if azure.vms else ""
+    first_plan = azure.plans[0] if azure.plans else None
+    first_ip = azure.public_ips[0].id if azure.public_ips else ""
+    scanned = len(azure.public_ips) + len(azure.plans) + len(azure.disks) + len(azure.snapshots)
+    bulk_vms = [vm.id for vm in azure.vms[:20]]
+    bulk_plans = [{"action": "update_sku", "resource_group_name": plan.resource_group, "plan_name": plan.name,
+                   "target_sku_name": "B1", "target_sku_tier": "Basic"} for plan in azure.plans[:20]]
+    return {
+        "POST /list-custom-recommendations": {
+            "request": lambda c: c.post("/list-custom-recommendations", json=CREDENTIALS),
+            "resources": len(azure.public_ips) + len(azure.plans) + len(azure.disks) + len(azure.snapshots),
+        },
+        # Bir önceki senaryonun sonuç deposuna yazdığı taramayı okur
+        "GET /dashboard/summary": {
+            "request": lambda c: c.get("/dashboard/summary", params={"subscription_id": FAKE_SUBSCRIPTION_ID}),
+            "resources": len(azure.public_ips) + len(azure.plans) + len(azure.disks) + len(azure.snapshots),
+        },
+        "GET /recommendations": {
+            "request": lambda c: c.get("/recommendations", params={"subscription_id": FAKE_SUBSCRIPTION_ID,
+                                                                   "min_savings": 1, "limit": 50}),
+            "resources": 50,
+        },
+        "GET /savings/summary": {
+            "request": lambda c: c.get("/savings/summary", params={"subscription_id": FAKE_SUBSCRIPTION_ID}),
+            "resources": scanned,
+        },
+        "GET /export/recommendations": {
+            "request": lambda c: c.get("/export/recommendations", params={"subscription_id": FAKE_SUBSCRIPTION_ID}),
+            "resources": scanned,
+        },
+        "GET /export/findings": {
+            "request": lambda c: c.get("/export/findings", params={"subscription_id": FAKE_SUBSCRIPTION_ID,
+                                                                   "days": 30}),
+            "resources": scanned,
+        },
+        "GET /history/resource": {
+            "request": lambda c: c.get("/history/resource", params={"resource_id": first_ip}),
+            "resources": 1,
+        },
+        "GET /history/savings-trend": {
+            "request": lambda c: c.get("/history/savings-trend", params={"subscription_id": FAKE_SUBSCRIPTION_ID}),
+            "resources": 1,
+        },
+        "GET /history/scans": {
+            "request": lambda c: c.get("/history/scans", params={"subscription_id": FAKE_SUBSCRIPTION_ID}),
+            "resources": 1,
+        },
+        "POST /list-vms-detailed": {
+            "request": lambda c: c.post("/list-vms-detailed", json={**CREDENTIALS, "cpu_threshold": 5.0, "days_for_metrics": 7}),
+            "resources": len(azure.vms),
+        },
+        "POST /export/vms": {
+            "request": lambda c: c.post("/export/vms", json={**CREDENTIALS, "cpu_threshold": 5.0, "days_for_metrics": 7}),
+            "resources": len(azure.vms),
+        },
+        "POST /stop-vm": {
+            "request": lambda c: c.post("/stop-vm", json={"credentials": CREDENTIALS, "vm_id": first_vm}),
+            "resources": 1,
+        },
+        "POST /cost-details": {
+            "request": lambda c: c.post("/cost-details", json={"credentials": CREDENTIALS, "scope": f"subscriptions/{FAKE_SUBSCRIPTION_ID}"}),
+            "resources": 1,
+        },
+        "POST /cost-allocation/refresh": {
+            "request": lambda c: c.post("/cost-allocation/refresh", json={"credentials": CREDENTIALS}),
+            "resources": len(azure.inventory()),
+        },
+        # Bir önceki senaryonun yazdığı rollup'ı okur
+        "GET /cost-allocation": {
+            "request": lambda c: c.get("/cost-allocation", params={"group_by": ["tag:team", "service"],
+                                                                   "subscription_id": FAKE_SUBSCRIPTION_ID}),
+            "resources": 1,
+        },
+        "GET /get-current-pricing/{region}": {
+            "request": lambda c: c.get("/get-current-pricing/westeurope"),
+            "resources": 1,
+        },
+        "GET /pricing/regions": {
+            "request": lambda c: c.get("/pricing/regions", params={"regions": ",".join(_COMPARED_REGIONS)}),
+            "resources": len(_COMPARED_REGIONS),
+        },
+        "GET /pricing/cheapest-region/{sku}": {
+            "request": lambda c: c.get("/pricing/cheapest-region/P1V3", params={"regions": ",".join(_COMPARED_REGIONS)}),
+            "resources": len(_COMPARED_REGIONS),
+        },
+        "POST /commitments/app-service": {
+            "request": lambda c: c.post("/commitments/app-service", json={"credentials": CREDENTIALS, "days": 30}),
+            "resources": len(azure.plans),
+        },
+        "POST /debug/list-app-service-plans": {
+            "request": lambda c: c.post("/debug/list-app-service-plans", json=CREDENTIALS),
+            "resources": len(azure.plans),
+        },
+        "POST /actions/update-app-service-plan-sku": {
+            "request": lambda c: c.post("/actions/update-app-service-plan-sku", json={
+                "credentials": CREDENTIALS,
+                "resource_group_name": first_plan.resource_group if first_plan else "rg-0",
+                "plan_name": first_plan.name if first_plan else "asp-0",
+                "target_sku_name": "B1",
+                "target_sku_tier": "Basic"
+            }),
+            "resources": 1,
+        },
+        "POST /actions/delete-app-service-plan": {
+            "request": lambda c: c.post("/actions/delete-app-service-plan", json={
+                "credentials": CREDENTIALS,
+                "resource_group_name": first_plan.resource_group if first_plan else "rg-0",
+                "plan_name": first_plan.name if first_plan else "asp-0"
+            }),
+            "resources": 1,
+        },
+        "POST /actions/bulk (dry_run)": {
+            "request": lambda c: _run_bulk(c, {"credentials": CREDENTIALS, "vm_ids": bulk_vms,
+                                               "plan_actions": bulk_plans, "dry_run": True}),
+            "resources": len(bulk_vms) + len(bulk_plans),
+        },
+    }
+
+
+def _percentile(values: List[float], pct: float) -> float:
+    ordered = sorted(values)
+    index = min(int(round(pct / 100.0 * (len(ordered) - 1))), len(ordered) - 1)
+    return ordered[index]
+
+
+def run_benchmarks(fleet: Dict[str, Any], repeats: int = 5) -> Dict[str, Dict[str, float]]:
+    """Her endpoint'i taze bir sahte Azure üzerinde çalıştırır ve ölçümleri döndürür."""
+    results: Dict[str, Dict[str, float]] = {}
+    client = TestClient(app)
+    names = list(_scenarios(FakeAzure(**fleet)).keys())
+
+    for name in names:
+        latencies = []
+        calls = 0
+        status_codes = set()
+        resources = 1
+        for _ in range(repeats):
+            azure = FakeAzure(**fleet)
+            scenario = _scenarios(azure)[name]
+            resources = max(scenario["resources"], 1)
+            with azure.install():
+                start = time.perf_counter()
+                response = scenario["request"](client)
+                latencies.append((time.perf_counter() - start) * 1000.0)
+            status_codes.add(response.status_code)
+            calls = azure.total_calls
+
+        # Tepe bellek ayrı bir çalıştırmada ölçülür; tracemalloc gecikmeyi bozmasın
+        azure = FakeAzure(**fleet)
+        request: Callable = _scenarios(azure)[name]["request"]
+        with azure.install():
+            tracemalloc.start()
+            request(client)
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+
+        results[name] = {
+            "latency_p50_ms": round(statistics.median(latencies), 3),
+            "latency_p95_ms": round(_percentile(latencies, 95), 3),
+            "arm_calls": calls,
+            "arm_calls_per_resource": round(calls / resources, 4),
+            "peak_memory_kb": round(peak / 1024.0, 1),
+            "status_codes": sorted(status_codes),
+        }
+    return results
+
+
+# Gerileme sayılacak metrikler ve izin verilen göreli artış
+_REGRESSION_METRICS = {
+    "latency_p50_ms": 0.25,
+    "latency_p95_ms": 0.50,
+    "arm_calls_per_resource": 0.0,
+    "peak_memory_kb": 0.25,
+}
+
+
+def compare_with_baseline(results: Dict[str, Dict], baseline: Dict[str, Dict],
+                          tolerance_scale: float = 1.0) -> List[str]:
+    """Baseline'a göre izin verilen artışı aşan metrikleri listeler."""
+    regressions = []
+    for name, metrics in results.items():
+        base = baseline.get(name)
+        if not base:
+            continue
+        for metric, tolerance in _REGRESSION_METRICS.items():
+            old, new = base.get(metric), metrics.get(metric)
+            if old is None or new is None:
+                continue
+            limit = old * (1.0 + tolerance * tolerance_scale)
+            if new > limit and new - old > 1e-9:
+                regressions.append(f"{name}: {metric} {old} -> {new} (limit {limit:.3f})")
+    return regressions
+
+
+def _print_table(results: Dict[str, Dict]) -> None:
+    header = f"{'Endpoint':<45} {'p50 ms':>9} {'p95 ms':>9} {'ARM':>7} {'ARM/kaynak':>11} {'tepe KB':>10}"
+    print(header)
+    print("-" * len(header))
+    for name, m in results.items():
+        print(f"{name:<45} {m['latency_p50_ms']:>9.2f} {m['latency_p95_ms']:>9.2f} {m['arm_calls']:>7} "
+              f"{m['arm_calls_per_resource']:>11.3f} {m['peak_memory_kb']:>10.1f}")
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Sahte Azure üzerinde backend benchmark'ı")
+    parser.add_argument("--vms", type=int, default=200)
+    parser.add_argument("--public-ips", type=int, default=100)
+    parser.add_argument("--plans", type=int, default=40)
+    parser.add_argument("--disks", type=int, default=100)
+    parser.add_argument("--snapshots", type=int, default=40)
+    parser.add_argument("--resource-groups", type=int, default=10)
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="Her sahte ARM çağrısına eklenen gecikme")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Sahte ARM çağrılarının hata olasılığı")
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE_PATH)
+    parser.add_argument("--save-baseline", action="store_true", help="Sonuçları baseline olarak kaydet")
+    parser.add_argument("--check", action="store_true", help="Baseline'a göre gerileme varsa 1 ile çık")
+    parser.add_argument("--tolerance-scale", type=float, default=1.0, help="Gerileme toleranslarını ölçekler")
+    parser.add_argument("--json", action="store_true", help="Sonuçları JSON olarak yazdır")
+    args = parser.parse_args(argv)
+    # stdout yalnızca sonuçlara (tablo ya da --json) ayrılır; loglar stderr'e yazılır
+    configure_logging(stream=sys.stderr)
+
+    fleet = {
+        "vms": args.vms,
+        "public_ips": args.public_ips,
+        "app_service_plans": args.plans,
+        "disks": args.disks,
+        "snapshots": args.snapshots,
+        "resource_groups": args.resource_groups,
+        "latency_ms": args.latency_ms,
+        "error_rate": args.error_rate,
+    }
+    results = run_benchmarks(fleet, repeats=args.repeats)
+
+    if args.json:
+        print(json.dumps(results, indent=2, ensure_ascii=False))
+    else:
+        _print_table(results)
+
+    if args.save_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump({"fleet": fleet, "results": results}, f, indent=2, ensure_ascii=False)
+        print(f"Baseline kaydedildi: {args.baseline}", file=sys.stderr)
+        return 0
+
+    if os.path.exists(args.baseline):
+        with open(args.baseline, encoding="utf-8") as f:
+            stored = json.load(f)
+        if stored.get("fleet") != fleet:
+            print("[WARN] Baseline farklı bir filo yapılandırmasıyla alınmış; karşılaştırma yanıltıcı olabilir.",
+                  file=sys.stderr)
+        regressions = compare_with_baseline(results, stored.get("results", {}), args.tolerance_scale)
+        if regressions:
+            print("\nGerilemeler:", file=sys.stderr)
+            for line in regressions:
+                print(f"  - {line}", file=sys.stderr)
+            return 1 if args.check else 0
+        print("\nBaseline'a göre gerileme yok.", file=sys.stderr)
+    elif args.check:
+        print(f"Baseline bulunamadı: {args.baseline} (önce --save-baseline ile oluşturun)", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -90,8 +90,6 @@ st.markdown('''
 BACKEND_URL = "http://127.0.0.1:8000"
 
 # Session State Başlatma
-if 'custom_recommendations' not in st.session_state:
-    st.session_state.custom_recommendations = []
 if 'credentials_stored' not in st.session_state:
     st.session_state.credentials_stored = False
 if 'error_message' not in st.session_state:
@@ -100,10 +98,20 @@ if 'info_message' not in st.session_state:
     st.session_state.info_message = ""
 if 'total_potential_savings' not in st.session_state:
     st.session_state.total_potential_savings = 0.0
+    st.session_state.yearly_potential_savings = 0.0
+    st.session_state.three_year_potential_savings = 0.0
 if 'current_pricing' not in st.session_state:
     st.session_state.current_pricing = {}
 if 'pricing_source' not in st.session_state:
     st.session_state.pricing_source = "Varsayılan"
+if 'last_scan' not in st.session_state:
+    st.session_state.last_scan = None
+if 'dashboard_summary' not in st.session_state:
+    st.session_state.dashboard_summary = None
+if 'page_cursors' not in st.session_state:
+    # Tablo sayfalarının imleçleri; ilk sayfanın imleci yoktur
+    st.session_state.page_cursors = [None]
+    st.session_state.page_filters = None
 
 # Kenar Çubuğu: Azure Bağlantı Bilgileri
 st.sidebar.header("⚙️ Azure Bağlantı Bilgileri")
@@ -123,7 +131,7 @@ with st.sidebar.expander("🔑 Abonelik ve Service Principal Bilgileri", expande
             st.session_state.credentials_stored = True
             st.session_state.error_message = ""
             st.session_state.info_message = "Azure bilgileri kaydedildi. Analiz başlatılıyor..."
-            st.session_state.custom_recommendations = []
+            st.session_state.dashboard_summary = None
             st.rerun()
         else:
             st.session_state.error_message = "Lütfen tüm Azure bağlantı bilgilerini eksiksiz girin."
@@ -138,33 +146,118 @@ def get_credentials_payload():
         "client_secret": st.session_state.client_secret
     }
 
-def fetch_custom_recommendations():
-    """Custom recommendations API'sini çağırır."""
+def fetch_custom_recommendations(force_refresh=False):
+    """
+    Önce son kayıtlı taramanın özetini kullanır; kayıt yoksa ya da yenileme istendiyse canlı tarama yapar.
+    Öneriler toplu indirilmez, tablo sayfaları ayrıca istenir.
+    """
     try:
+        if not force_refresh:
+            fetch_dashboard_summary()
+            if st.session_state.dashboard_summary is not None:
+                calculate_potential_savings()
+                return
         with st.spinner("Azure'dan optimizasyon önerileri alınıyor..."):
             response = requests.post(
                 f"{BACKEND_URL}/list-custom-recommendations",
+                params={"limit": 1},
                 json=get_credentials_payload(),
                 timeout=30
             )
             response.raise_for_status()
-            st.session_state.custom_recommendations = response.json()
-            st.session_state.error_message = ""
-            calculate_potential_savings()
+        st.session_state.page_cursors = [None]
+        st.session_state.error_message = ""
+        calculate_potential_savings()
+        fetch_dashboard_summary()
     except requests.exceptions.RequestException as e:
         handle_api_error(e, "Azure önerileri alınırken")
 
+def fetch_recommendation_page(filters, cursor=None):
+    """Filtrelenmiş öneri sayfasını backend'den alır (sunucu tarafı sıralama ve imleçli sayfalama)."""
+    params = {"subscription_id": st.session_state.subscription_id, **filters}
+    if cursor:
+        params["cursor"] = cursor
+    try:
+        response = requests.get(f"{BACKEND_URL}/recommendations", params=params, timeout=10)
+        response.raise_for_status()
+        return response.json()
+    except requests.exceptions.RequestException as e:
+        handle_api_error(e, "Öneriler alınırken")
+        return None
+
+CATEGORY_LABELS = {
+    "Cost_Custom_PublicIP": "Sahipsiz genel IP",
+    "Cost_Custom_AppServicePlan": "App Service planı",
+    "Cost_Custom_UnattachedDisk": "Sahipsiz disk",
+    "Cost_Custom_OldSnapshot": "Eski snapshot",
+}
+
+def build_recommendations_frame(recommendations):
+    """Bir sayfadaki önerileri tablo sütunlarına ayırır (sıralama backend'de yapılır)."""
+    columns = {"Ad": [], "Kategori": [], "Etki": [], "Bölge": [], "Resource Group": [], "SKU": [],
+               "Önerilen SKU": [], "Aylık Tasarruf (USD)": [], "Çözüm": []}
+    for rec in recommendations:
+        props = rec.get("extended_properties") or {}
+        metadata = rec.get("resource_metadata") or {}
+        columns["Ad"].append(rec.get("name"))
+        columns["Kategori"].append(CATEGORY_LABELS.get(rec.get("category"), rec.get("category")))
+        columns["Etki"].append(rec.get("impact"))
+        columns["Bölge"].append(metadata.get("location"))
+        columns["Resource Group"].append(metadata.get("resource_group"))
+        columns["SKU"].append(props.get("current_sku") or props.get("sku"))
+        columns["Önerilen SKU"].append(props.get("recommended_sku"))
+        columns["Aylık Tasarruf (USD)"].append(
+            max((props.get("estimated_monthly_cost_usd") or 0.0) - (props.get("target_monthly_cost_usd") or 0.0), 0.0)
+        )
+        columns["Çözüm"].append(rec.get("short_description_solution"))
+    return pd.DataFrame(columns)
+
+def breakdown_figure(breakdown, title, currency):
+    """Backend'in sütunsal kırılımından yatay çubuk grafik."""
+    labels = [CATEGORY_LABELS.get(key, key) for key in breakdown["keys"]]
+    fig = go.Figure(go.Bar(
+        x=breakdown["monthly_savings"], y=labels, orientation="h",
+        customdata=breakdown["count"],
+        hovertemplate="%{y}<br>%{x:,.0f} " + currency + "<br>%{customdata} öneri<extra></extra>"
+    ))
+    fig.update_layout(title=title, xaxis_title=f"Aylık tasarruf ({currency})", yaxis={"autorange": "reversed"},
+                      height=max(300, 28 * len(labels) + 120))
+    return fig
+
+def fetch_dashboard_summary():
+    """Kırılımları backend'den alır; kayıtlı tarama yoksa özet boş kalır."""
+    try:
+        response = requests.get(
+            f"{BACKEND_URL}/dashboard/summary",
+            params={"subscription_id": st.session_state.subscription_id, "currency": "TRY"},
+            timeout=10
+        )
+        if response.status_code == 404:
+            st.session_state.dashboard_summary = None
+            return
+        response.raise_for_status()
+        st.session_state.dashboard_summary = response.json()
+        st.session_state.last_scan = st.session_state.dashboard_summary.get("scan")
+    except requests.exceptions.RequestException as e:
+        handle_api_error(e, "Dashboard özeti alınırken")
+
 def calculate_potential_savings():
-    """Toplam potansiyel tasarruf hesaplar."""
-    total_savings = 0.0
-    
-    for rec in st.session_state.custom_recommendations:
-        extended_props = rec.get('extended_properties', {})
-        estimated_cost = extended_props.get('estimated_monthly_cost_usd', 0)
-        if estimated_cost:
-            total_savings += estimated_cost
+    """Toplam potansiyel tasarrufu backend'in hesapladığı özetten alır (TL)."""
+    try:
+        response = requests.get(
+            f"{BACKEND_URL}/savings/summary",
+            params={"subscription_id": st.session_state.subscription_id, "currency": "TRY"},
+            timeout=10
+        )
+        response.raise_for_status()
+        summary = response.json()
+    except requests.exceptions.RequestException as e:
+        handle_api_error(e, "Tasarruf özeti alınırken")
+        return
     
-    st.session_state.total_potential_savings = total_savings * 30  # USD to TRY conversion
+    st.session_state.total_potential_savings = summary.get("monthly_savings", 0.0)
+    st.session_state.yearly_potential_savings = summary.get("yearly_savings", 0.0)
+    st.session_state.three_year_potential_savings = summary.get("three_year_savings", 0.0)
 
 def handle_api_error(e, context_message):
     """API hatalarını düzenli şekilde işler."""
@@ -201,6 +294,19 @@ def fetch_current_pricing(region="westeurope"):
     except Exception as e:
         st.error(f"Fiyat bilgileri alınırken hata: {str(e)}")
 
+def fetch_savings_trend(days=90):
+    """Kayıtlı tarama geçmişinden günlük tasarruf trendini çeker (Azure taranmaz)."""
+    try:
+        response = requests.get(
+            f"{BACKEND_URL}/history/savings-trend",
+            params={"days": days, "subscription_id": st.session_state.subscription_id},
+            timeout=10
+        )
+        response.raise_for_status()
+        return response.json().get("trend", [])
+    except requests.exceptions.RequestException:
+        return []
+
 # Ana içerik
 if st.session_state.error_message:
     st.error(st.session_state.error_message)
@@ -210,7 +316,7 @@ if st.session_state.info_message:
 
 # Azure bilgileri kaydedildiyse analiz yap
 if st.session_state.credentials_stored:
-    if not st.session_state.custom_recommendations:
+    if st.session_state.dashboard_summary is None:
         fetch_custom_recommendations()
     
     # Güncel fiyatları yükle
@@ -219,11 +325,26 @@ if st.session_state.credentials_stored:
     
     # Dashboard metrikleri
     st.markdown("## 📊 Dashboard Metrikleri")
+
+    scan_col, refresh_col = st.columns([4, 1])
+    with scan_col:
+        last_scan = st.session_state.last_scan
+        if last_scan:
+            age_minutes = last_scan.get("age_seconds", 0) / 60
+            age_text = f"{age_minutes:.0f} dakika" if age_minutes < 120 else f"{age_minutes / 60:.1f} saat"
+            source_text = "zamanlanmış" if last_scan.get("source") == "scheduler" else "canlı"
+            st.caption(f"Son {source_text} tarama {age_text} önce yapıldı.")
+        else:
+            st.caption("Sonuçlar canlı taramadan alındı.")
+    with refresh_col:
+        if st.button("🔄 Şimdi Tara"):
+            fetch_custom_recommendations(force_refresh=True)
+            st.rerun()
     
     col1, col2, col3, col4 = st.columns(4)
     
     with col1:
-        recommendation_count = len(st.session_state.custom_recommendations)
+        recommendation_count = (st.session_state.dashboard_summary or {}).get("finding_count", 0)
         st.metric(
             label="🎯 Toplam Öneri",
             value=recommendation_count,
@@ -238,7 +359,11 @@ if st.session_state.credentials_stored:
         )
     
     with col3:
-        app_service_plans = len([r for r in st.session_state.custom_recommendations if r.get('category') == 'Cost_Custom_AppServicePlan'])
+        category_counts = {}
+        if st.session_state.dashboard_summary:
+            category_breakdown = st.session_state.dashboard_summary["breakdowns"]["category"]
+            category_counts = dict(zip(category_breakdown["keys"], category_breakdown["count"]))
+        app_service_plans = category_counts.get('Cost_Custom_AppServicePlan', 0)
         st.metric(
             label="⚙️ App Service Plan",
             value=app_service_plans,
@@ -246,7 +371,7 @@ if st.session_state.credentials_stored:
         )
     
     with col4:
-        yearly_savings = st.session_state.total_potential_savings * 12
+        yearly_savings = st.session_state.yearly_potential_savings
         st.metric(
             label="🎊 Yıllık Tasarruf",
             value=f"₺{yearly_savings:,.0f}",
@@ -262,53 +387,112 @@ if st.session_state.credentials_stored:
             <ul>
                 <li><strong>Aylık tasarruf:</strong> ₺{st.session_state.total_potential_savings:,.0f}</li>
                 <li><strong>Yıllık tasarruf:</strong> ₺{yearly_savings:,.0f}</li>
-                <li><strong>3 yıllık tasarruf:</strong> ₺{yearly_savings * 3:,.0f}</li>
+                <li><strong>3 yıllık tasarruf:</strong> ₺{st.session_state.three_year_potential_savings:,.0f}</li>
             </ul>
         </div>
         ''', unsafe_allow_html=True)
     
-    # App Service Plan önerileri
-    if st.session_state.custom_recommendations:
-        st.markdown("## ⚙️ App Service Plan Optimizasyon Önerileri")
-        
-        app_service_recs = [r for r in st.session_state.custom_recommendations if r.get('category') == 'Cost_Custom_AppServicePlan']
-        
-        if app_service_recs:
-            for i, rec in enumerate(app_service_recs):
-                with st.expander(f"📋 {rec.get('name', 'Unknown')} - {rec.get('short_description_problem', '')}", expanded=i == 0):
-                    
-                    col1, col2 = st.columns([2, 1])
-                    
-                    with col1:
-                        st.markdown(f"**🔍 Problem:** {rec.get('short_description_problem', 'N/A')}")
-                        st.markdown(f"**💡 Çözüm:** {rec.get('short_description_solution', 'N/A')}")
-                        
-                        extended_props = rec.get('extended_properties', {})
-                        if extended_props:
-                            st.markdown("**📊 Teknik Detaylar:**")
-                            st.markdown(f"- Mevcut SKU: `{extended_props.get('current_sku', 'N/A')}`")
-                            st.markdown(f"- Mevcut Tier: `{extended_props.get('current_tier', 'N/A')}`")
-                            st.markdown(f"- Önerilen SKU: `{extended_props.get('recommended_sku', 'N/A')}`")
-                            st.markdown(f"- Önerilen Tier: `{extended_props.get('recommended_tier', 'N/A')}`")
-                            st.markdown(f"- Uygulama sayısı: {extended_props.get('apps_count', 0)}")
-                    
-                    with col2:
-                        potential_benefit = rec.get('potential_benefits', 'N/A')
-                        st.markdown(f'''
-                        <div class="solution-box">
-                            <h5>💰 Tasarruf</h5>
-                            <p>{potential_benefit}</p>
-                        </div>
-                        ''', unsafe_allow_html=True)
-                        
-                        # Konum ve resource group bilgileri
-                        resource_metadata = rec.get('resource_metadata', {})
-                        if resource_metadata:
-                            st.markdown("**📍 Konum Bilgileri:**")
-                            st.markdown(f"- Bölge: `{resource_metadata.get('location', 'N/A')}`")
-                            st.markdown(f"- Resource Group: `{resource_metadata.get('resource_group', 'N/A')}`")
-        else:
-            st.success("🎉 Tüm App Service planlarınız optimal durumda!")
+    # Tasarruf trendi (geçmiş deposundan)
+    savings_trend = fetch_savings_trend()
+    if len(savings_trend) > 1:
+        st.markdown("## 📈 Tasarruf Potansiyeli Trendi (90 gün)")
+        trend_df = pd.DataFrame(savings_trend)
+        fig = px.line(trend_df, x="day", y="monthly_savings", markers=True,
+                      labels={"day": "Gün", "monthly_savings": "Potansiyel aylık tasarruf (USD)"})
+        st.plotly_chart(fig, use_container_width=True)
+    
+    # Tasarruf dağılımı (backend'de önceden toplanmış kırılımlar)
+    summary = st.session_state.dashboard_summary
+    if summary and summary.get("finding_count"):
+        st.markdown("## 🧭 Tasarruf Dağılımı")
+        breakdowns = summary["breakdowns"]
+        currency = summary["currency"]
+
+        chart_col1, chart_col2 = st.columns(2)
+        with chart_col1:
+            st.plotly_chart(breakdown_figure(breakdowns["category"], "Kategoriye göre", currency),
+                            use_container_width=True)
+            st.plotly_chart(breakdown_figure(breakdowns["resource_group"], "Resource group'a göre", currency),
+                            use_container_width=True)
+        with chart_col2:
+            matrix = summary["category_by_region"]
+            fig = go.Figure([
+                go.Bar(name=CATEGORY_LABELS.get(category, category), x=matrix["columns"], y=values)
+                for category, values in zip(matrix["rows"], matrix["monthly_savings"])
+            ])
+            fig.update_layout(barmode="stack", title="Bölgeye göre", yaxis_title=f"Aylık tasarruf ({currency})",
+                              legend_title_text="Kategori")
+            st.plotly_chart(fig, use_container_width=True)
+            st.plotly_chart(breakdown_figure(breakdowns["sku"], "SKU'ya göre", currency),
+                            use_container_width=True)
+
+    # Öneri detayları: yalnızca gösterilen sayfa backend'den alınır
+    if summary and summary.get("finding_count"):
+        st.markdown("## 📋 Öneri Detayları")
+        breakdowns = summary["breakdowns"]
+
+        filter_col1, filter_col2, filter_col3 = st.columns(3)
+        with filter_col1:
+            categories = st.multiselect("Kategori", breakdowns["category"]["keys"],
+                                        format_func=lambda key: CATEGORY_LABELS.get(key, key))
+            impacts = st.multiselect("Etki", ["High", "Medium", "Low"])
+        with filter_col2:
+            regions = [key for key in breakdowns["region"]["keys"] if key not in ("Diğer", "(bilinmiyor)")]
+            region = st.selectbox("Bölge", ["Tümü"] + regions)
+            resource_group = st.text_input("Resource Group").strip()
+        with filter_col3:
+            min_savings = st.number_input("En az aylık tasarruf (USD)", min_value=0.0, value=0.0, step=5.0)
+            sort_labels = {"-monthly_savings": "Tasarruf (azalan)", "monthly_savings": "Tasarruf (artan)",
+                           "name": "Ad (A-Z)", "-name": "Ad (Z-A)"}
+            sort = st.selectbox("Sıralama", list(sort_labels), format_func=sort_labels.get)
+        page_size = st.selectbox("Sayfa boyutu", [25, 50, 100, 250], index=1)
+
+        filters = {"sort": sort, "limit": page_size}
+        if categories:
+            filters["category"] = categories
+        if impacts:
+            filters["impact"] = impacts
+        if region != "Tümü":
+            filters["region"] = region
+        if resource_group:
+            filters["resource_group"] = resource_group
+        if min_savings > 0:
+            filters["min_savings"] = min_savings
+
+        # Filtre değişince ilk sayfaya dönülür
+        if filters != st.session_state.page_filters:
+            st.session_state.page_filters = filters
+            st.session_state.page_cursors = [None]
+
+        page = fetch_recommendation_page(filters, st.session_state.page_cursors[-1])
+        if page is None and len(st.session_state.page_cursors) > 1:
+            # İmleç yeni bir taramayla geçersizleşmiş olabilir
+            st.session_state.page_cursors = [None]
+            page = fetch_recommendation_page(filters)
+        if page is not None:
+            page_number = len(st.session_state.page_cursors)
+            st.dataframe(
+                build_recommendations_frame(page["items"]),
+                use_container_width=True,
+                hide_index=True,
+                column_config={"Aylık Tasarruf (USD)": st.column_config.NumberColumn(format="$%.2f")}
+            )
+            shown = len(page["items"])
+            first = (page_number - 1) * page_size + 1 if shown else 0
+            last = first + shown - 1 if shown else 0
+            st.caption(f"{page['total']:,} öneriden {first:,}-{last:,} arası gösteriliyor (sayfa {page_number}).")
+
+            prev_col, next_col, _ = st.columns([1, 1, 6])
+            with prev_col:
+                if st.button("◀ Önceki", disabled=page_number == 1):
+                    st.session_state.page_cursors.pop()
+                    st.rerun()
+            with next_col:
+                if st.button("Sonraki ▶", disabled=not page["next_cursor"]):
+                    st.session_state.page_cursors.append(page["next_cursor"])
+                    st.rerun()
+    elif summary is not None:
+        st.success("🎉 Optimizasyon gerektiren kaynak bulunamadı!")
     
     # Fiyat bilgileri
     with st.sidebar.expander("💰 Gerçek Azure Fiyatları", expanded=False):
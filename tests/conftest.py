@@ -0,0 +1,44 @@
+# Testler sahte Azure (backend/fake_azure.py) üzerinde çalışır; ağa ve gerçek data/ dosyalarına dokunulmaz.
+# Depo ve snapshot yolları backend içe aktarılmadan önce geçici bir dizine yönlendirilir; her test kendi
+# depolarını alır.
+import os
+import shutil
+import tempfile
+
+import pytest
+
+_DATA_DIR = tempfile.mkdtemp(prefix="test-data-")
+for _env, _name in (("RESULTS_DB_PATH", "results.db"), ("HISTORY_DB_PATH", "history.db"),
+                    ("COST_DB_PATH", "cost.db"), ("SCHEDULER_DB_PATH", "scheduler.db"),
+                    ("PRICING_SNAPSHOT_PATH", "pricing_snapshot.json"), ("FX_CACHE_PATH", "fx_rates.json")):
+    os.environ[_env] = os.path.join(_DATA_DIR, _name)
+
+from backend import cost_allocation, history, results_store  # noqa: E402
+from backend.fake_azure import FAKE_SUBSCRIPTION_ID  # noqa: E402
+
+CREDENTIALS = {
+    "subscription_id": FAKE_SUBSCRIPTION_ID,
+    "tenant_id": "fake-tenant",
+    "client_id": "fake-client",
+    "client_secret": "fake-secret"
+}
+
+
+def pytest_sessionfinish(session, exitstatus):
+    shutil.rmtree(_DATA_DIR, ignore_errors=True)
+
+
+@pytest.fixture
+def stores(tmp_path, monkeypatch):
+    """Süreç genelindeki sonuç, geçmiş ve maliyet depolarını teste özgü dosyalarla değiştirir."""
+    created = {
+        "results": results_store.LatestResultsStore(str(tmp_path / "results.db")),
+        "history": history.RecommendationHistoryStore(str(tmp_path / "history.db")),
+        "cost": cost_allocation.CostAllocationStore(str(tmp_path / "cost.db")),
+    }
+    monkeypatch.setattr(results_store, "_store", created["results"])
+    monkeypatch.setattr(history, "_store", created["history"])
+    monkeypatch.setattr(cost_allocation, "_store", created["cost"])
+    yield created
+    for store in created.values():
+        store.close()
@@ -0,0 +1,133 @@
+import numpy as np
+import pytest
+
+from backend.azure_pricing import HOURS_PER_MONTH
+from backend.commitments import (
+    COMMITMENT_OPTIONS,
+    analyze_commitments,
+    commitment_recommendations,
+    fleet_savings_plan,
+    usage_histogram
+)
+
+OPTIONS = list(COMMITMENT_OPTIONS)
+
+
+def _brute_force_period_cost(usage: np.ndarray, payg: float, rate: float) -> float:
+    """Her taahhüt miktarını tek tek deneyerek en ucuz dönem maliyeti."""
+    hours = usage.shape[0]
+    return min(q * rate * hours + payg * np.maximum(usage - q, 0).sum() for q in range(int(usage.max()) + 1))
+
+
+def test_usage_histogram():
+    usage = np.array([[0, 1, 1, 3], [2, 2, 2, 2]])
+    assert usage_histogram(usage).tolist() == [[1, 2, 0, 1], [0, 0, 4, 0]]
+
+
+def test_constant_usage_commits_every_instance():
+    hours = 720
+    usage = np.full((1, hours), 4)
+    payg = np.array([1.0])
+    rates = np.array([[0.6, 0.4, 0.8, 0.7]])
+    analysis = analyze_commitments(usage, payg, rates, OPTIONS)
+
+    assert analysis.break_even_utilization[0].tolist() == pytest.approx([0.6, 0.4, 0.8, 0.7])
+    assert analysis.quantity[0].tolist() == [4, 4, 4, 4]
+    assert analysis.coverage[0].tolist() == pytest.approx([1.0] * 4)
+    assert analysis.commitment_utilization[0].tolist() == pytest.approx([1.0] * 4)
+    assert analysis.payg_monthly[0] == pytest.approx(4 * HOURS_PER_MONTH)
+    assert analysis.monthly_cost[0].tolist() == pytest.approx([4 * r * HOURS_PER_MONTH for r in rates[0]])
+    assert OPTIONS[analysis.best_option[0]] == "reservation_3y"
+    assert analysis.best_savings[0] == pytest.approx(4 * 0.6 * HOURS_PER_MONTH)
+
+
+def test_commitment_stops_at_break_even_utilization():
+    # 1. instance her saat, 2. instance saatlerin %50'sinde, 3. instance %20'sinde çalışıyor
+    hours = 100
+    usage = np.ones((1, hours), dtype=int)
+    usage[0, :50] += 1
+    usage[0, :20] += 1
+    payg = np.array([2.0])
+    # Başabaş oranları 0.9, 0.45, 0.15, 1.2 (sonuncusu hiç kârlı değil)
+    rates = np.array([[1.8, 0.9, 0.3, 2.4]])
+    analysis = analyze_commitments(usage, payg, rates, OPTIONS)
+
+    assert analysis.quantity[0].tolist() == [1, 2, 3, 0]
+    assert analysis.monthly_cost[0, 3] == pytest.approx(analysis.payg_monthly[0])
+    assert analysis.peak_instances[0] == 3
+    assert analysis.average_instances[0] == pytest.approx(1.7)
+
+
+def test_matches_brute_force_on_random_fleet():
+    rng = np.random.default_rng(7)
+    n, hours = 25, 24 * 30
+    usage = rng.poisson(rng.uniform(0.2, 6.0, size=(n, 1)), size=(n, hours))
+    payg = rng.uniform(0.05, 2.0, size=n)
+    rates = payg[:, None] * rng.uniform(0.3, 1.1, size=(n, len(OPTIONS)))
+    rates[3, 1] = np.nan
+    analysis = analyze_commitments(usage, payg, rates, OPTIONS)
+
+    to_monthly = HOURS_PER_MONTH / hours
+    for i in range(n):
+        for j in range(len(OPTIONS)):
+            if np.isnan(rates[i, j]):
+                assert analysis.quantity[i, j] == 0
+                assert analysis.monthly_cost[i, j] == pytest.approx(analysis.payg_monthly[i])
+                continue
+            expected = _brute_force_period_cost(usage[i], payg[i], rates[i, j]) * to_monthly
+            assert analysis.monthly_cost[i, j] == pytest.approx(expected, rel=1e-9)
+        assert analysis.best_savings[i] == pytest.approx(
+            max(analysis.payg_monthly[i] - analysis.monthly_cost[i].min(), 0.0), rel=1e-9, abs=1e-9)
+
+
+def test_recommendations_report_break_even_months():
+    usage = np.full((2, 100), 2)
+    usage[1] = 0
+    usage[1, :10] = 1
+    payg = np.array([1.0, 1.0])
+    rates = np.array([[0.5, 0.3, 0.6, 0.4], [0.5, 0.3, 0.6, 0.4]])
+    rows = commitment_recommendations([("westeurope", "P1V3"), ("eastus", "P2V3")],
+                                      analyze_commitments(usage, payg, rates, OPTIONS))
+
+    assert [row["sku"] for row in rows] == ["P1V3", "P2V3"]
+    best = rows[0]
+    assert best["recommended_option"] == "reservation_3y"
+    assert best["recommended_quantity"] == 2
+    assert best["options"]["reservation_1y"]["break_even_months"] == pytest.approx(
+        0.5 * COMMITMENT_OPTIONS["reservation_1y"].term_months, abs=0.05)
+    # %10 kullanım hiçbir seçeneğin başabaş oranına ulaşmıyor
+    assert rows[1]["recommended_option"] is None
+    assert rows[1]["monthly_savings"] == 0
+
+
+def test_fleet_savings_plan_constant_spend():
+    usage = np.full((2, 100), 1)
+    payg = np.array([1.0, 3.0])
+    plan = np.array([0.8, 2.4])
+    result = fleet_savings_plan(usage, payg, plan)
+
+    assert result.hourly_commitment == pytest.approx(3.2)
+    assert result.coverage == pytest.approx(1.0)
+    assert result.monthly_payg == pytest.approx(4.0 * HOURS_PER_MONTH)
+    assert result.monthly_savings == pytest.approx(0.8 * HOURS_PER_MONTH)
+
+
+def test_fleet_savings_plan_matches_brute_force():
+    rng = np.random.default_rng(11)
+    n, hours = 10, 500
+    usage = rng.poisson(rng.uniform(0.5, 4.0, size=(n, 1)), size=(n, hours))
+    payg = rng.uniform(0.1, 1.5, size=n)
+    plan = payg * 0.75
+    plan[2] = np.nan
+    result = fleet_savings_plan(usage, payg, plan)
+
+    eligible = np.isfinite(plan)
+    spend = (usage[eligible] * plan[eligible, None]).sum(axis=0)
+    ratio = spend.sum() / (usage[eligible] * payg[eligible, None]).sum()
+    candidates = np.concatenate([[0.0], spend])
+    costs = [c * hours + np.maximum(spend - c, 0.0).sum() / ratio for c in candidates]
+    assert result.monthly_cost == pytest.approx(min(costs) * HOURS_PER_MONTH / hours, abs=0.05)
+
+
+def test_fleet_savings_plan_without_prices():
+    assert fleet_savings_plan(np.ones((1, 10)), np.array([1.0]), np.array([np.nan])) is None
@@ -0,0 +1,119 @@
+import datetime
+
+import pytest
+
+from backend.cost_allocation import (
+    COST_BACKFILL_DAYS,
+    COST_REFRESH_DAYS,
+    UNTAGGED,
+    InvalidCostQuery,
+    refresh_cost_allocation,
+    refresh_start
+)
+from backend.fake_azure import FAKE_SUBSCRIPTION_ID, FakeAzure
+
+from conftest import CREDENTIALS
+
+_ARGS = (CREDENTIALS["subscription_id"], CREDENTIALS["tenant_id"], CREDENTIALS["client_id"],
+         CREDENTIALS["client_secret"])
+
+
+@pytest.fixture
+def loaded(stores):
+    azure = FakeAzure(vms=30, public_ips=15, app_service_plans=6, disks=15, snapshots=5)
+    with azure.install():
+        result = refresh_cost_allocation(*_ARGS, store=stores["cost"])
+        yield stores["cost"], result
+
+
+def _total(rows):
+    return round(sum(row["cost"] for row in rows), 2)
+
+
+def test_refresh_backfills_and_rollup_matches_leaf_rows(loaded):
+    store, result = loaded
+    assert result["days"] == COST_BACKFILL_DAYS
+    assert result["cost_rows"] > 0
+
+    by_service = store.query(["service"], FAKE_SUBSCRIPTION_ID, top=1000)
+    by_resource = store.query(["resource"], FAKE_SUBSCRIPTION_ID, top=1000)
+    assert by_service["source"] == "rollup"
+    assert by_resource["source"] == "resources"
+    assert by_service["total"] > 0
+    assert by_service["total"] == pytest.approx(by_resource["total"], abs=0.05)
+    assert _total(by_service["rows"]) == pytest.approx(by_service["total"], abs=0.05)
+
+
+def test_group_by_tag_and_resource_group_partitions_total(loaded):
+    store, _ = loaded
+    total = store.query(["service"], FAKE_SUBSCRIPTION_ID)["total"]
+    by_team = store.query(["tag:team"], FAKE_SUBSCRIPTION_ID)
+    nested = store.query(["tag:team", "resource_group"], FAKE_SUBSCRIPTION_ID, top=1000)
+
+    assert by_team["total"] == pytest.approx(total, abs=0.05)
+    assert nested["total"] == pytest.approx(total, abs=0.05)
+    teams = {row["tag:team"] for row in by_team["rows"]}
+    assert "payments" in teams and UNTAGGED in teams
+    for row in by_team["rows"]:
+        filtered = store.query(["resource_group"], FAKE_SUBSCRIPTION_ID, filters={"tag:team": row["tag:team"]})
+        assert filtered["total"] == pytest.approx(row["cost"], abs=0.05)
+        assert _total(r for r in nested["rows"] if r["tag:team"] == row["tag:team"]) == \
+            pytest.approx(row["cost"], abs=0.05)
+
+
+def test_daily_rows_and_date_range(loaded):
+    store, _ = loaded
+    end = datetime.datetime.now(datetime.timezone.utc).date()
+    by_day = store.query(["day"], FAKE_SUBSCRIPTION_ID, top=1000)
+    assert by_day["row_count"] == COST_BACKFILL_DAYS
+    last_week = store.query(["service"], FAKE_SUBSCRIPTION_ID, start=end - datetime.timedelta(days=6), end=end)
+    expected = _total(row for row in by_day["rows"] if row["day"] >= (end - datetime.timedelta(days=6)).isoformat())
+    assert last_week["total"] == pytest.approx(expected, abs=0.05)
+
+
+def test_repeated_refresh_rewrites_recent_days_without_double_counting(loaded):
+    store, _ = loaded
+    before = store.query(["service"], FAKE_SUBSCRIPTION_ID)["total"]
+    result = refresh_cost_allocation(*_ARGS, store=store)
+    assert result["days"] == COST_REFRESH_DAYS
+    assert store.query(["service"], FAKE_SUBSCRIPTION_ID)["total"] == pytest.approx(before, abs=0.05)
+
+
+def test_cost_details_matches_rollup(loaded):
+    store, _ = loaded
+    details = store.cost_details(FAKE_SUBSCRIPTION_ID)
+    total = store.query(["service"], FAKE_SUBSCRIPTION_ID)["total"]
+    assert details["total_cost"] == pytest.approx(total, abs=0.05)
+    assert sum(details["costs_by_service"].values()) == pytest.approx(total, abs=0.05)
+    assert sum(details["costs_by_resource_group"].values()) == pytest.approx(total, abs=0.05)
+    assert sum(details["costs_by_tag"]["team"].values()) == pytest.approx(total, abs=0.05)
+    assert store.cost_details("baska-abonelik") is None
+
+
+def test_currency_conversion(loaded):
+    store, _ = loaded
+    usd = store.query(["service"], FAKE_SUBSCRIPTION_ID)
+    eur = store.query(["service"], FAKE_SUBSCRIPTION_ID, currency="EUR")
+    assert eur["currency"] == "EUR"
+    assert eur["total"] == pytest.approx(usd["total"] * eur["exchange_rate"], abs=0.05)
+
+
+@pytest.mark.parametrize("group_by, filters", [
+    (["region"], None),
+    (["tag:unknown-key"], None),
+    (["service"], {"day": "2024-01-01"}),
+])
+def test_invalid_queries_are_rejected(loaded, group_by, filters):
+    store, _ = loaded
+    with pytest.raises(InvalidCostQuery):
+        store.query(group_by, FAKE_SUBSCRIPTION_ID, filters=filters)
+
+
+def test_refresh_start():
+    today = datetime.date(2024, 3, 31)
+    assert refresh_start(None, today) == today - datetime.timedelta(days=COST_BACKFILL_DAYS - 1)
+    assert refresh_start("2024-03-31", today) == today - datetime.timedelta(days=COST_REFRESH_DAYS - 1)
+    # Aksayan yenilemelerin günleri de doldurulur, ama geriye en fazla COST_BACKFILL_DAYS gidilir
+    assert refresh_start("2024-03-20", today) == datetime.date(2024, 3, 18)
+    assert refresh_start("2023-01-01", today) == today - datetime.timedelta(days=COST_BACKFILL_DAYS - 1)
+    assert refresh_start(None, today, days=7) == datetime.date(2024, 3, 25)
@@ -0,0 +1,89 @@
+import pytest
+from fastapi.testclient import TestClient
+
+from backend.fake_azure import FAKE_SUBSCRIPTION_ID, FakeAzure
+from backend.main import app
+from backend.recommendations import Category
+from backend.results_store import SORT_ORDERS, InvalidCursor, RecommendationQuery
+from backend.scan import scan_subscription
+
+from conftest import CREDENTIALS
+
+_SCAN_ARGS = (CREDENTIALS["subscription_id"], CREDENTIALS["tenant_id"], CREDENTIALS["client_id"],
+              CREDENTIALS["client_secret"])
+
+
+@pytest.fixture
+def scanned(stores):
+    with FakeAzure(vms=2, public_ips=60, app_service_plans=10, disks=30, snapshots=10).install():
+        records = scan_subscription(*_SCAN_ARGS)
+    return stores["results"], records
+
+
+def _savings_by_id(records):
+    return {record.to_dict()["id"]: record.monthly_savings for record in records}
+
+
+def _all_pages(store, query: RecommendationQuery, limit: int):
+    items, cursor, total = [], None, None
+    while True:
+        page = store.query(FAKE_SUBSCRIPTION_ID, query, limit=limit, cursor=cursor)
+        items.extend(page.items)
+        total = page.total
+        cursor = page.next_cursor
+        if cursor is None:
+            return items, total
+
+
+@pytest.mark.parametrize("sort", sorted(SORT_ORDERS))
+def test_cursor_pages_cover_every_row_once_in_order(scanned, sort):
+    store, records = scanned
+    query = RecommendationQuery(sort=sort)
+    column, descending = SORT_ORDERS[sort]
+    savings = _savings_by_id(records)
+
+    items, total = _all_pages(store, query, limit=7)
+
+    assert total == len(records)
+    ids = [item["id"] for item in items]
+    assert len(ids) == len(set(ids)) == len(records)
+    values = [item["name"] if column == "name" else savings[item["id"]] for item in items]
+    assert values == sorted(values, reverse=descending)
+
+
+def test_filtered_pagination_matches_single_page(scanned):
+    store, records = scanned
+    savings = _savings_by_id(records)
+    query = RecommendationQuery(categories=(Category.UNATTACHED_DISK.value, Category.OLD_SNAPSHOT.value),
+                                min_savings=5.0)
+    items, total = _all_pages(store, query, limit=3)
+    single = store.query(FAKE_SUBSCRIPTION_ID, query, limit=500)
+    assert [item["id"] for item in items] == [item["id"] for item in single.items]
+    assert total == single.total == len(items) > 0
+    assert all(savings[item["id"]] >= 5.0 for item in items)
+    assert {item["category"] for item in items} <= set(query.categories)
+
+
+def test_cursor_is_rejected_after_new_scan(scanned):
+    store, _ = scanned
+    page = store.query(FAKE_SUBSCRIPTION_ID, RecommendationQuery(), limit=5)
+    assert page.next_cursor
+    with pytest.raises(InvalidCursor):
+        store.query(FAKE_SUBSCRIPTION_ID, RecommendationQuery(sort="name"), limit=5, cursor=page.next_cursor)
+
+    with FakeAzure(vms=2, public_ips=60, app_service_plans=10, disks=30, snapshots=10).install():
+        scan_subscription(*_SCAN_ARGS)
+    with pytest.raises(InvalidCursor):
+        store.query(FAKE_SUBSCRIPTION_ID, RecommendationQuery(), limit=5, cursor=page.next_cursor)
+
+
+def test_recommendations_endpoint_pages_and_rejects_bad_cursor(scanned):
+    _, records = scanned
+    client = TestClient(app)
+    params = {"subscription_id": FAKE_SUBSCRIPTION_ID, "limit": 10}
+    first = client.get("/recommendations", params=params).json()
+    second = client.get("/recommendations", params={**params, "cursor": first["next_cursor"]}).json()
+
+    assert first["total"] == len(records)
+    assert not {item["id"] for item in first["items"]} & {item["id"] for item in second["items"]}
+    assert client.get("/recommendations", params={**params, "cursor": "bozuk"}).status_code == 400
@@ -0,0 +1,64 @@
+import pytest
+
+import backend.fake_azure as fake_azure
+from backend.fake_azure import FAKE_SUBSCRIPTION_ID, FakeAzure, FakeAzureError
+from backend.recommendations import AppServicePlanRightsizeRecommendation, Category
+from backend.scan import ScanIncomplete, scan_subscription
+
+from conftest import CREDENTIALS
+
+_SCAN_ARGS = (CREDENTIALS["subscription_id"], CREDENTIALS["tenant_id"], CREDENTIALS["client_id"],
+              CREDENTIALS["client_secret"])
+
+
+def _stored_ids(store, category: Category):
+    return sorted(rec["resource_metadata"]["resource_id"] for rec in store.recommendations(FAKE_SUBSCRIPTION_ID)
+                  if rec["category"] == category.value)
+
+
+def test_failed_analyzer_keeps_previous_category_results(stores, monkeypatch):
+    with FakeAzure(vms=2, public_ips=20, app_service_plans=5, disks=10, snapshots=5).install():
+        first = scan_subscription(*_SCAN_ARGS)
+        ips_before = _stored_ids(stores["results"], Category.PUBLIC_IP)
+        assert ips_before
+
+        def failing_list_all(self):
+            raise FakeAzureError("network API kullanılamıyor")
+
+        monkeypatch.setattr(fake_azure._FakePublicIpAddresses, "list_all", failing_list_all)
+        with pytest.raises(ScanIncomplete) as excinfo:
+            scan_subscription(*_SCAN_ARGS)
+
+    assert excinfo.value.failed == ["public_ips"]
+    assert all(record.category != Category.PUBLIC_IP for record in excinfo.value.records)
+    # Başarısız kategorinin önceki sonuçları hem son sonuçlarda hem geçmişte açık kalır
+    assert _stored_ids(stores["results"], Category.PUBLIC_IP) == ips_before
+    assert stores["results"].scan_info(FAKE_SUBSCRIPTION_ID)["finding_count"] == len(first)
+    assert all(finding["open"] for finding in stores["history"].resource_history(ips_before[0])["findings"])
+
+
+def test_unmeasured_plan_keeps_previous_finding(stores, monkeypatch):
+    with FakeAzure(vms=2, public_ips=5, app_service_plans=40).install():
+        first = scan_subscription(*_SCAN_ARGS)
+        rightsized = [record for record in first if isinstance(record, AppServicePlanRightsizeRecommendation)]
+        assert rightsized
+        victim = rightsized[0]
+
+        original_list = fake_azure._FakeMetrics.list
+
+        def flaky_list(self, resource_uri, *args, **kwargs):
+            if resource_uri == victim.resource_id:
+                raise FakeAzureError("metrik okunamadı")
+            return original_list(self, resource_uri, *args, **kwargs)
+
+        monkeypatch.setattr(fake_azure._FakeMetrics, "list", flaky_list)
+        second = scan_subscription(*_SCAN_ARGS)
+
+    # Tarama tamamlanır; ölçülemeyen plan canlı sonuçta yoktur ama depolarda önceki bulgusu korunur
+    assert all(record.resource_id != victim.resource_id for record in second)
+    assert victim.resource_id in _stored_ids(stores["results"], Category.APP_SERVICE_PLAN)
+    findings = stores["history"].resource_history(victim.resource_id)["findings"]
+    assert findings and all(finding["open"] for finding in findings)
+    trend = stores["history"].savings_trend(days=1, subscription_id=FAKE_SUBSCRIPTION_ID)
+    assert trend[-1]["monthly_savings"] == pytest.approx(
+        stores["results"].scan_info(FAKE_SUBSCRIPTION_ID)["total_monthly_savings"], abs=0.05)
@@ -0,0 +1,122 @@
+import datetime
+
+import pytest
+
+from backend.scheduler import (
+    JOB_FAILED,
+    JOB_QUEUED,
+    CronSchedule,
+    JobQueue,
+    ScheduleConfig,
+    _parse_cron_field,
+    stagger_offset
+)
+
+
+def _ts(*args) -> float:
+    return datetime.datetime(*args, tzinfo=datetime.timezone.utc).timestamp()
+
+
+@pytest.mark.parametrize("field, low, high, expected", [
+    ("*", 0, 5, {0, 1, 2, 3, 4, 5}),
+    ("*/15", 0, 59, {0, 15, 30, 45}),
+    ("1-5", 0, 6, {1, 2, 3, 4, 5}),
+    ("10-20/5", 0, 59, {10, 15, 20}),
+    ("5/20", 0, 59, {5, 25, 45}),
+    ("0,30,45", 0, 59, {0, 30, 45}),
+])
+def test_parse_cron_field(field, low, high, expected):
+    assert _parse_cron_field(field, low, high) == expected
+
+
+@pytest.mark.parametrize("field", ["60", "5-1", "*/0", "a", "0-60"])
+def test_parse_cron_field_rejects_invalid(field):
+    with pytest.raises(ValueError):
+        _parse_cron_field(field, 0, 59)
+
+
+@pytest.mark.parametrize("expression, now, expected", [
+    ("0 */6 * * *", _ts(2024, 3, 10, 5, 59, 30), _ts(2024, 3, 10, 6, 0)),
+    ("0 */6 * * *", _ts(2024, 3, 10, 6, 0), _ts(2024, 3, 10, 12, 0)),
+    ("@daily", _ts(2024, 12, 31, 23, 0), _ts(2025, 1, 1, 0, 0)),
+    ("30 2 * * 1", _ts(2024, 3, 10, 12, 0), _ts(2024, 3, 11, 2, 30)),       # 10 Mart 2024 Pazar
+    ("0 0 29 2 *", _ts(2024, 3, 1, 0, 0), _ts(2028, 2, 29, 0, 0)),
+    # Gün ve haftanın günü birlikte kısıtlıysa biri tutması yeterli (ayın 15'i ya da Pazar)
+    ("0 0 15 * 0", _ts(2024, 3, 11, 0, 0), _ts(2024, 3, 15, 0, 0)),
+    ("0 0 15 * 7", _ts(2024, 3, 15, 1, 0), _ts(2024, 3, 17, 0, 0)),
+])
+def test_cron_next_after(expression, now, expected):
+    assert CronSchedule(expression).next_after(now) == expected
+
+
+@pytest.mark.parametrize("expression", ["0 0 * *", "0 0 31 2 *", "61 * * * *"])
+def test_cron_rejects_invalid_or_impossible(expression):
+    with pytest.raises(ValueError):
+        CronSchedule(expression).next_after(_ts(2024, 1, 1))
+
+
+def test_stagger_offset_is_stable_and_bounded():
+    offset = stagger_offset("sub-a", 600.0)
+    assert offset == stagger_offset("sub-a", 600.0)
+    assert 0.0 <= offset < 600.0
+    assert stagger_offset("sub-a", 0.0) == 0.0
+
+
+@pytest.fixture
+def queue(tmp_path):
+    job_queue = JobQueue(str(tmp_path / "scheduler.db"))
+    yield job_queue
+    job_queue.close()
+
+
+def test_enqueue_due_follows_cron_and_skips_active_subscription(queue):
+    now = _ts(2024, 3, 10, 5, 0)
+    queue.sync_schedules([ScheduleConfig("sub-a", "t", "c", cron="0 */6 * * *", stagger_seconds=0)], now=now)
+
+    assert queue.enqueue_due(now) == 0
+    assert queue.enqueue_due(_ts(2024, 3, 10, 6, 0)) == 1
+    # Bekleyen iş varken bir sonraki zaman gelse de ikinci iş eklenmez
+    assert queue.enqueue_due(_ts(2024, 3, 10, 12, 0)) == 0
+
+
+def test_claim_runs_one_job_per_subscription(queue):
+    now = _ts(2024, 3, 10, 6, 0)
+    for subscription_id in ("sub-a", "sub-a", "sub-b"):
+        queue.enqueue(subscription_id, not_before=now)
+    queue.enqueue("sub-c", not_before=now + 3600)
+
+    first = queue.claim("w1", now=now)
+    second = queue.claim("w2", now=now)
+    assert {first.subscription_id, second.subscription_id} == {"sub-a", "sub-b"}
+    # sub-a'nın ikinci işi ilki bitmeden, sub-c'nin işi zamanı gelmeden alınmaz
+    assert queue.claim("w3", now=now) is None
+
+    queue.complete(first.job_id, 3)
+    queue.complete(second.job_id, 1)
+    third = queue.claim("w3", now=now)
+    assert third.subscription_id == "sub-a"
+    assert queue.claim("w4", now=now + 3600).subscription_id == "sub-c"
+
+
+def test_failed_job_is_retried_then_marked_failed(queue):
+    queue.enqueue("sub-a", not_before=1.0)
+    job = queue.claim("w1", now=1.0)
+    for attempt in range(1, 3):
+        assert job.attempts == attempt
+        assert queue.fail(job, "boom", max_attempts=3, retry_delay=0.0) is True
+        job = queue.claim("w1", now=_ts(2100, 1, 1))
+    assert job.attempts == 3
+    assert queue.fail(job, "boom", max_attempts=3, retry_delay=0.0) is False
+    assert queue.claim("w1", now=_ts(2100, 1, 1)) is None
+    status = queue._conn.execute("SELECT status, error FROM jobs WHERE job_id = ?", (job.job_id,)).fetchone()
+    assert tuple(status) == (JOB_FAILED, "boom")
+
+
+def test_expired_lease_is_requeued(queue):
+    queue.enqueue("sub-a", not_before=100.0)
+    job = queue.claim("w1", now=100.0, lease_seconds=60.0)
+    assert queue.requeue_expired(now=150.0) == 0
+    assert queue.requeue_expired(now=161.0) == 1
+    status = queue._conn.execute("SELECT status FROM jobs WHERE job_id = ?", (job.job_id,)).fetchone()[0]
+    assert status == JOB_QUEUED
+    assert queue.claim("w2", now=161.0).job_id == job.job_id